@@ -26,6 +26,7 @@ import argparse
 import json
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -289,11 +290,15 @@ def generate_full_checkpoint(since: str | None = None) -> Path | None:
     # Ensure checkpoints directory exists
     CHECKPOINTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Gather data
-    entries = parse_logs(since)
-    commits = get_git_commits(since)
-    file_changes = get_file_changes(since)
-    file_stats = get_file_stats(since)
+    # Gather data (the git queries are independent and run concurrently)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        commits_future = pool.submit(get_git_commits, since)
+        file_changes_future = pool.submit(get_file_changes, since)
+        file_stats_future = pool.submit(get_file_stats, since)
+        entries = parse_logs(since)
+    commits = commits_future.result()
+    file_changes = file_changes_future.result()
+    file_stats = file_stats_future.result()
 
     # Count CLI consultations
     codex_count = sum(1 for e in entries if e.get("tool") == "codex")
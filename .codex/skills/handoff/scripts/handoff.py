@@ -17,6 +17,7 @@ import json
 import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -180,10 +181,15 @@ def collect_handoff_data(project_dir: Path) -> dict:
     tasks = parse_tasks(content)
     decisions = parse_decisions(content)
 
-    branch = get_branch(project_dir)
-    commits = get_recent_commits(project_dir)
-    diff_stat = filter_sensitive_lines(get_diff_stat(project_dir))
-    working_ctx = load_working_context(project_dir)
+    # The git queries are independent: run them concurrently instead of one after another
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        branch_future = pool.submit(get_branch, project_dir)
+        commits_future = pool.submit(get_recent_commits, project_dir)
+        diff_stat_future = pool.submit(get_diff_stat, project_dir)
+        working_ctx = load_working_context(project_dir)
+    branch = branch_future.result()
+    commits = commits_future.result()
+    diff_stat = filter_sensitive_lines(diff_stat_future.result())
 
     return {
         "timestamp": datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S UTC"),
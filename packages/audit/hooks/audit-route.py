@@ -32,7 +32,7 @@ from hook_common import (
     find_first_int,
     find_first_text,
     load_package_config,
-    read_hook_input,
+    peek_hook_input,
     read_json_safe,
     safe_hook_execution,
 )
@@ -46,6 +46,9 @@ TEST_CMD_PATTERN = re.compile(
     r"\b(pytest|npm\s+test|pnpm\s+test|yarn\s+test|go\s+test|cargo\s+test|ruff\s+check|mypy)\b"
 )
 
+# ルートを検出しうるツール名（小文字）
+ROUTE_TOOLS = frozenset({"bash", "task", "agent", "skill"})
+
 
 # ---------------------------------------------------------------------------
 # Route detection
@@ -174,7 +177,13 @@ def main() -> None:
     実ルートを検出し、予測ルートとの一致判定を行って route_decision イベントを記録する。
     テストコマンドの検出時には quality_gate イベントも記録する。
     """
-    data = read_hook_input()
+    hook_input = peek_hook_input()
+    # matcher なしで全ツールに登録されているため、ルートにならないツール（Read 等）は
+    # 巨大な tool_response をデコードする前に終了する
+    peeked_tool = hook_input.get("tool_name")
+    if isinstance(peeked_tool, str) and peeked_tool and peeked_tool.lower() not in ROUTE_TOOLS:
+        return
+    data = hook_input.data
 
     root = resolve_project_root_from_hook_data(data)
     flags = load_package_config("audit", "audit-flags.json", root)
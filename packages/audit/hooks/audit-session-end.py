@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""SessionEnd hook: セッション終了時にサマリーを記録する。"""
+"""SessionEnd hook: セッション終了時にサマリーを記録する。
+
+セッションログ全体の再集計はセッション終了を待たせないよう遅延ジョブキュー
+（core の job_queue.py）に積み、ワーカーから同じ入力で再実行されたときに行う。
+"""
 
 from __future__ import annotations
 
@@ -24,6 +28,11 @@ if _orchestra_dir:
 from event_logger import emit_event, get_session_log_path
 from hook_common import read_hook_input, safe_hook_execution
 
+try:
+    from job_queue import defer_hook
+except ImportError:  # pragma: no cover - core の旧バージョンではその場で集計する
+    defer_hook = None  # type: ignore[assignment]
+
 
 def _count_events(session_log_path: str) -> dict:
     """セッションログからイベント数・エラー数・開始時刻を集計する。
@@ -122,7 +131,8 @@ def main() -> None:
     """SessionEnd hook のエントリポイント。
 
     セッションログを読み込み、イベント数・エラー数・経過時間を集計して
-    session_end イベントを記録する。
+    session_end イベントを記録する。hook から直接呼ばれた場合は終了時刻を
+    ended_at として入力に添えてジョブに積み、集計はワーカー側で行う。
     """
     data = read_hook_input()
     session_id = str(data.get("session_id") or "")
@@ -131,11 +141,19 @@ def main() -> None:
 
     cwd = str(data.get("cwd") or "") or os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
 
+    ended_at = str(data.get("ended_at") or "") or datetime.now(UTC).isoformat()
+    if defer_hook is not None and defer_hook(
+        __file__,
+        cwd,
+        {**data, "ended_at": ended_at},
+        key=f"audit-session-end:{session_id}",
+    ):
+        return
+
     session_log = get_session_log_path(session_id, project_dir=cwd)
     stats = _count_events(session_log)
 
-    now = datetime.now(UTC).isoformat()
-    duration_ms = _calc_duration_ms(stats.get("first_ts", ""), now)
+    duration_ms = _calc_duration_ms(stats.get("first_ts", ""), ended_at)
 
     emit_event(
         "session_end",
@@ -13,10 +13,24 @@ import json
 import os
 import re
 import subprocess
-import tempfile
+import sys
 import uuid
 from typing import Any
 
+_orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
+if _orchestra_dir:
+    _core_hooks = os.path.join(_orchestra_dir, "packages", "core", "hooks")
+else:
+    _core_hooks = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "core",
+        "hooks",
+    )
+if _core_hooks not in sys.path:
+    sys.path.insert(0, _core_hooks)
+
+from state_store import PROJECT, STATE_ERRORS, open_store, state_db_path  # noqa: E402
+
 
 def _resolve_root_worktree(project_dir: str | None = None) -> str | None:
     """Git の root worktree パスを解決する。
@@ -69,10 +83,13 @@ SCHEMA_VERSION = 1
 # 以下のパス定数はプロジェクトルートとの相対パス。_resolve_project_dir() と結合して使用する
 LOG_BASE_DIR = os.path.join(".claude", "logs", "audit")
 SESSIONS_DIR = os.path.join(LOG_BASE_DIR, "sessions")
-STATE_DIR = os.path.join(".claude", "state")
-TRACE_STATE_FILE = "audit-trace.json"
+# 状態ストア（PROJECT namespace）上のトレース state のキー
+TRACE_STATE_KEY = "audit-trace"
+SUBAGENT_TRACE_KEY_PREFIX = "audit-subagent:"
+# SubagentStop が来ずに残ったサブエージェント state の保持期間（秒）
+SUBAGENT_TRACE_TTL = 24 * 3600
 
-# ログディレクトリ / state ファイルのパーミッション（所有者のみ読み書き可）
+# ログディレクトリ / ログファイルのパーミッション（所有者のみ読み書き可）
 LOG_DIR_MODE = 0o700
 LOG_FILE_MODE = 0o600
 
@@ -89,6 +106,7 @@ EVENT_TYPES = frozenset(
         "instructions_loaded",
         "turn_end",
         "precompact",
+        "mcp_proxy",
     }
 )
 
@@ -195,36 +213,16 @@ def get_log_base_path(project_dir: str | None = None) -> str:
 # ---------------------------------------------------------------------------
 
 
-def _trace_state_path(project_dir: str | None = None) -> str:
-    """トレース state ファイルのパスを返す。"""
+def _load_state_value(key: str, project_dir: str | None) -> dict[str, str]:
+    """状態ストアから値を読み込む（DB がなければ作らずに空辞書を返す）。"""
     root = _resolve_project_dir(project_dir)
-    return os.path.join(root, STATE_DIR, TRACE_STATE_FILE)
-
-
-def _atomic_write_json(path: str, data: dict) -> None:
-    """JSON ファイルをアトミックに書き出す（tempfile + os.replace）。
-
-    Args:
-        path: 書き込み先パス。
-        data: JSON 化する辞書。
-
-    Raises:
-        OSError: 書き込みに失敗した場合。
-    """
-    dir_name = os.path.dirname(path)
-    os.makedirs(dir_name, mode=LOG_DIR_MODE, exist_ok=True)
-    fd, tmp_path = tempfile.mkstemp(prefix=".audit-", dir=dir_name)
+    if not os.path.isfile(state_db_path(root)):
+        return {}
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f)
-        os.chmod(tmp_path, LOG_FILE_MODE)
-        os.replace(tmp_path, path)
-    except Exception:
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
-        raise
+        value = open_store(root).get(PROJECT, key)
+    except STATE_ERRORS:
+        return {}
+    return value if isinstance(value, dict) else {}
 
 
 def save_trace_state(
@@ -234,7 +232,7 @@ def save_trace_state(
     expected_route: str = "",
     project_dir: str | None = None,
 ) -> None:
-    """現在のトレース ID を state ファイルに保存する（アトミック書き込み）。
+    """現在のトレース ID を状態ストアに保存する。
 
     Args:
         tid: トレース ID（UserPromptSubmit 起点で生成される）
@@ -242,33 +240,25 @@ def save_trace_state(
         expected_route: 予測ルート（audit-route.py が参照する）
         project_dir: プロジェクトルート。省略時は自動解決。
     """
-    path = _trace_state_path(project_dir)
     data = {
         "tid": tid,
         "session_id": session_id,
         "expected_route": expected_route,
         "updated_at": datetime.datetime.now(datetime.UTC).isoformat(),
     }
-    _atomic_write_json(path, data)
+    open_store(_resolve_project_dir(project_dir)).put(PROJECT, TRACE_STATE_KEY, data)
 
 
 def load_trace_state(project_dir: str | None = None) -> dict[str, str]:
-    """state ファイルからトレース情報を読み込む。
+    """状態ストアからトレース情報を読み込む。
 
     Args:
         project_dir: プロジェクトルート。省略時は自動解決。
 
     Returns:
-        トレース情報辞書。存在しない/パース失敗時は空辞書。
+        トレース情報辞書。存在しない/読み込み失敗時は空辞書。
     """
-    path = _trace_state_path(project_dir)
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
+    return _load_state_value(TRACE_STATE_KEY, project_dir)
 
 
 # ---------------------------------------------------------------------------
@@ -276,11 +266,9 @@ def load_trace_state(project_dir: str | None = None) -> dict[str, str]:
 # ---------------------------------------------------------------------------
 
 
-def _subagent_trace_path(agent_id: str, project_dir: str | None = None) -> str:
-    """サブエージェント固有の state ファイルパスを返す。"""
-    root = _resolve_project_dir(project_dir)
-    safe_aid = _sanitize_session_id(agent_id)
-    return os.path.join(root, STATE_DIR, f"audit-subagent-{safe_aid}.json")
+def _subagent_trace_key(agent_id: str) -> str:
+    """サブエージェント固有の state キーを返す。"""
+    return SUBAGENT_TRACE_KEY_PREFIX + _sanitize_session_id(agent_id)
 
 
 def save_subagent_trace(
@@ -290,7 +278,7 @@ def save_subagent_trace(
     ptid: str = "",
     project_dir: str | None = None,
 ) -> None:
-    """サブエージェント固有のトレース情報を保存する（アトミック書き込み）。
+    """サブエージェント固有のトレース情報を保存する（SUBAGENT_TRACE_TTL 後に失効）。
 
     Args:
         aid: エージェント ID
@@ -298,14 +286,15 @@ def save_subagent_trace(
         ptid: 親トレース ID
         project_dir: プロジェクトルート。省略時は自動解決。
     """
-    path = _subagent_trace_path(aid, project_dir)
     data = {
         "tid": tid,
         "ptid": ptid,
         "aid": aid,
         "updated_at": datetime.datetime.now(datetime.UTC).isoformat(),
     }
-    _atomic_write_json(path, data)
+    open_store(_resolve_project_dir(project_dir)).put(
+        PROJECT, _subagent_trace_key(aid), data, ttl=SUBAGENT_TRACE_TTL
+    )
 
 
 def load_subagent_trace(aid: str, project_dir: str | None = None) -> dict[str, str]:
@@ -316,29 +305,24 @@ def load_subagent_trace(aid: str, project_dir: str | None = None) -> dict[str, s
         project_dir: プロジェクトルート。省略時は自動解決。
 
     Returns:
-        トレース情報辞書。存在しない/パース失敗時は空辞書。
+        トレース情報辞書。存在しない/読み込み失敗時は空辞書。
     """
-    path = _subagent_trace_path(aid, project_dir)
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
+    return _load_state_value(_subagent_trace_key(aid), project_dir)
 
 
 def cleanup_subagent_trace(aid: str, project_dir: str | None = None) -> None:
-    """サブエージェント固有のトレース state ファイルを削除する。
+    """サブエージェント固有のトレース state を削除する。
 
     Args:
         aid: エージェント ID
         project_dir: プロジェクトルート。省略時は自動解決。
     """
-    path = _subagent_trace_path(aid, project_dir)
+    root = _resolve_project_dir(project_dir)
+    if not os.path.isfile(state_db_path(root)):
+        return
     try:
-        os.remove(path)
-    except OSError:
+        open_store(root).delete(PROJECT, _subagent_trace_key(aid))
+    except STATE_ERRORS:
         pass
 
 
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import io
+import json
 import os
 import sys
 
+import pytest
+
 from tests.module_loader import REPO_ROOT, load_module
 
 _audit_hooks = str(REPO_ROOT / "packages" / "audit" / "hooks")
@@ -19,6 +23,7 @@ os.environ.setdefault("AI_ORCHESTRA_DIR", str(REPO_ROOT))
 audit_route = load_module("audit_route", "packages/audit/hooks/audit-route.py")
 audit_cli = load_module("audit_cli", "packages/audit/hooks/audit-cli.py")
 audit_prompt = load_module("audit_prompt", "packages/audit/hooks/audit-prompt.py")
+audit_session_end = load_module("audit_session_end", "packages/audit/hooks/audit-session-end.py")
 
 
 # ---------------------------------------------------------------------------
@@ -241,3 +246,60 @@ class TestSelectExpectedRoute:
         route, rule = audit_prompt.select_expected_route("please optimize this query", {}, policy)
         assert route == "codex"
         assert rule == "r1"
+
+
+# ---------------------------------------------------------------------------
+# main (from audit-session-end.py)
+# ---------------------------------------------------------------------------
+
+
+class TestSessionEndDeferred:
+    """audit-session-end の遅延実行のテスト。"""
+
+    def _invoke(self, payload: dict, monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+        emitted: list[tuple] = []
+        monkeypatch.setattr(
+            audit_session_end, "emit_event", lambda *args, **kwargs: emitted.append((args, kwargs))
+        )
+        monkeypatch.setattr(sys, "stdin", io.StringIO(json.dumps(payload)))
+        audit_session_end.main()
+        return emitted
+
+    def test_hook_only_enqueues(self, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """hook からの直接実行では ended_at を添えてジョブに積むだけで集計しない。"""
+        deferred: list[tuple] = []
+
+        def fake_defer(script, project_dir, data, **kwargs):
+            deferred.append((project_dir, data, kwargs))
+            return True
+
+        monkeypatch.setattr(audit_session_end, "defer_hook", fake_defer)
+        emitted = self._invoke({"session_id": "s1", "cwd": str(tmp_path)}, monkeypatch)
+
+        assert emitted == []
+        project_dir, data, kwargs = deferred[0]
+        assert project_dir == str(tmp_path)
+        assert data["ended_at"]
+        assert kwargs["key"] == "audit-session-end:s1"
+
+    def test_worker_uses_recorded_end_time(self, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """ワーカーでの実行時は入力の ended_at で経過時間を計算する。"""
+        monkeypatch.setattr(audit_session_end, "defer_hook", lambda *args, **kwargs: False)
+        log_path = tmp_path / "s1.jsonl"
+        log_path.write_text(
+            json.dumps({"type": "session_start", "ts": "2026-01-01T00:00:00+00:00"}) + "\n",
+            encoding="utf-8",
+        )
+        monkeypatch.setattr(
+            audit_session_end, "get_session_log_path", lambda *args, **kwargs: str(log_path)
+        )
+
+        emitted = self._invoke(
+            {"session_id": "s1", "cwd": str(tmp_path), "ended_at": "2026-01-01T00:00:05+00:00"},
+            monkeypatch,
+        )
+
+        args, _ = emitted[0]
+        assert args[0] == "session_end"
+        assert args[1]["duration_ms"] == 5000
+        assert args[1]["event_count"] == 1
@@ -10,6 +10,9 @@
 クリーンアップ: enabled=false またはパッケージ未インストール時にエントリを削除する。
 
 v2: proxy.enabled=true 時は mcp-proxy 経由の HTTP エントリを生成する。
+proxy.async_start=true（既定）では proxy の起動を待たずに HTTP エントリを書き、
+準備完了の確認は切り離した watcher（このスクリプトの --watch-proxy モード）に任せる。
+watcher は proxy が起動しなければエントリを stdio に戻し、起動時間を監査ログに記録する。
 """
 
 from __future__ import annotations
@@ -17,7 +20,9 @@ from __future__ import annotations
 import json
 import os
 import re
+import subprocess
 import sys
+import time
 
 # hook_common を import するため core/hooks を sys.path に追加
 _orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
@@ -26,6 +31,11 @@ if _orchestra_dir:
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
 
+    # audit package が有効なら event_logger を読み込む（proxy の起動時間を監査ログに残す）
+    _audit_hooks = os.path.join(_orchestra_dir, "packages", "audit", "hooks")
+    if os.path.isdir(_audit_hooks) and _audit_hooks not in sys.path:
+        sys.path.insert(0, _audit_hooks)
+
 # proxy_manager を import するため自ディレクトリを sys.path に追加
 _hooks_dir = os.path.dirname(os.path.abspath(__file__))
 if _hooks_dir not in sys.path:
@@ -38,7 +48,20 @@ from hook_common import (
     safe_hook_execution,
     write_json,
 )
-from proxy_manager import get_proxy_config, start_proxy
+from proxy_manager import (
+    PROXY_FAILED,
+    PROXY_STARTING,
+    get_proxy_config,
+    start_proxy_async,
+    wait_for_proxy,
+)
+
+try:
+    from event_logger import emit_event as _emit_event  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - audit 未導入時は起動時間を記録しない
+    _emit_event = None  # type: ignore[assignment]
+
+WATCH_PROXY_FLAG = "--watch-proxy"
 
 # ---------------------------------------------------------------------------
 # Claude Code (.mcp.json)
@@ -295,6 +318,102 @@ TARGET_HANDLERS = {
 }
 
 
+def provision_targets(
+    project_dir: str, config: dict, server_name: str, enabled: bool, proxy_active: bool
+) -> list[str]:
+    """全 CLI のエントリを追加/更新/削除し、変更した CLI 名を返す。"""
+    changed: list[str] = []
+    targets = config.get("targets", {}) if enabled else {}
+    for target_name, (provision_fn, cleanup_fn) in TARGET_HANDLERS.items():
+        if targets.get(target_name, {}).get("enabled", False):
+            result = provision_fn(project_dir, config, server_name, proxy_active)
+        else:
+            result = cleanup_fn(project_dir, server_name)
+        if result:
+            changed.append(result)
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# proxy の準備完了確認
+# ---------------------------------------------------------------------------
+
+
+def record_proxy_startup(
+    project_dir: str, session_id: str, mode: str, ready: bool, startup_ms: int, port: int
+) -> None:
+    """proxy の起動結果を監査ログに記録する（audit 未導入時はスキップ）。"""
+    if _emit_event is None or not session_id:
+        return
+    try:
+        _emit_event(
+            "mcp_proxy",
+            {
+                "mode": mode,
+                "ready": ready,
+                "startup_ms": startup_ms,
+                "port": port,
+                "fallback": None if ready else "stdio",
+            },
+            session_id=session_id,
+            project_dir=project_dir,
+        )
+    except Exception as exc:  # pragma: no cover - 診断ログのみ、フックは止めない
+        print(f"[cocoindex] failed to emit audit event: {exc}", file=sys.stderr)
+
+
+def await_proxy(
+    project_dir: str, config: dict, session_id: str, started_at: float, mode: str
+) -> bool:
+    """起動した proxy の準備完了を待ち、起動時間（started_at からの経過）を記録する。"""
+    ready = wait_for_proxy(config, project_dir)
+    startup_ms = int((time.time() - started_at) * 1000)
+    port = get_proxy_config(config, project_dir)["port"]
+    record_proxy_startup(project_dir, session_id, mode, ready, startup_ms, port)
+    return ready
+
+
+def spawn_readiness_watcher(project_dir: str, session_id: str, started_at: float) -> None:
+    """準備完了を確認する watcher を hook から切り離して起動する。"""
+    cmd = [
+        sys.executable,
+        os.path.abspath(__file__),
+        WATCH_PROXY_FLAG,
+        project_dir,
+        session_id,
+        f"{started_at:.3f}",
+    ]
+    try:
+        subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def watch_proxy(project_dir: str, session_id: str, started_at: float) -> bool:
+    """proxy の準備完了を待つ。起動しなければエントリを stdio に戻す。"""
+    config = load_package_config("cocoindex", "cocoindex.yaml", project_dir)
+    if not config:
+        return False
+
+    if await_proxy(project_dir, config, session_id, started_at, "async"):
+        return True
+
+    server_name = config.get("server_name", "cocoindex-code")
+    provision_targets(project_dir, config, server_name, config.get("enabled", False), False)
+    return False
+
+
+# ---------------------------------------------------------------------------
+# メイン
+# ---------------------------------------------------------------------------
+
+
 @safe_hook_execution
 def main() -> None:
     data = read_hook_input()
@@ -305,34 +424,26 @@ def main() -> None:
     config = load_package_config("cocoindex", "cocoindex.yaml", project_dir)
     enabled = config.get("enabled", False) if config else False
     server_name = config.get("server_name", "cocoindex-code") if config else "cocoindex-code"
+    session_id = data.get("session_id", "")
 
     # proxy 判定
     proxy_active = False
     if enabled and config:
-        proxy_cfg = config.get("proxy", {})
-        proxy_enabled = proxy_cfg.get("enabled", False)
-        if proxy_enabled:
-            proxy_active = start_proxy(config, project_dir)
+        proxy_cfg = get_proxy_config(config, project_dir)
+        if proxy_cfg["enabled"]:
+            started_at = time.time()
+            status = start_proxy_async(config, project_dir)
+            proxy_active = status != PROXY_FAILED
+            if status == PROXY_STARTING:
+                if proxy_cfg["async_start"]:
+                    # HTTP エントリを先に書き、起動しなければ watcher が stdio に戻す
+                    spawn_readiness_watcher(project_dir, session_id, started_at)
+                else:
+                    proxy_active = await_proxy(project_dir, config, session_id, started_at, "sync")
             if not proxy_active:
                 print("[cocoindex] mcp-proxy failed, falling back to stdio", file=sys.stderr)
 
-    changed: list[str] = []
-
-    if enabled:
-        targets = config.get("targets", {})
-        for target_name, (provision_fn, cleanup_fn) in TARGET_HANDLERS.items():
-            target_config = targets.get(target_name, {})
-            if target_config.get("enabled", False):
-                result = provision_fn(project_dir, config, server_name, proxy_active)
-            else:
-                result = cleanup_fn(project_dir, server_name)
-            if result:
-                changed.append(result)
-    else:
-        for target_name, (_provision_fn, cleanup_fn) in TARGET_HANDLERS.items():
-            result = cleanup_fn(project_dir, server_name)
-            if result:
-                changed.append(result)
+    changed = provision_targets(project_dir, config or {}, server_name, enabled, proxy_active)
 
     if changed:
         mode = "proxy" if proxy_active else "stdio"
@@ -340,4 +451,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) == 5 and sys.argv[1] == WATCH_PROXY_FLAG:
+        watch_proxy(sys.argv[2], sys.argv[3], float(sys.argv[4]))
+    else:
+        main()
@@ -24,9 +24,17 @@ _DEFAULTS: dict = {
     "host": "127.0.0.1",
     "pid_file": ".claude/.mcp-proxy.pid",
     "startup_timeout": 10,
+    "async_start": True,
 }
 
-_PORT_POLL_INTERVAL = 0.3
+# start_proxy_async() の結果
+PROXY_RUNNING = "running"  # 既に稼働中（ポート応答あり）
+PROXY_STARTING = "starting"  # 起動した（準備完了は wait_for_proxy() で確認する）
+PROXY_FAILED = "failed"  # 起動できなかった
+
+# 起動待ちの接続確認は初回 _PROBE_INITIAL_DELAY 秒から倍々に伸ばし、_PROBE_MAX_DELAY 秒で頭打ち
+_PROBE_INITIAL_DELAY = 0.05
+_PROBE_MAX_DELAY = 0.5
 _EXIT_POLL_INTERVAL = 0.2
 _SIGTERM_WAIT = 5
 
@@ -59,14 +67,28 @@ def resolve_pid_path(config: dict, project_dir: str) -> str:
 
 
 def start_proxy(config: dict, project_dir: str) -> bool:
-    """mcp-proxy を起動する。既に起動中ならスキップ（冪等）。
+    """mcp-proxy を起動し、ポートが開くまで待つ。既に起動中ならスキップ（冪等）。
 
     Returns:
         True: proxy が利用可能になった
         False: 起動失敗
     """
+    status = start_proxy_async(config, project_dir)
+    if status != PROXY_STARTING:
+        return status == PROXY_RUNNING
+    return wait_for_proxy(config, project_dir)
+
+
+def start_proxy_async(config: dict, project_dir: str) -> str:
+    """mcp-proxy を起動して PID ファイルを書き、ポートが開くのを待たずに返す。
+
+    Returns:
+        PROXY_RUNNING: 既に稼働中
+        PROXY_STARTING: 起動した（準備完了は wait_for_proxy() で確認する）
+        PROXY_FAILED: 起動失敗
+    """
     if is_proxy_running(config, project_dir):
-        return True
+        return PROXY_RUNNING
 
     # PID ファイルが無効でもポートが使用中なら稼働中とみなす
     # （前セッションの proxy が停止されずに残っているケース）
@@ -79,7 +101,7 @@ def start_proxy(config: dict, project_dir: str) -> bool:
             _write_pid(pid_path, port_pid)
         else:
             _remove_pid(pid_path)
-        return True
+        return PROXY_RUNNING
 
     cleanup_orphan(config, project_dir)
 
@@ -99,22 +121,36 @@ def start_proxy(config: dict, project_dir: str) -> bool:
             start_new_session=True,
         )
     except (OSError, FileNotFoundError, ValueError):
-        return False
+        return PROXY_FAILED
 
     _write_pid(pid_path, proc.pid)
+    return PROXY_STARTING
 
-    host = proxy_cfg["host"]
-    port = proxy_cfg["port"]
-    timeout = proxy_cfg["startup_timeout"]
 
-    if _wait_for_port(host, port, timeout):
+def wait_for_proxy(config: dict, project_dir: str, timeout: float | None = None) -> bool:
+    """起動した proxy のポートが開くまで待つ（既定は startup_timeout 秒）。
+
+    プロセスが先に終了した場合はすぐに諦める。失敗時はプロセスを kill して
+    PID ファイルを削除する。
+
+    Returns:
+        True: proxy が利用可能になった
+        False: 起動失敗
+    """
+    proxy_cfg = get_proxy_config(config, project_dir)
+    pid_path = resolve_pid_path(config, project_dir)
+    pid = _read_pid(pid_path)
+    wait_timeout = float(proxy_cfg["startup_timeout"]) if timeout is None else timeout
+
+    if _wait_for_port(proxy_cfg["host"], proxy_cfg["port"], wait_timeout, pid):
         return True
 
     # タイムアウト — プロセスを kill して失敗
-    try:
-        os.kill(proc.pid, signal.SIGKILL)
-    except OSError:
-        pass
+    if pid is not None:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
     _remove_pid(pid_path)
     return False
 
@@ -255,6 +291,20 @@ def _is_pid_alive(pid: int) -> bool:
         return False
 
 
+def _has_exited(pid: int) -> bool:
+    """PID のプロセスが終了していれば True。
+
+    自分の子プロセス（同期起動した proxy）は waitpid で回収する。回収しないと
+    ゾンビとして残り、kill(pid, 0) では生存扱いになるため。
+    """
+    try:
+        reaped, _status = os.waitpid(pid, os.WNOHANG)
+    except OSError:
+        # 子プロセスでない（別プロセスが起動した proxy）
+        return not _is_pid_alive(pid)
+    return reaped == pid
+
+
 def _is_port_in_use(host: str, port: int) -> bool:
     """指定ホスト:ポートが使用中かチェックする。"""
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
@@ -262,14 +312,25 @@ def _is_port_in_use(host: str, port: int) -> bool:
         return sock.connect_ex((host, port)) == 0
 
 
-def _wait_for_port(host: str, port: int, timeout: float) -> bool:
-    """ポートが開くまで待機する。"""
+def _wait_for_port(host: str, port: int, timeout: float, pid: int | None = None) -> bool:
+    """ポートが開くまで待機する。
+
+    接続確認の間隔は指数バックオフで伸ばす（すぐ起動する場合は早く気づき、
+    uvx のキャッシュ作成などで遅い場合は確認回数を抑える）。
+    pid が指定された場合、そのプロセスが終了したら待たずに False を返す。
+    """
     deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
+    delay = _PROBE_INITIAL_DELAY
+    while True:
         if _is_port_in_use(host, port):
             return True
-        time.sleep(_PORT_POLL_INTERVAL)
-    return False
+        if pid is not None and _has_exited(pid):
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, _PROBE_MAX_DELAY)
 
 
 def _wait_for_exit(pid: int, timeout: float) -> bool:
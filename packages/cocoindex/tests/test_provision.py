@@ -12,8 +12,11 @@ from __future__ import annotations
 
 import json
 import sys
+import time
 from pathlib import Path
 
+import pytest
+
 from tests.module_loader import REPO_ROOT, load_module
 
 # hook_common を先に読み込む（provision が import するため）
@@ -483,3 +486,78 @@ class TestProxyModeEntries:
         entry = data["mcpServers"]["cocoindex-code"]
         assert entry["command"] == "uvx"
         assert entry["type"] == "stdio"
+
+
+# =========================================================================
+# 非同期起動（optimistic エントリ + readiness watcher）
+# =========================================================================
+
+
+class TestAsyncProxyStart:
+    """proxy.async_start=True 時の SessionStart と watcher のテスト。"""
+
+    def _setup(self, tmp_path: Path, monkeypatch) -> Path:
+        mcp_path = tmp_path / ".mcp.json"
+        mcp_path.write_text("{}")
+        monkeypatch.setattr(provision, "load_package_config", lambda *_: SAMPLE_CONFIG_V2)
+        return mcp_path
+
+    def test_main_writes_proxy_entry_without_waiting(self, tmp_path: Path, monkeypatch) -> None:
+        mcp_path = self._setup(tmp_path, monkeypatch)
+        spawned: list[tuple[str, str]] = []
+        monkeypatch.setattr(
+            provision,
+            "read_hook_input",
+            lambda: {"cwd": str(tmp_path), "session_id": "sess-1"},
+        )
+        monkeypatch.setattr(provision, "start_proxy_async", lambda *_: provision.PROXY_STARTING)
+        monkeypatch.setattr(
+            provision, "wait_for_proxy", lambda *_: pytest.fail("must not wait in the hook")
+        )
+        monkeypatch.setattr(
+            provision,
+            "spawn_readiness_watcher",
+            lambda project_dir, session_id, _started_at: spawned.append((project_dir, session_id)),
+        )
+
+        provision.main()
+
+        entry = json.loads(mcp_path.read_text())["mcpServers"][SERVER_NAME]
+        assert entry == {"type": "sse", "url": "http://127.0.0.1:8792/sse"}
+        assert spawned == [(str(tmp_path), "sess-1")]
+
+    def test_watcher_downgrades_to_stdio_and_records_startup(
+        self, tmp_path: Path, monkeypatch
+    ) -> None:
+        mcp_path = self._setup(tmp_path, monkeypatch)
+        provision.provision_claude(str(tmp_path), SAMPLE_CONFIG_V2, SERVER_NAME, proxy_active=True)
+        events: list[tuple] = []
+        monkeypatch.setattr(provision, "wait_for_proxy", lambda *_: False)
+        monkeypatch.setattr(
+            provision,
+            "_emit_event",
+            lambda event_type, data, **kwargs: events.append((event_type, data, kwargs)),
+        )
+
+        assert provision.watch_proxy(str(tmp_path), "sess-1", time.time() - 2) is False
+
+        entry = json.loads(mcp_path.read_text())["mcpServers"][SERVER_NAME]
+        assert entry["command"] == "uvx"
+        event_type, data, kwargs = events[0]
+        assert event_type == "mcp_proxy"
+        assert data["mode"] == "async"
+        assert data["ready"] is False
+        assert data["fallback"] == "stdio"
+        assert data["startup_ms"] >= 2000
+        assert kwargs["session_id"] == "sess-1"
+
+    def test_watcher_keeps_proxy_entry_when_ready(self, tmp_path: Path, monkeypatch) -> None:
+        mcp_path = self._setup(tmp_path, monkeypatch)
+        provision.provision_claude(str(tmp_path), SAMPLE_CONFIG_V2, SERVER_NAME, proxy_active=True)
+        monkeypatch.setattr(provision, "wait_for_proxy", lambda *_: True)
+        monkeypatch.setattr(provision, "_emit_event", None)
+
+        assert provision.watch_proxy(str(tmp_path), "sess-1", time.time()) is True
+
+        entry = json.loads(mcp_path.read_text())["mcpServers"][SERVER_NAME]
+        assert entry["type"] == "sse"
@@ -6,7 +6,9 @@ subprocess.Popen / os.kill / socket.connect_ex を mock でテストする。
 from __future__ import annotations
 
 import os
+import subprocess
 import sys
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -414,6 +416,107 @@ class TestStartProxy:
         assert result is False
 
 
+# =========================================================================
+# start_proxy_async / wait_for_proxy
+# =========================================================================
+
+
+class TestStartProxyAsync:
+    @patch("proxy_manager._wait_for_port")
+    @patch("proxy_manager.subprocess.Popen")
+    @patch("proxy_manager.cleanup_orphan")
+    @patch("proxy_manager._is_port_in_use", return_value=False)
+    @patch("proxy_manager.is_proxy_running", return_value=False)
+    def test_returns_without_waiting_for_port(
+        self,
+        mock_running: MagicMock,
+        mock_port_check: MagicMock,
+        mock_cleanup: MagicMock,
+        mock_popen: MagicMock,
+        mock_wait: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_popen.return_value = MagicMock(pid=99999)
+
+        result = proxy_mgr.start_proxy_async(SAMPLE_CONFIG, str(tmp_path))
+
+        assert result == proxy_mgr.PROXY_STARTING
+        mock_wait.assert_not_called()
+        pid_path = os.path.join(str(tmp_path), ".claude", ".mcp-proxy.pid")
+        assert proxy_mgr._read_pid(pid_path) == 99999
+
+    @patch("proxy_manager.is_proxy_running", return_value=True)
+    def test_running(self, mock_running: MagicMock, tmp_path: Path) -> None:
+        assert proxy_mgr.start_proxy_async(SAMPLE_CONFIG, str(tmp_path)) == "running"
+
+    @patch("proxy_manager.subprocess.Popen", side_effect=FileNotFoundError)
+    @patch("proxy_manager.cleanup_orphan")
+    @patch("proxy_manager._is_port_in_use", return_value=False)
+    @patch("proxy_manager.is_proxy_running", return_value=False)
+    def test_popen_failure(
+        self,
+        mock_running: MagicMock,
+        mock_port_check: MagicMock,
+        mock_cleanup: MagicMock,
+        mock_popen: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        assert proxy_mgr.start_proxy_async(SAMPLE_CONFIG, str(tmp_path)) == "failed"
+
+
+class TestWaitForPort:
+    @patch("proxy_manager.time.sleep")
+    @patch("proxy_manager._is_port_in_use", side_effect=[False] * 6 + [True])
+    def test_probes_with_exponential_backoff(
+        self, mock_port_check: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        assert proxy_mgr._wait_for_port("127.0.0.1", 8792, 60) is True
+
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert delays == [0.05, 0.1, 0.2, 0.4, 0.5, 0.5]
+
+    @patch("proxy_manager.time.sleep")
+    @patch("proxy_manager._is_pid_alive", return_value=False)
+    @patch("proxy_manager._is_port_in_use", return_value=False)
+    def test_gives_up_when_process_exits(
+        self, mock_port_check: MagicMock, mock_alive: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        assert proxy_mgr._wait_for_port("127.0.0.1", 8792, 60, pid=12345) is False
+        mock_sleep.assert_not_called()
+
+    @patch("proxy_manager._is_port_in_use", return_value=False)
+    def test_gives_up_when_child_process_exits(self, mock_port_check: MagicMock) -> None:
+        """終了した子プロセス（ゾンビ）も回収して待たずに諦める。"""
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        try:
+            # 終了を待つが回収はしない（ゾンビは kill(pid, 0) では生存扱い）
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+            assert proxy_mgr._is_pid_alive(proc.pid)
+
+            start = time.monotonic()
+            assert proxy_mgr._wait_for_port("127.0.0.1", 8792, 5, pid=proc.pid) is False
+            assert time.monotonic() - start < 1
+        finally:
+            proc.poll()
+
+
+class TestWaitForProxy:
+    @patch("proxy_manager.os.kill")
+    @patch("proxy_manager._wait_for_port", return_value=False)
+    def test_failure_kills_process_and_removes_pid(
+        self, mock_wait: MagicMock, mock_kill: MagicMock, tmp_path: Path
+    ) -> None:
+        pid_path = os.path.join(str(tmp_path), ".claude", ".mcp-proxy.pid")
+        os.makedirs(os.path.dirname(pid_path), exist_ok=True)
+        proxy_mgr._write_pid(pid_path, 88888)
+
+        assert proxy_mgr.wait_for_proxy(SAMPLE_CONFIG, str(tmp_path)) is False
+
+        mock_wait.assert_called_once_with("127.0.0.1", 8792, 10, 88888)
+        mock_kill.assert_called_once()
+        assert proxy_mgr._read_pid(pid_path) is None
+
+
 # =========================================================================
 # stop_proxy
 # =========================================================================
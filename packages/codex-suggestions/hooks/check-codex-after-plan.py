@@ -20,7 +20,7 @@ if _orchestra_dir:
     if _routing_hooks not in sys.path:
         sys.path.insert(0, _routing_hooks)
 
-from hook_common import load_package_config  # noqa: E402
+from hook_common import load_package_config, peek_hook_input  # noqa: E402
 from route_config import is_cli_enabled  # noqa: E402
 
 
@@ -56,13 +56,15 @@ def _build_codex_command(config: dict) -> str:
 
 def main():
     try:
-        data = json.load(sys.stdin)
-        tool_name = data.get("tool_name", "")
+        hook_input = peek_hook_input()
+        tool_name = hook_input.get("tool_name", "")
 
         # Only process Agent tool calls (backward compat: "Task" also accepted)
         if tool_name not in ("Agent", "Task"):
             sys.exit(0)
 
+        data = hook_input.data
+
         # Codex CLI が無効化されている場合は提案をスキップ
         project_dir = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
         config = load_package_config("agent-routing", "cli-tools.yaml", project_dir)
@@ -18,7 +18,11 @@ if _orchestra_dir:
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
 
-from hook_common import read_json_safe, safe_hook_execution  # noqa: E402
+from hook_common import peek_hook_input, safe_hook_execution  # noqa: E402
+from state_store import PROJECT, open_store, state_db_path  # noqa: E402
+
+# 状態ストア（PROJECT namespace）上の plan gate のキー
+PLAN_GATE_KEY = "plan-gate"
 
 # 実装系エージェント（plan gate でブロック対象）
 IMPLEMENTATION_AGENTS: set[str] = {
@@ -36,22 +40,21 @@ IMPLEMENTATION_AGENTS: set[str] = {
 WARN_AGENTS: set[str] = {"general-purpose"}
 
 
-def _get_gate_path(data: dict) -> str:
-    """plan-gate.json のパスを返す。"""
-    cwd = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
-    if not cwd:
-        return ""
-    return os.path.join(cwd, ".claude", "state", "plan-gate.json")
+def _get_project_dir(data: dict) -> str:
+    """plan gate を保持するプロジェクトディレクトリを返す（不明なら空文字）。"""
+    return data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
 
 
 @safe_hook_execution
 def main() -> None:
-    data = json.load(sys.stdin)
+    hook_input = peek_hook_input()
 
-    # Agent ツール以外は無視（後方互換のため "Task" も許容）
-    if data.get("tool_name") not in ("Agent", "Task"):
+    # Agent ツール以外は全体をデコードせずに無視（後方互換のため "Task" も許容）
+    if hook_input.get("tool_name") not in ("Agent", "Task"):
         sys.exit(0)
 
+    data = hook_input.data
+
     tool_input = data.get("tool_input", {})
     subagent_type = tool_input.get("subagent_type", "").lower()
 
@@ -62,11 +65,11 @@ def main() -> None:
         sys.exit(0)
 
     # plan gate の状態を確認
-    gate_path = _get_gate_path(data)
-    if not gate_path:
+    project_dir = _get_project_dir(data)
+    if not project_dir or not os.path.isfile(state_db_path(project_dir)):
         sys.exit(0)
 
-    gate = read_json_safe(gate_path)
+    gate = open_store(project_dir).get(PROJECT, PLAN_GATE_KEY) or {}
     if not gate.get("pending", False):
         sys.exit(0)
 
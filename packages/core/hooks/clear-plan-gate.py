@@ -19,29 +19,28 @@ if _orchestra_dir:
         sys.path.insert(0, _core_hooks)
 
 from hook_common import safe_hook_execution  # noqa: E402
+from state_store import PROJECT, open_store, state_db_path  # noqa: E402
 
+# 状態ストア（PROJECT namespace）上の plan gate のキー
+PLAN_GATE_KEY = "plan-gate"
 
-def _get_gate_path(data: dict) -> str:
-    """plan-gate.json のパスを返す。"""
-    cwd = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
-    if not cwd:
-        return ""
-    return os.path.join(cwd, ".claude", "state", "plan-gate.json")
+
+def _get_project_dir(data: dict) -> str:
+    """plan gate を保持するプロジェクトディレクトリを返す（不明なら空文字）。"""
+    return data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
 
 
 @safe_hook_execution
 def main() -> None:
     data = json.load(sys.stdin)
-    gate_path = _get_gate_path(data)
+    project_dir = _get_project_dir(data)
 
-    if not gate_path or not os.path.isfile(gate_path):
+    # 状態 DB がなければゲートも存在しない（毎プロンプト DB を作らない）
+    if not project_dir or not os.path.isfile(state_db_path(project_dir)):
         sys.exit(0)
 
-    # plan gate ファイルを削除してゲートを解除
-    try:
-        os.remove(gate_path)
-    except OSError:
-        pass
+    # plan gate のキーを削除してゲートを解除
+    open_store(project_dir).delete(PROJECT, PLAN_GATE_KEY)
 
     sys.exit(0)
 
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""hook から使う git 問い合わせ層。
+
+1 回の hook 実行で同じ git コマンドを何度も起動しないよう、問い合わせ結果をまとめて扱う。
+
+- メモ化: GitRepo.run() は同じ引数の結果をインスタンス内でキャッシュする（repo_for() が
+  ディレクトリごとに GitRepo をプロセス内でキャッシュするため、実質 1 回の hook 実行単位）
+- リポジトリの事実: toplevel / git dir / common dir は rev-parse 1 回でまとめて取得する。
+  persist=True のときは状態ストアにも保存し、git dir が存在する限り次の hook 実行でも再利用する
+- 追跡ファイル: ls-files（インデックス）と ls-tree（HEAD）を並行に起動して合わせる
+- 並行実行: 独立した問い合わせは run_many() でスレッド並行に起動する
+
+HEAD やインデックスの内容は hook 実行のたびに変わりうるため永続キャッシュしない。
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+try:
+    from state_store import PROJECT, STATE_ERRORS, open_store
+except ImportError:  # pragma: no cover - state_store 未導入時は事実を永続化しない
+    open_store = None  # type: ignore[assignment]
+
+GIT_TIMEOUT = 5
+
+# リポジトリの事実をまとめて取得する rev-parse（出力は指定順に 1 行ずつ）
+FACTS_ARGS = ("rev-parse", "--show-toplevel", "--absolute-git-dir", "--git-common-dir")
+
+# 追跡ファイル一覧（サブディレクトリから実行しても toplevel からの相対パスで全体を返す）
+INDEX_FILES_ARGS = ("ls-files", "-z", "--full-name", "--", ":/")
+HEAD_FILES_ARGS = ("ls-tree", "-r", "-z", "--name-only", "--full-tree", "HEAD")
+
+# 永続キャッシュした事実の有効期限（git dir の存在確認に加えて定期的に取り直す）
+FACTS_TTL = 24 * 3600
+
+_repos: dict[tuple[str, bool], GitRepo] = {}
+
+
+@dataclass(frozen=True)
+class RepoFacts:
+    """実行中に変わらないリポジトリの事実（すべて絶対パス）。"""
+
+    toplevel: str
+    git_dir: str
+    common_dir: str
+
+
+class GitRepo:
+    """1 つの作業ディレクトリに対する git 問い合わせ（結果はインスタンス内でメモ化）。"""
+
+    def __init__(self, cwd: str, *, timeout: float = GIT_TIMEOUT, persist: bool = False) -> None:
+        self.cwd = cwd
+        self.timeout = timeout
+        self.persist = persist
+        self._results: dict[tuple[str, ...], str | None] = {}
+        self._lock = threading.Lock()
+        self._facts: RepoFacts | None = None
+        self._facts_loaded = False
+
+    # ------------------------------------------------------------------
+    # コマンド実行
+    # ------------------------------------------------------------------
+
+    def _execute(self, args: tuple[str, ...]) -> str | None:
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                cwd=self.cwd,
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    def run(self, *args: str) -> str | None:
+        """git コマンドの stdout を返す（失敗時は None）。同じ引数は 2 回目以降キャッシュを返す。"""
+        with self._lock:
+            if args in self._results:
+                return self._results[args]
+        output = self._execute(args)
+        with self._lock:
+            self._results.setdefault(args, output)
+            return self._results[args]
+
+    def run_many(self, *commands: Sequence[str]) -> list[str | None]:
+        """複数の git コマンドを並行に実行し、指定順に結果を返す（キャッシュ済みは起動しない）。"""
+        keys = [tuple(command) for command in commands]
+        with self._lock:
+            missing = list(dict.fromkeys(k for k in keys if k not in self._results))
+        if len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                for key, output in zip(missing, pool.map(self._execute, missing), strict=True):
+                    with self._lock:
+                        self._results.setdefault(key, output)
+        return [self.run(*key) for key in keys]
+
+    # ------------------------------------------------------------------
+    # リポジトリの事実
+    # ------------------------------------------------------------------
+
+    def _facts_key(self) -> str:
+        return f"git-facts:{os.path.abspath(self.cwd)}"
+
+    def _load_persisted_facts(self) -> bool:
+        if not self.persist or open_store is None:
+            return False
+        try:
+            value = open_store(self.cwd).get(PROJECT, self._facts_key())
+        except STATE_ERRORS:
+            return False
+        if not isinstance(value, dict):
+            return False
+        try:
+            facts = RepoFacts(**value)
+        except TypeError:
+            return False
+        if not os.path.isdir(facts.git_dir):
+            return False
+        self._facts = facts
+        self._facts_loaded = True
+        return True
+
+    def _persist_facts(self, facts: RepoFacts) -> None:
+        if not self.persist or open_store is None:
+            return
+        try:
+            open_store(self.cwd).put(PROJECT, self._facts_key(), asdict(facts), ttl=FACTS_TTL)
+        except STATE_ERRORS:
+            pass
+
+    @property
+    def facts(self) -> RepoFacts | None:
+        """toplevel / git dir / common dir。git リポジトリ外（または bare）なら None。"""
+        if self._facts_loaded or self._load_persisted_facts():
+            return self._facts
+        output = self.run(*FACTS_ARGS)
+        lines = output.splitlines() if output else []
+        if len(lines) >= 3:
+            common_dir = lines[2]
+            if not os.path.isabs(common_dir):
+                common_dir = os.path.normpath(os.path.join(self.cwd, common_dir))
+            self._facts = RepoFacts(lines[0], lines[1], os.path.realpath(common_dir))
+            self._persist_facts(self._facts)
+        self._facts_loaded = True
+        return self._facts
+
+    @property
+    def toplevel(self) -> str | None:
+        facts = self.facts
+        return facts.toplevel if facts else None
+
+    @property
+    def common_dir(self) -> str | None:
+        facts = self.facts
+        return facts.common_dir if facts else None
+
+    def index_mtime_ns(self) -> int | None:
+        """インデックスファイルの mtime（ns）。インデックスの変更検知に使う。"""
+        facts = self.facts
+        if facts is None:
+            return None
+        try:
+            return os.stat(os.path.join(facts.git_dir, "index")).st_mtime_ns
+        except OSError:
+            return None
+
+    # ------------------------------------------------------------------
+    # 追跡ファイル
+    # ------------------------------------------------------------------
+
+    def tracked_paths(self) -> set[str] | None:
+        """インデックスまたは HEAD にあるファイル（toplevel からの相対パス）。
+
+        HEAD 側も含めるため、`git rm` でインデックスから消えたファイルも残る。
+        ls-files と ls-tree は並行に実行する。取得できなければ None。
+        """
+        index_output, head_output = self.run_many(INDEX_FILES_ARGS, HEAD_FILES_ARGS)
+        if index_output is None:
+            return None
+        paths = set(index_output.split("\0"))
+        if head_output:
+            paths.update(head_output.split("\0"))
+        paths.discard("")
+        return paths
+
+
+def repo_for(cwd: str, *, persist: bool = False) -> GitRepo:
+    """ディレクトリの GitRepo を返す（同一プロセス内では同じインスタンスを再利用する）。"""
+    key = (os.path.abspath(cwd), persist)
+    repo = _repos.get(key)
+    if repo is None:
+        repo = GitRepo(cwd, persist=persist)
+        _repos[key] = repo
+    return repo
+
+
+def clear_repos() -> None:
+    """キャッシュ済みの GitRepo をすべて破棄する（主にテスト用）。"""
+    _repos.clear()
@@ -0,0 +1,80 @@
+#!/bin/sh
+# manifest の hook filter を Python を起動せずに評価する前段ガード。
+#
+# 使い方（sync_engine / orchestra-manager が settings.local.json に書き出す）:
+#   hook-guard.sh [--path GLOB]... [--field NAME [--contains GLOB]...]... \
+#                 [--max-bytes N] -- COMMAND...
+#
+# stdin の hook 入力 JSON を読み、条件をすべて満たすときだけ COMMAND に同じ入力を渡す。
+# 満たさない場合は何も出力せず exit 0（hook を実行しなかったのと同じ扱い）。
+#
+# - --path: "file_path": の後ろに GLOB + '"' が現れるか（複数指定は OR）
+# - --field / --contains: "NAME": の後ろに GLOB が現れるか（contains は OR、field 間は AND）
+# - --max-bytes: 入力が N 文字を超えたらスキップ
+#
+# JSON はパースせず文字列照合だけで判定する。照合は「実際の値を含みうる」かどうかの
+# 上位集合なので、迷う入力は COMMAND に渡す（最終判定は hook 本体が行う）。
+
+payload=$(cat)
+
+path_state=none
+field_state=none
+field_name=
+field_ok=1
+
+finish_field() {
+  if [ "$field_state" = miss ]; then
+    field_ok=0
+  fi
+  field_state=none
+}
+
+while [ $# -gt 0 ]; do
+  case $1 in
+    --path)
+      if [ "$path_state" != hit ]; then
+        path_state=miss
+        # shellcheck disable=SC2254  # $2 は glob として評価する
+        case $payload in
+          *'"file_path":'*$2'"'*) path_state=hit ;;
+        esac
+      fi
+      shift 2
+      ;;
+    --field)
+      finish_field
+      field_name=$2
+      field_state=miss
+      shift 2
+      ;;
+    --contains)
+      if [ "$field_state" = miss ]; then
+        # shellcheck disable=SC2254
+        case $payload in
+          *'"'"$field_name"'":'*$2*) field_state=hit ;;
+        esac
+      fi
+      shift 2
+      ;;
+    --max-bytes)
+      if [ "${#payload}" -gt "$2" ]; then
+        exit 0
+      fi
+      shift 2
+      ;;
+    --)
+      shift
+      break
+      ;;
+    *)
+      break
+      ;;
+  esac
+done
+finish_field
+
+if [ "$path_state" = miss ] || [ "$field_ok" = 0 ]; then
+  exit 0
+fi
+
+printf '%s\n' "$payload" | "$@"
@@ -6,6 +6,7 @@ from __future__ import annotations
 import functools
 import json
 import os
+import re
 import sys
 from collections.abc import Callable
 from typing import Any
@@ -91,12 +92,155 @@ def load_package_config(package_name: str, filename: str, project_dir: str) -> d
     return base
 
 
-def read_hook_input() -> dict:
-    """stdin から JSON を読み取って dict を返す。"""
+# ---------------------------------------------------------------------------
+# hook 入力（stdin）
+# ---------------------------------------------------------------------------
+
+# 全体をデコードせずに読めるトップレベルのスカラー項目
+PEEK_FIELDS = frozenset({"tool_name", "hook_event_name", "cwd", "session_id"})
+
+# peek で走査する最大文字数。ここまでに見つからない項目は全体デコードに委ねる
+PEEK_SCAN_LIMIT = 64 * 1024
+
+_WS = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+# コンテナ読み飛ばし用のトークン（文字列は丸ごと、走査範囲で閉じない " は単独でマッチ）
+_CONTAINER_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|"|[{}\[\]]', re.DOTALL)
+
+
+def _skip_ws(text: str, pos: int, end: int) -> int:
+    """pos から空白を読み飛ばした位置を返す。"""
+    match = _WS.match(text, pos, end)
+    return match.end() if match else pos
+
+
+def _skip_container(text: str, pos: int, end: int) -> int:
+    """pos から始まるオブジェクト/配列の直後の位置を返す。end までに閉じなければ -1。"""
+    depth = 0
+    for match in _CONTAINER_TOKEN.finditer(text, pos, end):
+        token = match.group()
+        if token == "{" or token == "[":
+            depth += 1
+        elif token == "}" or token == "]":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif token == '"':
+            return -1
+    return -1
+
+
+def _scan_top_level(text: str, limit: int) -> tuple[dict[str, Any], bool]:
+    """トップレベルの PEEK_FIELDS を先頭 limit 文字の範囲で取り出す。
+
+    Returns:
+        (見つかった項目, 見つからなかった項目が存在しないと確定したか)。
+        オブジェクトの終端まで走査できた場合と全項目が揃った場合に True。
+    """
+    found: dict[str, Any] = {}
+    end = min(len(text), limit)
+    pos = _skip_ws(text, 0, end)
+    if pos >= end or text[pos] != "{":
+        return found, False
+    pos += 1
+    while True:
+        pos = _skip_ws(text, pos, end)
+        if pos < end and text[pos] == "}":
+            return found, True
+        match = _STRING.match(text, pos, end)
+        if match is None:
+            return found, False
+        key = json.loads(match.group())
+        pos = _skip_ws(text, match.end(), end)
+        if pos >= end or text[pos] != ":":
+            return found, False
+        pos = _skip_ws(text, pos + 1, end)
+        if pos >= end:
+            return found, False
+
+        if text[pos] in "{[":
+            # スカラーでない PEEK_FIELDS は全体デコードに委ねる
+            if key in PEEK_FIELDS:
+                return found, False
+            pos = _skip_container(text, pos, end)
+            if pos < 0:
+                return found, False
+        else:
+            pattern = _STRING if text[pos] == '"' else _SCALAR
+            match = pattern.match(text, pos, end)
+            if match is None:
+                return found, False
+            if key in PEEK_FIELDS:
+                found[key] = json.loads(match.group())
+                if len(found) == len(PEEK_FIELDS):
+                    return found, True
+            pos = match.end()
+
+        pos = _skip_ws(text, pos, end)
+        if pos < end and text[pos] == ",":
+            pos += 1
+            continue
+        return found, pos < end and text[pos] == "}"
+
+
+def _read_stdin() -> str:
     try:
-        return json.loads(sys.stdin.read())
+        return sys.stdin.read()
+    except (OSError, ValueError):
+        return ""
+
+
+def _decode_object(raw: str) -> dict:
+    """JSON オブジェクトをデコードする（不正な JSON やオブジェクト以外は空辞書）。"""
+    try:
+        parsed = json.loads(raw)
     except (json.JSONDecodeError, ValueError):
         return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+class HookInput:
+    """hook の stdin 入力。PEEK_FIELDS は全体をデコードせずに読める。
+
+    PostToolUse の tool_response は数 MB になることがあるため、tool_name 等で
+    対象外と判定できる hook は get() だけで終了し、必要なときだけ data で全体を
+    デコードする。
+    """
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        self._peeked, self._exhaustive = _scan_top_level(raw, PEEK_SCAN_LIMIT)
+        self._data: dict | None = None
+
+    @classmethod
+    def from_stdin(cls) -> HookInput:
+        return cls(_read_stdin())
+
+    @property
+    def data(self) -> dict:
+        """入力全体（初回アクセス時にデコード。不正な JSON は空辞書）。"""
+        if self._data is None:
+            self._data = _decode_object(self.raw)
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """トップレベルの項目を返す。PEEK_FIELDS 以外は全体をデコードして読む。"""
+        if key in self._peeked:
+            return self._peeked[key]
+        if key in PEEK_FIELDS and self._exhaustive:
+            return default
+        return self.data.get(key, default)
+
+
+def peek_hook_input() -> HookInput:
+    """stdin を読み込み、全体のデコードを遅延した HookInput を返す。"""
+    return HookInput.from_stdin()
+
+
+def read_hook_input() -> dict:
+    """stdin から JSON を読み取って dict を返す（全体を読むため peek の走査はしない）。"""
+    return _decode_object(_read_stdin())
 
 
 def get_field(data: dict, key: str) -> str:
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""プロジェクト単位の遅延ジョブキュー。
+
+結果をすぐに必要としない hook の処理（ログの再集計・古いファイルの削除など）を
+スプールディレクトリに積み、デタッチされたワーカープロセスがバックグラウンドで実行する。
+hook のレイテンシは enqueue（小さな JSON ファイル 1 つの書き込み）だけになる。
+
+ストレージ構造:
+  .claude/state/jobs/
+    pending/{job_id}.json   # 未実行ジョブ（key 付きは key のハッシュが job_id）
+    running/{job_id}.json   # 実行中ジョブ（ワーカー異常終了時は次のワーカーが pending に戻す）
+    history.jsonl           # 完了ジョブの記録（末尾 HISTORY_KEEP 件を保持）
+    spool.lock              # enqueue / claim の短時間ロック
+    worker.lock             # ワーカーの生存ロック（保持中はワーカーが稼働している）
+
+ジョブは argv（+ stdin）で表すコマンドで、ワーカーはプロジェクトディレクトリを cwd に
+ORCHESTRA_JOB_ID を設定して実行する。同じ key の未実行ジョブがあれば内容を最新で
+置き換え（優先度は高い方を保持）、1 回だけ実行する。priority は小さいほど先に実行する。
+
+環境変数 ORCHESTRA_JOBS=sync を設定すると enqueue 時にその場で実行する（デバッグ用）。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+JOB_ID_ENV = "ORCHESTRA_JOB_ID"
+MODE_ENV = "ORCHESTRA_JOBS"
+
+DEFAULT_PRIORITY = 50
+DEFAULT_TIMEOUT = 120
+
+# history.jsonl に保持する完了ジョブ数
+HISTORY_KEEP = 100
+
+# 失敗ジョブの stderr を history に残す最大文字数
+_STDERR_TAIL = 500
+
+# ジョブ実行時に引き継ぐ環境変数（ワーカーは最初に起動した hook の環境を継承するため）
+_PASSTHROUGH_ENV = ("AI_ORCHESTRA_DIR", "CLAUDE_PROJECT_DIR")
+
+
+def jobs_dir(project_dir: str) -> str:
+    """ジョブスプールのベースディレクトリを返す。"""
+    return os.path.join(project_dir, ".claude", "state", "jobs")
+
+
+def _pending_dir(project_dir: str) -> str:
+    return os.path.join(jobs_dir(project_dir), "pending")
+
+
+def _running_dir(project_dir: str) -> str:
+    return os.path.join(jobs_dir(project_dir), "running")
+
+
+def _history_path(project_dir: str) -> str:
+    return os.path.join(jobs_dir(project_dir), "history.jsonl")
+
+
+def _now_iso8601() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+def _job_id_for_key(key: str) -> str:
+    return "k-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+@contextlib.contextmanager
+def _spool_lock(project_dir: str) -> Iterator[None]:
+    """enqueue / claim を直列化する短時間の排他ロック。"""
+    os.makedirs(jobs_dir(project_dir), exist_ok=True)
+    with open(os.path.join(jobs_dir(project_dir), "spool.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_job(path: str) -> dict[str, Any] | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            job = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return job if isinstance(job, dict) else None
+
+
+def _write_job(path: str, job: dict[str, Any]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _list_jobs(directory: str) -> list[dict[str, Any]]:
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(".json")]
+    except OSError:
+        return []
+    jobs = []
+    for name in names:
+        job = _read_job(os.path.join(directory, name))
+        if job is not None:
+            jobs.append(job)
+    return jobs
+
+
+def describe_job(job: dict[str, Any]) -> str:
+    """表示用のジョブ名（key、なければ実行するスクリプト名）を返す。"""
+    if job.get("key"):
+        return str(job["key"])
+    argv = [str(a) for a in job.get("argv") or []]
+    if len(argv) > 1 and os.path.basename(argv[0]).startswith("python"):
+        argv = argv[1:]
+    return " ".join([os.path.basename(argv[0]), *argv[1:]]) if argv else ""
+
+
+def _job_order(job: dict[str, Any]) -> tuple[int, str]:
+    return (int(job.get("priority", DEFAULT_PRIORITY)), str(job.get("enqueued_at", "")))
+
+
+def enqueue(
+    project_dir: str,
+    argv: list[str],
+    *,
+    key: str | None = None,
+    priority: int = DEFAULT_PRIORITY,
+    stdin: str = "",
+    timeout: float = DEFAULT_TIMEOUT,
+    start_worker: bool = True,
+) -> str:
+    """ジョブをスプールに積み、ワーカーが動いていなければ起動する。job_id を返す。
+
+    同じ key の未実行ジョブがある場合は argv / stdin を置き換え、priority は小さい方
+    （先に実行される方）を保持する。ORCHESTRA_JOBS=sync の場合はその場で実行する。
+    """
+    job_id = _job_id_for_key(key) if key else "j-" + uuid.uuid4().hex[:16]
+    job: dict[str, Any] = {
+        "id": job_id,
+        "key": key,
+        "argv": list(argv),
+        "stdin": stdin,
+        "priority": priority,
+        "timeout": timeout,
+        "env": {k: os.environ[k] for k in _PASSTHROUGH_ENV if k in os.environ},
+        "enqueued_at": _now_iso8601(),
+    }
+
+    if os.environ.get(MODE_ENV) == "sync":
+        _record_history(project_dir, _execute(project_dir, job))
+        return job_id
+
+    pending_dir = _pending_dir(project_dir)
+    os.makedirs(pending_dir, exist_ok=True)
+    path = os.path.join(pending_dir, f"{job_id}.json")
+    with _spool_lock(project_dir):
+        existing = _read_job(path) if key else None
+        if existing is not None:
+            job["priority"] = min(priority, int(existing.get("priority", priority)))
+            job["enqueued_at"] = existing.get("enqueued_at", job["enqueued_at"])
+            job["merged"] = int(existing.get("merged", 0)) + 1
+        _write_job(path, job)
+
+    if start_worker:
+        ensure_worker(project_dir)
+    return job_id
+
+
+def defer_hook(
+    script: str,
+    project_dir: str,
+    data: dict[str, Any],
+    *,
+    key: str | None = None,
+    priority: int = DEFAULT_PRIORITY,
+) -> bool:
+    """hook スクリプト（通常は呼び出し元の __file__）を同じ入力でジョブとして積む。
+
+    積んだ場合は True を返す（呼び出し側はそのまま終了する）。ワーカーから実行されている
+    場合やスプールに書き込めない場合は False を返し、呼び出し側が処理を続行する。
+    """
+    if os.environ.get(JOB_ID_ENV) or os.environ.get(MODE_ENV) == "sync":
+        return False
+    try:
+        enqueue(
+            project_dir,
+            [sys.executable, os.path.abspath(script)],
+            key=key,
+            priority=priority,
+            stdin=json.dumps(data, ensure_ascii=False),
+        )
+    except OSError:
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# ワーカー
+# ---------------------------------------------------------------------------
+
+
+def _try_lock_worker(project_dir: str, retries: int = 0):
+    """worker.lock を非ブロッキングで取得する。取得できればファイルオブジェクトを返す。
+
+    retries > 0 の場合は短い間隔で再試行する（稼働確認の一時的なロックと衝突した
+    起動直後のワーカーが、ジョブを残したまま終了しないようにするため）。
+    """
+    os.makedirs(jobs_dir(project_dir), exist_ok=True)
+    f = open(os.path.join(jobs_dir(project_dir), "worker.lock"), "a+")
+    for attempt in range(retries + 1):
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return f
+        except OSError:
+            if attempt < retries:
+                time.sleep(0.02)
+    f.close()
+    return None
+
+
+def worker_running(project_dir: str) -> bool:
+    """ワーカーが稼働中（worker.lock が保持されている）かを返す。"""
+    lock = _try_lock_worker(project_dir)
+    if lock is None:
+        return True
+    lock.close()
+    return False
+
+
+def ensure_worker(project_dir: str) -> bool:
+    """ワーカーが稼働していなければデタッチして起動する。起動した場合は True。"""
+    if worker_running(project_dir):
+        return False
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "worker", project_dir],
+        cwd=project_dir,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+    return True
+
+
+def _claim_next(project_dir: str) -> dict[str, Any] | None:
+    """最も優先度の高い未実行ジョブを running/ に移して返す。"""
+    pending_dir = _pending_dir(project_dir)
+    running_dir = _running_dir(project_dir)
+    with _spool_lock(project_dir):
+        jobs = sorted(_list_jobs(pending_dir), key=_job_order)
+        if not jobs:
+            return None
+        job = jobs[0]
+        os.makedirs(running_dir, exist_ok=True)
+        os.replace(
+            os.path.join(pending_dir, f"{job['id']}.json"),
+            os.path.join(running_dir, f"{job['id']}.json"),
+        )
+    return job
+
+
+def _requeue_orphans(project_dir: str) -> None:
+    """異常終了したワーカーが残した running/ のジョブを pending/ に戻す。"""
+    running_dir = _running_dir(project_dir)
+    pending_dir = _pending_dir(project_dir)
+    with _spool_lock(project_dir):
+        for job in _list_jobs(running_dir):
+            src = os.path.join(running_dir, f"{job['id']}.json")
+            dst = os.path.join(pending_dir, f"{job['id']}.json")
+            os.makedirs(pending_dir, exist_ok=True)
+            if os.path.exists(dst):
+                os.remove(src)
+            else:
+                os.replace(src, dst)
+
+
+def _execute(project_dir: str, job: dict[str, Any]) -> dict[str, Any]:
+    """ジョブを実行し、history に記録する結果 dict を返す。"""
+    env = {**os.environ, **job.get("env", {}), JOB_ID_ENV: job["id"]}
+    started = time.perf_counter()
+    result: dict[str, Any] = {
+        "id": job["id"],
+        "key": job.get("key"),
+        "label": describe_job(job),
+        "priority": job.get("priority", DEFAULT_PRIORITY),
+        "enqueued_at": job.get("enqueued_at"),
+    }
+    try:
+        proc = subprocess.run(
+            job["argv"],
+            input=job.get("stdin", ""),
+            cwd=project_dir,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=job.get("timeout", DEFAULT_TIMEOUT),
+        )
+        result["returncode"] = proc.returncode
+        if proc.returncode != 0:
+            result["stderr"] = proc.stderr[-_STDERR_TAIL:]
+    except subprocess.TimeoutExpired:
+        result["returncode"] = None
+        result["error"] = "timeout"
+    except (OSError, ValueError) as e:
+        result["returncode"] = None
+        result["error"] = str(e)
+    result["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    result["finished_at"] = _now_iso8601()
+    return result
+
+
+def _record_history(project_dir: str, result: dict[str, Any]) -> None:
+    path = _history_path(project_dir)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if os.path.getsize(path) > HISTORY_KEEP * 1024:
+            with open(path, encoding="utf-8") as f:
+                lines = f.readlines()[-HISTORY_KEEP:]
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _drain(project_dir: str) -> int:
+    processed = 0
+    while True:
+        job = _claim_next(project_dir)
+        if job is None:
+            return processed
+        result = _execute(project_dir, job)
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(_running_dir(project_dir), f"{job['id']}.json"))
+        _record_history(project_dir, result)
+        processed += 1
+
+
+def run_worker(project_dir: str) -> int:
+    """スプールが空になるまでジョブを実行する。処理したジョブ数を返す。
+
+    他のワーカーが稼働中なら何もしない。ロック解放後に積まれたジョブを取りこぼさない
+    よう、解放後にスプールを再確認し、残っていればロックを取り直して続行する。
+    """
+    processed = 0
+    retries = 5
+    while True:
+        lock = _try_lock_worker(project_dir, retries)
+        retries = 0
+        if lock is None:
+            return processed
+        try:
+            lock.seek(0)
+            lock.truncate()
+            lock.write(str(os.getpid()))
+            lock.flush()
+            _requeue_orphans(project_dir)
+            processed += _drain(project_dir)
+            lock.truncate(0)
+        finally:
+            lock.close()
+        if not _list_jobs(_pending_dir(project_dir)):
+            return processed
+
+
+def queue_status(project_dir: str, recent: int = 10) -> dict[str, Any]:
+    """キューの状態（未実行・実行中・直近の完了ジョブ・ワーカー PID）を返す。"""
+    running = worker_running(project_dir)
+    pid = None
+    if running:
+        try:
+            with open(os.path.join(jobs_dir(project_dir), "worker.lock"), encoding="utf-8") as f:
+                pid = int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            pid = None
+
+    history: list[dict[str, Any]] = []
+    try:
+        with open(_history_path(project_dir), encoding="utf-8") as f:
+            lines = f.readlines()[-recent:] if recent > 0 else []
+        for line in lines:
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                continue
+    except OSError:
+        pass
+
+    return {
+        "worker_running": running,
+        "worker_pid": pid,
+        "pending": sorted(_list_jobs(_pending_dir(project_dir)), key=_job_order),
+        "running": _list_jobs(_running_dir(project_dir)),
+        "recent": history,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "worker":
+        run_worker(sys.argv[2])
+    else:
+        print("usage: job_queue.py worker <project_dir>", file=sys.stderr)
+        sys.exit(2)
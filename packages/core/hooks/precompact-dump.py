@@ -13,6 +13,8 @@ Claude Code がコンテキスト圧縮を実行する直前に発火する。
 副作用:
 - stdout への JSON 出力は行わない（観測専用）。失敗しても exit 0 を返し、
   圧縮フローをブロックしない。
+- 古いダンプの削除は遅延ジョブキュー（job_queue.py）に積み、バックグラウンドで
+  `precompact-dump.py --prune <shared_dir>` として実行する。
 """
 
 from __future__ import annotations
@@ -36,6 +38,7 @@ if _orchestra_dir:
 
 from context_store import get_project_dir, get_shared_dir, read_working_context
 from hook_common import read_hook_input, safe_hook_execution
+from job_queue import enqueue
 
 try:
     from event_logger import emit_event as _emit_event  # type: ignore[import-not-found]
@@ -45,6 +48,9 @@ except ImportError:  # pragma: no cover - audit 未導入時のフォールバ
 # 保存するダンプファイルの最大数（古いものから削除）
 MAX_DUMP_FILES = 20
 
+# 削除ジョブの優先度（他の遅延ジョブより後回しでよい）
+PRUNE_JOB_PRIORITY = 80
+
 
 def _now_stamp() -> str:
     """ファイル名用のタイムスタンプを返す(UTC, コロン無し)。
@@ -157,10 +163,23 @@ def write_dump(project_dir: str, text: str) -> str:
     dump_path = os.path.join(shared_dir, filename)
     with open(dump_path, "w", encoding="utf-8") as f:
         f.write(text)
-    _prune_old_dumps(shared_dir)
     return dump_path
 
 
+def schedule_prune(project_dir: str) -> None:
+    """古いダンプの削除を遅延ジョブとして積む。積めない場合はその場で削除する。"""
+    shared_dir = get_shared_dir(project_dir)
+    try:
+        enqueue(
+            project_dir,
+            [sys.executable, os.path.abspath(__file__), "--prune", shared_dir],
+            key="precompact-prune",
+            priority=PRUNE_JOB_PRIORITY,
+        )
+    except OSError:
+        _prune_old_dumps(shared_dir)
+
+
 def _resolve_project_dir(data: dict) -> str:
     """hook 入力からプロジェクトディレクトリを取得し、検証する。
 
@@ -198,6 +217,7 @@ def main() -> None:
         plans_text=plans_text,
     )
     dump_path = write_dump(project_dir, text)
+    schedule_prune(project_dir)
 
     # 監査ログにも小さく痕跡を残す（audit 未導入時はスキップ）
     if _emit_event is not None and session_id:
@@ -223,4 +243,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) == 3 and sys.argv[1] == "--prune":
+        _prune_old_dumps(sys.argv[2])
+    else:
+        main()
@@ -19,28 +19,31 @@ if _orchestra_dir:
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
 
-from hook_common import safe_hook_execution, write_json  # noqa: E402
+from hook_common import peek_hook_input, safe_hook_execution  # noqa: E402
+from state_store import PROJECT, open_store  # noqa: E402
+
+# 状態ストア（PROJECT namespace）上の plan gate のキー
+PLAN_GATE_KEY = "plan-gate"
 
 # plan gate を設定するエージェント（subagent_type の完全一致のみ）
 PLAN_AGENTS: set[str] = {"plan", "planner"}
 
 
-def _get_state_dir(data: dict) -> str:
-    """プロジェクトの .claude/state ディレクトリのパスを返す。"""
-    cwd = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
-    if not cwd:
-        return ""
-    return os.path.join(cwd, ".claude", "state")
+def _get_project_dir(data: dict) -> str:
+    """plan gate を保持するプロジェクトディレクトリを返す（不明なら空文字）。"""
+    return data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
 
 
 @safe_hook_execution
 def main() -> None:
-    data = json.load(sys.stdin)
+    hook_input = peek_hook_input()
 
-    # Agent ツール以外は無視（後方互換のため "Task" も許容）
-    if data.get("tool_name") not in ("Agent", "Task"):
+    # Agent ツール以外は全体をデコードせずに無視（後方互換のため "Task" も許容）
+    if hook_input.get("tool_name") not in ("Agent", "Task"):
         sys.exit(0)
 
+    data = hook_input.data
+
     tool_input = data.get("tool_input", {})
     subagent_type = tool_input.get("subagent_type", "").lower()
 
@@ -62,19 +65,16 @@ def main() -> None:
             sys.exit(0)
 
     # plan gate を設定
-    state_dir = _get_state_dir(data)
-    if not state_dir:
+    project_dir = _get_project_dir(data)
+    if not project_dir:
         sys.exit(0)
 
-    os.makedirs(state_dir, exist_ok=True)
-    gate_path = os.path.join(state_dir, "plan-gate.json")
-
     gate_data = {
         "pending": True,
         "agent": tool_input.get("subagent_type", "unknown"),
         "set_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),  # noqa: UP017
     }
-    write_json(gate_path, gate_data)
+    open_store(project_dir).put(PROJECT, PLAN_GATE_KEY, gate_data)
 
     # オーケストレーターへの通知
     output = {
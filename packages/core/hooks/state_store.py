@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""hook 間で共有する crash-safe な状態ストア。
+
+プロジェクトごとに 1 つの SQLite データベース（WAL モード）を `.claude/state/state.db`
+に置き、hook の状態を (namespace, key) → JSON 値として保持する。
+
+- namespace: プロジェクト全体で共有する値は PROJECT、セッション固有の値は
+  session_namespace(session_id) を使う
+- 更新: update() は 1 トランザクション（BEGIN IMMEDIATE）で read-modify-write を行うため、
+  並行する hook 間でも更新が失われない。楽観的な更新には get_versioned() と
+  compare_and_swap() を使う
+- TTL: ttl 秒を指定した値は期限切れ後に読み出されなくなり、次の書き込み時に削除される
+- 1 回の hook 実行につき接続は 1 つ（open_store() がプロセス内でキャッシュする）
+
+書き込み中にプロセスが落ちても SQLite のジャーナルにより直前のコミット状態に戻る。
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Callable
+from typing import Any
+
+DB_FILENAME = "state.db"
+
+PROJECT = "project"
+
+# セッション namespace の既定 TTL（書き込みのたびに延長される）
+SESSION_TTL = 7 * 24 * 3600
+
+# 他プロセスの書き込みロック解放を待つ最大秒数
+BUSY_TIMEOUT = 5.0
+
+# 呼び出し側が捕捉すべき例外（DB を開けない・書けない場合）
+STATE_ERRORS: tuple[type[BaseException], ...] = (OSError, sqlite3.Error)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS state_expires ON state (expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+_stores: dict[str, StateStore] = {}
+
+
+def session_namespace(session_id: str) -> str:
+    """セッション固有の namespace 名を返す。"""
+    return f"session:{session_id or 'unknown'}"
+
+
+def state_db_path(project_dir: str) -> str:
+    """プロジェクトの状態 DB のパスを返す。"""
+    return os.path.join(project_dir, ".claude", "state", DB_FILENAME)
+
+
+class StateStore:
+    """SQLite（WAL）で永続化する namespace 付きキーバリューストア。"""
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        created = not os.path.exists(path)
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        if created:
+            # 監査トレース等を含むため所有者のみ読み書き可にする（-wal / -shm も同じ権限になる）
+            os.chmod(path, 0o600)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # 読み出し
+    # ------------------------------------------------------------------
+
+    def get_versioned(self, ns: str, key: str) -> tuple[Any, int]:
+        """(値, version) を返す。存在しない・期限切れの場合は (None, 0)。"""
+        row = self._conn.execute(
+            "SELECT value, version FROM state WHERE ns = ? AND key = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (ns, key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None, 0
+        return json.loads(row[0]), row[1]
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        """値を返す。存在しない・期限切れの場合は default。"""
+        value, version = self.get_versioned(ns, key)
+        return value if version else default
+
+    def items(self, ns: str) -> dict[str, Any]:
+        """namespace 内の有効な値をすべて返す。"""
+        rows = self._conn.execute(
+            "SELECT key, value FROM state WHERE ns = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (ns, time.time()),
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    # ------------------------------------------------------------------
+    # 書き込み
+    # ------------------------------------------------------------------
+
+    def _begin(self) -> float:
+        self._conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        # 期限切れの削除は書き込みロックを取ったついでに行う（追加のロックを増やさない）
+        self._conn.execute(
+            "DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        return now
+
+    def _write(
+        self, ns: str, key: str, value: Any, version: int, now: float, ttl: float | None
+    ) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state (ns, key, value, version, expires_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                ns,
+                key,
+                json.dumps(value, ensure_ascii=False),
+                version,
+                now + ttl if ttl else None,
+                now,
+            ),
+        )
+
+    def _current_version(self, ns: str, key: str) -> int:
+        # _begin() で期限切れは削除済みのため、トランザクション内では期限を見なくてよい
+        row = self._conn.execute(
+            "SELECT version FROM state WHERE ns = ? AND key = ?", (ns, key)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def put(self, ns: str, key: str, value: Any, *, ttl: float | None = None) -> int:
+        """値を無条件に書き込み、新しい version を返す。"""
+        try:
+            now = self._begin()
+            version = self._current_version(ns, key) + 1
+            self._write(ns, key, value, version, now, ttl)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._rollback()
+            raise
+        return version
+
+    def compare_and_swap(
+        self,
+        ns: str,
+        key: str,
+        expected_version: int,
+        value: Any,
+        *,
+        ttl: float | None = None,
+    ) -> bool:
+        """version が expected_version のときだけ書き込む（未作成は 0）。成功したら True。"""
+        try:
+            now = self._begin()
+            current_version = self._current_version(ns, key)
+            if current_version != expected_version:
+                self._conn.execute("ROLLBACK")
+                return False
+            self._write(ns, key, value, current_version + 1, now, ttl)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._rollback()
+            raise
+        return True
+
+    def update(
+        self,
+        ns: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        *,
+        default: Any = None,
+        ttl: float | None = None,
+    ) -> Any:
+        """現在値（なければ default のコピー）に fn を適用して書き戻し、新しい値を返す。
+
+        読み出しから書き込みまでを 1 トランザクションで行うため、並行する更新は直列化される。
+        fn が None を返した場合はキーを削除する。
+        """
+        try:
+            now = self._begin()
+            current, version = self.get_versioned(ns, key)
+            if not version:
+                current = copy.deepcopy(default)
+            new_value = fn(current)
+            if new_value is None:
+                self._conn.execute("DELETE FROM state WHERE ns = ? AND key = ?", (ns, key))
+            else:
+                self._write(ns, key, new_value, version + 1, now, ttl)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._rollback()
+            raise
+        return new_value
+
+    def delete(self, ns: str, key: str) -> bool:
+        """キーを削除する。削除した場合は True。"""
+        cursor = self._conn.execute("DELETE FROM state WHERE ns = ? AND key = ?", (ns, key))
+        return cursor.rowcount > 0
+
+    def delete_namespace(self, ns: str) -> int:
+        """namespace 内のキーをすべて削除し、削除件数を返す。"""
+        return self._conn.execute("DELETE FROM state WHERE ns = ?", (ns,)).rowcount
+
+    def evict_expired(self) -> int:
+        """期限切れの値を削除し、削除件数を返す。"""
+        return self._conn.execute(
+            "DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+
+    def _rollback(self) -> None:
+        if self._conn.in_transaction:
+            try:
+                self._conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+
+def open_store(project_dir: str) -> StateStore:
+    """プロジェクトの状態ストアを返す（同一プロセス内では接続を再利用する）。"""
+    path = state_db_path(os.path.abspath(project_dir))
+    store = _stores.get(path)
+    if store is None:
+        store = StateStore(path)
+        _stores[path] = store
+    return store
+
+
+def close_stores() -> None:
+    """キャッシュ済みの接続をすべて閉じる（主にテスト用）。"""
+    for store in _stores.values():
+        try:
+            store.close()
+        except sqlite3.Error:
+            pass
+    _stores.clear()
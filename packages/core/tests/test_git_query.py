@@ -0,0 +1,102 @@
+"""git_query.py（hook 用 git 問い合わせ層）のユニットテスト。"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import REPO_ROOT, load_module
+
+HOOKS_DIR = REPO_ROOT / "packages" / "core" / "hooks"
+if str(HOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(HOOKS_DIR))
+
+git_query = load_module("git_query_test", "packages/core/hooks/git_query.py")
+
+from state_store import close_stores  # noqa: E402
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture()
+def repo_dir(tmp_path: Path) -> Iterator[Path]:
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "test")
+    for name in ("a.py", "b.py", "c.py", "d.py"):
+        (tmp_path / name).write_text(f"{name}\n", encoding="utf-8")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    yield tmp_path
+    git_query.clear_repos()
+    close_stores()
+
+
+class TestGitRepo:
+    """GitRepo のテスト。"""
+
+    def test_facts_are_fetched_with_one_rev_parse(self, repo_dir: Path) -> None:
+        repo = git_query.GitRepo(str(repo_dir))
+
+        facts = repo.facts
+
+        assert facts is not None
+        assert Path(facts.toplevel).samefile(repo_dir)
+        assert Path(facts.common_dir).samefile(repo_dir / ".git")
+        assert list(repo._results) == [git_query.FACTS_ARGS]
+        assert repo.index_mtime_ns() == os.stat(repo_dir / ".git" / "index").st_mtime_ns
+
+    def test_outside_repository_has_no_facts(self, tmp_path: Path) -> None:
+        repo = git_query.GitRepo(str(tmp_path))
+
+        assert repo.facts is None
+        assert repo.common_dir is None
+        assert repo.tracked_paths() is None
+
+    def test_run_is_memoized(self, repo_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        repo = git_query.GitRepo(str(repo_dir))
+        calls: list[tuple[str, ...]] = []
+        execute = repo._execute
+
+        def counting(args: tuple[str, ...]) -> str | None:
+            calls.append(args)
+            return execute(args)
+
+        monkeypatch.setattr(repo, "_execute", counting)
+
+        head = repo.run("rev-parse", "--verify", "--quiet", "HEAD")
+        assert head and repo.run("rev-parse", "--verify", "--quiet", "HEAD") == head
+        assert repo.run_many(("rev-parse", "--verify", "--quiet", "HEAD"), ("status",))[0]
+        assert calls == [("rev-parse", "--verify", "--quiet", "HEAD"), ("status",)]
+
+    def test_persisted_facts_skip_rev_parse(self, repo_dir: Path) -> None:
+        first = git_query.GitRepo(str(repo_dir), persist=True)
+        assert first.facts is not None
+
+        second = git_query.GitRepo(str(repo_dir), persist=True)
+        assert second.facts == first.facts
+        assert git_query.FACTS_ARGS not in second._results
+
+    def test_repo_for_reuses_instance(self, repo_dir: Path) -> None:
+        assert git_query.repo_for(str(repo_dir)) is git_query.repo_for(str(repo_dir))
+
+    def test_tracked_paths_keep_files_removed_from_index(self, repo_dir: Path) -> None:
+        """`git rm` でインデックスから消えたファイルも HEAD 側から含まれる。"""
+        _git(repo_dir, "rm", "-q", "b.py")
+        (repo_dir / "e.py").write_text("e\n", encoding="utf-8")
+        _git(repo_dir, "add", "e.py")
+        (repo_dir / "sub").mkdir()
+
+        repo = git_query.GitRepo(str(repo_dir / "sub"))
+
+        assert repo.tracked_paths() == {"a.py", "b.py", "c.py", "d.py", "e.py"}
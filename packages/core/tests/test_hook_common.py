@@ -20,6 +20,70 @@ def test_read_hook_input_invalid_json(monkeypatch) -> None:
     assert hook_common.read_hook_input() == {}
 
 
+def test_read_hook_input_skips_peek_scan(monkeypatch) -> None:
+    def fail(*_args):
+        raise AssertionError("peek scan should not run")
+
+    monkeypatch.setattr(hook_common, "_scan_top_level", fail)
+    monkeypatch.setattr(sys, "stdin", io.StringIO('{"tool_name":"Edit"}'))
+    assert hook_common.read_hook_input() == {"tool_name": "Edit"}
+
+
+class TestHookInput:
+    """HookInput（トップレベル項目の peek と遅延デコード）のテスト。"""
+
+    def test_peek_does_not_decode_full_payload(self, monkeypatch) -> None:
+        """PEEK_FIELDS は tool_response を含む全体をデコードせずに読める。"""
+        payload = {
+            "session_id": "s1",
+            "cwd": "/project",
+            "hook_event_name": "PostToolUse",
+            "tool_name": "Read",
+            "tool_input": {"file_path": "a.py", "nested": [{"tool_name": "Agent"}]},
+            "tool_response": "x" * 500_000,
+        }
+        hook_input = hook_common.HookInput(json.dumps(payload))
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("full decode should not happen")
+
+        monkeypatch.setattr(hook_common.json, "loads", fail)
+        # peek は構築時に先頭だけを走査して済ませており、get() で全体はデコードしない
+        assert hook_input.get("tool_name") == "Read"
+        assert hook_input.get("cwd") == "/project"
+        assert hook_input.get("hook_event_name") == "PostToolUse"
+
+    def test_missing_field_known_absent_when_object_scanned(self) -> None:
+        """オブジェクト終端まで走査できた場合、無い項目は全体デコードなしで default。"""
+        hook_input = hook_common.HookInput('{"session_id": "s1", "prompt": "hi"}')
+        assert hook_input.get("tool_name", "") == ""
+        assert hook_input._data is None
+        assert hook_input.get("prompt") == "hi"
+        assert hook_input.data == {"session_id": "s1", "prompt": "hi"}
+
+    def test_falls_back_to_full_decode_beyond_scan_limit(self, monkeypatch) -> None:
+        """走査範囲内に見つからない項目は全体デコードで読む。"""
+        monkeypatch.setattr(hook_common, "PEEK_SCAN_LIMIT", 64)
+        raw = json.dumps({"tool_response": "y" * 1000, "tool_name": "Bash"})
+        hook_input = hook_common.HookInput(raw)
+        assert hook_input.get("tool_name") == "Bash"
+
+    def test_escaped_strings_and_scalars(self) -> None:
+        raw = '{"a": {"b": "}\\"{"}, "n": -1.5e3, "tool_name": "Ed\\u0069t", "cwd": null}'
+        hook_input = hook_common.HookInput(raw)
+        assert hook_input._peeked == {"tool_name": "Edit", "cwd": None}
+        assert hook_input.get("n") == -1500.0
+
+    def test_invalid_json_returns_empty(self) -> None:
+        hook_input = hook_common.HookInput("{invalid-json")
+        assert hook_input.get("tool_name") is None
+        assert hook_input.data == {}
+
+    def test_peek_hook_input_reads_stdin(self, monkeypatch) -> None:
+        monkeypatch.setattr(sys, "stdin", io.StringIO('{"tool_name": "Agent"}'))
+        assert hook_common.peek_hook_input().get("tool_name") == "Agent"
+
+
 def test_get_field_returns_value_or_empty_string() -> None:
     data = {"name": "alice", "empty": "", "none": None, "zero": 0}
     assert hook_common.get_field(data, "name") == "alice"
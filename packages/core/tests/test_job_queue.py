@@ -0,0 +1,151 @@
+"""job_queue.py（遅延ジョブキュー）のユニットテスト。"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import REPO_ROOT, load_module
+
+HOOKS_DIR = REPO_ROOT / "packages" / "core" / "hooks"
+if str(HOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(HOOKS_DIR))
+
+job_queue = load_module("job_queue", "packages/core/hooks/job_queue.py")
+
+
+def _append_argv(target: Path, text: str) -> list[str]:
+    """target に text を追記する Python ワンライナーの argv を返す。"""
+    code = f"open({str(target)!r}, 'a').write({text!r})"
+    return [sys.executable, "-c", code]
+
+
+@pytest.fixture(autouse=True)
+def _clear_job_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(job_queue.JOB_ID_ENV, raising=False)
+    monkeypatch.delenv(job_queue.MODE_ENV, raising=False)
+
+
+class TestEnqueue:
+    """`enqueue` のテスト。"""
+
+    def test_same_key_is_merged(self, tmp_path: Path) -> None:
+        """同じ key の未実行ジョブは 1 件にまとまり、内容は最新・優先度は高い方になる。"""
+        project_dir = str(tmp_path)
+        first = job_queue.enqueue(project_dir, ["a"], key="k", priority=30, start_worker=False)
+        second = job_queue.enqueue(project_dir, ["b"], key="k", priority=70, start_worker=False)
+
+        assert first == second
+        pending = job_queue.queue_status(project_dir)["pending"]
+        assert len(pending) == 1
+        assert pending[0]["argv"] == ["b"]
+        assert pending[0]["priority"] == 30
+        assert pending[0]["merged"] == 1
+
+    def test_pending_sorted_by_priority(self, tmp_path: Path) -> None:
+        """未実行ジョブは priority の小さい順（同順位は enqueue 順）に並ぶ。"""
+        project_dir = str(tmp_path)
+        job_queue.enqueue(project_dir, ["low"], priority=90, start_worker=False)
+        job_queue.enqueue(project_dir, ["high"], priority=10, start_worker=False)
+        job_queue.enqueue(project_dir, ["mid"], start_worker=False)
+
+        pending = job_queue.queue_status(project_dir)["pending"]
+        assert [job["argv"][0] for job in pending] == ["high", "mid", "low"]
+
+    def test_sync_mode_runs_inline(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """ORCHESTRA_JOBS=sync ではスプールを使わずその場で実行する。"""
+        monkeypatch.setenv(job_queue.MODE_ENV, "sync")
+        out = tmp_path / "out.txt"
+        job_queue.enqueue(str(tmp_path), _append_argv(out, "x"), key="inline")
+
+        assert out.read_text() == "x"
+        status = job_queue.queue_status(str(tmp_path))
+        assert status["pending"] == []
+        assert status["recent"][-1]["returncode"] == 0
+
+
+class TestWorker:
+    """`run_worker` のテスト。"""
+
+    def test_drains_in_priority_order(self, tmp_path: Path) -> None:
+        """優先度順に全ジョブを実行し、history に記録して running/ を空にする。"""
+        project_dir = str(tmp_path)
+        out = tmp_path / "out.txt"
+        job_queue.enqueue(project_dir, _append_argv(out, "b"), priority=60, start_worker=False)
+        job_queue.enqueue(project_dir, _append_argv(out, "a"), priority=20, start_worker=False)
+        job_queue.enqueue(
+            project_dir, [sys.executable, "-c", "raise SystemExit(3)"], start_worker=False
+        )
+
+        assert job_queue.run_worker(project_dir) == 3
+        assert out.read_text() == "ab"
+
+        status = job_queue.queue_status(project_dir)
+        assert status["pending"] == [] and status["running"] == []
+        assert [r["returncode"] for r in status["recent"]] == [0, 3, 0]
+        assert not status["worker_running"]
+
+    def test_skips_when_another_worker_holds_lock(self, tmp_path: Path) -> None:
+        """他のワーカーが稼働中なら何も実行しない。"""
+        project_dir = str(tmp_path)
+        job_queue.enqueue(project_dir, ["true"], start_worker=False)
+        lock = job_queue._try_lock_worker(project_dir)
+        try:
+            assert job_queue.worker_running(project_dir)
+            assert job_queue.run_worker(project_dir) == 0
+        finally:
+            lock.close()
+        assert len(job_queue.queue_status(project_dir)["pending"]) == 1
+
+    def test_requeues_orphaned_running_jobs(self, tmp_path: Path) -> None:
+        """異常終了したワーカーの running/ ジョブは次のワーカーが再実行する。"""
+        project_dir = str(tmp_path)
+        out = tmp_path / "out.txt"
+        job_queue.enqueue(project_dir, _append_argv(out, "x"), start_worker=False)
+        assert job_queue._claim_next(project_dir) is not None
+        assert len(job_queue.queue_status(project_dir)["running"]) == 1
+
+        assert job_queue.run_worker(project_dir) == 1
+        assert out.read_text() == "x"
+
+    def test_detached_worker_runs_job(self, tmp_path: Path) -> None:
+        """enqueue はデタッチしたワーカーを起動し、ジョブはバックグラウンドで完了する。"""
+        project_dir = str(tmp_path)
+        out = tmp_path / "out.txt"
+        job_queue.enqueue(project_dir, _append_argv(out, "done"), key="bg")
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not out.exists():
+            time.sleep(0.05)
+        assert out.read_text() == "done"
+
+
+class TestDeferHook:
+    """`defer_hook` のテスト。"""
+
+    def test_enqueues_script_with_input(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """hook スクリプトと入力 JSON をジョブとして積む。"""
+        monkeypatch.setattr(job_queue, "ensure_worker", lambda _project_dir: False)
+        script = tmp_path / "hook.py"
+        script.write_text("")
+
+        assert job_queue.defer_hook(str(script), str(tmp_path), {"a": 1}, key="hook")
+
+        job = job_queue.queue_status(str(tmp_path))["pending"][0]
+        assert job["argv"] == [sys.executable, str(script)]
+        assert json.loads(job["stdin"]) == {"a": 1}
+
+    def test_inside_worker_runs_inline(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """ワーカーから実行されている場合は積まずに False を返す。"""
+        monkeypatch.setenv(job_queue.JOB_ID_ENV, "j-1")
+        assert not job_queue.defer_hook(__file__, str(tmp_path), {})
+        assert not os.path.exists(job_queue.jobs_dir(str(tmp_path)))
@@ -23,23 +23,31 @@ set_plan_gate = load_module("set_plan_gate", "packages/core/hooks/set-plan-gate.
 check_plan_gate = load_module("check_plan_gate", "packages/core/hooks/check-plan-gate.py")
 clear_plan_gate = load_module("clear_plan_gate", "packages/core/hooks/clear-plan-gate.py")
 
+from state_store import PROJECT, StateStore, state_db_path  # noqa: E402
 
-def _state_dir(project_dir: Path) -> Path:
-    return project_dir / ".claude" / "state"
 
+def _write_gate(project_dir: Path, *, pending: bool = True, agent: str = "planner") -> None:
+    store = StateStore(state_db_path(str(project_dir)))
+    try:
+        store.put(
+            PROJECT,
+            "plan-gate",
+            {"pending": pending, "agent": agent, "set_at": "2026-01-01T00:00:00+00:00"},
+        )
+    finally:
+        store.close()
 
-def _gate_path(project_dir: Path) -> Path:
-    return _state_dir(project_dir) / "plan-gate.json"
 
-
-def _write_gate_file(project_dir: Path, *, pending: bool = True, agent: str = "planner") -> Path:
-    path = _gate_path(project_dir)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
-        json.dumps({"pending": pending, "agent": agent, "set_at": "2026-01-01T00:00:00+00:00"}),
-        encoding="utf-8",
-    )
-    return path
+def _read_gate(project_dir: Path) -> dict[str, Any] | None:
+    """plan gate を読み出す（状態 DB がなければ作らずに None）。"""
+    db_path = state_db_path(str(project_dir))
+    if not os.path.isfile(db_path):
+        return None
+    store = StateStore(db_path)
+    try:
+        return store.get(PROJECT, "plan-gate")
+    finally:
+        store.close()
 
 
 def _run_hook(
@@ -62,15 +70,14 @@ class TestSetPlanGate:
     def test_plan_agents_contains_exact_expected_set(self) -> None:
         assert set_plan_gate.PLAN_AGENTS == {"plan", "planner"}
 
-    def test_get_state_dir_returns_expected_path_with_cwd(self, tmp_path: Path) -> None:
-        result = set_plan_gate._get_state_dir({"cwd": str(tmp_path)})
-        assert result == str(_state_dir(tmp_path))
+    def test_get_project_dir_returns_cwd(self, tmp_path: Path) -> None:
+        assert set_plan_gate._get_project_dir({"cwd": str(tmp_path)}) == str(tmp_path)
 
-    def test_get_state_dir_returns_empty_when_cwd_missing(
+    def test_get_project_dir_returns_empty_when_cwd_missing(
         self, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         monkeypatch.delenv("CLAUDE_PROJECT_DIR", raising=False)
-        assert set_plan_gate._get_state_dir({}) == ""
+        assert set_plan_gate._get_project_dir({}) == ""
 
     def test_subprocess_creates_gate_for_planner(self, tmp_path: Path) -> None:
         payload = {
@@ -80,12 +87,10 @@ class TestSetPlanGate:
             "cwd": str(tmp_path),
         }
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
-        gate_path = _gate_path(tmp_path)
+        gate_data = _read_gate(tmp_path)
 
         assert result.returncode == 0
-        assert gate_path.is_file()
-
-        gate_data = json.loads(gate_path.read_text(encoding="utf-8"))
+        assert gate_data is not None
         assert gate_data["pending"] is True
         assert gate_data["agent"] == "planner"
         assert isinstance(gate_data.get("set_at"), str)
@@ -105,7 +110,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not _gate_path(tmp_path).exists()
+        assert _read_gate(tmp_path) is None
 
     def test_subprocess_does_not_create_gate_when_response_has_nonzero_exit_code(
         self, tmp_path: Path
@@ -119,7 +124,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not _gate_path(tmp_path).exists()
+        assert _read_gate(tmp_path) is None
 
     def test_subprocess_does_not_create_gate_when_response_has_error_key(
         self, tmp_path: Path
@@ -133,7 +138,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not _gate_path(tmp_path).exists()
+        assert _read_gate(tmp_path) is None
 
     def test_subprocess_creates_gate_when_response_is_empty_dict(self, tmp_path: Path) -> None:
         """空 dict は有効なレスポンスとみなし、ゲートを設定する。"""
@@ -146,7 +151,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert _gate_path(tmp_path).is_file()
+        assert _read_gate(tmp_path) is not None
 
     def test_subprocess_creates_gate_when_error_is_null(self, tmp_path: Path) -> None:
         """error=null, exit_code=0 は成功扱いで、ゲートを設定する。"""
@@ -159,7 +164,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert _gate_path(tmp_path).is_file()
+        assert _read_gate(tmp_path) is not None
 
     def test_subprocess_creates_gate_when_response_contains_error_word_in_text(
         self, tmp_path: Path
@@ -174,7 +179,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert _gate_path(tmp_path).is_file()
+        assert _read_gate(tmp_path) is not None
 
     def test_subprocess_does_not_create_gate_for_non_plan_agent(self, tmp_path: Path) -> None:
         payload = {
@@ -185,7 +190,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not _gate_path(tmp_path).exists()
+        assert _read_gate(tmp_path) is None
 
     def test_subprocess_does_not_create_gate_for_non_task_tool(self, tmp_path: Path) -> None:
         payload = {
@@ -196,7 +201,7 @@ class TestSetPlanGate:
         result = _run_hook("set-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not _gate_path(tmp_path).exists()
+        assert _read_gate(tmp_path) is None
 
 
 class TestCheckPlanGate:
@@ -215,14 +220,13 @@ class TestCheckPlanGate:
     def test_warn_agents_contains_general_purpose_only(self) -> None:
         assert check_plan_gate.WARN_AGENTS == {"general-purpose"}
 
-    def test_get_gate_path_returns_expected_path(self, tmp_path: Path) -> None:
-        result = check_plan_gate._get_gate_path({"cwd": str(tmp_path)})
-        assert result == str(_gate_path(tmp_path))
+    def test_get_project_dir_returns_cwd(self, tmp_path: Path) -> None:
+        assert check_plan_gate._get_project_dir({"cwd": str(tmp_path)}) == str(tmp_path)
 
     def test_subprocess_exits_2_for_pending_gate_and_implementation_agent(
         self, tmp_path: Path
     ) -> None:
-        _write_gate_file(tmp_path, pending=True, agent="planner")
+        _write_gate(tmp_path, pending=True, agent="planner")
         payload = {
             "tool_name": "Task",
             "tool_input": {"subagent_type": "frontend-dev"},
@@ -235,7 +239,7 @@ class TestCheckPlanGate:
         assert "frontend-dev" in result.stderr
 
     def test_subprocess_warns_for_pending_gate_and_general_purpose(self, tmp_path: Path) -> None:
-        _write_gate_file(tmp_path, pending=True, agent="planner")
+        _write_gate(tmp_path, pending=True, agent="planner")
         payload = {
             "tool_name": "Task",
             "tool_input": {"subagent_type": "general-purpose"},
@@ -249,7 +253,7 @@ class TestCheckPlanGate:
         assert "[Plan Gate Warning]" in context
         assert "general-purpose" in context
 
-    def test_subprocess_allows_implementation_agent_when_no_gate_file(self, tmp_path: Path) -> None:
+    def test_subprocess_allows_implementation_agent_when_no_gate(self, tmp_path: Path) -> None:
         payload = {
             "tool_name": "Task",
             "tool_input": {"subagent_type": "frontend-dev"},
@@ -264,7 +268,7 @@ class TestCheckPlanGate:
     def test_subprocess_allows_non_implementation_agent_when_gate_pending(
         self, tmp_path: Path
     ) -> None:
-        _write_gate_file(tmp_path, pending=True, agent="planner")
+        _write_gate(tmp_path, pending=True, agent="planner")
         payload = {
             "tool_name": "Task",
             "tool_input": {"subagent_type": "planner"},
@@ -278,21 +282,20 @@ class TestCheckPlanGate:
 
 
 class TestClearPlanGate:
-    def test_get_gate_path_returns_expected_path(self, tmp_path: Path) -> None:
-        result = clear_plan_gate._get_gate_path({"cwd": str(tmp_path)})
-        assert result == str(_gate_path(tmp_path))
+    def test_get_project_dir_returns_cwd(self, tmp_path: Path) -> None:
+        assert clear_plan_gate._get_project_dir({"cwd": str(tmp_path)}) == str(tmp_path)
 
-    def test_subprocess_removes_gate_file_when_exists(self, tmp_path: Path) -> None:
-        gate_path = _write_gate_file(tmp_path, pending=True, agent="planner")
+    def test_subprocess_removes_gate_when_exists(self, tmp_path: Path) -> None:
+        _write_gate(tmp_path, pending=True, agent="planner")
         payload = {"cwd": str(tmp_path)}
         result = _run_hook("clear-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not gate_path.exists()
+        assert _read_gate(tmp_path) is None
 
-    def test_subprocess_no_error_when_gate_file_does_not_exist(self, tmp_path: Path) -> None:
+    def test_subprocess_does_not_create_state_db_when_no_gate(self, tmp_path: Path) -> None:
         payload = {"cwd": str(tmp_path)}
         result = _run_hook("clear-plan-gate.py", payload, tmp_path)
 
         assert result.returncode == 0
-        assert not _gate_path(tmp_path).exists()
+        assert not os.path.exists(state_db_path(str(tmp_path)))
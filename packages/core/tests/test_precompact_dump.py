@@ -95,7 +95,7 @@ class TestWriteDump:
         assert Path(path).read_text(encoding="utf-8") == "# hello\n"
 
     def test_prunes_old_dumps(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-        """古いダンプは MAX_DUMP_FILES を超えると削除され、新規 dump は残ることを確認する。
+        """古いダンプは削除ジョブで MAX_DUMP_FILES まで減り、新規 dump は残ることを確認する。
 
         実行時刻に依存しないよう `_now_stamp` を固定値にモンキーパッチする。
         古いダンプよりも必ず後ろに並ぶタイムスタンプを使うことで、ソート順が
@@ -116,6 +116,8 @@ class TestWriteDump:
         monkeypatch.setattr(precompact, "_now_stamp", lambda: fixed_stamp)
 
         new_path = precompact.write_dump(project_dir, "new")
+        # 削除は遅延ジョブ（--prune）で行うため、ジョブ本体を直接呼ぶ
+        precompact._prune_old_dumps(str(shared_dir))
 
         remaining_names = sorted(
             p.name for p in shared_dir.iterdir() if p.name.startswith("precompact-")
@@ -191,6 +193,12 @@ class TestMain:
 
         monkeypatch.setattr(precompact, "_emit_event", _fake_emit)
 
+        # 古いダンプの削除はジョブとして積まれる（ワーカーは起動しない）
+        enqueued: list[tuple] = []
+        monkeypatch.setattr(
+            precompact, "enqueue", lambda *args, **kwargs: enqueued.append((args, kwargs))
+        )
+
         payload = {
             "session_id": "sess-x",
             "cwd": str(tmp_path),
@@ -210,3 +218,8 @@ class TestMain:
         content = dumps[0].read_text(encoding="utf-8")
         assert "sess-x" in content
         assert "build feature" in content
+
+        assert len(enqueued) == 1
+        args, kwargs = enqueued[0]
+        assert args[1][-2:] == ["--prune", str(tmp_path / ".claude" / "context" / "shared")]
+        assert kwargs["key"] == "precompact-prune"
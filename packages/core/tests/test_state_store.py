@@ -0,0 +1,186 @@
+"""state_store.py（hook 共有状態ストア）のユニットテスト。"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import REPO_ROOT, load_module
+
+HOOKS_DIR = REPO_ROOT / "packages" / "core" / "hooks"
+if str(HOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(HOOKS_DIR))
+
+state_store = load_module("state_store_test", "packages/core/hooks/state_store.py")
+
+
+@pytest.fixture()
+def store(tmp_path: Path):
+    s = state_store.StateStore(state_store.state_db_path(str(tmp_path)))
+    yield s
+    s.close()
+
+
+class TestReadWrite:
+    """get / put / delete のテスト。"""
+
+    def test_put_and_get_roundtrip(self, store) -> None:
+        """書き込んだ値を JSON として読み戻し、version が 1 ずつ増える。"""
+        assert store.put("ns", "k", {"a": [1, 2]}) == 1
+        assert store.put("ns", "k", {"a": [3]}) == 2
+        assert store.get_versioned("ns", "k") == ({"a": [3]}, 2)
+
+    def test_missing_key_returns_default(self, store) -> None:
+        """存在しないキーは default / (None, 0) を返す。"""
+        assert store.get("ns", "missing", {"x": 1}) == {"x": 1}
+        assert store.get_versioned("ns", "missing") == (None, 0)
+
+    def test_namespaces_are_isolated(self, store) -> None:
+        """同じキーでも namespace が違えば別の値になる。"""
+        store.put(state_store.session_namespace("s1"), "k", 1)
+        store.put(state_store.session_namespace("s2"), "k", 2)
+
+        assert store.get(state_store.session_namespace("s1"), "k") == 1
+        assert store.delete_namespace(state_store.session_namespace("s1")) == 1
+        assert store.items(state_store.session_namespace("s2")) == {"k": 2}
+
+    def test_delete(self, store) -> None:
+        store.put("ns", "k", 1)
+        assert store.delete("ns", "k") is True
+        assert store.delete("ns", "k") is False
+        assert store.get("ns", "k") is None
+
+
+class TestCompareAndSwap:
+    """compare_and_swap のテスト。"""
+
+    def test_succeeds_only_for_expected_version(self, store) -> None:
+        """expected_version が一致したときだけ書き込む（未作成は 0）。"""
+        assert store.compare_and_swap("ns", "k", 0, "first") is True
+        assert store.compare_and_swap("ns", "k", 0, "stale") is False
+        assert store.compare_and_swap("ns", "k", 1, "second") is True
+        assert store.get_versioned("ns", "k") == ("second", 2)
+
+
+class TestUpdate:
+    """update のテスト。"""
+
+    def test_applies_fn_to_default_copy(self, store) -> None:
+        """未作成なら default のコピーに fn を適用する（default 自体は変更しない）。"""
+        default = {"items": []}
+
+        def add(state: dict) -> dict:
+            state["items"].append("a")
+            return state
+
+        assert store.update("ns", "k", add, default=default) == {"items": ["a"]}
+        assert store.update("ns", "k", add, default=default) == {"items": ["a", "a"]}
+        assert default == {"items": []}
+
+    def test_none_result_deletes_key(self, store) -> None:
+        store.put("ns", "k", 1)
+        store.update("ns", "k", lambda _value: None)
+        assert store.get_versioned("ns", "k") == (None, 0)
+
+    def test_exception_in_fn_rolls_back(self, store) -> None:
+        """fn が例外を送出した場合は何も書き込まない。"""
+        store.put("ns", "k", 1)
+
+        def fail(_value):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            store.update("ns", "k", fail)
+        assert store.get_versioned("ns", "k") == (1, 1)
+
+    def test_concurrent_updates_are_not_lost(self, tmp_path: Path) -> None:
+        """別接続からの並行インクリメントでも更新が失われない。"""
+        path = state_store.state_db_path(str(tmp_path))
+        state_store.StateStore(path).close()
+
+        def worker() -> None:
+            local = state_store.StateStore(path)
+            try:
+                for _ in range(50):
+                    local.update("ns", "counter", lambda n: n + 1, default=0)
+            finally:
+                local.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reader = state_store.StateStore(path)
+        try:
+            assert reader.get("ns", "counter") == 200
+        finally:
+            reader.close()
+
+    def test_concurrent_processes_are_not_lost(self, tmp_path: Path) -> None:
+        """別プロセスからの並行インクリメントでも更新が失われない。"""
+        code = (
+            "import sys; sys.path.insert(0, sys.argv[1]);"
+            "from state_store import open_store;"
+            "s = open_store(sys.argv[2]);"
+            "[s.update('ns', 'counter', lambda n: n + 1, default=0) for _ in range(30)]"
+        )
+        procs = [
+            subprocess.Popen([sys.executable, "-c", code, str(HOOKS_DIR), str(tmp_path)])
+            for _ in range(3)
+        ]
+        assert all(proc.wait(timeout=60) == 0 for proc in procs)
+
+        reader = state_store.StateStore(state_store.state_db_path(str(tmp_path)))
+        try:
+            assert reader.get("ns", "counter") == 90
+        finally:
+            reader.close()
+
+
+class TestTtl:
+    """TTL による失効のテスト。"""
+
+    def test_expired_values_are_hidden_and_evicted(
+        self, store, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """期限切れの値は読み出されず、次の書き込みで削除される。"""
+        now = 1_000_000.0
+        monkeypatch.setattr(state_store.time, "time", lambda: now)
+        store.put("ns", "short", "v", ttl=10)
+        store.put("ns", "forever", "v")
+
+        now += 11
+        assert store.get("ns", "short") is None
+        assert store.items("ns") == {"forever": "v"}
+
+        store.put("ns", "other", "v")
+        assert store.evict_expired() == 0
+
+    def test_expired_key_restarts_version(self, store, monkeypatch: pytest.MonkeyPatch) -> None:
+        """期限切れのキーは未作成扱い（version 0）で CAS できる。"""
+        now = 1_000_000.0
+        monkeypatch.setattr(state_store.time, "time", lambda: now)
+        store.put("ns", "k", "old", ttl=5)
+
+        now += 6
+        assert store.compare_and_swap("ns", "k", 0, "new") is True
+        assert store.get_versioned("ns", "k") == ("new", 1)
+
+
+class TestOpenStore:
+    """open_store のテスト。"""
+
+    def test_reuses_connection_per_project(self, tmp_path: Path) -> None:
+        try:
+            first = state_store.open_store(str(tmp_path))
+            assert state_store.open_store(str(tmp_path)) is first
+            assert Path(first.path) == tmp_path / ".claude" / "state" / "state.db"
+            assert (Path(first.path).stat().st_mode & 0o777) == 0o600
+        finally:
+            state_store.close_stores()
@@ -6,15 +6,21 @@ PreToolUse hook: Suggest context-saving alternatives for Read / Grep / Bash.
 を検出し、エスカレーション戦略への切り替えを提案する。
 
 参照: .claude/rules/escalation-strategy.md
+
+Read の行数判定は mmap 上の改行数で行い、閾値を超えた時点で数えるのをやめる。
+大きいファイルの行数は (dev, inode, mtime_ns, size) をキーに状態ストアへキャッシュし、
+同じファイルの再 Read では数え直さない。
 """
 
 from __future__ import annotations
 
 import json
+import mmap
 import os
 import shlex
 import stat
 import sys
+from pathlib import Path
 
 # hook_common を $AI_ORCHESTRA_DIR/packages/core/hooks/ から読み込む
 _orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
@@ -22,12 +28,26 @@ if _orchestra_dir:
     _core_hooks = os.path.join(_orchestra_dir, "packages", "core", "hooks")
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
+else:
+    _fallback_core_hooks = Path(__file__).resolve().parents[2] / "core" / "hooks"
+    if str(_fallback_core_hooks) not in sys.path:
+        sys.path.insert(0, str(_fallback_core_hooks))
 
 from hook_common import load_package_config  # noqa: E402
 
 DEFAULT_READ_LINE_THRESHOLD = 200
 DEFAULT_MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5 MB
 
+# 改行を数える単位（チャンクごとに閾値超過を判定して打ち切る）
+COUNT_CHUNK_BYTES = 64 * 1024
+
+# 行数をキャッシュする最小サイズ（これより小さいファイルは状態ストアを開くより数える方が速い）
+LINE_CACHE_MIN_BYTES = 256 * 1024
+
+# 行数キャッシュの状態キー（PROJECT namespace、ファイルの絶対パスを付ける）と有効期限
+LINE_CACHE_KEY = "line-count"
+LINE_CACHE_TTL = 7 * 24 * 3600
+
 # Bash で代替が望ましい先頭コマンド → 提案する代替ツール
 BASH_REPLACEMENTS: dict[str, str] = {
     "cat": "Read",
@@ -74,8 +94,44 @@ def is_enabled(settings: dict) -> bool:
     return bool(settings.get("enabled", True))
 
 
-def _count_lines(path: str, max_bytes: int) -> int | None:
-    """通常ファイルの行数を返す。サイズ超過・特殊ファイル・I/O 失敗時は None。"""
+def _count_newlines(path: str, stop_after: int | None = None) -> tuple[int, bool]:
+    """mmap 上で行数を数え、(行数, 最後まで数えたか) を返す。
+
+    stop_after を超えた時点で打ち切り、その時点の行数（下限）を返す。
+    末尾が改行で終わらない最終行も 1 行と数える（行単位で読んだときと同じ）。
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, True
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            count = 0
+            for start in range(0, size, COUNT_CHUNK_BYTES):
+                end = start + COUNT_CHUNK_BYTES
+                count += mm[start:end].count(b"\n")
+                if stop_after is not None and count > stop_after and end < size:
+                    return count, False
+            if mm[size - 1] != ord("\n"):
+                count += 1
+            return count, True
+
+
+def _line_cache_key(path: str) -> str:
+    return f"{LINE_CACHE_KEY}:{os.path.abspath(path)}"
+
+
+def _file_identity(st: os.stat_result) -> list[int]:
+    return [st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+def _count_lines(
+    path: str, max_bytes: int, stop_after: int | None = None, project_dir: str = ""
+) -> tuple[int, bool] | None:
+    """通常ファイルの (行数, 正確な値か) を返す。サイズ超過・特殊ファイル・I/O 失敗時は None。
+
+    stop_after を指定すると、それを超えた時点で数えるのをやめる（行数は下限値になる）。
+    project_dir を指定すると、LINE_CACHE_MIN_BYTES 以上のファイルの結果をキャッシュする。
+    """
     try:
         st = os.stat(path, follow_symlinks=True)
     except OSError:
@@ -84,14 +140,43 @@ def _count_lines(path: str, max_bytes: int) -> int | None:
         return None
     if st.st_size > max_bytes:
         return None
+
+    use_cache = bool(project_dir) and st.st_size >= LINE_CACHE_MIN_BYTES
+    identity = _file_identity(st)
+    if use_cache:
+        # 状態ストア（sqlite3）は大きいファイルの Read でしか使わないため、ここで読み込む
+        from state_store import PROJECT, STATE_ERRORS, open_store
+
+        try:
+            cached = open_store(project_dir).get(PROJECT, _line_cache_key(path))
+        except STATE_ERRORS:
+            use_cache = False
+            cached = None
+        if isinstance(cached, dict) and cached.get("id") == identity:
+            lines, complete = cached.get("lines"), cached.get("complete")
+            # 打ち切った値は、今回の判定にも十分な（閾値を超えている）ときだけ使う
+            if isinstance(lines, int) and (
+                complete or (stop_after is not None and lines > stop_after)
+            ):
+                return lines, bool(complete)
+
     try:
-        with open(path, "rb") as f:
-            return sum(1 for _ in f)
-    except OSError:
+        lines, complete = _count_newlines(path, stop_after)
+    except (OSError, ValueError):
         return None
 
+    if use_cache:
+        from state_store import PROJECT, STATE_ERRORS, open_store
+
+        value = {"id": identity, "lines": lines, "complete": complete}
+        try:
+            open_store(project_dir).put(PROJECT, _line_cache_key(path), value, ttl=LINE_CACHE_TTL)
+        except STATE_ERRORS:
+            pass
+    return lines, complete
+
 
-def check_read(tool_input: dict, settings: dict) -> str:
+def check_read(tool_input: dict, settings: dict, project_dir: str = "") -> str:
     """Read 呼び出しを検査し、提案メッセージ (空文字なら提案なし) を返す。"""
     file_path = tool_input.get("file_path", "")
     if not file_path:
@@ -111,18 +196,20 @@ def check_read(tool_input: dict, settings: dict) -> str:
         DEFAULT_MAX_FILE_SIZE_BYTES,
     )
 
-    line_count = _count_lines(file_path, max_bytes)
-    if line_count is None or line_count <= threshold:
+    counted = _count_lines(file_path, max_bytes, stop_after=threshold, project_dir=project_dir)
+    if counted is None or counted[0] <= threshold:
         return ""
 
+    line_count, complete = counted
+    size_label = f"{line_count} 行" if complete else f"{line_count} 行以上"
     return (
-        f"[Context Optimization] Read で {line_count} 行のファイルを全文読み込もうとしています。\n"
+        f"[Context Optimization] Read で {size_label}のファイルを全文読み込もうとしています。\n"
         "  → offset/limit を指定して必要範囲のみ部分読み込みを検討してください。\n"
         f"  → {ESCALATION_REF}"
     )
 
 
-def check_grep(tool_input: dict, _settings: dict) -> str:
+def check_grep(tool_input: dict, _settings: dict, _project_dir: str = "") -> str:
     """Grep 呼び出しを検査し、提案メッセージを返す。"""
     output_mode = tool_input.get("output_mode", "files_with_matches")
     if output_mode != "content":
@@ -164,7 +251,7 @@ def _bash_replacement(command: str) -> tuple[str, str]:
     return "", ""
 
 
-def check_bash(tool_input: dict, _settings: dict) -> str:
+def check_bash(tool_input: dict, _settings: dict, _project_dir: str = "") -> str:
     """Bash 呼び出しを検査し、専用ツール推奨メッセージを返す。"""
     command = tool_input.get("command", "")
     used, replacement = _bash_replacement(command)
@@ -206,7 +293,7 @@ def main() -> None:
 
     tool_input = data.get("tool_input", {}) or {}
     try:
-        message = checker(tool_input, settings)
+        message = checker(tool_input, settings, project_dir)
     except Exception as exc:
         print(f"check-context-optimization error: {exc}", file=sys.stderr)
         sys.exit(0)
@@ -4,13 +4,48 @@ PostToolUse hook: 対応ファイルの編集後に formatter / linter を実行
 
 編集されたファイルパスから言語種別を判定し、
 適切なツール群へ振り分ける。
+
+どの実行方法（pnpm exec / uv run / 直接実行など）でツールが動いたかはプロジェクトの
+状態ストア（PROJECT namespace、キー "lint-on-save:runners"）にキャッシュし、
+次回以降は解決済みの実行ファイルを直接起動する。キャッシュは package.json や
+lockfile が変わったときに作り直す。
+
+実行モード（config/lint-on-save.json の mode）:
+- sync: 編集のたびに、その場でファイル単位に実行して結果を返す（既定）
+- batch（opt-in）: 編集されたパスを状態ストアの待ち行列に積み、遅延ジョブキュー（job_queue.py）の
+  ワーカーがデバウンス後にまとめて処理する。ツールは種別・パッケージディレクトリごとに
+  1 回だけ起動し、結果はそのセッションで次に lint-on-save が動いたときの
+  additionalContext で返す
 """
 
 import json
+import os
+import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
 
+_orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
+if _orchestra_dir:
+    _core_hooks = os.path.join(_orchestra_dir, "packages", "core", "hooks")
+    if _core_hooks not in sys.path:
+        sys.path.insert(0, _core_hooks)
+else:
+    _fallback_core_hooks = Path(__file__).resolve().parents[2] / "core" / "hooks"
+    if str(_fallback_core_hooks) not in sys.path:
+        sys.path.insert(0, str(_fallback_core_hooks))
+
+from hook_common import load_package_config, peek_hook_input  # noqa: E402
+from job_queue import MODE_ENV, enqueue  # noqa: E402
+from state_store import (  # noqa: E402
+    PROJECT,
+    SESSION_TTL,
+    STATE_ERRORS,
+    open_store,
+    session_namespace,
+)
+
 PYTHON_EXTENSIONS = {".py"}
 JS_TS_EXTENSIONS = {".cjs", ".cts", ".js", ".jsx", ".mjs", ".mts", ".ts", ".tsx"}
 PRETTIER_EXTENSIONS = {".css", ".html", ".json", ".jsonc", ".md", ".yaml", ".yml"}
@@ -26,6 +61,46 @@ MISSING_TOOL_PATTERNS = (
     "package.json not found",
 )
 
+# ツール解決キャッシュの状態キー（PROJECT namespace）
+RUNNER_CACHE_KEY = "lint-on-save:runners"
+
+# 解決結果の有効期限（グローバルに導入したツールなど、lockfile に現れない変化を拾い直す）
+RUNNER_CACHE_TTL = 24 * 3600
+
+# 変わったらツール解決をやり直すファイル（最寄りのパッケージディレクトリとプロジェクト直下）
+RUNNER_FINGERPRINT_FILES = (
+    "package.json",
+    "package-lock.json",
+    "pnpm-lock.yaml",
+    "yarn.lock",
+    "bun.lock",
+    "bun.lockb",
+    "pyproject.toml",
+    "uv.lock",
+)
+
+# 実行方法ごとの「直接起動できる実行ファイル」の置き場所
+NODE_RUNNERS = {"pnpm", "npm", "yarn", "npx"}
+NODE_BIN_DIR = os.path.join("node_modules", ".bin")
+PYTHON_BIN_DIR = os.path.join(".venv", "bin")
+
+# config/lint-on-save.json がない場合の設定
+DEFAULT_LINT_CONFIG = {"mode": "sync", "debounce_seconds": 1.5, "max_wait_seconds": 10}
+
+# batch モードの待ち行列（PROJECT namespace）と結果（セッション namespace）の状態キー
+PENDING_KEY = "lint-on-save:pending"
+REPORTS_KEY = "lint-on-save:reports"
+
+# 未配信のまま保持する結果の最大件数（古いものから捨てる）
+MAX_PENDING_REPORTS = 20
+
+# バッチジョブの key（未実行のジョブは 1 件にまとまる）と優先度
+BATCH_JOB_KEY = "lint-on-save:batch"
+BATCH_JOB_PRIORITY = 20
+
+# 結果の見出しに列挙するファイル数
+MAX_LABEL_PATHS = 5
+
 
 def is_shell_script(file_path: str) -> bool:
     """拡張子または shebang から shell script かどうかを判定する。"""
@@ -74,76 +149,102 @@ def node_tool_commands(tool: str, *args: str) -> list[list[str]]:
     ]
 
 
-def build_lint_steps(file_path: str) -> list[dict]:
-    """ファイル種別ごとの formatter / linter 実行手順を返す。"""
-    kind = get_file_kind(file_path)
+def python_tool_commands(tool: str, *args: str) -> list[list[str]]:
+    """Python 系ツールの実行コマンド候補を組み立てる。"""
+    return [
+        ["uv", "run", tool, *args],
+        [tool, *args],
+    ]
+
+
+def build_kind_steps(kind: str | None, paths: list[str]) -> list[dict]:
+    """ファイル種別ごとの formatter / linter 実行手順を返す（paths をまとめて 1 回で処理する）。"""
     if kind == "python":
         return [
             {
                 "name": "ruff format",
-                "commands": [
-                    ["uv", "run", "ruff", "format", file_path],
-                    ["ruff", "format", file_path],
-                ],
+                "tool": "ruff",
+                "args": ["format", *paths],
+                "commands": python_tool_commands("ruff", "format", *paths),
             },
             {
                 "name": "ruff check",
-                "commands": [
-                    ["uv", "run", "ruff", "check", "--fix", file_path],
-                    ["ruff", "check", "--fix", file_path],
-                ],
+                "tool": "ruff",
+                "args": ["check", "--fix", *paths],
+                "commands": python_tool_commands("ruff", "check", "--fix", *paths),
             },
         ]
     if kind == "javascript":
         return [
             {
                 "name": "biome check",
-                "commands": node_tool_commands("biome", "check", "--write", file_path),
+                "tool": "biome",
+                "args": ["check", "--write", *paths],
+                "commands": node_tool_commands("biome", "check", "--write", *paths),
             },
             {
                 "name": "prettier",
-                "commands": node_tool_commands("prettier", "--write", file_path),
+                "tool": "prettier",
+                "args": ["--write", *paths],
+                "commands": node_tool_commands("prettier", "--write", *paths),
             },
             {
                 "name": "eslint",
-                "commands": node_tool_commands("eslint", "--fix", file_path),
+                "tool": "eslint",
+                "args": ["--fix", *paths],
+                "commands": node_tool_commands("eslint", "--fix", *paths),
             },
         ]
     if kind == "prettier":
         return [
             {
                 "name": "prettier",
-                "commands": node_tool_commands("prettier", "--write", file_path),
+                "tool": "prettier",
+                "args": ["--write", *paths],
+                "commands": node_tool_commands("prettier", "--write", *paths),
             }
         ]
     if kind == "shell":
         return [
             {
                 "name": "shfmt",
-                "commands": [["shfmt", "-w", file_path]],
+                "tool": "shfmt",
+                "args": ["-w", *paths],
+                "commands": [["shfmt", "-w", *paths]],
             },
             {
                 "name": "shellcheck",
-                "commands": [["shellcheck", file_path]],
+                "tool": "shellcheck",
+                "args": [*paths],
+                "commands": [["shellcheck", *paths]],
             },
         ]
     if kind == "go":
         return [
             {
                 "name": "gofmt",
-                "commands": [["gofmt", "-w", file_path]],
+                "tool": "gofmt",
+                "args": ["-w", *paths],
+                "commands": [["gofmt", "-w", *paths]],
             }
         ]
     if kind == "rust":
         return [
             {
                 "name": "rustfmt",
-                "commands": [["rustfmt", file_path]],
+                "tool": "rustfmt",
+                "args": [*paths],
+                "commands": [["rustfmt", *paths]],
             }
         ]
     return []
 
 
+def build_lint_steps(file_path: str) -> list[dict]:
+    """ファイル種別ごとの formatter / linter 実行手順を返す。"""
+    return build_kind_steps(get_file_kind(file_path), [file_path])
+
+
 def is_missing_tool_output(output: str) -> bool:
     """出力内容から「ツール未導入による失敗」かを判定する。"""
     lowered = output.lower()
@@ -152,9 +253,165 @@ def is_missing_tool_output(output: str) -> bool:
     return any(pattern in lowered for pattern in MISSING_TOOL_PATTERNS)
 
 
-def run_step(step: dict, file_dir: str) -> dict | None:
-    """1つの手順をフォールバック付きで実行する。"""
-    for cmd in step["commands"]:
+def find_package_dir(file_dir: str, project_dir: str) -> str:
+    """file_dir から上へたどり、最初に package.json などを含むディレクトリを返す。
+
+    見つからなければ project_dir を返す（project_dir より上へはたどらない）。
+    """
+    project_dir = os.path.abspath(project_dir)
+    current = os.path.abspath(file_dir)
+    while True:
+        if any(os.path.isfile(os.path.join(current, name)) for name in RUNNER_FINGERPRINT_FILES):
+            return current
+        parent = os.path.dirname(current)
+        if current == project_dir or parent == current:
+            return project_dir
+        current = parent
+
+
+def runner_fingerprint(*dirs: str) -> list[list]:
+    """package.json / lockfile の (パス, mtime_ns, size) の一覧を返す。"""
+    fingerprint: list[list] = []
+    for directory in dict.fromkeys(dirs):
+        for name in RUNNER_FINGERPRINT_FILES:
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            fingerprint.append([path, st.st_mtime_ns, st.st_size])
+    return fingerprint
+
+
+def find_direct_executable(cmd: list[str], tool: str, file_dir: str, stop_dir: str) -> str | None:
+    """動いた実行方法に対応する、直接起動できる実行ファイルのパスを返す。
+
+    pnpm / npm / yarn / npx 経由なら node_modules/.bin、uv run 経由なら .venv/bin を
+    file_dir から stop_dir までたどって探す。ツールを直接起動した場合は PATH から探す。
+    実行方法と別の場所の実行ファイル（別バージョン）を拾わないよう、場所は実行方法で決める。
+    """
+    runner = cmd[0]
+    if runner == tool:
+        return shutil.which(tool)
+    if runner in NODE_RUNNERS:
+        bin_dir = NODE_BIN_DIR
+    elif runner == "uv":
+        bin_dir = PYTHON_BIN_DIR
+    else:
+        return None
+
+    stop_dir = os.path.abspath(stop_dir)
+    current = os.path.abspath(file_dir)
+    while True:
+        candidate = os.path.join(current, bin_dir, tool)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+        parent = os.path.dirname(current)
+        if current == stop_dir or parent == current:
+            return None
+        current = parent
+
+
+class RunnerCache:
+    """プロジェクト単位のツール解決結果（どの実行方法で動くか）のキャッシュ。
+
+    package.json などを含む最寄りのディレクトリごとに、ツール名 → 解決結果を保持する。
+
+    - {"path": 実行ファイル}: 次回はこの実行ファイルを直接起動する
+    - {"index": n}: 直接起動できる場所がないため、n 番目のコマンド候補から試す
+    - {"missing": True}: どの候補でも見つからなかったため起動しない
+    """
+
+    def __init__(self, project_dir: str, file_dir: str) -> None:
+        self.project_dir = project_dir
+        self.file_dir = file_dir
+        self.package_dir = find_package_dir(file_dir, project_dir)
+        self.fingerprint = runner_fingerprint(self.package_dir, os.path.abspath(project_dir))
+        self.tools: dict[str, dict] = {}
+        self.dirty = False
+        try:
+            cached = open_store(project_dir).get(PROJECT, RUNNER_CACHE_KEY)
+        except STATE_ERRORS:
+            cached = None
+        entry = cached.get(self.package_dir) if isinstance(cached, dict) else None
+        if (
+            isinstance(entry, dict)
+            and entry.get("fingerprint") == self.fingerprint
+            and time.time() - entry.get("checked_at", 0) < RUNNER_CACHE_TTL
+        ):
+            tools = entry.get("tools")
+            if isinstance(tools, dict):
+                self.tools = tools
+
+    def commands_for(self, step: dict) -> list[list[str]]:
+        """キャッシュに従って試すコマンド候補を返す。"""
+        tool = step.get("tool")
+        resolved = self.tools.get(tool) if tool else None
+        if not isinstance(resolved, dict):
+            return step["commands"]
+        if resolved.get("missing"):
+            return []
+        if resolved.get("path"):
+            return [[resolved["path"], *step.get("args", [])]]
+        index = resolved.get("index")
+        if isinstance(index, int) and 0 <= index < len(step["commands"]):
+            return step["commands"][index:]
+        return step["commands"]
+
+    def is_cached(self, step: dict) -> bool:
+        return step.get("tool") in self.tools
+
+    def record(self, step: dict, cmd: list[str] | None) -> None:
+        """解決結果を記録する（cmd が None ならツール未導入として記録する）。"""
+        tool = step.get("tool")
+        if not tool:
+            return
+        if cmd is None:
+            resolved = {"missing": True}
+        else:
+            path = find_direct_executable(cmd, tool, self.file_dir, self.package_dir)
+            if path:
+                resolved = {"path": path}
+            else:
+                resolved = {"index": step["commands"].index(cmd)}
+        if self.tools.get(tool) != resolved:
+            self.tools[tool] = resolved
+            self.dirty = True
+
+    def forget(self, step: dict) -> None:
+        """キャッシュした実行ファイルが使えなかった場合に解決結果を捨てる。"""
+        tool = step.get("tool")
+        if not isinstance(tool, str):
+            return
+        if self.tools.pop(tool, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        """変更があれば状態ストアへ書き戻す（他のパッケージディレクトリの結果は保持する）。"""
+        if not self.dirty:
+            return
+        entry = {"fingerprint": self.fingerprint, "checked_at": time.time(), "tools": self.tools}
+
+        def merge(cached: dict) -> dict:
+            if not isinstance(cached, dict):
+                cached = {}
+            cached[self.package_dir] = entry
+            return cached
+
+        try:
+            open_store(self.project_dir).update(
+                PROJECT, RUNNER_CACHE_KEY, merge, default={}, ttl=RUNNER_CACHE_TTL
+            )
+        except STATE_ERRORS:
+            pass
+        self.dirty = False
+
+
+def _run_commands(
+    step: dict, commands: list[list[str]], file_dir: str
+) -> tuple[dict | None, list[str] | None]:
+    """コマンド候補を順に試し、(結果, 動いたコマンド) を返す。"""
+    for cmd in commands:
         try:
             result = subprocess.run(
                 cmd,
@@ -172,66 +429,250 @@ def run_step(step: dict, file_dir: str) -> dict | None:
                 "name": step["name"],
                 "success": True,
                 "output": output,
-            }
+            }, cmd
         if is_missing_tool_output(output):
             continue
         return {
             "name": step["name"],
             "success": False,
             "output": output,
-        }
-    return None
+        }, cmd
+    return None, None
+
+
+def run_step(step: dict, file_dir: str, cache: RunnerCache | None = None) -> dict | None:
+    """1つの手順をフォールバック付きで実行する。
+
+    cache があれば解決済みの実行方法だけを試し、未解決なら結果を記録する。
+    解決済みの実行方法が動かなくなっていた場合は全候補から解決し直す。
+    """
+    if cache is None or not cache.is_cached(step):
+        result, cmd = _run_commands(step, step["commands"], file_dir)
+        if cache is not None:
+            cache.record(step, cmd)
+        return result
 
+    commands = cache.commands_for(step)
+    if not commands:
+        return None
+    result, cmd = _run_commands(step, commands, file_dir)
+    if cmd is None:
+        cache.forget(step)
+        return run_step(step, file_dir, cache)
+    return result
 
-def run_lint_commands(file_path: str) -> list[dict]:
-    """対象ファイル向けの手順を順に実行し、結果を返す。"""
+
+def run_lint_commands(file_path: str, project_dir: str | None = None) -> list[dict]:
+    """対象ファイル向けの手順を順に実行し、結果を返す。
+
+    project_dir を渡すとツール解決キャッシュを使う。
+    """
     results = []
     file_dir = str(Path(file_path).parent)
+    cache = RunnerCache(project_dir, file_dir) if project_dir else None
 
     for step in build_lint_steps(file_path):
-        result = run_step(step, file_dir)
+        result = run_step(step, file_dir, cache)
         if result is not None:
             results.append(result)
 
+    if cache is not None:
+        cache.save()
     return results
 
 
+def build_lint_message(label: str, results: list[dict]) -> str | None:
+    """実際に動いたツールの結果を通知用のメッセージにまとめる（通知不要なら None）。"""
+    messages = []
+    has_issues = False
+    for result in results:
+        if result["success"]:
+            if result["output"]:
+                messages.append(f"✓ {result['name']}: {result['output']}")
+        else:
+            has_issues = True
+            messages.append(f"✗ {result['name']}: {result['output']}")
+
+    if not messages:
+        return None
+    status = "Issues found" if has_issues else "OK"
+    return f"[Lint {status}] {label}\n" + "\n".join(messages)
+
+
+def load_lint_config(project_dir: str) -> dict:
+    """lint-on-save の設定を返す（未設定の項目は DEFAULT_LINT_CONFIG で補う）。"""
+    config = load_package_config("quality-gates", "lint-on-save.json", project_dir)
+    return {**DEFAULT_LINT_CONFIG, **config}
+
+
+# ---------------------------------------------------------------------------
+# batch モード
+# ---------------------------------------------------------------------------
+
+
+def enqueue_batch(project_dir: str, file_path: str, session_id: str) -> bool:
+    """編集されたパスを待ち行列に積み、バッチジョブを予約する。積めなければ False。"""
+    file_path = os.path.join(project_dir, file_path)
+
+    def add(state: dict) -> dict:
+        state.setdefault("paths", {})[file_path] = session_id
+        state["updated_at"] = time.time()
+        return state
+
+    try:
+        open_store(project_dir).update(PROJECT, PENDING_KEY, add, default={})
+        enqueue(
+            project_dir,
+            [sys.executable, os.path.abspath(__file__), "--batch", project_dir],
+            key=BATCH_JOB_KEY,
+            priority=BATCH_JOB_PRIORITY,
+        )
+    except STATE_ERRORS:
+        return False
+    return True
+
+
+def wait_for_quiet(project_dir: str, debounce: float, max_wait: float) -> None:
+    """最後の編集から debounce 秒経つまで待つ（最長 max_wait 秒）。"""
+    deadline = time.monotonic() + max_wait
+    while True:
+        try:
+            state = open_store(project_dir).get(PROJECT, PENDING_KEY)
+        except STATE_ERRORS:
+            return
+        updated_at = state.get("updated_at", 0) if isinstance(state, dict) else 0
+        remaining = min(updated_at + debounce - time.time(), deadline - time.monotonic())
+        if remaining <= 0:
+            return
+        time.sleep(remaining)
+
+
+def take_pending(project_dir: str) -> dict[str, str]:
+    """待ち行列のパスをすべて取り出して {path: session_id} を返す。"""
+    taken: dict[str, str] = {}
+
+    def take(state: dict | None) -> None:
+        if isinstance(state, dict) and isinstance(state.get("paths"), dict):
+            taken.update(state["paths"])
+        return None
+
+    try:
+        open_store(project_dir).update(PROJECT, PENDING_KEY, take)
+    except STATE_ERRORS:
+        return {}
+    return taken
+
+
+def describe_paths(paths: list[str], project_dir: str) -> str:
+    """結果の見出し用にパスを列挙する（多い場合は件数で省略する）。"""
+    names = [os.path.relpath(path, project_dir) for path in paths[:MAX_LABEL_PATHS]]
+    if len(paths) > MAX_LABEL_PATHS:
+        names.append(f"... (+{len(paths) - MAX_LABEL_PATHS} files)")
+    return ", ".join(names)
+
+
+def run_batch(project_dir: str, paths: dict[str, str]) -> dict[str, list[str]]:
+    """パスを種別・パッケージディレクトリごとにまとめて lint し、セッションごとの結果を返す。"""
+    groups: dict[tuple[str, str], list[str]] = {}
+    for path in sorted(paths):
+        kind = get_file_kind(path)
+        if kind is None or not os.path.isfile(path):
+            continue
+        package_dir = find_package_dir(os.path.dirname(path), project_dir)
+        groups.setdefault((kind, package_dir), []).append(path)
+
+    reports: dict[str, list[str]] = {}
+    for (kind, package_dir), group in groups.items():
+        cache = RunnerCache(project_dir, package_dir)
+        results = []
+        for step in build_kind_steps(kind, group):
+            result = run_step(step, package_dir, cache)
+            if result is not None:
+                results.append(result)
+        cache.save()
+
+        message = build_lint_message(describe_paths(group, project_dir), results)
+        if message is None:
+            continue
+        for session_id in dict.fromkeys(paths[path] for path in group):
+            reports.setdefault(session_id, []).append(message)
+    return reports
+
+
+def store_reports(project_dir: str, reports: dict[str, list[str]]) -> None:
+    """バッチの結果を各セッションの未配信リストに追加する。"""
+    for session_id, messages in reports.items():
+
+        def append(current: list, messages: list[str] = messages) -> list:
+            return [*current, *messages][-MAX_PENDING_REPORTS:]
+
+        try:
+            open_store(project_dir).update(
+                session_namespace(session_id), REPORTS_KEY, append, default=[], ttl=SESSION_TTL
+            )
+        except STATE_ERRORS:
+            pass
+
+
+def pop_reports(project_dir: str, session_id: str) -> list[str]:
+    """セッションの未配信の結果を取り出す。"""
+    popped: list[str] = []
+
+    def take(current: list | None) -> None:
+        if isinstance(current, list):
+            popped.extend(current)
+        return None
+
+    try:
+        open_store(project_dir).update(session_namespace(session_id), REPORTS_KEY, take)
+    except STATE_ERRORS:
+        return []
+    return popped
+
+
+def run_batch_job(project_dir: str) -> None:
+    """バッチジョブのエントリポイント（遅延ジョブキューのワーカーから実行される）。"""
+    config = load_lint_config(project_dir)
+    if os.environ.get(MODE_ENV) != "sync":
+        wait_for_quiet(project_dir, config["debounce_seconds"], config["max_wait_seconds"])
+    paths = take_pending(project_dir)
+    if paths:
+        store_reports(project_dir, run_batch(project_dir, paths))
+
+
 def main() -> None:
     """PostToolUse hook のエントリポイント。"""
     try:
-        data = json.load(sys.stdin)
-        tool_name = data.get("tool_name", "")
+        hook_input = peek_hook_input()
+        tool_name = hook_input.get("tool_name", "")
 
+        # Edit / Write 以外は tool_response を含む全体をデコードせずに終了する
         if tool_name not in ("Edit", "Write"):
             sys.exit(0)
 
+        data = hook_input.data
         tool_input = data.get("tool_input", {})
         file_path = tool_input.get("file_path", "")
 
-        if not build_lint_steps(file_path):
-            sys.exit(0)
-
-        results = run_lint_commands(file_path)
-        if not results:
+        project_dir = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "") or os.getcwd()
+        batch = load_lint_config(project_dir)["mode"] == "batch"
+        has_steps = bool(build_lint_steps(file_path))
+        if not has_steps and not batch:
             sys.exit(0)
 
-        # 実際に動いたツールだけをユーザーへ通知する。
-        messages = []
-        has_issues = False
-        for result in results:
-            if result["success"]:
-                if result["output"]:
-                    messages.append(f"✓ {result['name']}: {result['output']}")
-            else:
-                has_issues = True
-                messages.append(f"✗ {result['name']}: {result['output']}")
+        session_id = data.get("session_id", "")
+        if batch and (not has_steps or enqueue_batch(project_dir, file_path, session_id)):
+            # 前回までのバッチの結果を返す（積めなかった場合だけその場で処理する）
+            message = "\n\n".join(pop_reports(project_dir, session_id))
+        else:
+            results = run_lint_commands(file_path, project_dir=project_dir)
+            message = build_lint_message(file_path, results)
 
-        if messages:
-            status = "Issues found" if has_issues else "OK"
+        if message:
             output = {
                 "hookSpecificOutput": {
                     "hookEventName": "PostToolUse",
-                    "additionalContext": f"[Lint {status}] {file_path}\n" + "\n".join(messages),
+                    "additionalContext": message,
                 }
             }
             print(json.dumps(output))
@@ -243,4 +684,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) == 3 and sys.argv[1] == "--batch":
+        run_batch_job(sys.argv[2])
+    else:
+        main()
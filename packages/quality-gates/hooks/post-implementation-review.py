@@ -4,39 +4,52 @@ PostToolUse hook: Suggest review after significant implementation.
 
 Tracks file edits across the session and suggests code review
 when 3+ files or 100+ lines have been modified.
+
+The modification counters live in the shared state store (session namespace,
+key "impl-review").
 """
 
+import copy
 import json
+import os
 import sys
 from pathlib import Path
 
-# Session state file for tracking modifications
-STATE_FILE = Path("/tmp/claude-impl-review-state.json")
+_orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
+if _orchestra_dir:
+    _core_hooks = os.path.join(_orchestra_dir, "packages", "core", "hooks")
+    if _core_hooks not in sys.path:
+        sys.path.insert(0, _core_hooks)
+else:
+    _fallback_core_hooks = Path(__file__).resolve().parents[2] / "core" / "hooks"
+    if str(_fallback_core_hooks) not in sys.path:
+        sys.path.insert(0, str(_fallback_core_hooks))
+
+from hook_common import peek_hook_input  # noqa: E402
+from state_store import (  # noqa: E402
+    SESSION_TTL,
+    STATE_ERRORS,
+    open_store,
+    session_namespace,
+)
+
+# State key for tracking modifications (session namespace)
+STATE_KEY = "impl-review"
+
+DEFAULT_STATE = {"files": [], "total_lines": 0, "review_suggested": False}
 
 # Thresholds for triggering review suggestion
 FILE_THRESHOLD = 3
 LINE_THRESHOLD = 100
 
 
-def load_state() -> dict:
-    """Load session state from file."""
-    try:
-        if STATE_FILE.exists():
-            with open(STATE_FILE, encoding="utf-8") as f:
-                return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        pass
-    return {"files": [], "total_lines": 0, "review_suggested": False}
-
-
-def save_state(state: dict) -> None:
-    """Save session state to file."""
+def load_state(project_dir: str, session_id: str) -> dict:
+    """Load the session's review state from the state store."""
     try:
-        STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f)
-    except OSError:
-        pass
+        state = open_store(project_dir).get(session_namespace(session_id), STATE_KEY)
+    except STATE_ERRORS:
+        state = None
+    return state if isinstance(state, dict) else copy.deepcopy(DEFAULT_STATE)
 
 
 def count_lines(content: str) -> int:
@@ -57,13 +70,15 @@ def should_suggest_review(state: dict) -> bool:
 
 def main():
     try:
-        data = json.load(sys.stdin)
-        tool_name = data.get("tool_name", "")
+        hook_input = peek_hook_input()
+        tool_name = hook_input.get("tool_name", "")
 
         # Only process Edit/Write tool calls
         if tool_name not in ("Edit", "Write"):
             sys.exit(0)
 
+        data = hook_input.data
+
         tool_input = data.get("tool_input", {})
         file_path = tool_input.get("file_path", "")
 
@@ -76,15 +91,31 @@ def main():
         content = tool_input.get("content", "") or tool_input.get("new_string", "")
         lines_changed = count_lines(content)
 
-        # Update state
-        state = load_state()
-        state["files"].append(file_path)
-        state["total_lines"] += lines_changed
-
-        if should_suggest_review(state):
-            state["review_suggested"] = True
-            save_state(state)
+        project_dir = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "") or os.getcwd()
+        suggest = False
+
+        def apply_edit(state: dict) -> dict:
+            nonlocal suggest
+            state["files"].append(file_path)
+            state["total_lines"] += lines_changed
+            suggest = should_suggest_review(state)
+            if suggest:
+                state["review_suggested"] = True
+            return state
+
+        # Update state (read-modify-write in one transaction)
+        try:
+            state = open_store(project_dir).update(
+                session_namespace(data.get("session_id", "")),
+                STATE_KEY,
+                apply_edit,
+                default=DEFAULT_STATE,
+                ttl=SESSION_TTL,
+            )
+        except STATE_ERRORS:
+            sys.exit(0)
 
+        if suggest:
             file_count = len(set(state["files"]))
             total_lines = state["total_lines"]
 
@@ -103,8 +134,6 @@ def main():
                 }
             }
             print(json.dumps(output))
-        else:
-            save_state(state)
 
         sys.exit(0)
 
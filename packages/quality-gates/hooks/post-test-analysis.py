@@ -5,14 +5,24 @@ PostToolUse hook: Suggest Codex debugging after test failures.
 Triggers after Bash tool calls containing test commands (pytest, npm test, etc.)
 when the test run fails.
 
-Also records test results to the shared test-gate state file so that
-test-gate-checker.py can reset change counters after successful tests.
+Also records test results to the shared test-gate state (state store, session
+namespace) so that test-gate-checker.py can reset change counters after
+successful tests.
+
+Test output is parsed tail-first: the framework summary (pytest, jest/vitest,
+go test, cargo test) lives at the end of the output, so the parsers walk lines
+backwards from the end, stop as soon as the summary and failed test ids are
+collected, and never look further back than TAIL_SCAN_CHARS.
 """
 
+import copy
 import json
 import os
 import re
 import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -22,8 +32,18 @@ if _orchestra_dir:
     _core_hooks = os.path.join(_orchestra_dir, "packages", "core", "hooks")
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
-
-from hook_common import load_package_config  # noqa: E402
+else:
+    _fallback_core_hooks = Path(__file__).resolve().parents[2] / "core" / "hooks"
+    if str(_fallback_core_hooks) not in sys.path:
+        sys.path.insert(0, str(_fallback_core_hooks))
+
+from hook_common import load_package_config, peek_hook_input  # noqa: E402
+from state_store import (  # noqa: E402
+    SESSION_TTL,
+    STATE_ERRORS,
+    open_store,
+    session_namespace,
+)
 
 # Test command patterns
 TEST_COMMAND_PATTERNS = [
@@ -39,8 +59,27 @@ TEST_COMMAND_PATTERNS = [
     r"\bmake\s+test\b",
 ]
 
-# Shared state file with test-gate-checker.py
-TEST_GATE_STATE_FILE = Path("/tmp/claude-test-gate-state.json")
+# Characters from the end of the output the tail parsers may scan
+TAIL_SCAN_CHARS = 256 * 1024
+
+# Failed test ids kept in a report (and in the test-gate state)
+MAX_FAILED_IDS = 20
+
+# Failure detail lines shown in the Codex suggestion
+MAX_SUMMARY_LINES = 3
+
+# Longest line kept in a report (log lines can be arbitrarily long)
+MAX_LINE_CHARS = 300
+
+# State key shared with test-gate-checker.py (session namespace)
+TEST_GATE_STATE_KEY = "test-gate"
+
+DEFAULT_TEST_GATE_STATE = {
+    "files_modified_since_test": [],
+    "lines_modified_since_test": 0,
+    "last_test_result": None,
+    "warned": False,
+}
 
 
 def is_test_command(command: str) -> bool:
@@ -70,13 +109,38 @@ def is_test_failure(exit_code: int, output: str) -> bool:
     return any(indicator in output for indicator in failure_indicators)
 
 
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of text from the start without splitting it all at once."""
+    start = 0
+    while start <= len(text):
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def iter_lines_reverse(text: str, limit: int = TAIL_SCAN_CHARS) -> Iterator[str]:
+    """Yield the lines of text from the end, looking at most `limit` characters back.
+
+    A line cut by the limit is yielded partially as the last item.
+    """
+    end = len(text)
+    floor = max(0, end - limit)
+    while True:
+        start = text.rfind("\n", floor, end)
+        yield text[start + 1 if start >= 0 else floor : end]
+        if start < 0:
+            return
+        end = start
+
+
 def extract_failure_summary(output: str) -> str:
     """Extract a brief summary of the test failure."""
-    lines = output.split("\n")
-
     # Look for lines containing failure information
     failure_lines = []
-    for line in lines:
+    for line in iter_lines(output):
         if any(
             indicator in line for indicator in ["FAILED", "Error", "AssertionError", "TypeError"]
         ):
@@ -89,49 +153,291 @@ def extract_failure_summary(output: str) -> str:
     return "Test failure detected"
 
 
-def load_test_gate_state() -> dict:
-    """Load the shared test-gate state from file."""
-    try:
-        if TEST_GATE_STATE_FILE.exists():
-            with open(TEST_GATE_STATE_FILE, encoding="utf-8") as f:
-                return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        pass
-    return {
-        "files_modified_since_test": [],
-        "lines_modified_since_test": 0,
-        "last_test_result": None,
-        "warned": False,
-    }
+# ---------------------------------------------------------------------------
+# Tail-first test output parsers
+# ---------------------------------------------------------------------------
+
+_COUNT_RE = re.compile(r"(\d+) (failed|passed|skipped|errors?|xfailed|xpassed|todo|total)\b")
+
+
+def _add_counts(counts: dict[str, int], text: str) -> None:
+    for number, label in _COUNT_RE.findall(text):
+        key = "errors" if label.startswith("error") else label
+        counts[key] = counts.get(key, 0) + int(number)
+
+
+def _clip(line: str) -> str:
+    line = line.strip()
+    return line if len(line) <= MAX_LINE_CHARS else line[: MAX_LINE_CHARS - 3] + "..."
+
+
+@dataclass
+class RunReport:
+    """Structured result extracted from the tail of a test run's output."""
+
+    framework: str
+    summary_found: bool = False
+    counts: dict[str, int] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+    duration: float | None = None
+    # Summary line and failure detail lines, in output order
+    lines: list[str] = field(default_factory=list)
+    scanned_chars: int = 0
 
+    @property
+    def failed_count(self) -> int:
+        return max(self.counts.get("failed", 0) + self.counts.get("errors", 0), len(self.failed))
 
-def save_test_gate_state(state: dict) -> None:
-    """Save the shared test-gate state to file."""
+    def add_failed(self, test_id: str, detail: str = "") -> None:
+        if len(self.failed) < MAX_FAILED_IDS and test_id not in self.failed:
+            self.failed.insert(0, test_id)
+            if detail:
+                self.lines.insert(0, _clip(detail))
+
+    def summary_text(self) -> str:
+        """Summary line plus the first failure details, for the Codex suggestion."""
+        return "\n".join([*self.lines[-1:], *self.lines[:-1][:MAX_SUMMARY_LINES]])
+
+    def to_state(self) -> dict:
+        return {
+            "framework": self.framework,
+            "counts": self.counts,
+            "failed": self.failed,
+            "duration": self.duration,
+        }
+
+
+class TailParser(ABC):
+    """Base class: receives output lines last-to-first via feed()."""
+
+    framework = ""
+
+    def __init__(self, exit_code: int | None = None) -> None:
+        self.report = RunReport(self.framework)
+        self.exit_code = exit_code
+
+    @abstractmethod
+    def feed(self, line: str) -> bool:
+        """Consume one line (tail first). Returns True once nothing more is needed."""
+
+    def _enough_failures(self) -> bool:
+        report = self.report
+        return len(report.failed) >= min(report.failed_count, MAX_FAILED_IDS)
+
+    def _found_summary(self, line: str) -> None:
+        self.report.summary_found = True
+        self.report.lines.append(_clip(line))
+
+
+class PytestParser(TailParser):
+    """`=== 1 failed, 2 passed in 0.12s ===` plus the short test summary section."""
+
+    framework = "pytest"
+    SUMMARY = re.compile(r"^=*\s*((?:\d+ \w+(?:, )?)+) in ([\d.]+)s\b")
+    FAILED = re.compile(r"^(?:FAILED|ERROR) (\S+)(?: - (.*))?$")
+    SECTION = re.compile(r"^=+ short test summary info =+$")
+
+    def feed(self, line: str) -> bool:
+        report = self.report
+        if not report.summary_found:
+            match = self.SUMMARY.match(line)
+            if match:
+                _add_counts(report.counts, match.group(1))
+                report.duration = float(match.group(2))
+                self._found_summary(line)
+                return report.failed_count == 0
+            return False
+        match = self.FAILED.match(line)
+        if match:
+            report.add_failed(match.group(1), line)
+            return self._enough_failures()
+        return bool(self.SECTION.match(line)) or self._enough_failures()
+
+
+class JestParser(TailParser):
+    """jest (`Tests: 1 failed, 5 passed, 6 total`) and vitest (`Tests  1 failed | 5 passed`)."""
+
+    framework = "jest"
+    TESTS = re.compile(r"^\s*Tests:?\s+(.*\d.*)$")
+    TIME = re.compile(r"^\s*(?:Time|Duration):?\s+([\d.]+)\s*(ms|s)\b")
+    # jest: `● suite › test`; vitest: `× suite > test` / `FAIL  file > suite > test`
+    # (a bare `FAIL path` line names a test file, not a test)
+    FAILED = re.compile(r"^\s*(?:[●×✕]|FAIL(?=\s+\S.* > ))\s+(.+?)\s*$")
+    SECTION = re.compile(r"^\s*Summary of all failing tests")
+
+    def feed(self, line: str) -> bool:
+        report = self.report
+        if not report.summary_found:
+            match = self.TIME.match(line)
+            if match:
+                value = float(match.group(1))
+                report.duration = value / 1000 if match.group(2) == "ms" else value
+                return False
+            match = self.TESTS.match(line)
+            if match:
+                _add_counts(report.counts, match.group(1))
+                report.counts.pop("total", None)
+                self._found_summary(line)
+                return report.failed_count == 0
+            return False
+        match = self.FAILED.match(line)
+        if match and "Test suite failed to run" not in line:
+            report.add_failed(match.group(1), line)
+            return self._enough_failures()
+        return bool(self.SECTION.match(line)) or self._enough_failures()
+
+
+class GoTestParser(TailParser):
+    """`--- FAIL: TestX (0.00s)` and per-package `ok`/`FAIL` lines.
+
+    go test has no global summary, so after a failed run the parser keeps reading
+    back (within the scan limit) until it has collected MAX_FAILED_IDS failures.
+    After a successful run (exit code 0) the last package line is enough.
+    """
+
+    framework = "go"
+    TEST = re.compile(r"^\s*--- (FAIL|PASS|SKIP): (\S+) \(([\d.]+)s\)")
+    PACKAGE = re.compile(r"^(ok|FAIL)\s+(\S+)\s+([\d.]+)s")
+    LABELS = {"FAIL": "failed", "PASS": "passed", "SKIP": "skipped"}
+
+    def feed(self, line: str) -> bool:
+        report = self.report
+        match = self.PACKAGE.match(line)
+        if match:
+            if not report.summary_found:
+                self._found_summary(line)
+            key = "packages_failed" if match.group(1) == "FAIL" else "packages_passed"
+            report.counts[key] = report.counts.get(key, 0) + 1
+            report.duration = (report.duration or 0.0) + float(match.group(3))
+            return self.exit_code == 0
+        match = self.TEST.match(line)
+        if match:
+            label = self.LABELS[match.group(1)]
+            report.counts[label] = report.counts.get(label, 0) + 1
+            if label == "failed":
+                report.add_failed(match.group(2), line)
+                return len(report.failed) >= MAX_FAILED_IDS
+        return False
+
+
+class CargoTestParser(TailParser):
+    """`test result: FAILED. 1 passed; 1 failed; ...` plus the `failures:` name list.
+
+    Counts come from the last test binary's result line (cargo stops at the
+    first failing binary, so that is the one that failed).
+    """
+
+    framework = "cargo"
+    RESULT = re.compile(
+        r"^test result: (?:ok|FAILED)\. (\d+) passed; (\d+) failed; (\d+) ignored;"
+        r".*?(?:finished in ([\d.]+)s)?$"
+    )
+    FAILURE_NAME = re.compile(r"^    (\S+)$")
+    FAILED_LINE = re.compile(r"^test (\S+) \.\.\. FAILED$")
+
+    def feed(self, line: str) -> bool:
+        report = self.report
+        if not report.summary_found:
+            match = self.RESULT.match(line)
+            if match:
+                passed, failed, ignored, duration = match.groups()
+                report.counts = {"passed": int(passed), "failed": int(failed)}
+                if int(ignored):
+                    report.counts["skipped"] = int(ignored)
+                report.duration = float(duration) if duration else None
+                self._found_summary(line)
+                return int(failed) == 0
+            return False
+        match = self.FAILURE_NAME.match(line) or self.FAILED_LINE.match(line)
+        if match:
+            report.add_failed(match.group(1), line)
+            return self._enough_failures()
+        return line == "failures:" or self._enough_failures()
+
+
+PARSERS: list[tuple[re.Pattern[str], type[TailParser]]] = [
+    (re.compile(r"\bpytest\b"), PytestParser),
+    (re.compile(r"\b(?:jest|vitest)\b|\b(?:npm|pnpm|yarn)\s+(?:run\s+)?test\b"), JestParser),
+    (re.compile(r"\bgo\s+test\b"), GoTestParser),
+    (re.compile(r"\bcargo\s+test\b"), CargoTestParser),
+]
+
+
+def parse_test_output(command: str, output: str, exit_code: int | None = None) -> RunReport | None:
+    """Parse the tail of a test run's output with the parser(s) for the command.
+
+    Commands that name no known framework (make test, poe test, ...) are fed to
+    every parser and the first one that finds a summary wins. Returns None when
+    no summary is found within TAIL_SCAN_CHARS.
+    """
+    command_lower = command.lower()
+    classes = [cls for pattern, cls in PARSERS if pattern.search(command_lower)]
+    active = [cls(exit_code) for cls in classes or [cls for _, cls in PARSERS]]
+    scanned = 0
+    for line in iter_lines_reverse(output):
+        scanned += len(line) + 1
+        for parser in active:
+            if parser.feed(line):
+                parser.report.scanned_chars = scanned
+                return parser.report
+        if len(active) > 1:
+            found = [parser for parser in active if parser.report.summary_found]
+            if found:
+                active = found[:1]
+
+    for parser in active:
+        if parser.report.summary_found:
+            parser.report.scanned_chars = scanned
+            return parser.report
+    return None
+
+
+def load_test_gate_state(project_dir: str, session_id: str) -> dict:
+    """Load the session's test-gate state from the state store."""
     try:
-        TEST_GATE_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(TEST_GATE_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-    except OSError:
-        pass
+        state = open_store(project_dir).get(session_namespace(session_id), TEST_GATE_STATE_KEY)
+    except STATE_ERRORS:
+        state = None
+    return state if isinstance(state, dict) else copy.deepcopy(DEFAULT_TEST_GATE_STATE)
 
 
-def record_test_result(command: str, passed: bool) -> None:
-    """Record test result to the shared state file.
+def record_test_result(
+    project_dir: str,
+    session_id: str,
+    command: str,
+    passed: bool,
+    report: RunReport | None = None,
+) -> None:
+    """Record test result to the session's test-gate state.
 
     On success: reset change counters and warned flag.
     On failure: keep counters (changes are not yet validated).
+    A parsed report adds framework, counts, failed test ids and duration.
     """
-    state = load_test_gate_state()
-    state["last_test_result"] = {
-        "timestamp": datetime.now(UTC).isoformat(),
-        "passed": passed,
-        "command": command,
-    }
-    if passed:
-        state["files_modified_since_test"] = []
-        state["lines_modified_since_test"] = 0
-        state["warned"] = False
-    save_test_gate_state(state)
+
+    def apply_result(state: dict) -> dict:
+        state["last_test_result"] = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "passed": passed,
+            "command": command,
+            **(report.to_state() if report else {}),
+        }
+        if passed:
+            state["files_modified_since_test"] = []
+            state["lines_modified_since_test"] = 0
+            state["warned"] = False
+        return state
+
+    try:
+        open_store(project_dir).update(
+            session_namespace(session_id),
+            TEST_GATE_STATE_KEY,
+            apply_result,
+            default=DEFAULT_TEST_GATE_STATE,
+            ttl=SESSION_TTL,
+        )
+    except STATE_ERRORS:
+        pass
 
 
 def _build_codex_command(data: dict) -> str:
@@ -147,13 +453,15 @@ def _build_codex_command(data: dict) -> str:
 
 def main():
     try:
-        data = json.load(sys.stdin)
-        tool_name = data.get("tool_name", "")
+        hook_input = peek_hook_input()
+        tool_name = hook_input.get("tool_name", "")
 
         # Only process Bash tool calls
         if tool_name != "Bash":
             sys.exit(0)
 
+        data = hook_input.data
+
         tool_input = data.get("tool_input", {})
         tool_response = data.get("tool_response", {})
 
@@ -166,16 +474,24 @@ def main():
         exit_code = tool_response.get("exit_code", 0)
         output = tool_response.get("stdout", "") or tool_response.get("content", "")
 
-        passed = not is_test_failure(exit_code, output)
+        report = parse_test_output(command, output, exit_code)
+        if report is not None:
+            passed = exit_code == 0 and report.failed_count == 0
+        else:
+            passed = not is_test_failure(exit_code, output)
 
         # Record test result to shared state (success resets counters)
-        record_test_result(command, passed)
+        project_dir = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "") or os.getcwd()
+        record_test_result(project_dir, data.get("session_id", ""), command, passed, report)
 
         # If tests passed, no further action needed
         if passed:
             sys.exit(0)
 
-        failure_summary = extract_failure_summary(output)
+        if report is not None:
+            failure_summary = report.summary_text()
+        else:
+            failure_summary = extract_failure_summary(output)
         codex_cmd = _build_codex_command(data)
 
         output_data = {
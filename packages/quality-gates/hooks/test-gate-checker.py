@@ -2,16 +2,18 @@
 """
 PostToolUse hook: Suggest running tests after significant code changes.
 
-Tracks file edits across the session via a shared state file and suggests
+Tracks file edits across the session via the shared state store and suggests
 test execution when the number of modified files or lines exceeds thresholds.
 
-The shared state file (/tmp/claude-test-gate-state.json) is also written by
+The test-gate state (session namespace, key "test-gate") is also updated by
 post-test-analysis.py, which resets counters on successful test runs.
 """
 
+import copy
 import json
 import os
 import sys
+from collections.abc import Callable
 from pathlib import Path
 
 # hook_common を $AI_ORCHESTRA_DIR/packages/core/hooks/ から読み込む
@@ -20,11 +22,28 @@ if _orchestra_dir:
     _core_hooks = os.path.join(_orchestra_dir, "packages", "core", "hooks")
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
-
-from hook_common import load_package_config  # noqa: E402
-
-# Shared state file with post-test-analysis.py
-TEST_GATE_STATE_FILE = Path("/tmp/claude-test-gate-state.json")
+else:
+    _fallback_core_hooks = Path(__file__).resolve().parents[2] / "core" / "hooks"
+    if str(_fallback_core_hooks) not in sys.path:
+        sys.path.insert(0, str(_fallback_core_hooks))
+
+from hook_common import load_package_config, peek_hook_input  # noqa: E402
+from state_store import (  # noqa: E402
+    SESSION_TTL,
+    STATE_ERRORS,
+    open_store,
+    session_namespace,
+)
+
+# State key shared with post-test-analysis.py (session namespace)
+TEST_GATE_STATE_KEY = "test-gate"
+
+DEFAULT_TEST_GATE_STATE = {
+    "files_modified_since_test": [],
+    "lines_modified_since_test": 0,
+    "last_test_result": None,
+    "warned": False,
+}
 
 # Code file extensions to track
 CODE_EXTENSIONS = {".py", ".js", ".ts", ".tsx", ".jsx", ".go", ".rs", ".java"}
@@ -34,30 +53,29 @@ DEFAULT_FILE_THRESHOLD = 3
 DEFAULT_LINE_THRESHOLD = 100
 
 
-def load_test_gate_state() -> dict:
-    """Load the shared test-gate state from file."""
+def load_test_gate_state(project_dir: str, session_id: str) -> dict:
+    """Load the session's test-gate state from the state store."""
     try:
-        if TEST_GATE_STATE_FILE.exists():
-            with open(TEST_GATE_STATE_FILE, encoding="utf-8") as f:
-                return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        pass
-    return {
-        "files_modified_since_test": [],
-        "lines_modified_since_test": 0,
-        "last_test_result": None,
-        "warned": False,
-    }
-
-
-def save_test_gate_state(state: dict) -> None:
-    """Save the shared test-gate state to file."""
+        state = open_store(project_dir).get(session_namespace(session_id), TEST_GATE_STATE_KEY)
+    except STATE_ERRORS:
+        state = None
+    return state if isinstance(state, dict) else copy.deepcopy(DEFAULT_TEST_GATE_STATE)
+
+
+def update_test_gate_state(
+    project_dir: str, session_id: str, fn: Callable[[dict], dict]
+) -> dict | None:
+    """Atomically apply fn to the session's test-gate state (None if the store fails)."""
     try:
-        TEST_GATE_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(TEST_GATE_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-    except OSError:
-        pass
+        return open_store(project_dir).update(
+            session_namespace(session_id),
+            TEST_GATE_STATE_KEY,
+            fn,
+            default=DEFAULT_TEST_GATE_STATE,
+            ttl=SESSION_TTL,
+        )
+    except STATE_ERRORS:
+        return None
 
 
 def is_code_file(file_path: str) -> bool:
@@ -105,13 +123,15 @@ def build_warning_message(file_count: int, line_count: int, has_test_history: bo
 
 def main() -> None:
     try:
-        data = json.load(sys.stdin)
-        tool_name = data.get("tool_name", "")
+        hook_input = peek_hook_input()
+        tool_name = hook_input.get("tool_name", "")
 
         # Only process Edit/Write tool calls
         if tool_name not in ("Edit", "Write"):
             sys.exit(0)
 
+        data = hook_input.data
+
         tool_input = data.get("tool_input", {})
         file_path = tool_input.get("file_path", "")
 
@@ -120,40 +140,43 @@ def main() -> None:
             sys.exit(0)
 
         # Check if quality gate is enabled
-        project_dir = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "")
+        project_dir = data.get("cwd", "") or os.environ.get("CLAUDE_PROJECT_DIR", "") or os.getcwd()
         if not is_quality_gate_enabled(project_dir):
             sys.exit(0)
 
         # Calculate lines changed
         content = tool_input.get("content", "") or tool_input.get("new_string", "")
         lines_changed = count_lines(content)
-
-        # Update state
-        state = load_test_gate_state()
-        modified_files = state.get("files_modified_since_test", [])
-        if file_path not in modified_files:
-            modified_files.append(file_path)
-        state["files_modified_since_test"] = modified_files
-        state["lines_modified_since_test"] = (
-            state.get("lines_modified_since_test", 0) + lines_changed
-        )
-
-        # Check thresholds
         file_threshold, line_threshold = load_thresholds(project_dir)
-        file_count = len(modified_files)
-        line_count = state["lines_modified_since_test"]
-        already_warned = state.get("warned", False)
-
-        should_warn = not already_warned and (
-            file_count >= file_threshold or line_count >= line_threshold
-        )
-
-        if should_warn:
-            state["warned"] = True
-            save_test_gate_state(state)
-
+        should_warn = False
+
+        def apply_edit(state: dict) -> dict:
+            nonlocal should_warn
+            modified_files = state.get("files_modified_since_test", [])
+            if file_path not in modified_files:
+                modified_files.append(file_path)
+            state["files_modified_since_test"] = modified_files
+            state["lines_modified_since_test"] = (
+                state.get("lines_modified_since_test", 0) + lines_changed
+            )
+            should_warn = not state.get("warned", False) and (
+                len(modified_files) >= file_threshold
+                or state["lines_modified_since_test"] >= line_threshold
+            )
+            if should_warn:
+                state["warned"] = True
+            return state
+
+        # Update state (read-modify-write in one transaction)
+        state = update_test_gate_state(project_dir, data.get("session_id", ""), apply_edit)
+
+        if state is not None and should_warn:
             has_test_history = state.get("last_test_result") is not None
-            message = build_warning_message(file_count, line_count, has_test_history)
+            message = build_warning_message(
+                len(state["files_modified_since_test"]),
+                state["lines_modified_since_test"],
+                has_test_history,
+            )
 
             output = {
                 "hookSpecificOutput": {
@@ -162,8 +185,6 @@ def main() -> None:
                 }
             }
             print(json.dumps(output))
-        else:
-            save_test_gate_state(state)
 
         sys.exit(0)
 
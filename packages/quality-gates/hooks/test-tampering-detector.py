@@ -12,10 +12,11 @@ import json
 import os
 import re
 import shlex
-import subprocess
 import sys
+from collections import Counter
 from fnmatch import fnmatchcase
 from pathlib import Path
+from typing import NamedTuple
 
 _orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
 if _orchestra_dir:
@@ -27,7 +28,9 @@ else:
     if str(_fallback_core_hooks) not in sys.path:
         sys.path.insert(0, str(_fallback_core_hooks))
 
-from hook_common import read_hook_input, safe_hook_execution  # noqa: E402
+from git_query import repo_for  # noqa: E402
+from hook_common import peek_hook_input, safe_hook_execution  # noqa: E402
+from state_store import PROJECT, STATE_ERRORS, open_store  # noqa: E402
 
 SKIP_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
     (
@@ -48,7 +51,12 @@ SUPPRESSION_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
 
 DELETE_COMMAND_PATTERN = re.compile(r"\b(?:rm|git\s+rm)\b")
 RELEVANT_TOOL_NAMES = {"Edit", "Write", "Bash", "Delete", "MultiEdit"}
-STATE_FILE = Path("/tmp/claude-test-tampering-state.json")
+
+# Already-reported findings are kept in the project state store for this long
+REPORTED_STATE_TTL = 30 * 24 * 3600
+
+# State key prefix of the tracked test file index (suffixed with the git dir)
+TEST_INDEX_KEY = "test-tampering:index"
 
 
 def is_test_file(file_path: str) -> bool:
@@ -74,6 +82,71 @@ def extract_added_lines(diff_text: str) -> list[str]:
     return added_lines
 
 
+def diff_added_lines(old_text: str, new_text: str) -> list[str]:
+    """Return lines of new_text that are not in old_text (multiset difference, O(n)).
+
+    Line order is ignored: moved lines are not reported, but a repeated line (e.g. a
+    second `@pytest.mark.skip`) is, since its count grows.
+    """
+    old_lines = old_text.splitlines()
+    new_lines = new_text.splitlines()
+    # Skip the unchanged head and tail so a small edit in a large file stays cheap
+    start = 0
+    limit = min(len(old_lines), len(new_lines))
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old_lines[-1 - end] == new_lines[-1 - end]:
+        end += 1
+
+    remaining = Counter(old_lines[start : len(old_lines) - end])
+    added_lines: list[str] = []
+    for line in new_lines[start : len(new_lines) - end]:
+        if remaining[line] > 0:
+            remaining[line] -= 1
+        else:
+            added_lines.append(line)
+    return added_lines
+
+
+def added_lines_from_payload(
+    tool_name: str, tool_input: dict, tool_response: object = None
+) -> list[str] | None:
+    """Compute the lines added by an Edit/MultiEdit/Write from the hook payload.
+
+    Returns None when the payload does not carry the previous content (a Write over an
+    existing file without `originalFile` in the tool response); the caller then falls
+    back to git.
+    """
+    pairs: list[tuple[object, object]]
+    if tool_name == "Edit":
+        pairs = [(tool_input.get("old_string"), tool_input.get("new_string"))]
+    elif tool_name == "MultiEdit":
+        edits = tool_input.get("edits")
+        if not isinstance(edits, list):
+            return None
+        pairs = [
+            (edit.get("old_string"), edit.get("new_string"))
+            for edit in edits
+            if isinstance(edit, dict)
+        ]
+    elif tool_name == "Write":
+        response = tool_response if isinstance(tool_response, dict) else {}
+        original = response.get("originalFile")
+        if original is None and response.get("type") == "create":
+            original = ""
+        pairs = [(original, tool_input.get("content"))]
+    else:
+        return None
+
+    added_lines: list[str] = []
+    for old_text, new_text in pairs:
+        if not isinstance(old_text, str) or not isinstance(new_text, str):
+            return None
+        added_lines.extend(diff_added_lines(old_text, new_text))
+    return added_lines
+
+
 def scan_added_lines(file_path: str, added_lines: list[str]) -> list[dict[str, str]]:
     """Scan added lines for test tampering patterns."""
     findings: list[dict[str, str]] = []
@@ -116,79 +189,16 @@ def _pattern_finding_key(finding: dict[str, str]) -> str:
     )
 
 
-def extract_deleted_test_files(name_status_output: str) -> list[str]:
-    """Extract deleted test files from `git diff --name-status` output."""
-    deleted_files: list[str] = []
-
-    for line in name_status_output.splitlines():
-        if not line:
-            continue
-        parts = line.split("\t", maxsplit=1)
-        if len(parts) != 2:
-            continue
-        status, file_path = parts
-        if not status.startswith("D"):
-            continue
-        if is_test_file(file_path):
-            deleted_files.append(file_path)
-
-    return sorted(set(deleted_files))
-
-
-def load_state() -> dict:
-    """Load persisted detector state."""
-    try:
-        if STATE_FILE.exists():
-            with open(STATE_FILE, encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                return data
-    except (OSError, ValueError, json.JSONDecodeError):
-        pass
-    return {"reported_deleted_files": {}}
-
-
-def save_state(state: dict) -> None:
-    """Persist detector state."""
-    try:
-        STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-    except OSError:
-        pass
-
-
 def run_git_command(project_dir: str, *args: str) -> str:
-    """Run a git command and return stdout on success."""
-    try:
-        result = subprocess.run(
-            ["git", *args],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            cwd=project_dir,
-        )
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
-        return ""
-
-    if result.returncode != 0:
-        return ""
-    return result.stdout
+    """Run a git command through the shared (memoized) git query layer."""
+    return repo_for(project_dir, persist=True).run(*args) or ""
 
 
 def get_project_state_key(project_dir: str) -> str:
     """Return a stable state key for the current git project."""
-    common_dir = run_git_command(project_dir, "rev-parse", "--git-common-dir").strip()
-    if common_dir:
-        common_path = Path(common_dir)
-        if not common_path.is_absolute():
-            common_path = (Path(project_dir) / common_path).resolve()
-        return str(common_path)
-
-    top_level = run_git_command(project_dir, "rev-parse", "--show-toplevel").strip()
-    if top_level:
-        return str(Path(top_level).resolve())
-
+    repo = repo_for(project_dir, persist=True)
+    if repo.common_dir:
+        return repo.common_dir
     return str(Path(project_dir).resolve())
 
 
@@ -214,16 +224,30 @@ def is_tracked_file(project_dir: str, file_path: str) -> bool:
     return bool(run_git_command(project_dir, "ls-files", "--error-unmatch", "--", file_path))
 
 
-def get_added_lines_for_file(project_dir: str, file_path: str, tool_input: dict) -> list[str]:
-    """Get added lines for a file using git diff, with tool_input fallback for new files."""
+def get_added_lines_for_file(
+    project_dir: str,
+    file_path: str,
+    tool_input: dict,
+    tool_name: str = "",
+    tool_response: object = None,
+) -> list[str]:
+    """Get lines added by the edit: from the payload when possible, else via git diff."""
+    if not file_path:
+        return []
+    added_lines = added_lines_from_payload(tool_name, tool_input, tool_response)
+    if added_lines is not None:
+        return added_lines
+
     normalized_path = normalize_path(file_path, project_dir)
     if not normalized_path:
         return []
 
-    diff_text = run_git_command(
-        project_dir, "diff", "--no-color", "--no-ext-diff", "--unified=0", "--", normalized_path
-    )
-    added_lines = extract_added_lines(diff_text)
+    # The diff and the tracked check are independent: start both at once
+    diff_args = ("diff", "--no-color", "--no-ext-diff", "--unified=0", "--", normalized_path)
+    tracked_args = ("ls-files", "--error-unmatch", "--", normalized_path)
+    repo_for(project_dir, persist=True).run_many(diff_args, tracked_args)
+
+    added_lines = extract_added_lines(run_git_command(project_dir, *diff_args))
     if added_lines:
         return added_lines
 
@@ -367,65 +391,111 @@ def _matches_delete_target(file_path: str, delete_targets: list[str]) -> bool:
     return False
 
 
-def get_all_deleted_test_files(project_dir: str) -> list[str]:
-    """Return all currently deleted tracked test files in the repo diff."""
-    deleted_files: set[str] = set()
-    for extra_args in ([], ["--cached"]):
-        output = run_git_command(
-            project_dir, "diff", *extra_args, "--name-status", "--diff-filter=D"
+class TrackedTestIndex(NamedTuple):
+    """Test files tracked in the index or HEAD (paths relative to the git toplevel)."""
+
+    toplevel: str
+    files: frozenset[str]
+
+    def is_deleted(self, file_path: str) -> bool:
+        """Return True when a tracked test file is missing from the working tree."""
+        return file_path in self.files and not os.path.lexists(
+            os.path.join(self.toplevel, file_path)
         )
-        deleted_files.update(extract_deleted_test_files(output))
-    return sorted(deleted_files)
 
 
-def _build_delete_pathspec(target: str) -> str:
-    if any(char in target for char in "*?[]"):
-        return f":(glob){target}"
-    return target
+def load_tracked_test_index(project_dir: str) -> TrackedTestIndex | None:
+    """Return the tracked test file index, rebuilt only when the git index changes.
+
+    The index is cached in the project state store keyed by the mtime of the git
+    index file, so a delete check normally starts no git process at all.
+    """
+    repo = repo_for(project_dir, persist=True)
+    facts = repo.facts
+    if facts is None:
+        return None
+    index_mtime_ns = repo.index_mtime_ns()
+    key = f"{TEST_INDEX_KEY}:{facts.git_dir}"
+
+    try:
+        store = open_store(project_dir)
+        cached = store.get(PROJECT, key)
+    except STATE_ERRORS:
+        store, cached = None, None
+    if (
+        index_mtime_ns is not None
+        and isinstance(cached, dict)
+        and cached.get("index_mtime_ns") == index_mtime_ns
+    ):
+        return TrackedTestIndex(facts.toplevel, frozenset(cached.get("files", [])))
+
+    tracked = repo.tracked_paths()
+    if tracked is None:
+        return None
+    files = sorted(file_path for file_path in tracked if is_test_file(file_path))
+    if store is not None and index_mtime_ns is not None:
+        try:
+            store.put(
+                PROJECT,
+                key,
+                {"index_mtime_ns": index_mtime_ns, "files": files},
+                ttl=REPORTED_STATE_TTL,
+            )
+        except STATE_ERRORS:
+            pass
+    return TrackedTestIndex(facts.toplevel, frozenset(files))
+
+
+def get_all_deleted_test_files(project_dir: str) -> list[str]:
+    """Return all currently deleted (staged or unstaged) tracked test files."""
+    index = load_tracked_test_index(project_dir)
+    if index is None:
+        return []
+    return sorted(file_path for file_path in index.files if index.is_deleted(file_path))
 
 
-def get_deleted_test_files(project_dir: str, delete_targets: list[str]) -> list[str]:
+def get_deleted_test_files(
+    project_dir: str, delete_targets: list[str], index: TrackedTestIndex | None = None
+) -> list[str]:
     """Return deleted tracked test files tied to the current delete targets."""
     if not delete_targets:
         return []
+    if index is None:
+        index = load_tracked_test_index(project_dir)
+        if index is None:
+            return []
+
+    return sorted(
+        file_path
+        for file_path in index.files
+        if _matches_delete_target(file_path, delete_targets) and index.is_deleted(file_path)
+    )
 
-    deleted_files: set[str] = set()
-    pathspecs = [_build_delete_pathspec(target) for target in delete_targets]
-    for extra_args in ([], ["--cached"]):
-        output = run_git_command(
-            project_dir,
-            "diff",
-            *extra_args,
-            "--name-status",
-            "--diff-filter=D",
-            "--",
-            *pathspecs,
-        )
-        for file_path in extract_deleted_test_files(output):
-            if _matches_delete_target(file_path, delete_targets):
-                deleted_files.add(file_path)
-    return sorted(deleted_files)
+
+def _update_reported(project_dir: str, kind: str, fn) -> None:
+    """Atomically update the reported set of `kind` for the current git project."""
+    key = f"test-tampering:{kind}:{get_project_state_key(project_dir)}"
+    open_store(project_dir).update(PROJECT, key, fn, default=[], ttl=REPORTED_STATE_TTL)
 
 
 def get_unreported_deleted_test_files(project_dir: str, delete_targets: list[str]) -> list[str]:
     """Return matched deleted test files that have not been warned yet."""
-    state = load_state()
-    reported_by_project = state.get("reported_deleted_files", {})
-    project_key = get_project_state_key(project_dir)
-    current_deleted = set(get_all_deleted_test_files(project_dir))
-    reported = set(reported_by_project.get(project_key, []))
-
-    reported &= current_deleted
-    reported_by_project[project_key] = sorted(reported)
-    state["reported_deleted_files"] = reported_by_project
-
-    matched_deleted = get_deleted_test_files(project_dir, delete_targets)
-    new_deleted = [file_path for file_path in matched_deleted if file_path not in reported]
-    if new_deleted:
-        reported_by_project[project_key] = sorted(reported.union(new_deleted))
-        state["reported_deleted_files"] = reported_by_project
-    save_state(state)
+    index = load_tracked_test_index(project_dir)
+    if index is None:
+        return []
+    matched_deleted = get_deleted_test_files(project_dir, delete_targets, index)
+    new_deleted: list[str] = []
 
+    def mark_reported(reported_files: list[str]) -> list[str]:
+        # Files restored since the last warning are forgotten so a re-delete warns again
+        reported = {file_path for file_path in reported_files if index.is_deleted(file_path)}
+        new_deleted[:] = [file_path for file_path in matched_deleted if file_path not in reported]
+        return sorted(reported.union(new_deleted))
+
+    try:
+        _update_reported(project_dir, "deleted", mark_reported)
+    except STATE_ERRORS:
+        return matched_deleted
     return new_deleted
 
 
@@ -433,20 +503,22 @@ def get_unreported_pattern_findings(
     project_dir: str, pattern_findings: list[dict[str, str]]
 ) -> list[dict[str, str]]:
     """Return pattern findings that have not been warned yet in this project."""
-    state = load_state()
-    project_key = get_project_state_key(project_dir)
-    reported_by_project = state.get("reported_pattern_findings", {})
-    reported = set(reported_by_project.get(project_key, []))
-
-    new_findings = [
-        finding for finding in pattern_findings if _pattern_finding_key(finding) not in reported
-    ]
-    if new_findings:
+    new_findings: list[dict[str, str]] = []
+
+    def mark_reported(reported_keys: list[str]) -> list[str]:
+        reported = set(reported_keys)
+        new_findings[:] = [
+            finding for finding in pattern_findings if _pattern_finding_key(finding) not in reported
+        ]
         reported.update(_pattern_finding_key(finding) for finding in new_findings)
-        reported_by_project[project_key] = sorted(reported)
-        state["reported_pattern_findings"] = reported_by_project
-        save_state(state)
+        return sorted(reported)
 
+    if not pattern_findings:
+        return []
+    try:
+        _update_reported(project_dir, "patterns", mark_reported)
+    except STATE_ERRORS:
+        return pattern_findings
     return new_findings
 
 
@@ -465,7 +537,9 @@ def collect_tampering_findings(data: dict) -> list[dict[str, str]]:
 
     if tool_name in {"Edit", "Write", "MultiEdit"}:
         file_path = str(tool_input.get("file_path") or "")
-        added_lines = get_added_lines_for_file(project_dir, file_path, tool_input)
+        added_lines = get_added_lines_for_file(
+            project_dir, file_path, tool_input, tool_name, data.get("tool_response")
+        )
         pattern_findings = scan_added_lines(file_path, added_lines)
         findings.extend(get_unreported_pattern_findings(project_dir, pattern_findings))
 
@@ -507,8 +581,12 @@ def build_warning_message(findings: list[dict[str, str]]) -> str:
 @safe_hook_execution
 def main() -> None:
     """Entry point for the test tampering detector hook."""
-    data = read_hook_input()
-    findings = collect_tampering_findings(data)
+    hook_input = peek_hook_input()
+    # Skip unrelated tools before decoding their (possibly large) output
+    if hook_input.get("tool_name") not in RELEVANT_TOOL_NAMES:
+        sys.exit(0)
+
+    findings = collect_tampering_findings(hook_input.data)
     if not findings:
         sys.exit(0)
 
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
 import os
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
 
-from tests.module_loader import load_module
+from tests.module_loader import REPO_ROOT, load_module
 
 check_context_optimization = load_module(
     "check_context_optimization",
     "packages/quality-gates/hooks/check-context-optimization.py",
 )
 
+from state_store import close_stores  # noqa: E402
+
 
 def _settings(**overrides) -> dict:
     base = {"enabled": True, "read_line_threshold": 200, "max_file_size_bytes": 5_242_880}
@@ -117,6 +121,111 @@ def test_check_read_skipped_for_non_regular_file(tmp_path: Path) -> None:
     assert msg == ""
 
 
+@pytest.mark.parametrize("content", [b"", b"a", b"a\n", b"a\nb", b"a\n\nb\n", b"\n" * 3])
+def test_count_newlines_matches_line_iteration(tmp_path: Path, content: bytes) -> None:
+    target = tmp_path / "f.txt"
+    target.write_bytes(content)
+    with open(target, "rb") as f:
+        expected = sum(1 for _ in f)
+    assert check_context_optimization._count_newlines(str(target)) == (expected, True)
+
+
+def test_count_newlines_stops_after_threshold(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(check_context_optimization, "COUNT_CHUNK_BYTES", 16)
+    target = tmp_path / "f.txt"
+    target.write_bytes(b"1\n" * 100)
+
+    assert check_context_optimization._count_newlines(str(target), stop_after=10) == (16, False)
+
+
+def test_check_read_reports_lower_bound_when_counting_stops_early(
+    tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr(check_context_optimization, "COUNT_CHUNK_BYTES", 1024)
+    target = tmp_path / "large.txt"
+    target.write_text("\n".join(str(i) for i in range(5000)))
+    msg = check_context_optimization.check_read({"file_path": str(target)}, _settings())
+    assert "行以上のファイル" in msg
+
+
+def test_count_lines_cache_is_keyed_by_file_identity(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(check_context_optimization, "LINE_CACHE_MIN_BYTES", 0)
+    count_newlines = check_context_optimization._count_newlines
+    calls: list[str] = []
+
+    def counting(path: str, stop_after: int | None = None) -> tuple[int, bool]:
+        calls.append(path)
+        return count_newlines(path, stop_after)
+
+    monkeypatch.setattr(check_context_optimization, "_count_newlines", counting)
+    target = tmp_path / "src.txt"
+    target.write_text("a\nb\n")
+    try:
+        first = check_context_optimization._count_lines(
+            str(target), 1000, project_dir=str(tmp_path)
+        )
+        second = check_context_optimization._count_lines(
+            str(target), 1000, project_dir=str(tmp_path)
+        )
+        target.write_text("a\nb\nc\n")
+        third = check_context_optimization._count_lines(
+            str(target), 1000, project_dir=str(tmp_path)
+        )
+    finally:
+        close_stores()
+
+    assert first == second == (2, True)
+    assert third == (3, True)
+    assert len(calls) == 2
+
+
+def test_state_store_is_not_imported_without_cache_use(tmp_path: Path) -> None:
+    """Grep / Bash と小さいファイルの Read では状態ストア（sqlite3）を読み込まない。"""
+    target = tmp_path / "small.txt"
+    target.write_text("a\n")
+    code = (
+        "import sys\n"
+        "from tests.module_loader import load_module\n"
+        "m = load_module('cco', 'packages/quality-gates/hooks/check-context-optimization.py')\n"
+        "settings = {'enabled': True}\n"
+        f"m.check_read({{'file_path': {str(target)!r}}}, settings, {str(tmp_path)!r})\n"
+        "m.check_grep({'pattern': 'x', 'output_mode': 'content'}, settings, '')\n"
+        "m.check_bash({'command': 'cat a.txt'}, settings, '')\n"
+        "print('state_store' in sys.modules, 'sqlite3' in sys.modules)\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+
+    assert result.stdout.strip() == "False False"
+
+
+def test_count_lines_cached_lower_bound_is_recounted_for_higher_threshold(
+    tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr(check_context_optimization, "LINE_CACHE_MIN_BYTES", 0)
+    monkeypatch.setattr(check_context_optimization, "COUNT_CHUNK_BYTES", 16)
+    target = tmp_path / "src.txt"
+    target.write_bytes(b"1\n" * 100)
+    try:
+        partial = check_context_optimization._count_lines(
+            str(target), 10_000, stop_after=10, project_dir=str(tmp_path)
+        )
+        full = check_context_optimization._count_lines(
+            str(target), 10_000, stop_after=500, project_dir=str(tmp_path)
+        )
+    finally:
+        close_stores()
+
+    assert partial == (16, False)
+    assert full == (100, True)
+
+
 # ---------------------------------------------------------------------------
 # check_grep
 # ---------------------------------------------------------------------------
@@ -11,6 +11,49 @@ from tests.module_loader import load_module
 
 lint_on_save = load_module("lint_on_save", "packages/quality-gates/hooks/lint-on-save.py")
 
+from state_store import close_stores  # noqa: E402
+
+
+class Result:
+    def __init__(self, returncode: int, stdout: str = "", stderr: str = "") -> None:
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+@pytest.fixture(autouse=True)
+def _sync_mode(monkeypatch) -> None:
+    """パッケージ同梱の config を読まず、DEFAULT_LINT_CONFIG で動かす。"""
+    monkeypatch.delenv("AI_ORCHESTRA_DIR", raising=False)
+
+
+@pytest.fixture()
+def node_project(tmp_path: Path):
+    """prettier を node_modules/.bin に持つ、pnpm のないプロジェクト。"""
+    (tmp_path / "package.json").write_text("{}", encoding="utf-8")
+    bin_dir = tmp_path / "node_modules" / ".bin"
+    bin_dir.mkdir(parents=True)
+    prettier = bin_dir / "prettier"
+    prettier.write_text("#!/bin/sh\n", encoding="utf-8")
+    prettier.chmod(0o755)
+    (tmp_path / "src").mkdir()
+    yield tmp_path
+    close_stores()
+
+
+def _fake_node_run(calls: list[list[str]], available: set[str]):
+    def fake_run(cmd, **kwargs):  # type: ignore[no-untyped-def]
+        calls.append(cmd)
+        if cmd[0] == "pnpm":
+            raise FileNotFoundError
+        if cmd[0] == "npm" and cmd[3] not in available:
+            return Result(1, stderr="npm ERR! could not determine executable to run")
+        if cmd[0] == "npm" or (cmd[0].endswith("/prettier") and Path(cmd[0]).exists()):
+            return Result(0, stdout="")
+        raise FileNotFoundError
+
+    return fake_run
+
 
 @pytest.mark.parametrize(
     ("path", "expected"),
@@ -101,6 +144,25 @@ def test_main_skips_unsupported_files(monkeypatch, capsys: pytest.CaptureFixture
     assert capsys.readouterr().out == ""
 
 
+def test_main_skips_other_tools_before_full_decode(
+    monkeypatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    payload = {"tool_name": "Read", "tool_response": {"content": "x" * 100_000}}
+    monkeypatch.setattr(sys, "stdin", StringIO(json.dumps(payload)))
+
+    def fail(*_args):
+        raise AssertionError("full decode should not happen")
+
+    monkeypatch.setattr(json, "load", fail)
+    monkeypatch.setattr(sys.modules["hook_common"].HookInput, "data", property(fail))
+
+    with pytest.raises(SystemExit) as exc_info:
+        lint_on_save.main()
+
+    assert exc_info.value.code == 0
+    assert capsys.readouterr() == ("", "")
+
+
 def test_main_reports_lint_result(monkeypatch, capsys: pytest.CaptureFixture[str]) -> None:
     payload = {
         "tool_name": "Write",
@@ -110,7 +172,9 @@ def test_main_reports_lint_result(monkeypatch, capsys: pytest.CaptureFixture[str
     monkeypatch.setattr(
         lint_on_save,
         "run_lint_commands",
-        lambda _: [{"name": "ruff format", "success": True, "output": "1 file reformatted"}],
+        lambda _path, **_kwargs: [
+            {"name": "ruff format", "success": True, "output": "1 file reformatted"}
+        ],
     )
 
     with pytest.raises(SystemExit) as exc_info:
@@ -121,3 +185,151 @@ def test_main_reports_lint_result(monkeypatch, capsys: pytest.CaptureFixture[str
     context = output["hookSpecificOutput"]["additionalContext"]
     assert "[Lint OK]" in context
     assert "ruff format: 1 file reformatted" in context
+
+
+def test_runner_cache_uses_resolved_executable_on_next_save(monkeypatch, node_project) -> None:
+    calls: list[list[str]] = []
+    monkeypatch.setattr(lint_on_save.subprocess, "run", _fake_node_run(calls, {"prettier"}))
+    file_path = str(node_project / "src" / "README.md")
+
+    lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+    assert [cmd[0] for cmd in calls] == ["pnpm", "npm"]
+
+    calls.clear()
+    lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+    assert calls == [
+        [str(node_project / "node_modules" / ".bin" / "prettier"), "--write", file_path]
+    ]
+
+
+def test_runner_cache_skips_missing_tools_until_package_json_changes(
+    monkeypatch, node_project
+) -> None:
+    calls: list[list[str]] = []
+    monkeypatch.setattr(lint_on_save.subprocess, "run", _fake_node_run(calls, {"prettier"}))
+    file_path = str(node_project / "src" / "app.ts")
+
+    lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+    calls.clear()
+    lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+    prettier = str(node_project / "node_modules" / ".bin" / "prettier")
+    assert calls == [[prettier, "--write", file_path]]
+
+    (node_project / "package.json").write_text('{"devDependencies": {}}', encoding="utf-8")
+    calls.clear()
+    lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+    assert len(calls) == 12  # biome / eslint は 5 候補すべて、prettier は pnpm → npm
+
+
+def test_runner_cache_re_resolves_when_executable_disappears(monkeypatch, node_project) -> None:
+    calls: list[list[str]] = []
+    monkeypatch.setattr(lint_on_save.subprocess, "run", _fake_node_run(calls, {"prettier"}))
+    file_path = str(node_project / "src" / "README.md")
+    lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+
+    (node_project / "node_modules" / ".bin" / "prettier").unlink()
+    calls.clear()
+    results = lint_on_save.run_lint_commands(file_path, project_dir=str(node_project))
+
+    assert results == [{"name": "prettier", "success": True, "output": ""}]
+    assert [cmd[0] for cmd in calls][-2:] == ["pnpm", "npm"]
+
+
+def test_build_kind_steps_passes_all_paths_to_one_command() -> None:
+    steps = lint_on_save.build_kind_steps("python", ["a.py", "b.py"])
+    assert steps[0]["commands"][-1] == ["ruff", "format", "a.py", "b.py"]
+    assert steps[1]["args"] == ["check", "--fix", "a.py", "b.py"]
+
+
+@pytest.fixture()
+def batch_project(tmp_path: Path, monkeypatch):
+    """batch モードを設定したプロジェクト（ワーカーは起動しない）。"""
+    config_dir = tmp_path / ".claude" / "config" / "quality-gates"
+    config_dir.mkdir(parents=True)
+    (config_dir / "lint-on-save.json").write_text(
+        json.dumps({"mode": "batch", "debounce_seconds": 0}), encoding="utf-8"
+    )
+    jobs: list[list[str]] = []
+    monkeypatch.setattr(
+        lint_on_save, "enqueue", lambda _project_dir, argv, **_kw: jobs.append(argv)
+    )
+    monkeypatch.delenv(lint_on_save.MODE_ENV, raising=False)
+    yield tmp_path, jobs
+    close_stores()
+
+
+def _run_main(monkeypatch, capsys, payload: dict) -> str:
+    monkeypatch.setattr(sys, "stdin", StringIO(json.dumps(payload)))
+    with pytest.raises(SystemExit):
+        lint_on_save.main()
+    return capsys.readouterr().out
+
+
+def test_batch_mode_lints_queued_edits_once_and_reports_on_next_hook(
+    monkeypatch, capsys: pytest.CaptureFixture[str], batch_project
+) -> None:
+    project, jobs = batch_project
+    calls: list[list[str]] = []
+
+    def fake_run(cmd, **kwargs):  # type: ignore[no-untyped-def]
+        calls.append(cmd)
+        if cmd[0] == "uv":
+            raise FileNotFoundError
+        return Result(0, stdout=f"{len(cmd) - 2} files changed")
+
+    monkeypatch.setattr(lint_on_save.subprocess, "run", fake_run)
+    # PATH 上の ruff を直接起動用にキャッシュさせず、実行方法どおりのコマンドで検証する
+    monkeypatch.setattr(lint_on_save.shutil, "which", lambda _tool: None)
+    for name in ("a.py", "b.py", "c.py"):
+        (project / name).write_text("x = 1\n", encoding="utf-8")
+        payload = {
+            "tool_name": "Edit",
+            "cwd": str(project),
+            "session_id": "s1" if name != "c.py" else "s2",
+            "tool_input": {"file_path": str(project / name)},
+        }
+        assert _run_main(monkeypatch, capsys, payload) == ""
+
+    assert calls == []
+    assert len(jobs) == 3 and jobs[0][-2:] == ["--batch", str(project)]
+
+    lint_on_save.run_batch_job(str(project))
+
+    paths = [str(project / name) for name in ("a.py", "b.py", "c.py")]
+    assert [cmd for cmd in calls if cmd[0] == "ruff"] == [
+        ["ruff", "format", *paths],
+        ["ruff", "check", "--fix", *paths],
+    ]
+    out = _run_main(
+        monkeypatch,
+        capsys,
+        {"tool_name": "Edit", "cwd": str(project), "session_id": "s2", "tool_input": {}},
+    )
+    context = json.loads(out)["hookSpecificOutput"]["additionalContext"]
+    assert context.startswith("[Lint OK] a.py, b.py, c.py\n✓ ruff format: 3 files changed")
+    assert lint_on_save.pop_reports(str(project), "s2") == []
+    assert len(lint_on_save.pop_reports(str(project), "s1")) == 1
+
+
+def test_batch_mode_falls_back_to_sync_when_queue_is_unavailable(
+    monkeypatch, capsys: pytest.CaptureFixture[str], batch_project
+) -> None:
+    project, _jobs = batch_project
+
+    def fail(*_args, **_kwargs):  # type: ignore[no-untyped-def]
+        raise OSError("read-only")
+
+    monkeypatch.setattr(lint_on_save, "enqueue", fail)
+    monkeypatch.setattr(
+        lint_on_save,
+        "run_lint_commands",
+        lambda _path, **_kwargs: [{"name": "ruff format", "success": True, "output": "done"}],
+    )
+
+    out = _run_main(
+        monkeypatch,
+        capsys,
+        {"tool_name": "Write", "cwd": str(project), "tool_input": {"file_path": "a.py"}},
+    )
+
+    assert "[Lint OK] a.py" in json.loads(out)["hookSpecificOutput"]["additionalContext"]
@@ -6,6 +6,8 @@ post_test_analysis = load_module(
     "post_test_analysis", "packages/quality-gates/hooks/post-test-analysis.py"
 )
 
+from state_store import close_stores, open_store, session_namespace  # noqa: E402
+
 
 @pytest.mark.parametrize(
     "command",
@@ -62,17 +64,217 @@ def test_extract_failure_summary_returns_default_when_no_match() -> None:
     assert post_test_analysis.extract_failure_summary("all passed") == "Test failure detected"
 
 
+# ---------------------------------------------------------------------------
+# Tail-first parsers
+# ---------------------------------------------------------------------------
+
+PYTEST_FAILED = """\
+============================= test session starts ==============================
+collected 3 items
+
+tests/test_a.py .F.                                                      [100%]
+
+=================================== FAILURES ===================================
+___________________________________ test_x ____________________________________
+E       assert 1 == 2
+=========================== short test summary info ============================
+FAILED tests/test_a.py::test_x - assert 1 == 2
+ERROR tests/test_b.py::test_y - RuntimeError: boom
+==================== 1 failed, 2 passed, 1 error in 0.12s =====================
+"""
+
+JEST_FAILED = """\
+FAIL src/sum.test.js
+  ● math › adds numbers
+
+    expect(received).toBe(expected)
+
+Summary of all failing tests
+FAIL src/sum.test.js
+  ● math › adds numbers
+
+Test Suites: 1 failed, 1 passed, 2 total
+Tests:       1 failed, 4 passed, 5 total
+Snapshots:   0 total
+Time:        1.234 s
+Ran all test suites.
+"""
+
+GO_FAILED = """\
+=== RUN   TestAdd
+--- PASS: TestAdd (0.00s)
+=== RUN   TestSub
+    calc_test.go:12: got 1, want 2
+--- FAIL: TestSub (0.01s)
+FAIL
+FAIL\texample.com/calc\t0.015s
+ok  \texample.com/util\t0.002s
+FAIL
+"""
+
+CARGO_FAILED = """\
+running 3 tests
+test tests::a ... ok
+test tests::b ... FAILED
+test tests::c ... ok
+
+failures:
+
+---- tests::b stdout ----
+thread 'tests::b' panicked at src/lib.rs:10:9
+
+failures:
+    tests::b
+
+test result: FAILED. 2 passed; 1 failed; 0 ignored; 0 measured; 0 filtered out; finished in 0.01s
+
+error: test failed, to rerun pass `--lib`
+"""
+
+
+@pytest.mark.parametrize(
+    ("command", "output", "framework", "counts", "failed", "duration"),
+    [
+        (
+            "uv run pytest",
+            PYTEST_FAILED,
+            "pytest",
+            {"failed": 1, "passed": 2, "errors": 1},
+            ["tests/test_a.py::test_x", "tests/test_b.py::test_y"],
+            0.12,
+        ),
+        (
+            "npm test",
+            JEST_FAILED,
+            "jest",
+            {"failed": 1, "passed": 4},
+            ["math › adds numbers"],
+            1.234,
+        ),
+        (
+            "go test ./...",
+            GO_FAILED,
+            "go",
+            {"packages_passed": 1, "packages_failed": 1, "failed": 1, "passed": 1},
+            ["TestSub"],
+            0.017,
+        ),
+        (
+            "cargo test",
+            CARGO_FAILED,
+            "cargo",
+            {"passed": 2, "failed": 1},
+            ["tests::b"],
+            0.01,
+        ),
+    ],
+)
+def test_parse_test_output_extracts_structured_results(
+    command: str, output: str, framework: str, counts: dict, failed: list, duration: float
+) -> None:
+    report = post_test_analysis.parse_test_output(command, output)
+
+    assert report is not None
+    assert report.framework == framework
+    assert report.counts == counts
+    assert report.failed == failed
+    assert report.duration == pytest.approx(duration)
+
+
+def test_go_parser_stops_at_last_package_line_after_successful_run() -> None:
+    output = _synthetic_output("--- PASS: TestMany (0.00s)\n", "ok  \texample.com/calc\t0.015s\n")
+
+    report = post_test_analysis.parse_test_output("go test -v ./...", output, exit_code=0)
+
+    assert report is not None and report.failed_count == 0
+    assert report.scanned_chars < 100
+
+
+def test_parse_test_output_tries_every_parser_for_unknown_commands() -> None:
+    report = post_test_analysis.parse_test_output("make test", CARGO_FAILED)
+
+    assert report is not None and report.framework == "cargo"
+
+
+def test_tail_parser_subclass_must_implement_feed() -> None:
+    class Incomplete(post_test_analysis.TailParser):
+        framework = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_parse_test_output_returns_none_without_summary() -> None:
+    assert post_test_analysis.parse_test_output("pytest", "FAILED test_x.py::test_y") is None
+
+
+def test_summary_text_leads_with_summary_line() -> None:
+    report = post_test_analysis.parse_test_output("pytest", PYTEST_FAILED)
+
+    lines = report.summary_text().split("\n")
+    assert lines[0].startswith("==") and "1 failed" in lines[0]
+    assert lines[1] == "FAILED tests/test_a.py::test_x - assert 1 == 2"
+
+
+def _synthetic_output(body_line: str, tail: str, size: int = 8 * 1024 * 1024) -> str:
+    """A multi-megabyte log: repeated body lines followed by the framework tail."""
+    return body_line * (size // len(body_line)) + tail
+
+
+@pytest.mark.parametrize(
+    ("command", "body_line", "tail"),
+    [
+        (
+            "pytest -v",
+            "tests/test_big.py::test_case PASSED                 [ 50%]\n",
+            PYTEST_FAILED,
+        ),
+        ("npm test", "  ✓ renders row (3 ms)\n", JEST_FAILED),
+        ("cargo test", "test tests::many ... ok\n", CARGO_FAILED),
+    ],
+)
+def test_parse_test_output_scans_only_the_tail_of_large_outputs(
+    command: str, body_line: str, tail: str
+) -> None:
+    output = _synthetic_output(body_line, tail)
+
+    report = post_test_analysis.parse_test_output(command, output)
+
+    assert report is not None and report.failed
+    assert report.scanned_chars <= len(tail) + 1
+
+
+def test_parse_test_output_scan_is_bounded_without_summary() -> None:
+    output = _synthetic_output("=== RUN   TestMany\n", "")
+
+    assert post_test_analysis.parse_test_output("go test ./...", output) is None
+    scanned = sum(len(line) + 1 for line in post_test_analysis.iter_lines_reverse(output))
+    assert scanned <= post_test_analysis.TAIL_SCAN_CHARS + 1
+
+
+def test_iter_lines_reverse_matches_forward_iteration() -> None:
+    text = "a\n\nb\nc"
+
+    assert list(post_test_analysis.iter_lines_reverse(text)) == ["c", "b", "", "a"]
+    assert list(post_test_analysis.iter_lines(text)) == ["a", "", "b", "c"]
+
+
 # ---------------------------------------------------------------------------
 # record_test_result (shared state management)
 # ---------------------------------------------------------------------------
 
 
 @pytest.fixture()
-def _clean_state(tmp_path, monkeypatch):
-    """Redirect state file to tmp_path so tests don't interfere."""
-    state_file = tmp_path / "test-gate-state.json"
-    monkeypatch.setattr(post_test_analysis, "TEST_GATE_STATE_FILE", state_file)
-    yield state_file
+def _clean_state(tmp_path):
+    """Use a state store under tmp_path so tests don't interfere."""
+    yield str(tmp_path)
+    close_stores()
+
+
+def _save(project_dir: str, state: dict) -> None:
+    open_store(project_dir).put(
+        session_namespace("s1"), post_test_analysis.TEST_GATE_STATE_KEY, state
+    )
 
 
 def test_record_test_result_resets_on_pass(_clean_state) -> None:
@@ -84,12 +286,12 @@ def test_record_test_result_resets_on_pass(_clean_state) -> None:
         "last_test_result": None,
         "warned": True,
     }
-    post_test_analysis.save_test_gate_state(state)
+    _save(_clean_state, state)
 
     # Record a passing test
-    post_test_analysis.record_test_result("pytest", passed=True)
+    post_test_analysis.record_test_result(_clean_state, "s1", "pytest", passed=True)
 
-    reloaded = post_test_analysis.load_test_gate_state()
+    reloaded = post_test_analysis.load_test_gate_state(_clean_state, "s1")
     assert reloaded["files_modified_since_test"] == []
     assert reloaded["lines_modified_since_test"] == 0
     assert reloaded["warned"] is False
@@ -105,13 +307,25 @@ def test_record_test_result_preserves_on_fail(_clean_state) -> None:
         "last_test_result": None,
         "warned": True,
     }
-    post_test_analysis.save_test_gate_state(state)
+    _save(_clean_state, state)
 
     # Record a failing test
-    post_test_analysis.record_test_result("pytest", passed=False)
+    post_test_analysis.record_test_result(_clean_state, "s1", "pytest", passed=False)
 
-    reloaded = post_test_analysis.load_test_gate_state()
+    reloaded = post_test_analysis.load_test_gate_state(_clean_state, "s1")
     assert reloaded["files_modified_since_test"] == ["src/auth.py", "src/models.py"]
     assert reloaded["lines_modified_since_test"] == 85
     assert reloaded["warned"] is True
     assert reloaded["last_test_result"]["passed"] is False
+
+
+def test_record_test_result_stores_parsed_report(_clean_state) -> None:
+    report = post_test_analysis.parse_test_output("pytest", PYTEST_FAILED)
+
+    post_test_analysis.record_test_result(_clean_state, "s1", "pytest", False, report)
+
+    result = post_test_analysis.load_test_gate_state(_clean_state, "s1")["last_test_result"]
+    assert result["framework"] == "pytest"
+    assert result["counts"] == {"failed": 1, "passed": 2, "errors": 1}
+    assert result["failed"] == ["tests/test_a.py::test_x", "tests/test_b.py::test_y"]
+    assert result["duration"] == 0.12
@@ -8,6 +8,7 @@ test_gate_checker = load_module(
     "test_gate_checker", "packages/quality-gates/hooks/test-gate-checker.py"
 )
 
+from state_store import close_stores  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # is_code_file
@@ -57,34 +58,44 @@ def test_count_lines_ignores_empty_lines() -> None:
 
 
 # ---------------------------------------------------------------------------
-# State management with tmp file
+# State management with the state store
 # ---------------------------------------------------------------------------
 
 
 @pytest.fixture()
-def _clean_state(tmp_path, monkeypatch):
-    """Redirect state file to tmp_path so tests don't interfere."""
-    state_file = tmp_path / "test-gate-state.json"
-    monkeypatch.setattr(test_gate_checker, "TEST_GATE_STATE_FILE", state_file)
-    yield state_file
+def _clean_state(tmp_path):
+    """Use a state store under tmp_path so tests don't interfere."""
+    yield str(tmp_path)
+    close_stores()
+
+
+def _save(project_dir: str, state: dict) -> None:
+    test_gate_checker.update_test_gate_state(project_dir, "s1", lambda _current: state)
 
 
 def test_increments_file_count(_clean_state) -> None:
-    state = test_gate_checker.load_test_gate_state()
+    state = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     assert state["files_modified_since_test"] == []
 
     # Simulate adding a file
     state["files_modified_since_test"].append("src/auth.py")
     state["lines_modified_since_test"] += 20
-    test_gate_checker.save_test_gate_state(state)
+    _save(_clean_state, state)
 
-    reloaded = test_gate_checker.load_test_gate_state()
+    reloaded = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     assert reloaded["files_modified_since_test"] == ["src/auth.py"]
     assert reloaded["lines_modified_since_test"] == 20
 
 
+def test_state_is_per_session(_clean_state) -> None:
+    _save(_clean_state, {"files_modified_since_test": ["a.py"], "lines_modified_since_test": 5})
+
+    other = test_gate_checker.load_test_gate_state(_clean_state, "s2")
+    assert other["files_modified_since_test"] == []
+
+
 def test_no_duplicate_files(_clean_state) -> None:
-    state = test_gate_checker.load_test_gate_state()
+    state = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     file_path = "src/auth.py"
 
     # Add same file twice (simulating two edits to same file)
@@ -98,13 +109,13 @@ def test_no_duplicate_files(_clean_state) -> None:
 
 
 def test_warns_at_threshold(_clean_state) -> None:
-    state = test_gate_checker.load_test_gate_state()
+    state = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     state["files_modified_since_test"] = ["a.py", "b.py", "c.py"]
     state["lines_modified_since_test"] = 50
     state["warned"] = False
-    test_gate_checker.save_test_gate_state(state)
+    _save(_clean_state, state)
 
-    reloaded = test_gate_checker.load_test_gate_state()
+    reloaded = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     file_count = len(reloaded["files_modified_since_test"])
     file_threshold = test_gate_checker.DEFAULT_FILE_THRESHOLD
 
@@ -114,13 +125,13 @@ def test_warns_at_threshold(_clean_state) -> None:
 
 
 def test_warns_only_once(_clean_state) -> None:
-    state = test_gate_checker.load_test_gate_state()
+    state = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     state["files_modified_since_test"] = ["a.py", "b.py", "c.py", "d.py"]
     state["lines_modified_since_test"] = 200
     state["warned"] = True  # Already warned
-    test_gate_checker.save_test_gate_state(state)
+    _save(_clean_state, state)
 
-    reloaded = test_gate_checker.load_test_gate_state()
+    reloaded = test_gate_checker.load_test_gate_state(_clean_state, "s1")
     # Even though thresholds exceeded, warned=True prevents re-warning
     assert reloaded["warned"] is True
 
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import json
+import shutil
+import subprocess
 import sys
+from collections.abc import Iterator
 from io import StringIO
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -13,10 +17,54 @@ test_tampering_detector = load_module(
     "test_tampering_detector", "packages/quality-gates/hooks/test-tampering-detector.py"
 )
 
+from state_store import StateStore  # noqa: E402
+
+
+class FakeRepo:
+    """git_query.GitRepo の代わりに固定の結果を返すテスト用リポジトリ。"""
+
+    def __init__(
+        self,
+        outputs=None,
+        tracked=(),
+        toplevel="/nonexistent-repo",
+        common_dir: str | None = "/repo/.git",
+    ) -> None:
+        self.outputs = outputs or {}
+        self.tracked = set(tracked)
+        self.common_dir = common_dir
+        self.facts = SimpleNamespace(
+            toplevel=toplevel, git_dir=f"{toplevel}/.git", common_dir=common_dir
+        )
+        self.index_mtime = 1
+        self.calls: list[tuple[str, ...]] = []
+
+    def run(self, *args: str):
+        self.calls.append(args)
+        return self.outputs.get(args[0])
+
+    def run_many(self, *commands):
+        return [self.run(*command) for command in commands]
+
+    def index_mtime_ns(self) -> int:
+        return self.index_mtime
+
+    def tracked_paths(self) -> set[str]:
+        self.calls.append(("ls-files",))
+        return set(self.tracked)
+
+
+def _use_repo(monkeypatch, repo: FakeRepo) -> FakeRepo:
+    monkeypatch.setattr(test_tampering_detector, "repo_for", lambda _cwd, persist=False: repo)
+    return repo
+
 
 @pytest.fixture()
-def _clean_state(tmp_path: Path, monkeypatch) -> None:
-    monkeypatch.setattr(test_tampering_detector, "STATE_FILE", tmp_path / "tampering-state.json")
+def _clean_state(tmp_path: Path, monkeypatch) -> Iterator[None]:
+    store = StateStore(str(tmp_path / "state.db"))
+    monkeypatch.setattr(test_tampering_detector, "open_store", lambda _project_dir: store)
+    yield
+    store.close()
 
 
 def test_is_test_file_detects_python_and_javascript_patterns() -> None:
@@ -75,17 +123,72 @@ def test_scan_added_lines_ignores_suppression_patterns_in_non_test_file() -> Non
     assert findings == []
 
 
-def test_extract_deleted_test_files_filters_non_test_paths() -> None:
-    name_status = "\n".join(
-        [
-            "D\ttests/test_auth.py",
-            "D\tsrc/main.py",
-            "M\tfrontend/app.tsx",
-            "D\tfrontend/button.test.tsx",
-        ]
+def test_diff_added_lines_counts_repeated_lines() -> None:
+    old = "@pytest.mark.skip\ndef test_a():\n    pass\n"
+    new = "@pytest.mark.skip\ndef test_a():\n    pass\n@pytest.mark.skip\ndef test_b():\n"
+
+    assert test_tampering_detector.diff_added_lines(old, new) == [
+        "@pytest.mark.skip",
+        "def test_b():",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("tool_name", "tool_input", "tool_response", "expected"),
+    [
+        ("Edit", {"old_string": "x = 1", "new_string": "x = 1  # noqa"}, None, ["x = 1  # noqa"]),
+        (
+            "MultiEdit",
+            {
+                "edits": [
+                    {"old_string": "a", "new_string": "a\nit.skip('x')"},
+                    {"old_string": "b", "new_string": "c"},
+                ]
+            },
+            None,
+            ["it.skip('x')", "c"],
+        ),
+        ("Write", {"content": "a\nb\n"}, {"type": "update", "originalFile": "a\n"}, ["b"]),
+        ("Write", {"content": "a\n"}, {"type": "create"}, ["a"]),
+        ("Write", {"content": "a\n"}, {"type": "update"}, None),
+    ],
+    ids=["edit", "multi_edit", "write_with_original", "write_create", "write_unknown"],
+)
+def test_added_lines_from_payload(tool_name, tool_input, tool_response, expected) -> None:
+    assert (
+        test_tampering_detector.added_lines_from_payload(tool_name, tool_input, tool_response)
+        == expected
     )
 
-    assert test_tampering_detector.extract_deleted_test_files(name_status) == [
+
+def test_edit_added_lines_do_not_call_git(monkeypatch) -> None:
+    repo = _use_repo(monkeypatch, FakeRepo())
+
+    added = test_tampering_detector.get_added_lines_for_file(
+        "/repo",
+        "tests/test_auth.py",
+        {"old_string": "def test_a():", "new_string": "@pytest.mark.skip\ndef test_a():"},
+        "Edit",
+    )
+
+    assert added == ["@pytest.mark.skip"]
+    assert repo.calls == []
+
+
+def test_get_all_deleted_test_files_filters_non_test_paths(
+    monkeypatch, tmp_path, _clean_state
+) -> None:
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_kept.py").write_text("", encoding="utf-8")
+    tracked = [
+        "tests/test_auth.py",
+        "tests/test_kept.py",
+        "src/main.py",
+        "frontend/button.test.tsx",
+    ]
+    _use_repo(monkeypatch, FakeRepo(tracked=tracked, toplevel=str(tmp_path)))
+
+    assert test_tampering_detector.get_all_deleted_test_files("/repo") == [
         "frontend/button.test.tsx",
         "tests/test_auth.py",
     ]
@@ -101,7 +204,7 @@ def test_collect_tampering_findings_for_new_file_uses_tool_input(monkeypatch, _c
         },
     }
 
-    monkeypatch.setattr(test_tampering_detector, "run_git_command", lambda *args: "")
+    _use_repo(monkeypatch, FakeRepo())
     findings = test_tampering_detector.collect_tampering_findings(payload)
 
     assert [finding["label"] for finding in findings] == [
@@ -117,13 +220,7 @@ def test_collect_tampering_findings_detects_deleted_test_files(monkeypatch, _cle
         "tool_input": {"command": "git rm tests/test_auth.py"},
     }
 
-    monkeypatch.setattr(
-        test_tampering_detector,
-        "run_git_command",
-        lambda _project_dir, *args: (
-            "D\ttests/test_auth.py\nD\ttests/test_other.py\n" if "--name-status" in args else ""
-        ),
-    )
+    _use_repo(monkeypatch, FakeRepo(tracked=["tests/test_auth.py", "tests/test_other.py"]))
 
     findings = test_tampering_detector.collect_tampering_findings(payload)
 
@@ -155,12 +252,8 @@ def test_extract_delete_targets_handles_delete_and_git_rm_commands() -> None:
     ) == ["tests/a.py", "tests/b.py"]
 
 
-def test_get_deleted_test_files_filters_to_current_targets(monkeypatch) -> None:
-    monkeypatch.setattr(
-        test_tampering_detector,
-        "run_git_command",
-        lambda _project_dir, *args: "D\ttests/test_auth.py\nD\ttests/sub/test_other.py\n",
-    )
+def test_get_deleted_test_files_filters_to_current_targets(monkeypatch, _clean_state) -> None:
+    _use_repo(monkeypatch, FakeRepo(tracked=["tests/test_auth.py", "tests/sub/test_other.py"]))
 
     assert test_tampering_detector.get_deleted_test_files("/repo", ["tests/test_auth.py"]) == [
         "tests/test_auth.py"
@@ -171,12 +264,8 @@ def test_get_deleted_test_files_filters_to_current_targets(monkeypatch) -> None:
     ]
 
 
-def test_get_deleted_test_files_matches_glob_targets(monkeypatch) -> None:
-    monkeypatch.setattr(
-        test_tampering_detector,
-        "run_git_command",
-        lambda _project_dir, *args: "D\ttests/test_auth.py\nD\ttests/helpers/util.txt\n",
-    )
+def test_get_deleted_test_files_matches_glob_targets(monkeypatch, _clean_state) -> None:
+    _use_repo(monkeypatch, FakeRepo(tracked=["tests/test_auth.py", "tests/helpers/util.txt"]))
 
     assert test_tampering_detector.get_deleted_test_files("/repo", ["tests/*.py"]) == [
         "tests/test_auth.py"
@@ -189,16 +278,7 @@ def test_path_glob_match_is_anchored() -> None:
 
 
 def test_get_unreported_deleted_test_files_suppresses_repeats(monkeypatch, _clean_state) -> None:
-    monkeypatch.setattr(
-        test_tampering_detector,
-        "get_all_deleted_test_files",
-        lambda _project_dir: ["tests/test_auth.py", "tests/test_other.py"],
-    )
-    monkeypatch.setattr(
-        test_tampering_detector,
-        "get_deleted_test_files",
-        lambda _project_dir, _targets: ["tests/test_auth.py", "tests/test_other.py"],
-    )
+    _use_repo(monkeypatch, FakeRepo(tracked=["tests/test_auth.py", "tests/test_other.py"]))
 
     first = test_tampering_detector.get_unreported_deleted_test_files("/repo", ["tests/*.py"])
     second = test_tampering_detector.get_unreported_deleted_test_files("/repo", ["tests/*.py"])
@@ -207,18 +287,61 @@ def test_get_unreported_deleted_test_files_suppresses_repeats(monkeypatch, _clea
     assert second == []
 
 
+def test_tracked_test_index_is_rebuilt_only_when_git_index_changes(
+    monkeypatch, _clean_state
+) -> None:
+    repo = _use_repo(monkeypatch, FakeRepo(tracked=["tests/test_a.py", "src/a.py"]))
+
+    first = test_tampering_detector.load_tracked_test_index("/repo")
+    second = test_tampering_detector.load_tracked_test_index("/repo")
+    repo.index_mtime = 2
+    repo.tracked.add("tests/test_b.py")
+    third = test_tampering_detector.load_tracked_test_index("/repo")
+
+    assert first.files == second.files == frozenset({"tests/test_a.py"})
+    assert third.files == frozenset({"tests/test_a.py", "tests/test_b.py"})
+    assert repo.calls == [("ls-files",), ("ls-files",)]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_deleted_test_files_in_real_repository(tmp_path, monkeypatch) -> None:
+    """Both `rm` (unstaged) and `git rm` (staged) deletions are detected."""
+    for args in (["init", "-q"], ["config", "user.email", "t@e"], ["config", "user.name", "t"]):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True)
+    (tmp_path / "tests").mkdir()
+    for name in ("test_a.py", "test_b.py", "test_c.py"):
+        (tmp_path / "tests" / name).write_text("", encoding="utf-8")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "init"], cwd=tmp_path, check=True)
+    (tmp_path / "tests" / "test_a.py").unlink()
+    subprocess.run(["git", "rm", "-q", "tests/test_b.py"], cwd=tmp_path, check=True)
+
+    import git_query
+
+    git_query.clear_repos()
+    store = StateStore(str(tmp_path / "state.db"))
+    monkeypatch.setattr(test_tampering_detector, "open_store", lambda _project_dir: store)
+    try:
+        deleted = test_tampering_detector.get_deleted_test_files(str(tmp_path), ["tests"])
+    finally:
+        store.close()
+        git_query.clear_repos()
+
+    assert deleted == ["tests/test_a.py", "tests/test_b.py"]
+
+
 def test_get_project_state_key_prefers_git_common_dir(monkeypatch) -> None:
-    monkeypatch.setattr(
-        test_tampering_detector,
-        "run_git_command",
-        lambda _project_dir, *args: (
-            "../../.git\n" if args == ("rev-parse", "--git-common-dir") else ""
-        ),
-    )
+    _use_repo(monkeypatch, FakeRepo(common_dir="/repo/.git"))
 
     key = test_tampering_detector.get_project_state_key("/repo/.worktrees/feat-4")
 
-    assert key.endswith("/repo/.git")
+    assert key == "/repo/.git"
+
+
+def test_get_project_state_key_outside_git_uses_project_dir(monkeypatch, tmp_path) -> None:
+    _use_repo(monkeypatch, FakeRepo(common_dir=None))
+
+    assert test_tampering_detector.get_project_state_key(str(tmp_path)) == str(tmp_path)
 
 
 def test_collect_tampering_findings_suppresses_repeated_pattern_warnings(
@@ -230,7 +353,7 @@ def test_collect_tampering_findings_suppresses_repeated_pattern_warnings(
         "tool_input": {"file_path": "tests/test_auth.py", "content": "@pytest.mark.skip\n"},
     }
 
-    monkeypatch.setattr(test_tampering_detector, "run_git_command", lambda *args: "")
+    _use_repo(monkeypatch, FakeRepo())
 
     first = test_tampering_detector.collect_tampering_findings(payload)
     second = test_tampering_detector.collect_tampering_findings(payload)
@@ -267,3 +390,18 @@ def test_main_outputs_warning(monkeypatch, capsys: pytest.CaptureFixture[str]) -
     assert "[Warning]" in context
     assert "tests/test_auth.py" in context
     assert "it.skip()" in context
+
+
+def test_main_skips_irrelevant_tool_before_full_decode(monkeypatch) -> None:
+    payload = {"tool_name": "Read", "tool_response": {"content": "x" * 100_000}}
+    monkeypatch.setattr(sys, "stdin", StringIO(json.dumps(payload)))
+
+    def fail(_data):
+        raise AssertionError("should not be called")
+
+    monkeypatch.setattr(test_tampering_detector, "collect_tampering_findings", fail)
+
+    with pytest.raises(SystemExit) as exc_info:
+        test_tampering_detector.main()
+
+    assert exc_info.value.code == 0
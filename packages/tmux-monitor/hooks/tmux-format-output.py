@@ -2,10 +2,22 @@
 """sub agent の JSONL 出力を人が読める形式にフォーマットする。
 
 使い方: tail -f agent-xxx.jsonl | ./tmux-format-output.py
+
+出力が多い sub agent でペイン（と tmux）を詰まらせないよう、
+- 表示行はまとめて FLUSH_INTERVAL 秒ごとに書き出し、
+- 連続する bash_progress は最新の 1 行にまとめ、
+- 1 秒あたり LINES_PER_SECOND 行を超えた分は "(N lines suppressed)" にまとめ、
+- 1 レコードの表示は MAX_RECORD_LINES 行 × MAX_LINE_CHARS 文字までに切り詰める。
 """
 
+from __future__ import annotations
+
 import json
+import os
+import select
 import sys
+import time
+from collections.abc import Callable
 
 # ANSI スタイルコード
 BOLD = "\033[1m"
@@ -19,6 +31,19 @@ GREEN = "\033[32m"
 # 組み合わせスタイル
 TOOL_NAME = f"{BOLD}{YELLOW}"  # ツール名: 太字 + 黄
 
+# 1 レコードから表示する最大行数と、1 行の最大文字数
+MAX_RECORD_LINES = 40
+MAX_LINE_CHARS = 400
+
+# 1 秒あたりに表示する最大行数（超えた分は件数だけ表示する）
+LINES_PER_SECOND = 200
+
+# 表示行をまとめて書き出す間隔（秒）
+FLUSH_INTERVAL = 0.1
+
+# stdin からの 1 回の読み出しサイズ
+READ_CHUNK = 64 * 1024
+
 
 def format_tool_input(input_data: dict) -> str:
     """ツール呼び出しの入力を短縮表示する。"""
@@ -28,58 +53,202 @@ def format_tool_input(input_data: dict) -> str:
     return json.dumps(input_data, ensure_ascii=False)[:120]
 
 
-def handle_assistant(message: dict) -> None:
-    """assistant メッセージのテキストとツール呼び出しを表示する。"""
+def render_assistant(message: dict) -> list[str]:
+    """assistant メッセージのテキストとツール呼び出しを表示行にする。"""
+    lines: list[str] = []
     for content in message.get("content", []):
         content_type = content.get("type")
         if content_type == "text":
-            print(content["text"])
+            lines.append(content["text"])
         elif content_type == "tool_use":
             name = content.get("name", "")
             input_summary = format_tool_input(content.get("input", {}))
-            print(f"{TOOL_NAME}[{name}]{RESET} {DIM}{input_summary}{RESET}")
+            lines.append(f"{TOOL_NAME}[{name}]{RESET} {DIM}{input_summary}{RESET}")
+    return lines
 
 
-def handle_user(message: dict) -> None:
-    """ツール結果を短縮表示する。"""
+def render_user(message: dict) -> list[str]:
+    """ツール結果を短縮した表示行にする。"""
     content = message.get("content")
     if not isinstance(content, list):
-        return
+        return []
+    lines: list[str] = []
     for item in content:
         if item.get("type") == "tool_result":
             result_text = str(item.get("content", ""))[:200]
-            print(f"{DIM}  → {result_text}{RESET}")
+            lines.append(f"{DIM}  → {result_text}{RESET}")
+    return lines
 
 
-def handle_progress(data: dict) -> None:
-    """bash の進捗を表示する（出力がある場合のみ）。"""
+def render_progress(data: dict) -> list[str]:
+    """bash の進捗を表示行にする（出力がある場合のみ）。"""
     if data.get("type") != "bash_progress":
-        return
+        return []
     progress_content = data.get("content", "")
-    if progress_content:
-        print(f"{DIM}{str(progress_content)[:200]}{RESET}")
-
-
-def main() -> None:
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
+    if not progress_content:
+        return []
+    return [f"{DIM}{str(progress_content)[:200]}{RESET}"]
+
+
+def bound_lines(lines: list[str]) -> list[str]:
+    """表示行を MAX_RECORD_LINES 行 × MAX_LINE_CHARS 文字までに切り詰める。"""
+    bounded: list[str] = []
+    total = 0
+    for line in lines:
+        for part in line.split("\n"):
+            total += 1
+            if len(bounded) >= MAX_RECORD_LINES:
+                continue
+            if len(part) > MAX_LINE_CHARS:
+                # 切り詰めでスタイルの終端が落ちても後続行に色が残らないようにする
+                part = part[:MAX_LINE_CHARS] + f"…{RESET}"
+            bounded.append(part)
+    if total > len(bounded):
+        bounded.append(f"{DIM}  … ({total - len(bounded)} more lines){RESET}")
+    return bounded
+
+
+def render_record(record: dict) -> list[str]:
+    """JSONL の 1 レコードを表示行にする（tmux-output-streamer.py からも使う）。"""
+    record_type = record.get("type", "")
+    if record_type == "assistant":
+        lines = render_assistant(record.get("message", {}))
+    elif record_type == "user":
+        lines = render_user(record.get("message", {}))
+    elif record_type == "progress":
+        lines = render_progress(record.get("data", {}))
+    else:
+        return []
+    return bound_lines(lines)
+
+
+def is_bash_progress(record: dict) -> bool:
+    """bash の進捗レコードか（出力の有無は問わない）。"""
+    data = record.get("data")
+    return (
+        record.get("type") == "progress"
+        and isinstance(data, dict)
+        and (data.get("type") == "bash_progress")
+    )
+
+
+class LineThrottle:
+    """レコードを表示行にし、bash_progress の集約と 1 秒あたりの行数制限をかける。
+
+    feed() はすぐに表示してよい行を返す。保留した bash_progress（FLUSH_INTERVAL 秒に 1 行まで）と
+    抑制件数は tick() で取り出す（書き出しのたびに呼ぶ）。
+    """
+
+    def __init__(
+        self,
+        lines_per_second: int = LINES_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.lines_per_second = lines_per_second
+        self.clock = clock
+        self._window_start = clock()
+        self._emitted = 0
+        self._suppressed = 0
+        self._progress: list[str] = []
+        self._progress_at = float("-inf")
+
+    @property
+    def has_pending(self) -> bool:
+        """tick() で出す行（保留中の進捗・抑制件数）が残っているか。"""
+        return bool(self._progress or self._suppressed)
+
+    def feed(self, record: dict) -> list[str]:
+        if is_bash_progress(record):
+            # 連続する進捗は最新の 1 行だけ残す
+            self._progress = render_record(record) or self._progress
+            return []
+        lines = render_record(record)
+        if not lines:
+            return []
+        return self._admit(self._take_progress() + lines)
+
+    def tick(self, final: bool = False) -> list[str]:
+        if final or self.clock() - self._progress_at >= FLUSH_INTERVAL:
+            lines = self._admit(self._take_progress())
+        else:
+            lines = self._admit([])
+        if final and self._suppressed:
+            lines.append(self._suppressed_marker())
+        return lines
+
+    def _take_progress(self) -> list[str]:
+        progress, self._progress = self._progress, []
+        if progress:
+            self._progress_at = self.clock()
+        return progress
+
+    def _suppressed_marker(self) -> str:
+        marker = f"{DIM}({self._suppressed} lines suppressed){RESET}"
+        self._suppressed = 0
+        return marker
+
+    def _admit(self, lines: list[str]) -> list[str]:
+        admitted: list[str] = []
+        now = self.clock()
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._emitted = 0
+            if self._suppressed:
+                admitted.append(self._suppressed_marker())
+        room = max(self.lines_per_second - self._emitted, 0)
+        admitted.extend(lines[:room])
+        self._emitted += min(len(lines), room)
+        self._suppressed += len(lines) - min(len(lines), room)
+        return admitted
+
+
+def feed_lines(throttle: LineThrottle, raw_lines: list[bytes], out: list[str]) -> None:
+    """JSONL の行を解析して、表示してよい行を out に追加する。"""
+    for raw in raw_lines:
+        raw = raw.strip()
+        if not raw:
             continue
         try:
-            record = json.loads(line)
-        except json.JSONDecodeError:
+            record = json.loads(raw)
+        except ValueError:
             continue
+        if isinstance(record, dict):
+            out.extend(throttle.feed(record))
 
-        record_type = record.get("type", "")
-        if record_type == "assistant":
-            handle_assistant(record.get("message", {}))
-        elif record_type == "user":
-            handle_user(record.get("message", {}))
-        elif record_type == "progress":
-            handle_progress(record.get("data", {}))
 
+def write_lines(lines: list[str]) -> None:
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
         sys.stdout.flush()
 
 
+def main() -> None:
+    throttle = LineThrottle()
+    fd = sys.stdin.fileno()
+    partial = b""
+    out: list[str] = []
+    last_flush = time.monotonic()
+    while True:
+        # 書き出し待ちがなければ入力が来るまで待つ
+        timeout = FLUSH_INTERVAL if out or throttle.has_pending else None
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if ready:
+            data = os.read(fd, READ_CHUNK)
+            if not data:
+                break
+            *raw_lines, partial = (partial + data).split(b"\n")
+            feed_lines(throttle, raw_lines, out)
+        now = time.monotonic()
+        if not ready or now - last_flush >= FLUSH_INTERVAL:
+            out.extend(throttle.tick())
+            write_lines(out)
+            out = []
+            last_flush = now
+
+    feed_lines(throttle, [partial], out)
+    out.extend(throttle.tick(final=True))
+    write_lines(out)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""セッション内の全 sub agent の出力を 1 プロセスで各 tmux ペインに配信するストリーマー。
+
+使い方: tmux-output-streamer.py <session_id>
+（SubagentStart hook が tmux_common.ensure_streamer() でデタッチ起動する）
+
+SubagentStart hook は {session_id}.stream/{agent_id}.json に出力ファイルとペインの tty を
+登録し、ペイン側はタイトルを表示して待機するだけにする。ストリーマーは
+
+- 出力ファイルのディレクトリ（subagents/）と登録ディレクトリを inotify で監視し
+  （使えない環境では POLL_INTERVAL 秒ごとのポーリング）、
+- 追記された JSONL を 1 回だけ整形して各ペインの tty に書き込む
+  （整形・進捗の集約・行数制限は tmux-format-output.py の LineThrottle をペインごとに使う）。
+
+SubagentStop hook が {agent_id}.done を置くと、残りの出力を流し切ってから配信を止める
+（ペイン自体は従来どおり DONE 表示で残る）。登録そのものが消された場合
+（ペインプールがペインを別の sub agent に回した場合）はすぐに止める。登録がなくなって IDLE_EXIT 秒経つか、
+登録ディレクトリが削除される（SessionEnd）と終了する。
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import importlib.util
+import json
+import os
+import select
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tmux_common import stream_routes_dir, try_lock_streamer
+
+FORMATTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmux-format-output.py")
+
+# inotify が使えない環境でのポーリング間隔（従来のペイン内待機ループと同じ）
+POLL_INTERVAL = 0.3
+
+# inotify 使用時も取りこぼしに備えて再確認する間隔
+WAKE_INTERVAL = 2.0
+
+# 保留中の進捗・抑制件数を出すための再確認間隔
+THROTTLE_WAKE = 0.1
+
+# 登録がなくなってから終了するまでの秒数
+IDLE_EXIT = 60.0
+
+# 1 回の読み出しサイズと、1 周で 1 エージェントから読む上限（他のペインを待たせない）
+READ_CHUNK = 64 * 1024
+MAX_READ_PER_TICK = 1024 * 1024
+
+# ペインが詰まっている間に溜める出力の上限（超えたら古い方から捨てる）
+MAX_PENDING = 256 * 1024
+
+# inotify_add_watch のイベントマスク
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+# tmux-format-output.LineThrottle を作る関数（feed(record) / tick(final) / has_pending を持つ）
+ThrottleFactory = Callable[[], Any]
+
+
+def load_throttle_factory() -> ThrottleFactory:
+    """tmux-format-output.py の LineThrottle を読み込む（ハイフン入りのため importlib で読む）。"""
+    spec = importlib.util.spec_from_file_location("tmux_format_output", FORMATTER)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {FORMATTER}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.LineThrottle
+
+
+class DirWatcher:
+    """ディレクトリの変更を待つ。inotify が使えなければ一定間隔のスリープになる。"""
+
+    def __init__(self, use_inotify: bool = True) -> None:
+        self._libc = None
+        self._fd: int | None = None
+        self._watched: set[str] = set()
+        if use_inotify:
+            self._init_inotify()
+
+    def _init_inotify(self) -> None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd >= 0:
+            self._libc = libc
+            self._fd = fd
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def add(self, path: str) -> bool:
+        """ディレクトリを監視対象に加える。監視できている（または不要な）場合は True。"""
+        if self._libc is None or self._fd is None or path in self._watched:
+            return True
+        if not os.path.isdir(path):
+            return False
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self._watched.add(path)
+        return True
+
+    def wait(self, timeout: float) -> None:
+        """変更があるか timeout 秒経つまで待つ（ポーリング時は POLL_INTERVAL で打ち切る）。"""
+        if self._fd is None:
+            time.sleep(min(timeout, POLL_INTERVAL))
+            return
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return
+        # 個々のイベントは見ない（起きたら全エージェントの追記をまとめて確認する）
+        while True:
+            try:
+                if not os.read(self._fd, 64 * 1024):
+                    return
+            except OSError:  # BlockingIOError: 読み切った
+                return
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class AgentStream:
+    """1 つの sub agent の出力ファイルを追いかけて、ペインの tty に書き込む。"""
+
+    def __init__(self, agent_id: str, path: str, tty: str, throttle: Any) -> None:
+        self.agent_id = agent_id
+        self.path = path
+        self.tty = tty
+        self.throttle = throttle
+        self.done = False
+        self.closed = False
+        self._file = None
+        self._tty_fd: int | None = None
+        self._partial = b""
+        self._pending = b""
+
+    def read(self) -> bool:
+        """追記分を読んで整形する。ファイル末尾まで読み切った場合は True。"""
+        if self._file is None:
+            try:
+                self._file = open(self.path, "rb")
+            except OSError:
+                return True
+        budget = MAX_READ_PER_TICK
+        while budget > 0:
+            data = self._file.read(READ_CHUNK)
+            if not data:
+                return True
+            budget -= len(data)
+            *lines, self._partial = (self._partial + data).split(b"\n")
+            self._render(lines)
+        return False
+
+    def tick(self, final: bool = False) -> None:
+        """保留中の進捗と抑制件数を出力に加える（final は配信の最後）。"""
+        self._append(self.throttle.tick(final))
+
+    def _render(self, lines: list[bytes]) -> None:
+        rendered: list[str] = []
+        for raw in lines:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                rendered.extend(self.throttle.feed(record))
+        self._append(rendered)
+
+    def _append(self, rendered: list[str]) -> None:
+        if rendered:
+            self._pending += ("\n".join(rendered) + "\n").encode("utf-8", "replace")
+            if len(self._pending) > MAX_PENDING:
+                self._pending = self._pending[-MAX_PENDING:]
+
+    def flush(self) -> bool:
+        """溜まった出力を tty に書き込む。書き切った場合は True。
+
+        ペインが閉じられた（tty に書けない）場合は closed にする。
+        """
+        if not self._pending:
+            return True
+        if self._tty_fd is None:
+            try:
+                self._tty_fd = os.open(self.tty, os.O_WRONLY | os.O_NOCTTY | os.O_NONBLOCK)
+            except OSError:
+                self.closed = True
+                return True
+        while self._pending:
+            try:
+                written = os.write(self._tty_fd, self._pending)
+            except BlockingIOError:
+                return False
+            except OSError:
+                self.closed = True
+                return True
+            self._pending = self._pending[written:]
+        return True
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tty_fd is not None:
+            os.close(self._tty_fd)
+            self._tty_fd = None
+        self.closed = True
+
+
+class Streamer:
+    """登録ディレクトリの内容に従って、全 sub agent の出力を配信する。"""
+
+    def __init__(
+        self,
+        routes_dir: str,
+        make_throttle: ThrottleFactory,
+        watcher: DirWatcher | None = None,
+    ):
+        self.routes_dir = routes_dir
+        self.make_throttle = make_throttle
+        self.watcher = watcher or DirWatcher()
+        self.streams: dict[str, AgentStream] = {}
+
+    def refresh_routes(self) -> bool:
+        """登録を読み直す。登録ディレクトリが削除されていれば False。"""
+        try:
+            names = os.listdir(self.routes_dir)
+        except OSError:
+            return False
+        entries = set(names)
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            agent_id = name[: -len(".json")]
+            stream = self.streams.get(agent_id)
+            if stream is None:
+                try:
+                    with open(os.path.join(self.routes_dir, name)) as f:
+                        route = json.load(f)
+                    stream = AgentStream(
+                        agent_id, str(route["path"]), str(route["tty"]), self.make_throttle()
+                    )
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+                self.streams[agent_id] = stream
+            if stream is not None and f"{agent_id}.done" in entries:
+                stream.done = True
+        # 登録が消された（ペインプールが表示から外した）エージェントへの配信はすぐに止める
+        for agent_id in [a for a in self.streams if f"{a}.json" not in entries]:
+            self.streams.pop(agent_id).close()
+        return True
+
+    def pump(self) -> bool:
+        """全エージェントの追記分を配信する。まだ書き残しがある場合は True。"""
+        backlog = False
+        for agent_id, stream in list(self.streams.items()):
+            at_eof = stream.read()
+            stream.tick(final=stream.done and at_eof)
+            flushed = stream.flush()
+            if stream.closed or (stream.done and at_eof and flushed):
+                self._retire(agent_id, stream)
+                continue
+            backlog = backlog or not at_eof or not flushed
+        return backlog
+
+    def _retire(self, agent_id: str, stream: AgentStream) -> None:
+        """配信を終える。ペインが閉じられた場合も登録を消す（同じ tty には二度と書けない）。"""
+        stream.close()
+        del self.streams[agent_id]
+        for suffix in (".json", ".done"):
+            try:
+                os.remove(os.path.join(self.routes_dir, agent_id + suffix))
+            except OSError:
+                pass
+
+    def _watch(self) -> bool:
+        """登録ディレクトリと出力ファイルのディレクトリを監視する。全部監視できたら True。"""
+        watched = self.watcher.add(self.routes_dir)
+        for directory in {os.path.dirname(stream.path) for stream in self.streams.values()}:
+            watched = self.watcher.add(directory) and watched
+        return watched
+
+    def run(self) -> None:
+        idle_since = time.monotonic()
+        try:
+            while self.refresh_routes():
+                watched = self._watch()
+                backlog = self.pump()
+                now = time.monotonic()
+                if self.streams:
+                    idle_since = now
+                elif now - idle_since >= IDLE_EXIT:
+                    return
+                if backlog:
+                    timeout = 0.0 if self.watcher.uses_inotify else POLL_INTERVAL / 10
+                    time.sleep(timeout)
+                    continue
+                if any(stream.throttle.has_pending for stream in self.streams.values()):
+                    self.watcher.wait(THROTTLE_WAKE)
+                else:
+                    self.watcher.wait(WAKE_INTERVAL if watched else POLL_INTERVAL)
+        finally:
+            for stream in self.streams.values():
+                stream.close()
+            self.watcher.close()
+
+
+def has_routes(routes_dir: str) -> bool:
+    """配信待ちの登録が残っているかを返す。"""
+    try:
+        return any(name.endswith(".json") for name in os.listdir(routes_dir))
+    except OSError:
+        return False
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2:
+        print("usage: tmux-output-streamer.py <session_id>", file=sys.stderr)
+        return 2
+    session_id = argv[1]
+    routes_dir = stream_routes_dir(session_id)
+    make_throttle = load_throttle_factory()
+
+    retries = 5
+    while True:
+        lock = try_lock_streamer(session_id, retries)
+        retries = 0
+        if lock is None:
+            return 0
+        try:
+            lock.seek(0)
+            lock.truncate()
+            lock.write(str(os.getpid()))
+            lock.flush()
+            Streamer(routes_dir, make_throttle).run()
+            lock.truncate(0)
+        finally:
+            lock.close()
+        # 終了判定とロック解放の間に登録された sub agent を取りこぼさない
+        if not has_routes(routes_dir):
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
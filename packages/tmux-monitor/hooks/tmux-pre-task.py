@@ -5,14 +5,13 @@ SubagentStart hook でペインタイトルに description を表示するため
 Task 実行前に description をキューに保存する。
 """
 
-import fcntl
 import json
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from tmux_common import SESSION_INFO_DIR, is_tmux_monitoring_enabled
+from tmux_common import is_tmux_monitoring_enabled, push_task_description
 
 
 def main() -> None:
@@ -32,15 +31,8 @@ def main() -> None:
     if not session_id or not description:
         sys.exit(0)
 
-    os.makedirs(SESSION_INFO_DIR, exist_ok=True)
-    queue_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.task-queue")
-
-    entry = json.dumps({"description": description})
     try:
-        with open(queue_file, "a") as f:
-            fcntl.flock(f, fcntl.LOCK_EX)
-            f.write(entry + "\n")
-            fcntl.flock(f, fcntl.LOCK_UN)
+        push_task_description(session_id, description)
     except OSError:
         pass
 
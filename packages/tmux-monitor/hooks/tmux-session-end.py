@@ -15,6 +15,8 @@ from tmux_common import (
     get_field,
     is_tmux_monitoring_enabled,
     read_hook_input,
+    stream_routes_dir,
+    task_queue_dir,
 )
 
 
@@ -42,6 +44,24 @@ def rmdir_silent(path: str) -> None:
         pass
 
 
+def remove_stream_routes(session_id: str) -> None:
+    """ストリーマーの登録ディレクトリを削除する。"""
+    import shutil
+
+    shutil.rmtree(stream_routes_dir(session_id), ignore_errors=True)
+
+
+def remove_task_queue(session_id: str) -> None:
+    """description キューを削除する（旧形式の 1 ファイルのキューも消す）。"""
+    import shutil
+
+    queue_dir = task_queue_dir(session_id)
+    if os.path.isdir(queue_dir):
+        shutil.rmtree(queue_dir, ignore_errors=True)
+    else:
+        remove_silent(queue_dir)
+
+
 def main() -> None:
     data = read_hook_input()
     cwd = get_field(data, "cwd") or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
@@ -99,12 +119,26 @@ def main() -> None:
 
                 shutil.rmtree(sd, ignore_errors=True)
 
-            for ext in (".tmux-session", ".lock-path", ".pid", ".shared-dir", ".task-queue"):
+            # ストリーマーの登録を消す（ストリーマーは登録ディレクトリの削除を検知して終了する）
+            remove_stream_routes(sid)
+            remove_task_queue(sid)
+
+            for ext in (
+                ".tmux-session",
+                ".lock-path",
+                ".pid",
+                ".shared-dir",
+                ".streamer.lock",
+                ".pane-pool",
+                ".pane-pool.lock",
+            ):
                 remove_silent(os.path.join(SESSION_INFO_DIR, sid + ext))
     else:
         # PID ファイルが無い場合 (旧形式): 現在の session_id のみクリーンアップ
         remove_silent(tmux_session_file)
         remove_silent(lock_path_file)
+        remove_stream_routes(session_id)
+        remove_task_queue(session_id)
 
 
 if __name__ == "__main__":
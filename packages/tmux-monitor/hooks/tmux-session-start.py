@@ -16,12 +16,14 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from tmux_common import (
     SESSION_INFO_DIR,
     SHARED_STORE_PREFIX,
-    find_claude_pid,
+    build_session_info,
     get_field,
     is_tmux_monitoring_enabled,
     read_hook_input,
     run_tmux,
+    run_tmux_batch,
     tmux_has_session,
+    write_session_info,
 )
 
 
@@ -62,7 +64,7 @@ def cleanup_orphaned_sessions(project_name: str) -> None:
         except OSError:
             # PID が死んでいる → 関連ファイルを削除
             sid = filename[: -len(".pid")]
-            for ext in (".tmux-session", ".lock-path", ".pid"):
+            for ext in (".tmux-session", ".lock-path", ".pid", ".pane-pool", ".pane-pool.lock"):
                 try:
                     os.remove(os.path.join(SESSION_INFO_DIR, sid + ext))
                 except OSError:
@@ -84,22 +86,15 @@ def main() -> None:
     os.makedirs(SESSION_INFO_DIR, exist_ok=True)
 
     # PID ベースのセッション名を構築 (フォールバック: session_id[:7])
-    claude_pid = find_claude_pid()
-    session_key = str(claude_pid) if claude_pid else session_id[:7]
-
-    tmux_session = f"claude-{project_name}-{session_key}"
-    first_agent_lock = f"/tmp/claude-subagent-first-{session_key}"
+    info = build_session_info(project_name, session_id)
+    tmux_session = info.tmux_session
+    first_agent_lock = info.lock_path
+    session_key = info.session_key
 
     cleanup_orphaned_sessions(project_name)
 
-    # セッション情報を保存 (SubagentStart / SessionEnd から参照)
-    for suffix, content in [
-        (".tmux-session", tmux_session),
-        (".lock-path", first_agent_lock),
-        (".pid", session_key),
-    ]:
-        with open(os.path.join(SESSION_INFO_DIR, session_id + suffix), "w") as f:
-            f.write(content)
+    # セッション情報を保存 (SubagentStart / SubagentStop / SessionEnd から参照)
+    write_session_info(session_id, info)
 
     # 前回のロックをクリーンアップ
     try:
@@ -107,7 +102,9 @@ def main() -> None:
     except OSError:
         pass
 
-    # tmux セッションの作成/再利用
+    # tmux セッションの作成/再利用（tmux 操作は 1 回の tmux 起動にまとめる）
+    wait_cmd = f"echo 'Waiting for sub agents...' && echo '({project_name} / PID:{session_key})' && echo '($(date))' && cat"
+    commands: list[tuple[str, ...]] = []
     if tmux_has_session(tmux_session):
         # /clear や /resume 時: セッションを維持し、古いペインだけ掃除する
         # （kill-session すると attach 中のクライアントが切断されるため）
@@ -115,30 +112,19 @@ def main() -> None:
         if result.returncode == 0:
             pane_ids = [p for p in result.stdout.strip().splitlines() if p]
             if pane_ids:
-                # 最初のペインを待機画面で respawn
-                wait_cmd = f"echo 'Waiting for sub agents...' && echo '({project_name} / PID:{session_key})' && echo '($(date))' && cat"
-                run_tmux("respawn-pane", "-t", pane_ids[0], "-k", wait_cmd)
+                # 最初のペインを待機画面で respawn（DONE / OVERFLOW のタイトルも戻す）
+                commands.append(("respawn-pane", "-t", pane_ids[0], "-k", wait_cmd))
+                commands.append(("select-pane", "-t", pane_ids[0], "-T", "waiting"))
                 # 残りのペインを削除
                 for pane_id in pane_ids[1:]:
-                    run_tmux("kill-pane", "-t", pane_id)
+                    commands.append(("kill-pane", "-t", pane_id))
     else:
-        run_tmux(
-            "new-session",
-            "-d",
-            "-s",
-            tmux_session,
-            f"echo 'Waiting for sub agents...' && echo '({project_name} / PID:{session_key})' && echo '($(date))' && cat",
-        )
+        commands.append(("new-session", "-d", "-s", tmux_session, wait_cmd))
 
     # ペインボーダーにエージェント名を常時表示
-    run_tmux("set-option", "-t", tmux_session, "pane-border-status", "top")
-    run_tmux(
-        "set-option",
-        "-t",
-        tmux_session,
-        "pane-border-format",
-        " #{pane_title} ",
-    )
+    commands.append(("set-option", "-t", tmux_session, "pane-border-status", "top"))
+    commands.append(("set-option", "-t", tmux_session, "pane-border-format", " #{pane_title} "))
+    run_tmux_batch(*commands)
 
     # 共有コンテキストストアの作成
     shared_dir = f"{SHARED_STORE_PREFIX}{session_key}"
@@ -3,6 +3,7 @@
 
 SessionStart hook が保存したセッション情報を参照して
 正しい tmux セッションにペインを追加する。
+出力の整形と表示はセッションに 1 つの tmux-output-streamer.py が全ペイン分をまとめて行う。
 """
 
 import os
@@ -12,12 +13,17 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from tmux_common import (
     SESSION_INFO_DIR,
-    find_claude_pid,
+    STREAMER,
+    PanePool,
+    ensure_streamer,
     get_field,
     is_tmux_monitoring_enabled,
+    load_max_panes,
+    pop_task_description,
     read_hook_input,
+    register_stream_route,
+    resolve_session_info,
     run_tmux,
-    tmux_has_session,
 )
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -29,45 +35,6 @@ def shell_quote(s: str) -> str:
     return "'" + s.replace("'", "'\\''") + "'"
 
 
-def read_file(path: str) -> str:
-    """ファイルの内容を読み取る。存在しなければ空文字を返す。"""
-    try:
-        return open(path).read().strip()
-    except OSError:
-        return ""
-
-
-def pop_task_description(session_id: str) -> str:
-    """PreToolUse hook が保存した description をキューから取得する（FIFO）。"""
-    import fcntl
-    import json
-
-    queue_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.task-queue")
-    try:
-        with open(queue_file, "r+") as f:
-            fcntl.flock(f, fcntl.LOCK_EX)
-            lines = f.readlines()
-            description = ""
-            if lines:
-                entry = json.loads(lines[0])
-                description = entry.get("description", "")
-                f.seek(0)
-                f.writelines(lines[1:])
-                f.truncate()
-            fcntl.flock(f, fcntl.LOCK_UN)
-            return description
-    except (OSError, json.JSONDecodeError, ValueError):
-        return ""
-
-
-def get_current_pane_id(tmux_session: str) -> str:
-    """セッションの現在アクティブなペイン ID を取得する。"""
-    result = run_tmux("display-message", "-t", tmux_session, "-p", "#{pane_id}")
-    if result.returncode == 0 and result.stdout.strip():
-        return result.stdout.strip()
-    return ""
-
-
 def main() -> None:
     data = read_hook_input()
     cwd = get_field(data, "cwd")
@@ -84,21 +51,8 @@ def main() -> None:
         return
 
     # SessionStart が保存したセッション情報を読み込む
-    tmux_session_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.tmux-session")
-    lock_path_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.lock-path")
-
-    tmux_session = read_file(tmux_session_file)
-    first_agent_lock = read_file(lock_path_file)
-
-    if not tmux_session or not first_agent_lock:
-        # フォールバック: SessionStart が動いていない場合
-        project_name = os.path.basename(cwd)
-
-        claude_pid = find_claude_pid()
-        session_key = str(claude_pid) if claude_pid else session_id[:7]
-
-        tmux_session = f"claude-{project_name}-{session_key}"
-        first_agent_lock = f"/tmp/claude-subagent-first-{session_key}"
+    # (SessionStart が動いていない場合は PID から組み立てて保存し、次回以降に再利用する)
+    tmux_session = resolve_session_info(session_id, cwd).tmux_session
 
     # sub agent の出力ファイルパスを構築
     session_dir = transcript_path.removesuffix(".jsonl")
@@ -122,96 +76,28 @@ def main() -> None:
     else:
         tail_cmd = wait_and_tail
 
-    # ペイン ID を追跡（並列起動時のレースコンディション回避）
-    pane_id = ""
-
-    # 現在のペイン一覧をスナップショットとして取得（並列 split-window の前に確定）
-    # waiting_pane_id: 最初のエージェントが respawn する対象
-    waiting_pane_id = ""
-    done_panes: list[str] = []
-
-    # DONE ペインの再利用（並列安全: 各エージェントが1つだけ予約）
-    respawned = False
-    if tmux_has_session(tmux_session):
-        result = run_tmux("list-panes", "-t", tmux_session, "-F", "#{pane_id}\t#{pane_title}")
-        if result.returncode == 0:
-            lines = [line for line in result.stdout.strip().splitlines() if line]
-            for line in lines:
-                parts = line.split("\t", 1)
-                if len(parts) == 2:
-                    if parts[1].startswith("DONE:"):
-                        done_panes.append(parts[0])
-                    elif not waiting_pane_id:
-                        # DONE でない最初のペイン = 待機ペイン候補
-                        waiting_pane_id = parts[0]
-
-            # DONE ペインを1つだけ予約して respawn（mkdir でアトミックに排他制御）
-            for dp in done_panes:
-                claim_path = os.path.join(SESSION_INFO_DIR, f"{session_id}.claim-{dp}")
-                try:
-                    os.mkdir(claim_path)
-                except OSError:
-                    # 他のプロセスが先に予約した → 次の DONE ペインを試す
-                    continue
-                # このプロセスが dp を予約できた
-                resp = run_tmux("respawn-pane", "-t", dp, "-k", tail_cmd)
-                if resp.returncode == 0:
-                    # タイトル設定後に claim 解放（二重取得防止）
-                    run_tmux("select-pane", "-t", dp, "-T", pane_title)
-                    try:
-                        os.rmdir(claim_path)
-                    except OSError:
-                        pass
-                    pane_id = dp
-                    respawned = True
-                    break
-                # respawn 失敗 → claim 解放して次の DONE ペインを試す
-                try:
-                    os.rmdir(claim_path)
-                except OSError:
-                    pass
-
-    # tmux セッションにペインを追加（DONE ペインを再利用しなかった場合）
-    need_split = False
-    if respawned:
-        pass  # respawn 済み、pane_id は設定済み
-    elif tmux_has_session(tmux_session):
-        # mkdir はアトミック操作 - 最初の1つだけが成功する
-        try:
-            os.mkdir(first_agent_lock)
-            # 最初の sub agent: 待機ペインを置き換え（明示的ペイン ID で競合回避）
-            target_pane = waiting_pane_id or get_current_pane_id(tmux_session)
-            resp = run_tmux("respawn-pane", "-t", target_pane, "-k", tail_cmd)
-            if resp.returncode == 0:
-                pane_id = target_pane
-            else:
-                # respawn 失敗 → split-window フォールバック
-                need_split = True
-        except OSError:
-            # 2つ目以降 → split-window
-            need_split = True
-        if need_split:
-            MAX_SPLIT_RETRIES = 3
-            for _attempt in range(MAX_SPLIT_RETRIES):
-                run_tmux("select-layout", "-t", tmux_session, "tiled")
-                result = run_tmux(
-                    "split-window", "-t", tmux_session, "-P", "-F", "#{pane_id}", tail_cmd
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    pane_id = result.stdout.strip()
-                    break
-            run_tmux("select-layout", "-t", tmux_session, "tiled")
-    else:
-        # SessionStart hook が動いていない場合のフォールバック
-        run_tmux("new-session", "-d", "-s", tmux_session, tail_cmd)
-        pane_id = get_current_pane_id(tmux_session)
-
-    # ペインタイトルを設定（明示的なペイン ID 指定で競合回避）
-    if pane_id:
-        run_tmux("select-pane", "-t", pane_id, "-T", pane_title)
-    else:
-        # フォールバック: pane_id が取れなかった場合はセッション指定
-        run_tmux("select-pane", "-t", tmux_session, "-T", pane_title)
+    # ストリーマー方式: ペインはタイトルを表示して待機するだけにし、
+    # セッションに 1 つのストリーマーが整形済みの出力をペインの tty に書き込む
+    use_streamer = os.path.isfile(STREAMER) and os.path.isfile(FORMATTER)
+    pane_cmd = f"echo {safe_title} && exec cat" if use_streamer else tail_cmd
+
+    # ペインを割り当てる（DONE / 待機ペインの再利用 → 分割 → 上限到達時は最古のペインを回す）
+    pool = PanePool(session_id, tmux_session, load_max_panes(cwd))
+    slot = pool.acquire(agent_id, pane_title, pane_cmd)
+    pane_id = slot.pane_id if slot else ""
+
+    # ストリーマーに配信先を登録（tty が取れなければ従来の tail 方式に切り替える）
+    if use_streamer and slot:
+        streamed = False
+        if slot.tty:
+            try:
+                register_stream_route(session_id, agent_id, output_file, slot.tty)
+                ensure_streamer(session_id)
+                streamed = True
+            except OSError:
+                pass
+        if not streamed:
+            run_tmux("respawn-pane", "-t", pane_id, "-k", tail_cmd)
 
     # agent_id -> pane 情報を保存（pane_id も含めて保存）
     pane_info_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.pane-{agent_id}")
@@ -3,7 +3,7 @@
 
 SubagentStart hook が作成した tmux ペインに対して、
 ペインタイトルとスタイルを更新して完了を視覚的に示す。
-tail -f は維持し、出力内容を保持したままにする。
+ペインは維持し、出力内容を保持したままにする（ストリーマーは残りの出力を流し切って配信を止める）。
 """
 
 import os
@@ -12,12 +12,16 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from tmux_common import (
+    DONE_PREFIX,
     SESSION_INFO_DIR,
-    find_claude_pid,
+    PanePool,
+    finish_stream_route,
     get_field,
     is_tmux_monitoring_enabled,
     read_hook_input,
+    resolve_session_info,
     run_tmux,
+    run_tmux_batch,
     tmux_has_session,
 )
 
@@ -62,12 +66,37 @@ def find_pane_by_title(tmux_session: str, agent_id: str) -> tuple[str, str]:
     return "", ""
 
 
-def get_pane_title(pane_id: str) -> str:
-    """指定ペインの現在のタイトルを取得する。"""
-    result = run_tmux("display-message", "-t", pane_id, "-p", "#{pane_title}")
-    if result.returncode == 0:
-        return result.stdout.strip()
-    return ""
+def mark_pane_done(tmux_session: str, pane_id: str, agent_id: str) -> None:
+    """ペインのタイトルに DONE を付け、ボーダーを緑にする。
+
+    pane_id がセッション内に無い（または空の）場合はタイトルから agent_id のペインを探す。
+    """
+    current_title = ""
+    if pane_id:
+        # pane_id がセッション内に存在するか確認（タイトルも同時に取得）
+        result = run_tmux("list-panes", "-t", tmux_session, "-F", "#{pane_id}\t#{pane_title}")
+        titles = (
+            dict(line.split("\t", 1) for line in result.stdout.splitlines() if "\t" in line)
+            if result.returncode == 0
+            else {}
+        )
+        if pane_id in titles:
+            current_title = titles[pane_id]
+        else:
+            pane_id = ""
+    if not pane_id:
+        # フォールバック: タイトルベースの検索（旧形式互換）
+        pane_id, current_title = find_pane_by_title(tmux_session, agent_id)
+    if not pane_id:
+        return
+
+    # 完了通知: 現在のタイトル（description 入り）を保持して DONE を付与し、ボーダーを緑にする
+    commands: list[tuple[str, ...]] = []
+    if not current_title.startswith(DONE_PREFIX):
+        commands.append(("select-pane", "-t", pane_id, "-T", f"{DONE_PREFIX} {current_title}"))
+    commands.append(("set-option", "-t", pane_id, "pane-border-style", "fg=green"))
+    commands.append(("set-option", "-t", pane_id, "pane-active-border-style", "fg=green"))
+    run_tmux_batch(*commands)
 
 
 def main() -> None:
@@ -83,46 +112,28 @@ def main() -> None:
     if not agent_id or not session_id:
         return
 
-    # セッション情報を読み込む（pane info → tmux-session の順で試行）
+    # ストリーマーに終了を伝える（残りの出力を流し切ってから配信を止める）
+    finish_stream_route(session_id, agent_id)
+
+    # セッション情報を読み込む（pane info → 保存済みセッション情報の順で試行）
     pane_info_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.pane-{agent_id}")
-    tmux_session_file = os.path.join(SESSION_INFO_DIR, f"{session_id}.tmux-session")
 
     tmux_session, pane_id = read_pane_info(pane_info_file)
 
     if not tmux_session:
-        tmux_session = read_file(tmux_session_file)
-
-    if not tmux_session:
-        # フォールバック: PID ベースのセッション名を試行
-        project_name = os.path.basename(cwd) if cwd else "unknown"
-        claude_pid = find_claude_pid()
-        session_key = str(claude_pid) if claude_pid else session_id[:7]
-        tmux_session = f"claude-{project_name}-{session_key}"
+        # フォールバック: 保存済みセッション情報（なければ PID ベースで組み立てて保存）
+        tmux_session = resolve_session_info(session_id, cwd).tmux_session
 
     if not tmux_has_session(tmux_session):
         return
 
-    # ペインを特定（pane_id が保存されていればそれを使い、なければタイトル検索）
-    current_title = ""
-    if pane_id:
-        # pane_id がセッション内に存在するか確認
-        check = run_tmux("list-panes", "-t", tmux_session, "-F", "#{pane_id}")
-        if check.returncode == 0 and pane_id in check.stdout.splitlines():
-            current_title = get_pane_title(pane_id)
-        else:
-            pane_id = ""
-    if not pane_id:
-        # フォールバック: タイトルベースの検索（旧形式互換）
-        pane_id, current_title = find_pane_by_title(tmux_session, agent_id)
-
-    if pane_id:
-        # 完了通知: 現在のタイトル（description 入り）を保持して DONE を付与
-        if not current_title.startswith("DONE:"):
-            run_tmux("select-pane", "-t", pane_id, "-T", f"DONE: {current_title}")
-
-        # ペインのボーダースタイルを緑に変更
-        run_tmux("set-option", "-t", pane_id, "pane-border-style", "fg=green")
-        run_tmux("set-option", "-t", pane_id, "pane-active-border-style", "fg=green")
+    # プールが割り当てたペインはロック内で DONE にする（途中で別の sub agent に回されないように）
+    # プールの記録がなければ pane info / タイトル検索でペインを特定する
+    pool = PanePool(session_id, tmux_session)
+    if not pool.release(
+        agent_id, lambda pool_pane: mark_pane_done(tmux_session, pool_pane, agent_id)
+    ):
+        mark_pane_done(tmux_session, pane_id, agent_id)
 
     # pane info ファイルを削除（クリーンアップ）
     try:
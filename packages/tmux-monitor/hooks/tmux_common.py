@@ -5,10 +5,16 @@ packages 版: orchestration-flags.yaml ではなく tmux の存在チェック
 パッケージをアンインストールすれば無効になる。
 """
 
+import contextlib
+import fcntl
+import json
 import os
 import shutil
 import subprocess
 import sys
+import time
+from collections.abc import Callable, Iterator, Sequence
+from typing import NamedTuple
 
 # core パッケージの hook_common を参照
 _orchestra_dir = os.environ.get("AI_ORCHESTRA_DIR", "")
@@ -17,54 +23,319 @@ if _orchestra_dir:
     if _core_hooks not in sys.path:
         sys.path.insert(0, _core_hooks)
 
-from hook_common import get_field, read_hook_input  # noqa: F401 (re-export)
+from hook_common import get_field, load_package_config, read_hook_input  # noqa: F401 (re-export)
 
 SESSION_INFO_DIR = "/tmp/claude-session-info"
 SHARED_STORE_PREFIX = "/tmp/claude-shared-"
 
+# セッションごとに 1 つ起動する出力ストリーマー
+STREAMER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmux-output-streamer.py")
+
+# Linux の procfs（存在しない環境では ps にフォールバックする）
+PROC_DIR = "/proc"
+
+# find_claude_pid() が遡る親プロセスの最大数
+MAX_ANCESTOR_DEPTH = 5
+
+
+class SessionInfo(NamedTuple):
+    """SessionStart が session info ディレクトリに保存する tmux セッション情報。"""
+
+    tmux_session: str
+    lock_path: str
+    session_key: str
+
+
+def _read_proc_process(pid: int) -> tuple[str, int] | None:
+    """/proc/<pid>/comm と /proc/<pid>/stat から (comm, ppid) を読む。"""
+    base = os.path.join(PROC_DIR, str(pid))
+    try:
+        with open(os.path.join(base, "comm"), encoding="utf-8", errors="replace") as f:
+            comm = f.read().strip()
+        with open(os.path.join(base, "stat"), encoding="utf-8", errors="replace") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # stat は "pid (comm) state ppid ..."。comm に空白や括弧を含みうるため最後の ")" 以降を読む
+    fields = stat[stat.rfind(")") + 1 :].split()
+    try:
+        return comm, int(fields[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _read_ps_process(pid: int) -> tuple[str, int] | None:
+    """ps から (comm, ppid) を読む（procfs のない macOS 等向け）。"""
+    try:
+        result = subprocess.run(
+            ["ps", "-o", "comm=", "-p", str(pid)],
+            capture_output=True,
+            text=True,
+        )
+        comm = result.stdout.strip()
+        if not comm:
+            return None
+        if "claude" in comm:
+            # 目的のプロセスなら ppid は不要（ps の起動を 1 回省く）
+            return comm, 0
+        result = subprocess.run(
+            ["ps", "-o", "ppid=", "-p", str(pid)],
+            capture_output=True,
+            text=True,
+        )
+        return comm, int(result.stdout.strip())
+    except (OSError, ValueError):
+        return None
+
 
 def find_claude_pid() -> int | None:
     """プロセスツリーを遡って claude プロセスの PID を探す。
 
+    Linux では /proc を直接読み（サブプロセスを起動しない）、procfs がなければ ps を使う。
+
     成功時: PID (int) を返す
     失敗時: None を返す
     """
+    read_process = _read_proc_process if os.path.isdir(PROC_DIR) else _read_ps_process
     pid = os.getppid()
-    max_depth = 5
 
-    for _ in range(max_depth):
+    for _ in range(MAX_ANCESTOR_DEPTH):
         if pid <= 1:
             return None
 
-        try:
-            result = subprocess.run(
-                ["ps", "-o", "comm=", "-p", str(pid)],
-                capture_output=True,
-                text=True,
-            )
-            comm = result.stdout.strip()
-        except OSError:
-            return None
-
-        if not comm:
+        process = read_process(pid)
+        if process is None:
             return None
 
+        comm, ppid = process
         if "claude" in comm:
             return pid
+        pid = ppid
 
-        try:
-            result = subprocess.run(
-                ["ps", "-o", "ppid=", "-p", str(pid)],
-                capture_output=True,
-                text=True,
-            )
-            pid = int(result.stdout.strip())
-        except (OSError, ValueError):
-            return None
+    return None
+
+
+def _session_info_path(session_id: str, suffix: str) -> str:
+    return os.path.join(SESSION_INFO_DIR, session_id + suffix)
+
+
+def _read_info_file(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def build_session_info(project_name: str, session_id: str) -> SessionInfo:
+    """claude の PID からセッション情報を組み立てる（PID 検出失敗時は session_id[:7]）。"""
+    claude_pid = find_claude_pid()
+    session_key = str(claude_pid) if claude_pid else session_id[:7]
+    return SessionInfo(
+        tmux_session=f"claude-{project_name}-{session_key}",
+        lock_path=f"/tmp/claude-subagent-first-{session_key}",
+        session_key=session_key,
+    )
+
+
+def write_session_info(session_id: str, info: SessionInfo) -> None:
+    """セッション情報を保存する（SubagentStart / SubagentStop / SessionEnd から参照）。
 
+    並行する hook が書きかけのファイルを読まないよう、一時ファイルから rename する。
+    """
+    os.makedirs(SESSION_INFO_DIR, exist_ok=True)
+    for suffix, content in [
+        (".tmux-session", info.tmux_session),
+        (".lock-path", info.lock_path),
+        (".pid", info.session_key),
+    ]:
+        path = _session_info_path(session_id, suffix)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def resolve_session_info(session_id: str, cwd: str) -> SessionInfo:
+    """保存済みのセッション情報を返す。なければ組み立てて保存する。
+
+    SessionStart が動いていない場合でも、最初の 1 回だけプロセスツリーを遡り、
+    以降の SubagentStart / SubagentStop はファイルの読み出しだけで解決する。
+    """
+    tmux_session = _read_info_file(_session_info_path(session_id, ".tmux-session"))
+    lock_path = _read_info_file(_session_info_path(session_id, ".lock-path"))
+    if tmux_session and lock_path:
+        session_key = _read_info_file(_session_info_path(session_id, ".pid"))
+        return SessionInfo(tmux_session, lock_path, session_key)
+
+    info = build_session_info(os.path.basename(cwd) if cwd else "unknown", session_id)
+    try:
+        write_session_info(session_id, info)
+    except OSError:
+        pass
+    return info
+
+
+def stream_routes_dir(session_id: str) -> str:
+    """ストリーマーの配信先（agent_id → ペインの tty）を置くディレクトリを返す。"""
+    return os.path.join(SESSION_INFO_DIR, f"{session_id}.stream")
+
+
+def register_stream_route(session_id: str, agent_id: str, output_file: str, tty: str) -> None:
+    """sub agent の出力ファイルと表示先ペインの tty をストリーマーに登録する。"""
+    routes_dir = stream_routes_dir(session_id)
+    os.makedirs(routes_dir, exist_ok=True)
+    path = os.path.join(routes_dir, f"{agent_id}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"path": output_file, "tty": tty}, f)
+    os.replace(tmp_path, path)
+
+
+def finish_stream_route(session_id: str, agent_id: str) -> None:
+    """sub agent の終了をストリーマーに伝える（残りの出力を流し切ってから配信を止める）。"""
+    routes_dir = stream_routes_dir(session_id)
+    if not os.path.isfile(os.path.join(routes_dir, f"{agent_id}.json")):
+        return
+    try:
+        with open(os.path.join(routes_dir, f"{agent_id}.done"), "w"):
+            pass
+    except OSError:
+        pass
+
+
+def try_lock_streamer(session_id: str, retries: int = 0):
+    """ストリーマーの生存ロックを非ブロッキングで取得する。取得できればファイルオブジェクトを返す。
+
+    retries > 0 の場合は短い間隔で再試行する（ensure_streamer() の稼働確認と衝突した
+    起動直後のストリーマーが、配信を始めないまま終了しないようにするため）。
+    """
+    os.makedirs(SESSION_INFO_DIR, exist_ok=True)
+    f = open(os.path.join(SESSION_INFO_DIR, f"{session_id}.streamer.lock"), "a+")
+    for attempt in range(retries + 1):
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return f
+        except OSError:
+            if attempt < retries:
+                time.sleep(0.02)
+    f.close()
     return None
 
 
+def ensure_streamer(session_id: str) -> bool:
+    """セッションのストリーマーが稼働していなければデタッチして起動する。起動した場合は True。
+
+    同時に起動された場合は、生存ロックを取れなかった方がすぐに終了する。
+    """
+    lock = try_lock_streamer(session_id)
+    if lock is None:
+        return False
+    lock.close()
+    subprocess.Popen(
+        [sys.executable, STREAMER, session_id],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Task description キュー
+# ---------------------------------------------------------------------------
+#
+# PreToolUse（push）と SubagentStart（pop）の間で description を受け渡す FIFO。
+# {session_id}.task-queue/ ディレクトリに 1 件 1 ファイルで置き、ロックを使わない:
+#
+#   {seq:08d}.json   要素（一時ファイルからの link で作るため、書きかけは見えない）
+#   {seq:08d}.taken  取り出し済みの印（O_EXCL で作れた 1 プロセスだけが要素を受け取る）
+#   head / tail      次に push / pop する seq のヒント（シンボリックリンク。古くても前方に探索し直すだけ）
+#
+# 要素ファイルは取り出し後も残すため seq は再利用されない（SessionEnd でディレクトリごと削除）。
+
+
+def task_queue_dir(session_id: str) -> str:
+    """description キューのディレクトリを返す。"""
+    return os.path.join(SESSION_INFO_DIR, f"{session_id}.task-queue")
+
+
+def _queue_slot(queue_dir: str, seq: int, suffix: str) -> str:
+    return os.path.join(queue_dir, f"{seq:08d}{suffix}")
+
+
+def _read_hint(path: str) -> int:
+    try:
+        return max(int(os.readlink(path)), 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_hint(path: str, value: int) -> None:
+    # ヒントはリンク先の文字列に持つ（readlink 1 回で読め、作成と置き換えも通常ファイルより軽い）
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.symlink(str(value), tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def push_task_description(session_id: str, description: str) -> None:
+    """description をキューの末尾に追加する。"""
+    queue_dir = task_queue_dir(session_id)
+    if os.path.isfile(queue_dir):
+        # 旧形式（1 ファイルに追記するキュー）が残っていれば置き換える
+        os.remove(queue_dir)
+    os.makedirs(queue_dir, exist_ok=True)
+
+    tmp_path = os.path.join(queue_dir, f".push-{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"description": description}, f, ensure_ascii=False)
+    head_path = os.path.join(queue_dir, "head")
+    seq = _read_hint(head_path)
+    try:
+        while True:
+            try:
+                os.link(tmp_path, _queue_slot(queue_dir, seq, ".json"))
+                break
+            except FileExistsError:
+                seq += 1
+    finally:
+        os.remove(tmp_path)
+    _write_hint(head_path, seq + 1)
+
+
+def pop_task_description(session_id: str) -> str:
+    """PreToolUse hook が保存した description をキューから取得する（FIFO）。空なら空文字。
+
+    並行する SubagentStart 同士は互いを待たない（.taken の作成に負けた側は次の要素を試す）。
+    """
+    queue_dir = task_queue_dir(session_id)
+    tail_path = os.path.join(queue_dir, "tail")
+    seq = _read_hint(tail_path)
+    while True:
+        item_path = _queue_slot(queue_dir, seq, ".json")
+        if not os.path.exists(item_path):
+            return ""
+        try:
+            os.close(os.open(_queue_slot(queue_dir, seq, ".taken"), os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            seq += 1
+            continue
+        except OSError:
+            return ""
+        _write_hint(tail_path, seq + 1)
+        try:
+            with open(item_path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return ""
+        return str(entry.get("description", "")) if isinstance(entry, dict) else ""
+
+
 def run_tmux(*args: str) -> subprocess.CompletedProcess[str]:
     """tmux コマンドを実行する。エラーは無視する。"""
     return subprocess.run(
@@ -74,6 +345,20 @@ def run_tmux(*args: str) -> subprocess.CompletedProcess[str]:
     )
 
 
+def run_tmux_batch(*commands: Sequence[str]) -> subprocess.CompletedProcess[str]:
+    """複数の tmux コマンドを ";" で連結し、1 回の tmux 起動で順に実行する。
+
+    tmux は末尾が ";" の引数も区切りとして扱うため、そうした引数（タイトル等）は "\\;" に
+    エスケープして渡す。
+    """
+    argv: list[str] = []
+    for command in commands:
+        if argv:
+            argv.append(";")
+        argv.extend(arg[:-1] + "\\;" if arg.endswith(";") else arg for arg in command)
+    return run_tmux(*argv)
+
+
 def tmux_has_session(session_name: str) -> bool:
     """tmux セッションが存在するか確認する。"""
     result = run_tmux("has-session", "-t", session_name)
@@ -87,3 +372,267 @@ def is_tmux_monitoring_enabled(cwd: str) -> bool:
     プラグインをアンインストールすれば無効になる。
     """
     return bool(shutil.which("tmux"))
+
+
+# ---------------------------------------------------------------------------
+# ペインプール
+# ---------------------------------------------------------------------------
+
+# 同時に表示する sub agent ペインの既定の上限（config/tmux-monitor.json の max_panes、0 以下は無制限）
+DEFAULT_MAX_PANES = 6
+
+DONE_PREFIX = "DONE:"
+
+# 上限を超えて表示から外した sub agent を一覧するペインのタイトル
+OVERFLOW_TITLE = "OVERFLOW"
+
+# list-panes / split-window -P で取得するペイン情報（タイトルはタブを含みうるため最後）
+PANE_FORMAT = "#{pane_id}\t#{pane_tty}\t#{pane_title}"
+
+
+class PaneSlot(NamedTuple):
+    """tmux ペイン 1 つの情報。"""
+
+    pane_id: str
+    tty: str
+    title: str = ""
+
+
+def parse_pane_line(line: str) -> PaneSlot | None:
+    """PANE_FORMAT で出力された 1 行を PaneSlot にする。"""
+    parts = line.split("\t", 2)
+    if len(parts) < 2 or not parts[0]:
+        return None
+    return PaneSlot(parts[0], parts[1], parts[2] if len(parts) == 3 else "")
+
+
+def load_max_panes(cwd: str) -> int:
+    """tmux-monitor 設定の max_panes を返す（未設定なら DEFAULT_MAX_PANES）。"""
+    config = load_package_config("tmux-monitor", "tmux-monitor.json", cwd)
+    try:
+        return int(config.get("max_panes", DEFAULT_MAX_PANES))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_PANES
+
+
+def write_to_tty(tty: str, text: str) -> None:
+    """ペインの tty に直接書き込む（書けなければ何もしない）。"""
+    try:
+        fd = os.open(tty, os.O_WRONLY | os.O_NOCTTY | os.O_NONBLOCK)
+    except OSError:
+        return
+    try:
+        os.write(fd, text.encode("utf-8", "replace"))
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PanePool:
+    """tmux セッション内の sub agent ペインの割り当てを管理する。
+
+    - DONE ペイン（SubagentStop 済み）と SessionStart の待機ペインを優先して再利用する
+    - 表示中の sub agent が max_panes に達したら、最も古いものを表示から外して
+      そのペインを新しい sub agent に回す（直近 max_panes 件のリング）。外した sub agent は
+      オーバーフローペインに一覧する
+    - 割り当ての判断と tmux 操作は {session_id}.pane-pool.lock の排他ロック内で行い、
+      1 回の割り当ての tmux 操作は run_tmux_batch() でまとめて実行する
+
+    状態（リングとオーバーフロー）は {session_id}.pane-pool に JSON で保存する。
+    """
+
+    def __init__(self, session_id: str, tmux_session: str, max_panes: int = DEFAULT_MAX_PANES):
+        self.session_id = session_id
+        self.tmux_session = tmux_session
+        self.max_panes = max_panes
+        self.state_path = os.path.join(SESSION_INFO_DIR, f"{session_id}.pane-pool")
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        os.makedirs(SESSION_INFO_DIR, exist_ok=True)
+        with open(f"{self.state_path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if not isinstance(state, dict):
+            state = {}
+        state.setdefault("ring", [])
+        state.setdefault("overflow", [])
+        return state
+
+    def _save(self, state: dict) -> None:
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def list_panes(self) -> list[PaneSlot] | None:
+        """セッションのペイン一覧。セッションがなければ None。"""
+        result = run_tmux("list-panes", "-t", self.tmux_session, "-F", PANE_FORMAT)
+        if result.returncode != 0:
+            return None
+        slots = (parse_pane_line(line) for line in result.stdout.splitlines())
+        return [slot for slot in slots if slot is not None]
+
+    # ------------------------------------------------------------------
+    # 割り当て
+    # ------------------------------------------------------------------
+
+    def acquire(self, agent_id: str, title: str, command: str) -> PaneSlot | None:
+        """sub agent にペインを割り当てて command を起動する。失敗したら None。"""
+        with self._locked():
+            state = self._load()
+            panes = self.list_panes()
+            if panes is None:
+                slot = self._new_session(title, command)
+                state = {"ring": [], "overflow": []}
+            else:
+                slot = self._assign(state, panes, title, command)
+            if slot is None:
+                return None
+            state["ring"].append({"agent": agent_id, "pane": slot.pane_id, "title": title})
+            self._save(state)
+            return slot
+
+    def _assign(
+        self, state: dict, panes: list[PaneSlot], title: str, command: str
+    ) -> PaneSlot | None:
+        present = {pane.pane_id: pane for pane in panes}
+        ring = [entry for entry in state["ring"] if entry.get("pane") in present]
+        state["ring"] = ring
+        in_ring = {entry["pane"] for entry in ring}
+        overflow_pane = next((p for p in panes if p.title.startswith(OVERFLOW_TITLE)), None)
+
+        # DONE ペイン → 待機ペイン（リング外で DONE でもオーバーフローでもない）の順に再利用
+        free = [p for p in panes if p.pane_id not in in_ring and p is not overflow_pane]
+        free.sort(key=lambda p: not p.title.startswith(DONE_PREFIX))
+        if free:
+            return self._respawn(free[0].pane_id, title, command)
+
+        if self.max_panes <= 0 or len(ring) < self.max_panes:
+            return self._split(title, command)
+
+        # 上限到達: 最も古い sub agent を表示から外し、そのペインを回す
+        victim = ring.pop(0)
+        state["overflow"].append({"agent": victim["agent"], "title": victim.get("title", "")})
+        _remove_silent(os.path.join(SESSION_INFO_DIR, f"{self.session_id}.pane-{victim['agent']}"))
+        _remove_silent(os.path.join(stream_routes_dir(self.session_id), f"{victim['agent']}.json"))
+        overflow_title = f"{OVERFLOW_TITLE} ({len(state['overflow'])})"
+        if overflow_pane is None:
+            overflow_pane = self._split(
+                overflow_title, "echo '=== overflow: older sub agents ===' && exec cat"
+            )
+            extra: list[Sequence[str]] = []
+        else:
+            extra = [("select-pane", "-t", overflow_pane.pane_id, "-T", overflow_title)]
+        if overflow_pane is not None:
+            write_to_tty(overflow_pane.tty, f"▶ {victim.get('title', victim['agent'])}\n")
+        return self._respawn(victim["pane"], title, command, extra)
+
+    def _respawn(
+        self, pane_id: str, title: str, command: str, extra: Sequence[Sequence[str]] = ()
+    ) -> PaneSlot | None:
+        result = run_tmux_batch(
+            *extra,
+            ("respawn-pane", "-k", "-t", pane_id, command),
+            ("select-pane", "-t", pane_id, "-T", title),
+            ("display-message", "-p", "-t", pane_id, PANE_FORMAT),
+        )
+        if result.returncode != 0:
+            return None
+        lines = result.stdout.splitlines()
+        return parse_pane_line(lines[-1]) if lines else PaneSlot(pane_id, "", title)
+
+    def _split(self, title: str, command: str) -> PaneSlot | None:
+        # split-window 直後は新しいペインがアクティブになるため、-t セッションで新ペインを指せる
+        result = run_tmux_batch(
+            ("split-window", "-t", self.tmux_session, "-P", "-F", PANE_FORMAT, command),
+            ("select-pane", "-t", self.tmux_session, "-T", title),
+            ("select-layout", "-t", self.tmux_session, "tiled"),
+        )
+        if result.returncode != 0:
+            # ペインが小さすぎて分割できない場合など: レイアウトを整えて 1 回だけ再試行
+            result = run_tmux_batch(
+                ("select-layout", "-t", self.tmux_session, "tiled"),
+                ("split-window", "-t", self.tmux_session, "-P", "-F", PANE_FORMAT, command),
+                ("select-pane", "-t", self.tmux_session, "-T", title),
+                ("select-layout", "-t", self.tmux_session, "tiled"),
+            )
+            if result.returncode != 0:
+                return None
+        return _created_slot(result.stdout, title)
+
+    def _new_session(self, title: str, command: str) -> PaneSlot | None:
+        # SessionStart hook が動いていない場合のフォールバック
+        result = run_tmux_batch(
+            ("new-session", "-d", "-s", self.tmux_session, "-P", "-F", PANE_FORMAT, command),
+            ("select-pane", "-t", self.tmux_session, "-T", title),
+        )
+        if result.returncode != 0:
+            return None
+        return _created_slot(result.stdout, title)
+
+    # ------------------------------------------------------------------
+    # 解放
+    # ------------------------------------------------------------------
+
+    def release(self, agent_id: str, on_done: Callable[[str], None] | None = None) -> bool:
+        """sub agent の終了を記録する。プールが割り当てた sub agent なら True。
+
+        リング内の sub agent なら、ロックを保持したまま on_done(pane_id) を呼ぶ（DONE 表示の
+        途中でペインが別の sub agent に回されないようにするため）。ペインは DONE 表示のまま残り、
+        次の acquire() で再利用される。オーバーフロー中の sub agent ならオーバーフローペインに
+        完了を表示する。
+        """
+        with self._locked():
+            state = self._load()
+            entry = next((e for e in state["ring"] if e.get("agent") == agent_id), None)
+            if entry is not None:
+                if on_done is not None:
+                    on_done(entry["pane"])
+                state["ring"].remove(entry)
+            else:
+                entry = next((e for e in state["overflow"] if e.get("agent") == agent_id), None)
+                if entry is None:
+                    return False
+                state["overflow"].remove(entry)
+                self._mark_overflow_done(entry, len(state["overflow"]))
+            self._save(state)
+            return True
+
+    def _mark_overflow_done(self, entry: dict, remaining: int) -> None:
+        panes = self.list_panes() or []
+        overflow_pane = next((p for p in panes if p.title.startswith(OVERFLOW_TITLE)), None)
+        if overflow_pane is None:
+            return
+        write_to_tty(overflow_pane.tty, f"✓ {entry.get('title') or entry.get('agent')}\n")
+        run_tmux(
+            "select-pane", "-t", overflow_pane.pane_id, "-T", f"{OVERFLOW_TITLE} ({remaining})"
+        )
+
+
+def _created_slot(output: str, title: str) -> PaneSlot | None:
+    """split-window / new-session -P の出力からペイン情報を返す。
+
+    -P の出力はタイトル設定前の値のため、設定したタイトルに差し替える。
+    """
+    lines = output.splitlines()
+    slot = parse_pane_line(lines[0]) if lines else None
+    return slot._replace(title=title) if slot else None
+
+
+def _remove_silent(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
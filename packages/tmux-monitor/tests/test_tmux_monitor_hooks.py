@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import json
 import os
+import shutil
+import subprocess
 import sys
+import time
 from types import SimpleNamespace
 
+import pytest
+
 from tests.module_loader import REPO_ROOT, load_module
 
 os.environ["AI_ORCHESTRA_DIR"] = str(REPO_ROOT)
@@ -57,7 +63,40 @@ def test_is_tmux_monitoring_enabled_depends_on_tmux_binary(monkeypatch) -> None:
     assert not tmux_common.is_tmux_monitoring_enabled(".")
 
 
-def test_find_claude_pid_finds_parent_process(monkeypatch) -> None:
+def _write_proc(proc_dir, pid: int, comm: str, ppid: int) -> None:
+    entry = proc_dir / str(pid)
+    entry.mkdir(parents=True)
+    (entry / "comm").write_text(comm + "\n", encoding="utf-8")
+    (entry / "stat").write_text(f"{pid} ({comm}) S {ppid} {pid} {pid} 0 -1\n", encoding="utf-8")
+
+
+def test_find_claude_pid_reads_procfs_without_subprocess(monkeypatch, tmp_path) -> None:
+    proc_dir = tmp_path / "proc"
+    _write_proc(proc_dir, 200, "sh (hook) x", 150)
+    _write_proc(proc_dir, 150, "zsh", 120)
+    _write_proc(proc_dir, 120, "claude", 1)
+    monkeypatch.setattr(tmux_common, "PROC_DIR", str(proc_dir))
+    monkeypatch.setattr(tmux_common.os, "getppid", lambda: 200)
+
+    def fail_run(*args, **kwargs):
+        raise AssertionError("ps must not be used when procfs is available")
+
+    monkeypatch.setattr(tmux_common.subprocess, "run", fail_run)
+
+    assert tmux_common.find_claude_pid() == 120
+
+
+def test_find_claude_pid_returns_none_when_process_vanishes(monkeypatch, tmp_path) -> None:
+    proc_dir = tmp_path / "proc"
+    _write_proc(proc_dir, 200, "zsh", 150)
+    monkeypatch.setattr(tmux_common, "PROC_DIR", str(proc_dir))
+    monkeypatch.setattr(tmux_common.os, "getppid", lambda: 200)
+
+    assert tmux_common.find_claude_pid() is None
+
+
+def test_find_claude_pid_finds_parent_process(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(tmux_common, "PROC_DIR", str(tmp_path / "no-proc"))
     monkeypatch.setattr(tmux_common.os, "getppid", lambda: 200)
 
     def fake_run(cmd, capture_output, text):
@@ -74,7 +113,8 @@ def test_find_claude_pid_finds_parent_process(monkeypatch) -> None:
     assert tmux_common.find_claude_pid() == 150
 
 
-def test_find_claude_pid_returns_none_on_os_error(monkeypatch) -> None:
+def test_find_claude_pid_returns_none_on_os_error(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(tmux_common, "PROC_DIR", str(tmp_path / "no-proc"))
     monkeypatch.setattr(tmux_common.os, "getppid", lambda: 200)
 
     def fake_run(*args, **kwargs):
@@ -84,6 +124,94 @@ def test_find_claude_pid_returns_none_on_os_error(monkeypatch) -> None:
     assert tmux_common.find_claude_pid() is None
 
 
+def test_resolve_session_info_caches_built_info(monkeypatch, tmp_path) -> None:
+    calls: list[int] = []
+
+    def fake_find_claude_pid() -> int:
+        calls.append(1)
+        return 4321
+
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+    monkeypatch.setattr(tmux_common, "find_claude_pid", fake_find_claude_pid)
+
+    first = tmux_common.resolve_session_info("sess-1", "/work/proj")
+    second = tmux_common.resolve_session_info("sess-1", "/work/proj")
+
+    assert (
+        first
+        == second
+        == tmux_common.SessionInfo("claude-proj-4321", "/tmp/claude-subagent-first-4321", "4321")
+    )
+    assert calls == [1]
+    assert (tmp_path / "sess-1.pid").read_text() == "4321"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_resolve_session_info_prefers_session_start_files(monkeypatch, tmp_path) -> None:
+    (tmp_path / "sess-1.tmux-session").write_text("claude-proj-99")
+    (tmp_path / "sess-1.lock-path").write_text("/tmp/lock-99")
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+    monkeypatch.setattr(tmux_common, "find_claude_pid", lambda: pytest.fail("must use cache"))
+
+    info = tmux_common.resolve_session_info("sess-1", "/work/proj")
+
+    assert info == tmux_common.SessionInfo("claude-proj-99", "/tmp/lock-99", "")
+
+
+def test_task_queue_is_fifo_and_skips_stale_hints(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+    for description in ("first", "second", "third"):
+        tmux_common.push_task_description("sess-1", description)
+    queue_dir = tmp_path / "sess-1.task-queue"
+    # 古いヒントが残っていても前方に探索し直す
+    (queue_dir / "head").unlink()
+    (queue_dir / "head").symlink_to("0")
+    tmux_common.push_task_description("sess-1", "fourth")
+    assert tmux_common.pop_task_description("sess-1") == "first"
+    (queue_dir / "tail").unlink()
+    (queue_dir / "tail").symlink_to("0")
+
+    popped = [tmux_common.pop_task_description("sess-1") for _ in range(4)]
+
+    assert popped == ["second", "third", "fourth", ""]
+    assert not list(queue_dir.glob("*.tmp"))
+
+
+def test_task_queue_replaces_legacy_queue_file(monkeypatch, tmp_path) -> None:
+    (tmp_path / "sess-1.task-queue").write_text('{"description": "old"}\n')
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+
+    tmux_common.push_task_description("sess-1", "new")
+
+    assert tmux_common.pop_task_description("sess-1") == "new"
+
+
+def test_task_queue_hands_each_item_to_one_concurrent_consumer(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]);"
+        "import tmux_common; tmux_common.SESSION_INFO_DIR = sys.argv[2];"
+        "[tmux_common.push_task_description('sess-1', f'{sys.argv[3]}-{i}') for i in range(20)];"
+        "print('\\n'.join(tmux_common.pop_task_description('sess-1') for _ in range(20)))"
+    )
+    hooks_dir = str(REPO_ROOT / "packages" / "tmux-monitor" / "hooks")
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", code, hooks_dir, str(tmp_path), f"p{n}"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for n in range(4)
+    ]
+    outputs = [proc.communicate(timeout=60)[0] for proc in procs]
+    assert all(proc.returncode == 0 for proc in procs)
+
+    popped = [line for output in outputs for line in output.splitlines() if line]
+    expected = {f"p{n}-{i}" for n in range(4) for i in range(20)}
+    assert len(popped) == len(expected)
+    assert set(popped) == expected
+
+
 def test_format_tool_input_prioritizes_known_keys() -> None:
     assert tmux_format_output.format_tool_input({"command": "pytest -q"}) == "pytest -q"
     assert tmux_format_output.format_tool_input({"pattern": "TODO"}) == "TODO"
@@ -96,7 +224,7 @@ def test_format_tool_input_falls_back_to_json() -> None:
     assert '"foo": "bar"' in result
 
 
-def test_handle_assistant_prints_text_and_tool_use(capsys) -> None:
+def test_render_assistant_renders_text_and_tool_use() -> None:
     message = {
         "content": [
             {"type": "text", "text": "hello"},
@@ -104,38 +232,333 @@ def test_handle_assistant_prints_text_and_tool_use(capsys) -> None:
         ]
     }
 
-    tmux_format_output.handle_assistant(message)
-    captured = capsys.readouterr().out
+    rendered = "\n".join(tmux_format_output.render_assistant(message))
 
-    assert "hello" in captured
-    assert "[Bash]" in captured
-    assert "ls -la" in captured
+    assert "hello" in rendered
+    assert "[Bash]" in rendered
+    assert "ls -la" in rendered
 
 
-def test_handle_user_prints_tool_result(capsys) -> None:
+def test_render_user_renders_tool_result() -> None:
     message = {
         "content": [
             {"type": "tool_result", "content": "command output line"},
         ]
     }
 
-    tmux_format_output.handle_user(message)
-    captured = capsys.readouterr().out
+    rendered = "\n".join(tmux_format_output.render_user(message))
+
+    assert "→" in rendered
+    assert "command output line" in rendered
+
+
+def test_render_progress_renders_only_bash_progress() -> None:
+    rendered = tmux_format_output.render_progress(
+        {"type": "bash_progress", "content": "running..."}
+    )
+    assert any("running..." in line for line in rendered)
+
+    assert tmux_format_output.render_progress({"type": "other", "content": "skip"}) == []
+
+
+def test_render_progress_skips_empty_content() -> None:
+    assert tmux_format_output.render_progress({"type": "bash_progress", "content": ""}) == []
+
+
+def _progress(content: str) -> dict:
+    return {"type": "progress", "data": {"type": "bash_progress", "content": content}}
+
+
+def _text(text: str) -> dict:
+    return {"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}}
+
+
+def test_render_record_bounds_lines_and_width(monkeypatch) -> None:
+    monkeypatch.setattr(tmux_format_output, "MAX_RECORD_LINES", 3)
+    monkeypatch.setattr(tmux_format_output, "MAX_LINE_CHARS", 5)
+
+    lines = tmux_format_output.render_record(_text("a\nbbbbbbbb\nc\nd\ne"))
+
+    assert lines[:3] == ["a", f"bbbbb…{tmux_format_output.RESET}", "c"]
+    assert "(2 more lines)" in lines[3]
+    assert len(lines) == 4
+
+
+def test_line_throttle_coalesces_consecutive_progress() -> None:
+    now = [0.0]
+    throttle = tmux_format_output.LineThrottle(clock=lambda: now[0])
+
+    assert throttle.feed(_progress("1%")) == []
+    assert throttle.feed(_progress("2%")) == []
+    lines = throttle.feed(_text("done"))
+
+    assert [line for line in lines if "%" in line] == [
+        tmux_format_output.render_record(_progress("2%"))[0]
+    ]
+    assert lines[-1] == "done"
+    now[0] = 0.5
+    throttle.feed(_progress("3%"))
+    assert "3%" in throttle.tick()[0]
+    throttle.feed(_progress("4%"))
+    assert throttle.tick() == []  # FLUSH_INTERVAL 以内は保留したまま
+    assert throttle.has_pending
+
+
+def test_line_throttle_reports_suppressed_lines_after_budget() -> None:
+    now = [0.0]
+    throttle = tmux_format_output.LineThrottle(lines_per_second=2, clock=lambda: now[0])
+
+    emitted = [line for i in range(5) for line in throttle.feed(_text(f"line {i}"))]
+    assert emitted == ["line 0", "line 1"]
+    assert throttle.tick() == []
+
+    now[0] = 1.5
+    lines = throttle.tick()
+    assert lines == [f"{tmux_format_output.DIM}(3 lines suppressed){tmux_format_output.RESET}"]
+    assert not throttle.has_pending
+
+
+tmux_output_streamer = load_module(
+    "tmux_output_streamer", "packages/tmux-monitor/hooks/tmux-output-streamer.py"
+)
+
+
+def _assistant_line(text: str) -> str:
+    record = {"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}}
+    return json.dumps(record) + "\n"
+
+
+def _make_streamer(tmp_path, use_inotify: bool = False):
+    routes_dir = tmp_path / "routes"
+    routes_dir.mkdir()
+    watcher = tmux_output_streamer.DirWatcher(use_inotify=use_inotify)
+    streamer = tmux_output_streamer.Streamer(
+        str(routes_dir), tmux_format_output.LineThrottle, watcher
+    )
+    return streamer, routes_dir
+
+
+def _route(routes_dir, agent_id: str, path, tty) -> None:
+    (routes_dir / f"{agent_id}.json").write_text(json.dumps({"path": str(path), "tty": str(tty)}))
+
+
+def test_streamer_formats_each_agent_into_its_own_pane(tmp_path) -> None:
+    streamer, routes_dir = _make_streamer(tmp_path)
+    agent_a, agent_b = tmp_path / "agent-a.jsonl", tmp_path / "agent-b.jsonl"
+    pane_a, pane_b = tmp_path / "pane-a", tmp_path / "pane-b"
+    pane_a.touch()
+    pane_b.touch()
+    _route(routes_dir, "a", agent_a, pane_a)
+    _route(routes_dir, "b", agent_b, pane_b)
+    agent_a.write_text(_assistant_line("hello from a") + '{"type": "assi')
+    agent_b.write_text("not json\n" + _assistant_line("hello from b"))
+
+    assert streamer.refresh_routes()
+    streamer.pump()
+    with agent_a.open("a") as f:
+        f.write('stant", "message": {"content": [{"type": "text", "text": "second"}]}}\n')
+    streamer.pump()
+
+    assert pane_a.read_text() == "hello from a\nsecond\n"
+    assert pane_b.read_text() == "hello from b\n"
+
+
+def test_streamer_drains_then_retires_finished_agent(tmp_path) -> None:
+    streamer, routes_dir = _make_streamer(tmp_path)
+    agent, pane = tmp_path / "agent-a.jsonl", tmp_path / "pane-a"
+    pane.touch()
+    _route(routes_dir, "a", agent, pane)
+    streamer.refresh_routes()
+    streamer.pump()
+
+    agent.write_text(_assistant_line("last words"))
+    (routes_dir / "a.done").touch()
+    streamer.refresh_routes()
+    streamer.pump()
+
+    assert pane.read_text() == "last words\n"
+    assert streamer.streams == {}
+    assert list(routes_dir.iterdir()) == []
+
+
+def test_streamer_reports_suppressed_lines_when_agent_finishes(tmp_path) -> None:
+    streamer, routes_dir = _make_streamer(tmp_path)
+    streamer.make_throttle = lambda: tmux_format_output.LineThrottle(lines_per_second=2)
+    agent, pane = tmp_path / "agent-a.jsonl", tmp_path / "pane-a"
+    pane.touch()
+    _route(routes_dir, "a", agent, pane)
+    agent.write_text("".join(_assistant_line(f"line {i}") for i in range(5)))
+    (routes_dir / "a.done").touch()
+
+    streamer.refresh_routes()
+    streamer.pump()
+
+    assert pane.read_text().splitlines() == [
+        "line 0",
+        "line 1",
+        f"{tmux_format_output.DIM}(3 lines suppressed){tmux_format_output.RESET}",
+    ]
+
+
+def test_streamer_drops_route_when_pane_tty_is_gone(tmp_path) -> None:
+    streamer, routes_dir = _make_streamer(tmp_path)
+    agent = tmp_path / "agent-a.jsonl"
+    agent.write_text(_assistant_line("lost"))
+    _route(routes_dir, "a", agent, tmp_path / "missing" / "tty")
+
+    streamer.refresh_routes()
+    streamer.pump()
+
+    assert streamer.streams == {}
+    assert not (routes_dir / "a.json").exists()
+
+
+def test_streamer_writes_to_pseudo_terminal(tmp_path) -> None:
+    master, slave = os.openpty()
+    try:
+        streamer, routes_dir = _make_streamer(tmp_path)
+        agent = tmp_path / "agent-a.jsonl"
+        agent.write_text(_assistant_line("on the pane"))
+        _route(routes_dir, "a", agent, os.ttyname(slave))
+
+        streamer.refresh_routes()
+        streamer.pump()
+
+        assert b"on the pane" in os.read(master, 4096)
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+def test_streamer_run_exits_when_routes_dir_is_removed(tmp_path) -> None:
+    streamer, routes_dir = _make_streamer(tmp_path)
+    routes_dir.rmdir()
+
+    streamer.run()
+
+    assert tmux_output_streamer.has_routes(str(routes_dir)) is False
+
+
+def test_dir_watcher_wakes_on_change(tmp_path) -> None:
+    watcher = tmux_output_streamer.DirWatcher()
+    if not watcher.uses_inotify:
+        pytest.skip("inotify unavailable")
+    try:
+        assert watcher.add(str(tmp_path))
+        (tmp_path / "agent-a.jsonl").write_text("{}\n")
+
+        started = time.monotonic()
+        watcher.wait(5.0)
+
+        assert time.monotonic() - started < 1.0
+    finally:
+        watcher.close()
+
+
+def test_finish_stream_route_marks_only_registered_agents(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+    tmux_common.register_stream_route("sess-1", "a", "/x/agent-a.jsonl", "/dev/pts/9")
+
+    tmux_common.finish_stream_route("sess-1", "a")
+    tmux_common.finish_stream_route("sess-1", "unknown")
+
+    routes_dir = tmp_path / "sess-1.stream"
+    assert sorted(p.name for p in routes_dir.iterdir()) == ["a.done", "a.json"]
+    assert json.loads((routes_dir / "a.json").read_text()) == {
+        "path": "/x/agent-a.jsonl",
+        "tty": "/dev/pts/9",
+    }
+
+
+def test_ensure_streamer_skips_spawn_while_streamer_holds_lock(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path))
+    spawned: list[list[str]] = []
+    monkeypatch.setattr(tmux_common.subprocess, "Popen", lambda argv, **_kw: spawned.append(argv))
+
+    lock = tmux_common.try_lock_streamer("sess-1")
+    try:
+        assert tmux_common.ensure_streamer("sess-1") is False
+    finally:
+        lock.close()
+    assert tmux_common.ensure_streamer("sess-1") is True
+    assert spawned == [[sys.executable, tmux_common.STREAMER, "sess-1"]]
+
+
+def test_run_tmux_batch_chains_commands_and_escapes_trailing_semicolon(monkeypatch) -> None:
+    captured: list[tuple[str, ...]] = []
+    monkeypatch.setattr(tmux_common, "run_tmux", lambda *args: captured.append(args))
+
+    tmux_common.run_tmux_batch(
+        ("select-pane", "-t", "%1", "-T", "fix a; b;"),
+        ("select-layout", "tiled"),
+    )
+
+    assert captured == [
+        ("select-pane", "-t", "%1", "-T", r"fix a; b\;", ";", "select-layout", "tiled")
+    ]
+
+
+def test_load_max_panes_reads_package_config(tmp_path) -> None:
+    assert tmux_common.load_max_panes(str(tmp_path)) == 6
+
+    config_dir = tmp_path / ".claude" / "config" / "tmux-monitor"
+    config_dir.mkdir(parents=True)
+    (config_dir / "tmux-monitor.json").write_text('{"max_panes": 2}')
+
+    assert tmux_common.load_max_panes(str(tmp_path)) == 2
+
+
+@pytest.fixture()
+def tmux_server(monkeypatch, tmp_path):
+    """テスト専用ソケットの tmux サーバー（利用者のサーバーには触れない）。"""
+    if shutil.which("tmux") is None:
+        pytest.skip("tmux not installed")
+    monkeypatch.delenv("TMUX", raising=False)
+    monkeypatch.setenv("TMUX_TMPDIR", str(tmp_path / "tmux"))
+    (tmp_path / "tmux").mkdir()
+    monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(tmp_path / "info"))
+    tmux_common.run_tmux("new-session", "-d", "-s", "pool", "-x", "200", "-y", "60", "cat")
+    yield "pool"
+    tmux_common.run_tmux("kill-server")
+
+
+def _pane_titles(session: str) -> dict[str, str]:
+    result = tmux_common.run_tmux("list-panes", "-t", session, "-F", "#{pane_id}\t#{pane_title}")
+    return dict(line.split("\t", 1) for line in result.stdout.splitlines())
+
+
+def test_pane_pool_rotates_oldest_agent_into_overflow(tmux_server, tmp_path) -> None:
+    pool = tmux_common.PanePool("sess-1", tmux_server, max_panes=2)
+    (tmp_path / "info").mkdir()
+    (tmp_path / "info" / "sess-1.pane-a0").write_text(f"{tmux_server}\n%0")
+
+    first = pool.acquire("a0", "task 0", "exec cat")
+    second = pool.acquire("a1", "task 1", "exec cat")
+    third = pool.acquire("a2", "task 2", "exec cat")
 
-    assert "→" in captured
-    assert "command output line" in captured
+    assert first.pane_id == "%0"  # 待機ペインを再利用
+    assert second.pane_id != first.pane_id
+    assert third.pane_id == first.pane_id  # 上限到達で最古のペインを回す
+    titles = _pane_titles(tmux_server)
+    assert sorted(titles.values()) == ["OVERFLOW (1)", "task 1", "task 2"]
+    assert not (tmp_path / "info" / "sess-1.pane-a0").exists()
 
+    # 表示から外した sub agent の終了はオーバーフローペインに反映する
+    assert pool.release("a0") is True
+    assert "OVERFLOW (0)" in _pane_titles(tmux_server).values()
 
-def test_handle_progress_prints_only_bash_progress(capsys) -> None:
-    tmux_format_output.handle_progress({"type": "bash_progress", "content": "running..."})
-    printed = capsys.readouterr().out
-    assert "running..." in printed
 
-    tmux_format_output.handle_progress({"type": "other", "content": "skip"})
-    not_printed = capsys.readouterr().out
-    assert not_printed == ""
+def test_pane_pool_reuses_released_pane_before_splitting(tmux_server) -> None:
+    pool = tmux_common.PanePool("sess-1", tmux_server, max_panes=4)
+    first = pool.acquire("a0", "task 0", "exec cat")
+    second = pool.acquire("a1", "task 1", "exec cat")
+    done: list[str] = []
 
+    assert pool.release("a1", done.append) is True
+    tmux_common.run_tmux("select-pane", "-t", second.pane_id, "-T", "DONE: task 1")
+    third = pool.acquire("a2", "task 2", "exec cat")
 
-def test_handle_progress_skips_empty_content(capsys) -> None:
-    tmux_format_output.handle_progress({"type": "bash_progress", "content": ""})
-    assert capsys.readouterr().out == ""
+    assert done == [second.pane_id]
+    assert third.pane_id == second.pane_id
+    assert set(_pane_titles(tmux_server)) == {first.pane_id, second.pane_id}
+    assert pool.release("unknown") is False
@@ -97,6 +97,10 @@ def patch_agent_model(file_path: Path, model: str) -> bool:
         + content[frontmatter_match.end(1) :]
     )
     try:
+        # hardlink / symlink 同期のファイルは orchestra 側のソースと共有しているため、
+        # リンクを外してから書き込む（ソースを書き換えない）
+        if file_path.is_symlink() or file_path.stat().st_nlink > 1:
+            file_path.unlink()
         file_path.write_text(new_content, encoding="utf-8")
     except OSError:
         return False
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
 import shutil
 import sys
-from dataclasses import dataclass
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -12,6 +16,109 @@ import yaml
 
 FACET_MANIFEST_NAME = ".facet-manifest.json"
 
+# build_all で生成物を書き出すスレッド数（I/O バウンドのため CPU 数に依存させない）
+BUILD_WORKERS = 8
+
+# .facet-manifest.json の outputs レコード形式。互換性が変わったら上げる（全件再ビルド）
+DEPS_SCHEMA = 1
+
+
+def _file_record(path: Path, data: bytes | None = None) -> dict[str, Any]:
+    """ファイルの stat とコンテンツハッシュを依存レコードとして返す。"""
+    st = path.stat()
+    if data is None:
+        data = path.read_bytes()
+    return {
+        "path": str(path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def _record_matches(record: dict[str, Any], path: Path) -> bool:
+    """ファイルが記録時と同じ内容か判定する。
+
+    stat が一致すれば読まずに一致とみなす。stat だけ変わった場合（touch 等）は
+    ハッシュで比較し、一致すればレコードの mtime を更新して次回以降の読み込みを省く。
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    if st.st_size != record.get("size"):
+        return False
+    if st.st_mtime_ns == record.get("mtime_ns"):
+        return True
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return False
+    if hashlib.sha256(data).hexdigest() != record.get("sha256"):
+        return False
+    record["mtime_ns"] = st.st_mtime_ns
+    return True
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """内容が異なる場合のみ書き込む。書き込んだら True を返す。"""
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def _copy_if_changed(src: Path, dst: Path) -> bool:
+    """src と dst の内容が異なる場合のみコピーする。コピーしたら True を返す。"""
+    try:
+        if dst.stat().st_size == src.stat().st_size and dst.read_bytes() == src.read_bytes():
+            return False
+    except OSError:
+        pass
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(src, dst)
+    return True
+
+
+def _prune_dir(directory: Path, keep: set[str]) -> bool:
+    """directory 直下の keep 以外のエントリを削除する。空になればディレクトリごと削除する。"""
+    if not directory.is_dir():
+        return False
+    if not keep:
+        shutil.rmtree(directory)
+        return True
+    removed = False
+    for entry in directory.iterdir():
+        if entry.name in keep:
+            continue
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+        removed = True
+    return removed
+
+
+@dataclass
+class BuildPlan:
+    """ビルド対象 composition の描画結果（target 非依存）。
+
+    描画は 1 composition につき 1 回だけ行い、複数 target への書き出しで共有する。
+    """
+
+    name: str
+    comp_type: str
+    content: str
+    knowledge: list[tuple[str, Path]] = field(default_factory=list)
+    scripts: list[tuple[str, Path]] = field(default_factory=list)
+    # 入力ファイルの依存レコード（composition / policies / output-contracts /
+    # instructions / knowledge / scripts）。.facet-manifest.json の outputs に記録する
+    deps: list[dict[str, Any]] = field(default_factory=list)
+
 
 @dataclass
 class FacetBuilder:
@@ -24,6 +131,19 @@ class FacetBuilder:
     )
     installed_packages: list[str] | None = None  # currently installed packages
 
+    # 解決キャッシュ（インスタンス単位。1 回のビルドの間、ディレクトリ一覧・本文・依存レコードを共有する）
+    _listings: dict[str, dict[str, Path]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _resolved: dict[tuple[str, str], Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _records: dict[Path, dict[str, Any]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    cache_hits: int = field(default=0, init=False, compare=False)
+    cache_misses: int = field(default=0, init=False, compare=False)
+
     def load_composition(self, path: Path) -> dict[str, Any]:
         """composition YAML をロードして最低限の検証を行う。"""
         if not path.exists():
@@ -130,23 +250,81 @@ class FacetBuilder:
 
         return composition
 
-    def resolve_facet(self, kind: str, name: str) -> str:
-        """facet ファイル本文を読み込む。プロジェクトローカル → orchestra の順で解決。"""
+    def _listing(self, kind: str) -> dict[str, Path]:
+        """kind ディレクトリのエントリ {ファイル名: パス} を返す（ローカルが orchestra を上書き）。
+
+        kind ごとに orchestra / プロジェクトローカルを 1 回ずつ列挙し、以降はキャッシュを使う。
+        """
+        listing = self._listings.get(kind)
+        if listing is not None:
+            return listing
+
+        listing = {}
+        roots = [self.orchestra_dir / "facets" / kind]
+        if self.project_facets_dir:
+            roots.append(self.project_facets_dir / kind)
+        for root in roots:
+            try:
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        listing[entry.name] = Path(entry.path)
+            except OSError:
+                continue
+        self._listings[kind] = listing
+        return listing
+
+    def _locate(self, kind: str, filename: str) -> Path | None:
+        """facet ファイルのパスを探す。プロジェクトローカル → orchestra の順。未発見なら None。"""
+        if "/" not in filename:
+            return self._listing(kind).get(filename)
+
+        # サブディレクトリ指定（scripts/foo/bar.sh 等）は一覧に載らないため個別に確認する
         if self.project_facets_dir:
-            local_path = self.project_facets_dir / kind / f"{name}.md"
+            local_path = self.project_facets_dir / kind / filename
             if local_path.exists():
-                try:
-                    return local_path.read_text(encoding="utf-8").strip()
-                except OSError as e:
-                    print(
-                        f"エラー: facet の読み込みに失敗しました: {local_path} ({e})",
-                        file=sys.stderr,
-                    )
-                    sys.exit(1)
+                return local_path
+
+        facet_path = self.orchestra_dir / "facets" / kind / filename
+        if facet_path.exists():
+            return facet_path
+        return None
+
+    def _cached(self, key: tuple[str, str], resolve: Callable[[], Any]) -> Any:
+        """(kind, name) をキーに解決結果をメモ化し、ヒット/ミスを数える。"""
+        if key in self._resolved:
+            self.cache_hits += 1
+            return self._resolved[key]
+        self.cache_misses += 1
+        value = resolve()
+        self._resolved[key] = value
+        return value
+
+    def _dep_record(self, path: Path) -> dict[str, Any]:
+        """依存レコードを返す。同じファイルは 1 回だけハッシュする。"""
+        record = self._records.get(path)
+        if record is None:
+            record = _file_record(path)
+            self._records[path] = record
+        return dict(record)
+
+    def clear_cache(self) -> None:
+        """解決キャッシュとヒット/ミスカウンタをリセットする。"""
+        self._listings.clear()
+        self._resolved.clear()
+        self._records.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
-        facet_path = self.orchestra_dir / "facets" / kind / f"{name}.md"
-        if not facet_path.exists():
-            print(f"エラー: facet ファイルが見つかりません: {facet_path}", file=sys.stderr)
+    def resolve_facet(self, kind: str, name: str) -> str:
+        """facet ファイル本文を読み込む。プロジェクトローカル → orchestra の順で解決。"""
+        return self._cached((kind, name), lambda: self._read_facet(kind, name))
+
+    def _read_facet(self, kind: str, name: str) -> str:
+        """facet ファイル本文を読み込む（キャッシュなし）。"""
+        facet_path = self._locate(kind, f"{name}.md")
+        if facet_path is None:
+            missing = self.orchestra_dir / "facets" / kind / f"{name}.md"
+            print(f"エラー: facet ファイルが見つかりません: {missing}", file=sys.stderr)
             sys.exit(1)
         try:
             return facet_path.read_text(encoding="utf-8").strip()
@@ -154,40 +332,38 @@ class FacetBuilder:
             print(f"エラー: facet の読み込みに失敗しました: {facet_path} ({e})", file=sys.stderr)
             sys.exit(1)
 
-    def resolve_instruction(self, instruction: str) -> str:
-        """instruction を解決する。"""
+    @staticmethod
+    def _instruction_ref(instruction: str) -> str | None:
+        """instruction が facet 参照なら facet 名を、インライン本文（または空）なら None を返す。"""
         stripped = instruction.strip()
-        if not stripped:
-            return ""
-
-        if "\n" in instruction or len(instruction) > 100:
-            return stripped
+        if not stripped or "\n" in instruction or len(instruction) > 100:
+            return None
+        return stripped
 
-        return self.resolve_facet("instructions", stripped)
+    def resolve_instruction(self, instruction: str) -> str:
+        """instruction を解決する。"""
+        ref = self._instruction_ref(instruction)
+        if ref is None:
+            return instruction.strip()
+        return self.resolve_facet("instructions", ref)
 
     def resolve_knowledge(self, name: str) -> Path:
         """knowledge ファイルのパスを解決する。プロジェクトローカル → orchestra の順で解決。"""
-        if self.project_facets_dir:
-            local_path = self.project_facets_dir / "knowledge" / f"{name}.md"
-            if local_path.exists():
-                return local_path
-
-        facet_path = self.orchestra_dir / "facets" / "knowledge" / f"{name}.md"
-        if not facet_path.exists():
-            print(f"エラー: knowledge ファイルが見つかりません: {facet_path}", file=sys.stderr)
+        facet_path = self._cached(
+            ("knowledge", name), lambda: self._locate("knowledge", f"{name}.md")
+        )
+        if facet_path is None:
+            missing = self.orchestra_dir / "facets" / "knowledge" / f"{name}.md"
+            print(f"エラー: knowledge ファイルが見つかりません: {missing}", file=sys.stderr)
             sys.exit(1)
         return facet_path
 
     def resolve_script(self, name: str) -> Path:
         """script ファイルのパスを解決する。プロジェクトローカル → orchestra の順で解決。"""
-        if self.project_facets_dir:
-            local_path = self.project_facets_dir / "scripts" / name
-            if local_path.exists():
-                return local_path
-
-        facet_path = self.orchestra_dir / "facets" / "scripts" / name
-        if not facet_path.exists():
-            print(f"エラー: script ファイルが見つかりません: {facet_path}", file=sys.stderr)
+        facet_path = self._cached(("scripts", name), lambda: self._locate("scripts", name))
+        if facet_path is None:
+            missing = self.orchestra_dir / "facets" / "scripts" / name
+            print(f"エラー: script ファイルが見つかりません: {missing}", file=sys.stderr)
             sys.exit(1)
         return facet_path
 
@@ -292,75 +468,168 @@ class FacetBuilder:
         )
         sys.exit(1)
 
-    def build_one(self, name: str, target: str, project_dir: Path) -> Path | None:
-        """単一 composition をビルドして出力する。"""
-        composition_path = self._find_composition(name)
-
-        composition = self.load_composition(composition_path)
+    def _excluded_owner(self, name: str) -> str | None:
+        """パッケージ未インストールでビルド対象外なら、所有パッケージ名を返す。
 
-        # Package filtering:
-        # - manifest_compositions is None → build all (no filtering)
-        # - name in manifest_compositions → package-owned → build only if package is installed
-        # - name not in manifest_compositions → global → always build
-        if self.manifest_compositions is not None and name in self.manifest_compositions:
-            owning_pkg = self.manifest_compositions[name]
-            installed = set(self.installed_packages or [])
-            if owning_pkg not in installed:
-                output_name = composition["name"]
-                comp_type = composition.get("type", "skill")
-                old_path = self._build_output_path(output_name, target, project_dir, comp_type)
-                if old_path.exists():
-                    old_path.unlink()
-                    if (
-                        comp_type == "skill"
-                        and old_path.parent.exists()
-                        and not any(old_path.parent.iterdir())
-                    ):
-                        old_path.parent.rmdir()
-                    relative = old_path.relative_to(project_dir)
-                    print(
-                        f"[facet] removed {output_name} ({owning_pkg} not installed) <- {relative}"
-                    )
-                return None
+        - manifest_compositions is None → build all (no filtering)
+        - name in manifest_compositions → package-owned → build only if package is installed
+        - name not in manifest_compositions → global → always build
+        """
+        if self.manifest_compositions is None or name not in self.manifest_compositions:
+            return None
+        owning_pkg = self.manifest_compositions[name]
+        if owning_pkg in set(self.installed_packages or []):
+            return None
+        return owning_pkg
 
+    def _remove_excluded(
+        self,
+        composition: dict[str, Any],
+        owning_pkg: str,
+        target: str,
+        project_dir: Path,
+    ) -> str | None:
+        """未インストールパッケージの生成物を削除し、出力メッセージを返す。"""
         output_name = composition["name"]
         comp_type = composition.get("type", "skill")
+        old_path = self._build_output_path(output_name, target, project_dir, comp_type)
+        if not old_path.exists():
+            return None
+        old_path.unlink()
+        if comp_type == "skill" and old_path.parent.exists() and not any(old_path.parent.iterdir()):
+            old_path.parent.rmdir()
+        relative = old_path.relative_to(project_dir)
+        return f"[facet] removed {output_name} ({owning_pkg} not installed) <- {relative}"
+
+    def plan_build(
+        self, composition: dict[str, Any], composition_path: Path | None = None
+    ) -> BuildPlan:
+        """composition を描画し、knowledge / scripts の参照元と依存レコードを解決する。"""
+        comp_type = composition.get("type", "skill")
         if comp_type == "rule":
-            content = self.build_rule_md(composition)
+            plan = BuildPlan(composition["name"], comp_type, self.build_rule_md(composition))
         else:
-            content = self.build_skill_md(composition)
-        output_path = self._build_output_path(output_name, target, project_dir, comp_type)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(content, encoding="utf-8")
-
-        if comp_type != "rule":
+            plan = BuildPlan(
+                name=composition["name"],
+                comp_type=comp_type,
+                content=self.build_skill_md(composition),
+                knowledge=[
+                    (k, self.resolve_knowledge(k)) for k in composition.get("knowledge", [])
+                ],
+                scripts=[(s, self.resolve_script(s)) for s in composition.get("scripts", [])],
+            )
+        plan.deps = self._collect_deps(composition, composition_path)
+        return plan
+
+    def _collect_deps(
+        self, composition: dict[str, Any], composition_path: Path | None
+    ) -> list[dict[str, Any]]:
+        """composition が参照する全入力ファイルの依存レコードを返す。"""
+        refs: list[tuple[str, str]] = [("policies", f"{p}.md") for p in composition["policies"]]
+        refs.extend(
+            ("output-contracts", f"{c}.md") for c in composition.get("output_contracts") or []
+        )
+        instruction_ref = self._instruction_ref(composition.get("instruction") or "")
+        if instruction_ref is not None:
+            refs.append(("instructions", f"{instruction_ref}.md"))
+        if composition.get("type", "skill") != "rule":
+            refs.extend(("knowledge", f"{k}.md") for k in composition.get("knowledge", []))
+            refs.extend(("scripts", s) for s in composition.get("scripts", []))
+
+        deps: list[dict[str, Any]] = []
+        if composition_path is not None:
+            deps.append(
+                {"kind": "composition", "name": composition_path.name}
+                | self._dep_record(composition_path)
+            )
+        for kind, filename in refs:
+            path = self._locate(kind, filename)
+            if path is not None:
+                deps.append({"kind": kind, "name": filename} | self._dep_record(path))
+        return deps
+
+    def _is_up_to_date(self, record: Any, composition_path: Path, project_dir: Path) -> bool:
+        """前回ビルドの依存レコードから、出力が最新かどうかを判定する。
+
+        依存ファイルの解決先（ローカル上書きの追加・削除を含む）と内容がすべて記録時と一致し、
+        生成物が揃っている場合のみ True を返す。生成物の直接編集（facet extract 前の
+        チューニング）は入力の変更ではないため、上書きしない。
+        """
+        if not isinstance(record, dict):
+            return False
+        deps = record.get("deps")
+        files = record.get("files")
+        if not deps or not files:
+            return False
+
+        for dep in deps:
+            kind = dep.get("kind")
+            if kind == "composition":
+                path: Path | None = composition_path
+            else:
+                path = self._locate(str(kind), str(dep.get("name", "")))
+            if path is None or str(path) != dep.get("path") or not _record_matches(dep, path):
+                return False
+
+        return all((project_dir / str(f.get("path", ""))).is_file() for f in files)
+
+    def write_plan(
+        self, plan: BuildPlan, target: str, project_dir: Path
+    ) -> tuple[Path, str, list[dict[str, Any]]]:
+        """描画済みの plan を target に書き出す。
+
+        内容が同一のファイルは書き換えない（mtime を保つ）。
+        (出力パス, 出力メッセージ, 生成物の依存レコード) を返す。
+        """
+        output_path = self._build_output_path(plan.name, target, project_dir, plan.comp_type)
+        data = plan.content.encode("utf-8")
+        changed = _write_if_changed(output_path, data)
+        files = [_file_record(output_path, data)]
+
+        if plan.comp_type != "rule":
             skill_dir = output_path.parent
-
-            # Clear existing references/ and scripts/ to remove stale files
-            refs_dir = skill_dir / "references"
-            if refs_dir.is_dir():
-                shutil.rmtree(refs_dir)
-            scripts_dir_path = skill_dir / "scripts"
-            if scripts_dir_path.is_dir():
-                shutil.rmtree(scripts_dir_path)
-
-            for kname in composition.get("knowledge", []):
-                src = self.resolve_knowledge(kname)
-                dst = skill_dir / "references" / f"{kname}.md"
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(src, dst)
-
-            for sname in composition.get("scripts", []):
-                src = self.resolve_script(sname)
-                dst = skill_dir / "scripts" / sname
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(src, dst)
+            copies = (
+                ("references", [(f"{kname}.md", src) for kname, src in plan.knowledge]),
+                ("scripts", plan.scripts),
+            )
+            for subdir, items in copies:
+                # 今回コピーしないファイル（前回の残り）だけを削除する
+                keep = {Path(filename).parts[0] for filename, _src in items}
+                if _prune_dir(skill_dir / subdir, keep):
+                    changed = True
+                for filename, src in items:
+                    dst = skill_dir / subdir / filename
+                    if _copy_if_changed(src, dst):
+                        changed = True
+                    files.append(_file_record(dst))
+
+        for record in files:
+            record["path"] = str(Path(record["path"]).relative_to(project_dir))
 
         relative = output_path.relative_to(project_dir)
-        print(f"[facet] built {output_name} -> {relative}")
+        if not changed:
+            return output_path, f"[facet] unchanged {plan.name} -> {relative}", files
+        return output_path, f"[facet] built {plan.name} -> {relative}", files
+
+    def build_one(self, name: str, target: str, project_dir: Path) -> Path | None:
+        """単一 composition をビルドして出力する。"""
+        composition_path = self._find_composition(name)
+
+        composition = self.load_composition(composition_path)
+
+        owning_pkg = self._excluded_owner(name)
+        if owning_pkg is not None:
+            message = self._remove_excluded(composition, owning_pkg, target, project_dir)
+            if message:
+                print(message)
+            return None
+
+        plan = self.plan_build(composition, composition_path)
+        output_path, message, _files = self.write_plan(plan, target, project_dir)
+        print(message)
         return output_path
 
-    def _load_manifest(self, target: str, project_dir: Path) -> dict[str, list[str]]:
+    def _load_manifest(self, target: str, project_dir: Path) -> dict[str, Any]:
         """前回ビルド時のマニフェストを読み込む。"""
         import json
 
@@ -368,21 +637,41 @@ class FacetBuilder:
         if not manifest_path.exists():
             return {"skills": [], "rules": []}
         try:
-            return json.loads(manifest_path.read_text(encoding="utf-8"))
+            data = json.loads(manifest_path.read_text(encoding="utf-8"))
         except (json.JSONDecodeError, OSError):
             return {"skills": [], "rules": []}
+        return data if isinstance(data, dict) else {"skills": [], "rules": []}
+
+    def load_output_records(self, target: str, project_dir: Path) -> dict[str, Any]:
+        """前回ビルド時の出力ごとの依存レコード {composition 名: record} を返す。"""
+        manifest = self._load_manifest(target, project_dir)
+        outputs = manifest.get("outputs")
+        if manifest.get("schema") != DEPS_SCHEMA or not isinstance(outputs, dict):
+            return {}
+        return outputs
 
     def _save_manifest(
-        self, target: str, project_dir: Path, skills: list[str], rules: list[str]
+        self,
+        target: str,
+        project_dir: Path,
+        skills: list[str],
+        rules: list[str],
+        outputs: dict[str, Any] | None = None,
     ) -> None:
-        """今回ビルドしたスキル/ルール名をマニフェストに記録する。"""
+        """今回ビルドしたスキル/ルール名と出力ごとの依存レコードをマニフェストに記録する。
+
+        内容が前回と同一なら書き換えない。
+        """
         import json
 
         manifest_path = self._manifest_path(target, project_dir)
-        manifest_path.parent.mkdir(parents=True, exist_ok=True)
-        data = {"skills": sorted(skills), "rules": sorted(rules)}
-        manifest_path.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        data: dict[str, Any] = {"skills": sorted(skills), "rules": sorted(rules)}
+        if outputs is not None:
+            data["schema"] = DEPS_SCHEMA
+            data["outputs"] = {k: outputs[k] for k in sorted(outputs)}
+        _write_if_changed(
+            manifest_path,
+            (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8"),
         )
 
     def _manifest_path(self, target: str, project_dir: Path) -> Path:
@@ -397,6 +686,7 @@ class FacetBuilder:
         project_dir: Path,
         built_skills: set[str],
         built_rules: set[str],
+        log: Callable[[str], None] = print,
     ) -> None:
         """前回マニフェストに存在し今回ビルドされなかった生成物を削除する。"""
         prev = self._load_manifest(target, project_dir)
@@ -409,7 +699,7 @@ class FacetBuilder:
                     if orphan.exists():
                         orphan.unlink()
                         relative = orphan.relative_to(project_dir)
-                        print(f"[facet] cleanup: removed orphan skill {name} <- {relative}")
+                        log(f"[facet] cleanup: removed orphan skill {name} <- {relative}")
                     refs_dir = skill_dir / "references"
                     if refs_dir.is_dir():
                         shutil.rmtree(refs_dir)
@@ -425,15 +715,13 @@ class FacetBuilder:
                 if orphan.exists():
                     orphan.unlink()
                     relative = orphan.relative_to(project_dir)
-                    print(f"[facet] cleanup: removed orphan rule {name} <- {relative}")
+                    log(f"[facet] cleanup: removed orphan rule {name} <- {relative}")
 
-    def build_all(self, target: str, project_dir: Path) -> list[Path]:
-        """全 composition をビルドして出力する。"""
-        output_paths: list[Path] = []
+    def _composition_stems(self) -> tuple[list[str], int]:
+        """ビルド対象の composition 名（ローカル優先・重複除去済み）と YAML 総数を返す。"""
+        stems: list[str] = []
         seen_names: set[str] = set()
         found_yaml_files = 0
-        built_skills: set[str] = set()
-        built_rules: set[str] = set()
 
         if self.project_facets_dir:
             local_compositions_dir = self.project_facets_dir / "compositions"
@@ -448,10 +736,7 @@ class FacetBuilder:
                         )
                         continue
                     seen_names.add(stem)
-                    result = self.build_one(stem, target, project_dir)
-                    if result:
-                        output_paths.append(result)
-                        self._track_built(composition_path, built_skills, built_rules)
+                    stems.append(stem)
 
         compositions_dir = self.orchestra_dir / "facets" / "compositions"
         if compositions_dir.is_dir():
@@ -461,39 +746,120 @@ class FacetBuilder:
                 if stem in seen_names:
                     continue
                 seen_names.add(stem)
-                result = self.build_one(stem, target, project_dir)
-                if result:
-                    output_paths.append(result)
-                    self._track_built(composition_path, built_skills, built_rules)
+                stems.append(stem)
 
+        return stems, found_yaml_files
+
+    def build_all(
+        self,
+        target: str | list[str],
+        project_dir: Path,
+        force: bool = False,
+        only: set[str] | None = None,
+        log: Callable[[str], None] = print,
+    ) -> list[Path]:
+        """全 composition をビルドして出力する。
+
+        前回ビルド時の依存レコード（.facet-manifest.json の outputs）と照合し、
+        入力が変わった出力だけを再ビルドする（force=True なら全件）。
+        only を指定した場合、それ以外の composition は記録済みなら照合せずに最新とみなす
+        （watch モードで影響範囲が分かっている場合に使う）。
+        target に複数指定した場合も composition の読み込みと描画は 1 回だけ行い、
+        各 target への書き出しをスレッドプールで並行実行する。
+        進捗メッセージは log に渡す（既定は stdout。呼び出し側で収集する場合に差し替える）。
+        """
+        targets = [target] if isinstance(target, str) else list(target)
+
+        stems, found_yaml_files = self._composition_stems()
         if found_yaml_files == 0:
             print("エラー: compositions が見つかりません", file=sys.stderr)
             sys.exit(1)
 
-        self._cleanup_orphans(target, project_dir, built_skills, built_rules)
-        self._save_manifest(target, project_dir, list(built_skills), list(built_rules))
+        prev_records = {t: self.load_output_records(t, project_dir) for t in targets}
+        records: dict[str, dict[str, Any]] = {t: {} for t in targets}
+        # target ごとの作業: (stem, plan, None) は書き出し、(stem, None, (composition, pkg)) は削除
+        work: dict[str, list[tuple[str, BuildPlan | None, Any]]] = {t: [] for t in targets}
+        built_skills: set[str] = set()
+        built_rules: set[str] = set()
+        up_to_date = 0
+        for stem in stems:
+            composition_path = self._find_composition(stem)
+            owning_pkg = self._excluded_owner(stem)
+            if owning_pkg is not None:
+                composition = self.load_composition(composition_path)
+                for t in targets:
+                    work[t].append((stem, None, (composition, owning_pkg)))
+                continue
+
+            stale_targets: list[str] = []
+            for t in targets:
+                record = prev_records[t].get(stem)
+                unaffected = only is not None and stem not in only
+                if isinstance(record, dict) and (
+                    unaffected
+                    or (not force and self._is_up_to_date(record, composition_path, project_dir))
+                ):
+                    records[t][stem] = record
+                    up_to_date += 1
+                    if record.get("type") == "rule":
+                        built_rules.add(record.get("name", stem))
+                    else:
+                        built_skills.add(record.get("name", stem))
+                else:
+                    stale_targets.append(t)
+            if not stale_targets:
+                continue
+
+            plan = self.plan_build(self.load_composition(composition_path), composition_path)
+            if plan.comp_type == "rule":
+                built_rules.add(plan.name)
+            else:
+                built_skills.add(plan.name)
+            for t in stale_targets:
+                work[t].append((stem, plan, None))
 
-        return output_paths
+        output_paths: list[Path] = []
+        with ThreadPoolExecutor(max_workers=BUILD_WORKERS) as executor:
+            # 出力順を決定的に保つため、結果（メッセージ or Future）を順序付きで保持する
+            results: list[
+                tuple[str, str, BuildPlan | None, str | Future[tuple[Path, str, list[Any]]]]
+            ] = []
+            for t in targets:
+                for stem, plan, excluded in work[t]:
+                    if plan is None:
+                        composition, owning_pkg = excluded
+                        message = self._remove_excluded(composition, owning_pkg, t, project_dir)
+                        if message:
+                            results.append((t, stem, None, message))
+                        continue
+                    future = executor.submit(self.write_plan, plan, t, project_dir)
+                    results.append((t, stem, plan, future))
 
-    def _track_built(
-        self,
-        composition_path: Path,
-        built_skills: set[str],
-        built_rules: set[str],
-    ) -> None:
-        """ビルドされた composition の名前を種別ごとに記録する。"""
-        try:
-            comp = yaml.safe_load(composition_path.read_text(encoding="utf-8"))
-        except (yaml.YAMLError, OSError):
-            return
-        if not isinstance(comp, dict):
-            return
-        name = comp.get("name", composition_path.stem)
-        comp_type = comp.get("type", "skill")
-        if comp_type == "rule":
-            built_rules.add(name)
-        else:
-            built_skills.add(name)
+            for t, stem, plan, result in results:
+                if isinstance(result, str):
+                    log(result)
+                    continue
+                assert plan is not None
+                output_path, message, files = result.result()
+                log(message)
+                output_paths.append(output_path)
+                records[t][stem] = {
+                    "name": plan.name,
+                    "type": plan.comp_type,
+                    "deps": plan.deps,
+                    "files": files,
+                }
+
+        if up_to_date:
+            log(f"[facet] up-to-date: {up_to_date} output(s) skipped")
+        if self.cache_hits or self.cache_misses:
+            log(f"[facet] resolve cache: {self.cache_hits} hit(s), {self.cache_misses} miss(es)")
+
+        for t in targets:
+            self._cleanup_orphans(t, project_dir, built_skills, built_rules, log)
+            self._save_manifest(t, project_dir, list(built_skills), list(built_rules), records[t])
+
+        return output_paths
 
     def extract_one(self, name: str, target: str, project_dir: Path) -> Path | None:
         """生成済みファイルから instruction を抽出してソースに書き戻す。"""
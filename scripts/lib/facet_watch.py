@@ -0,0 +1,288 @@
+"""facet build --watch の差分リビルドループ。
+
+facets/ 配下（orchestra とプロジェクトローカル）の変更を監視し、逆依存グラフから
+影響を受ける composition だけを再ビルドする。Linux では ctypes 経由の inotify、
+それ以外（または inotify が使えない場合）は stat ポーリングで変更を検出する。
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from lib.facet_builder import FacetBuilder
+
+# inotify(7) のイベントマスク
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+DEFAULT_DEBOUNCE = 0.15
+DEFAULT_POLL_INTERVAL = 0.5
+
+# inotify で変更を待つ 1 回あたりの上限（stop の確認間隔）
+INOTIFY_IDLE_TIMEOUT = 0.2
+
+DepKey = tuple[str, str]
+
+
+class InotifyWatcher:
+    """inotify によるディレクトリツリー監視（Linux のみ）。"""
+
+    backend = "inotify"
+    idle_timeout = INOTIFY_IDLE_TIMEOUT
+
+    def __init__(self, roots: list[Path]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_init1.argtypes = [ctypes.c_int]
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._fd = fd
+        self._wds: dict[int, Path] = {}
+        for root in roots:
+            self._add_tree(root)
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._wds)
+
+    def _add_tree(self, root: Path) -> None:
+        for dirpath, dirnames, _filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self._wds[wd] = Path(dirpath)
+
+    def read(self, timeout: float) -> set[Path]:
+        """timeout 秒まで待ち、変更されたパスの集合を返す。"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        changed: set[Path] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            parent = self._wds.get(wd)
+            if parent is None:
+                continue
+            path = parent / os.fsdecode(name) if name else parent
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """stat ポーリングによるディレクトリツリー監視（inotify 非対応環境向け）。"""
+
+    backend = "polling"
+
+    def __init__(self, roots: list[Path], interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self._roots = roots
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._roots)
+
+    @property
+    def idle_timeout(self) -> float:
+        """変更を待つ 1 回あたりの時間（再走査の間隔は設定したポーリング間隔に従う）。"""
+        return self._interval
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for root in self._roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def read(self, timeout: float) -> set[Path]:
+        """最大 timeout 秒待ってから再走査し、前回との差分パスを返す。"""
+        time.sleep(min(self._interval, timeout))
+        current = self._scan()
+        previous = self._snapshot
+        self._snapshot = current
+        changed = {p for p, stat in current.items() if previous.get(p) != stat}
+        changed.update(p for p in previous if p not in current)
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(
+    roots: list[Path], poll: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> InotifyWatcher | PollingWatcher:
+    """Linux では inotify、それ以外または失敗時はポーリングの監視器を返す。"""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, poll_interval)
+
+
+def build_reverse_deps(records_by_target: list[dict[str, Any]]) -> dict[DepKey, set[str]]:
+    """出力ごとの依存レコードから {(kind, name): {composition 名}} の逆依存グラフを作る。"""
+    graph: dict[DepKey, set[str]] = {}
+    for records in records_by_target:
+        for stem, record in records.items():
+            graph.setdefault(("compositions", stem), set()).add(stem)
+            for dep in record.get("deps") or []:
+                if dep.get("kind") == "composition":
+                    continue
+                key = (str(dep.get("kind")), str(dep.get("name")))
+                graph.setdefault(key, set()).add(stem)
+    return graph
+
+
+def dep_key(path: Path, facet_roots: list[Path]) -> DepKey | None:
+    """変更パスを逆依存グラフのキーに変換する。facet 以外のパスなら None。
+
+    ローカル上書きの追加・削除も orchestra 側と同じキーになるため、影響範囲に含まれる。
+    """
+    for root in facet_roots:
+        try:
+            rel = path.relative_to(root)
+        except ValueError:
+            continue
+        if len(rel.parts) < 2:
+            return None
+        kind = rel.parts[0]
+        if kind == "compositions":
+            return ("compositions", path.stem) if path.suffix == ".yaml" else None
+        return (kind, "/".join(rel.parts[1:]))
+    return None
+
+
+def affected_stems(
+    changed: set[Path], facet_roots: list[Path], graph: dict[DepKey, set[str]]
+) -> set[str]:
+    """変更パスの集合から再ビルドが必要な composition 名を返す。"""
+    stems: set[str] = set()
+    for path in changed:
+        key = dep_key(path, facet_roots)
+        if key is None:
+            continue
+        stems.update(graph.get(key, ()))
+        if key[0] == "compositions":
+            # 新規・削除された composition はグラフに載っていないため直接加える
+            stems.add(key[1])
+    return stems
+
+
+def watch(
+    builder: FacetBuilder,
+    targets: list[str],
+    project_dir: Path,
+    *,
+    poll: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+    stop: threading.Event | None = None,
+) -> None:
+    """facets/ を監視し、変更のたびに影響を受ける出力だけを再ビルドする。
+
+    stop がセットされるか KeyboardInterrupt で終了する。
+    """
+    stop = stop or threading.Event()
+    facet_roots = [builder.orchestra_dir / "facets"]
+    if builder.project_facets_dir:
+        facet_roots.append(builder.project_facets_dir)
+
+    builder.build_all(targets, project_dir)
+    graph = build_reverse_deps([builder.load_output_records(t, project_dir) for t in targets])
+
+    watcher = open_watcher([r for r in facet_roots if r.is_dir()], poll, poll_interval)
+    print(
+        f"[watch] watching {watcher.watch_count} dir(s) via {watcher.backend}"
+        f" ({', '.join(targets)}); Ctrl+C で終了",
+        flush=True,
+    )
+    try:
+        while not stop.is_set():
+            changed = watcher.read(watcher.idle_timeout)
+            if not changed:
+                continue
+            # debounce: 連続保存やエディタの一時ファイル書き込みが落ち着くまで集約する
+            while not stop.is_set():
+                more = watcher.read(debounce)
+                if not more:
+                    break
+                changed |= more
+
+            stems = affected_stems(changed, facet_roots, graph)
+            if not stems:
+                continue
+
+            started = time.perf_counter()
+            builder.clear_cache()
+            try:
+                builder.build_all(targets, project_dir, only=stems)
+            except SystemExit:
+                print("[watch] ビルドに失敗しました。次の変更を待機します", file=sys.stderr)
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            graph = build_reverse_deps(
+                [builder.load_output_records(t, project_dir) for t in targets]
+            )
+            print(
+                f"[watch] {len(stems)} affected ({', '.join(sorted(stems))})"
+                f" rebuilt in {elapsed_ms:.1f}ms",
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
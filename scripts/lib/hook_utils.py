@@ -5,14 +5,89 @@ orchestra-manager.py (HooksMixin) と sync-orchestra.py の両方から使用す
 
 from __future__ import annotations
 
+import re
 from typing import Any
 
 HOOK_COMMAND_TEMPLATE = 'python3 "$AI_ORCHESTRA_DIR/packages/{pkg_name}/hooks/{filename}"'
 
-
-def get_hook_command(pkg_name: str, filename: str) -> str:
-    """フックコマンド文字列を生成する。"""
-    return HOOK_COMMAND_TEMPLATE.format(pkg_name=pkg_name, filename=filename)
+# manifest の filter を評価する前段ガード（条件に合わない入力では Python を起動しない）
+HOOK_GUARD_PREFIX = 'sh "$AI_ORCHESTRA_DIR/packages/core/hooks/hook-guard.sh"'
+
+HOOK_FILTER_KEYS = frozenset({"extensions", "paths", "tool_input", "max_bytes"})
+
+# シングルクォートで囲めない文字と、JSON 上でエスケープされて照合できない文字
+_UNSAFE_FILTER_CHARS = frozenset("'\"\\\n")
+
+_FIELD_NAME = re.compile(r"[A-Za-z0-9_]+")
+
+
+def _filter_arg(value: object) -> str:
+    if not isinstance(value, str) or not value or _UNSAFE_FILTER_CHARS & set(value):
+        raise ValueError(f"invalid hook filter value: {value!r}")
+    return f"'{value}'"
+
+
+def _extension_glob(ext: str) -> str:
+    """拡張子を大文字小文字を区別しない glob（"py" → "*.[pP][yY]"）に変換する。"""
+    chars = (f"[{c.lower()}{c.upper()}]" if c.isalpha() else c for c in ext.removeprefix("."))
+    return "*." + "".join(chars)
+
+
+def compile_hook_filter(hook_filter: dict[str, Any] | None) -> list[str]:
+    """manifest の filter を hook-guard.sh の引数（シェルクォート済み）に変換する。
+
+    未知のキーや、シェル・JSON 文字列上で安全に照合できない値は ValueError。
+    """
+    if not hook_filter:
+        return []
+    if not isinstance(hook_filter, dict):
+        raise ValueError(f"hook filter must be an object: {hook_filter!r}")
+    unknown = set(hook_filter) - HOOK_FILTER_KEYS
+    if unknown:
+        raise ValueError(f"unknown hook filter keys: {sorted(unknown)}")
+
+    args: list[str] = []
+    for ext in hook_filter.get("extensions", []):
+        if not isinstance(ext, str):
+            raise ValueError(f"invalid hook filter value: {ext!r}")
+        args += ["--path", _filter_arg(_extension_glob(ext))]
+    for pattern in hook_filter.get("paths", []):
+        args += ["--path", _filter_arg(pattern)]
+    for field, needles in hook_filter.get("tool_input", {}).items():
+        if not _FIELD_NAME.fullmatch(field) or not needles:
+            raise ValueError(f"invalid hook filter field: {field!r}")
+        args += ["--field", f"'{field}'"]
+        for needle in needles:
+            args += ["--contains", _filter_arg(needle)]
+    max_bytes = hook_filter.get("max_bytes")
+    if max_bytes is not None:
+        if isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError(f"invalid hook filter max_bytes: {max_bytes!r}")
+        args += ["--max-bytes", str(max_bytes)]
+    return args
+
+
+def get_hook_command(
+    pkg_name: str, filename: str, hook_filter: dict[str, Any] | None = None
+) -> str:
+    """フックコマンド文字列を生成する。
+
+    hook_filter があれば hook-guard.sh 経由のコマンドにする（条件は compile_hook_filter）。
+    """
+    command = HOOK_COMMAND_TEMPLATE.format(pkg_name=pkg_name, filename=filename)
+    guard_args = compile_hook_filter(hook_filter)
+    if not guard_args:
+        return command
+    return " ".join([HOOK_GUARD_PREFIX, *guard_args, "--", command])
+
+
+def strip_hook_guard(command: str) -> str:
+    """hook-guard.sh 経由のコマンドから、ガード後に実行される本体コマンドを取り出す。"""
+    if command.startswith(HOOK_GUARD_PREFIX + " "):
+        _, sep, inner = command.rpartition(" -- ")
+        if sep:
+            return inner
+    return command
 
 
 def find_hook_in_settings(
@@ -96,13 +171,15 @@ def remove_hook_from_settings(
 
 
 def is_orchestra_hook(command: str) -> bool:
-    """コマンドが $AI_ORCHESTRA_DIR/packages/*/hooks/* パターンか判定する。"""
+    """コマンドが $AI_ORCHESTRA_DIR/packages/*/hooks/* パターンか判定する（ガード経由も含む）。"""
+    command = strip_hook_guard(command)
     return command.startswith('python3 "$AI_ORCHESTRA_DIR/packages/') and "/hooks/" in command
 
 
 def parse_pkg_from_command(command: str) -> str | None:
     """hook コマンドからパッケージ名を抽出する。"""
     prefix = 'python3 "$AI_ORCHESTRA_DIR/packages/'
+    command = strip_hook_guard(command)
     if not command.startswith(prefix):
         return None
     rest = command[len(prefix) :]
@@ -119,3 +196,10 @@ def parse_hook_entry(value: object) -> tuple[str, str | None]:
     if isinstance(value, dict):
         return value["file"], value.get("matcher")
     return "", None
+
+
+def parse_hook_filter(value: object) -> dict[str, Any] | None:
+    """manifest.json の hooks 値から filter を取得する（なければ None）。"""
+    if isinstance(value, dict):
+        return value.get("filter") or None
+    return None
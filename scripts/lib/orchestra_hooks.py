@@ -59,9 +59,11 @@ class HooksMixin:
     # --- hook 操作（hook_utils に委譲） ---
 
     @staticmethod
-    def get_hook_command(pkg_name: str, filename: str) -> str:
-        """フックコマンドを生成（$AI_ORCHESTRA_DIR 参照）"""
-        return get_hook_command(pkg_name, filename)
+    def get_hook_command(
+        pkg_name: str, filename: str, hook_filter: dict[str, Any] | None = None
+    ) -> str:
+        """フックコマンドを生成（$AI_ORCHESTRA_DIR 参照、filter があればガード経由）"""
+        return get_hook_command(pkg_name, filename, hook_filter)
 
     def is_hook_registered(
         self,
@@ -70,10 +72,11 @@ class HooksMixin:
         filename: str,
         pkg_name: str,
         matcher: str | None = None,
+        hook_filter: dict[str, Any] | None = None,
     ) -> bool:
         """フックが settings.local.json に登録されているかチェック"""
         hooks = settings.get("hooks", {})
-        command = get_hook_command(pkg_name, filename)
+        command = get_hook_command(pkg_name, filename, hook_filter)
         return find_hook_in_settings(hooks, event, command, matcher)
 
     def _count_registered_hooks(self, pkg: Package, settings: dict[str, Any]) -> tuple[int, int]:
@@ -83,7 +86,9 @@ class HooksMixin:
             1
             for event, entries in pkg.hooks.items()
             for entry in entries
-            if self.is_hook_registered(settings, event, entry.file, pkg.name, entry.matcher)
+            if self.is_hook_registered(
+                settings, event, entry.file, pkg.name, entry.matcher, entry.filter
+            )
         )
         return registered, total
 
@@ -103,11 +108,17 @@ class HooksMixin:
                     print(f"[DRY-RUN] {verb}: {event} / {entry.file}{matcher_info}")
                 elif action == "add":
                     self.add_hook_to_settings(
-                        settings, event, entry.file, pkg.name, entry.matcher, entry.timeout
+                        settings,
+                        event,
+                        entry.file,
+                        pkg.name,
+                        entry.matcher,
+                        entry.timeout,
+                        entry.filter,
                     )
                 else:
                     self.remove_hook_from_settings(
-                        settings, event, entry.file, pkg.name, entry.matcher
+                        settings, event, entry.file, pkg.name, entry.matcher, entry.filter
                     )
 
     @staticmethod
@@ -118,11 +129,12 @@ class HooksMixin:
         pkg_name: str,
         matcher: str | None = None,
         timeout: int = 5,
+        hook_filter: dict[str, Any] | None = None,
     ) -> None:
         """settings.local.json にフックを追加"""
         if "hooks" not in settings:
             settings["hooks"] = {}
-        command = get_hook_command(pkg_name, filename)
+        command = get_hook_command(pkg_name, filename, hook_filter)
         _add_hook(settings["hooks"], event, command, matcher, timeout)
 
     @staticmethod
@@ -132,11 +144,12 @@ class HooksMixin:
         filename: str,
         pkg_name: str,
         matcher: str | None = None,
+        hook_filter: dict[str, Any] | None = None,
     ) -> None:
         """settings.local.json からフックを削除"""
         if "hooks" not in settings or event not in settings["hooks"]:
             return
-        command = get_hook_command(pkg_name, filename)
+        command = get_hook_command(pkg_name, filename, hook_filter)
         _remove_hook(settings["hooks"], event, command, matcher)
 
     def setup_env_var(self, dry_run: bool = False) -> None:
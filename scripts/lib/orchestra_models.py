@@ -15,6 +15,7 @@ class HookEntry:
     file: str
     matcher: str | None = None
     timeout: int = 5
+    filter: dict[str, Any] | None = None
 
     @classmethod
     def from_json(cls, value: str | dict[str, Any]) -> HookEntry:
@@ -25,6 +26,7 @@ class HookEntry:
             file=value["file"],
             matcher=value.get("matcher"),
             timeout=value.get("timeout", 5),
+            filter=value.get("filter") or None,
         )
 
 
@@ -73,7 +75,11 @@ class Package:
         """manifest.json からパッケージ情報をロード"""
         with open(manifest_path, encoding="utf-8") as f:
             data = json.load(f)
+        return cls.from_dict(data, manifest_path.parent)
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], path: Path) -> Package:
+        """manifest の内容（パッケージレジストリのエントリ）からパッケージ情報を生成"""
         hooks = {}
         for event, entries in data.get("hooks", {}).items():
             hooks[event] = [HookEntry.from_json(e) for e in entries]
@@ -82,14 +88,14 @@ class Package:
             name=data["name"],
             version=data["version"],
             description=data.get("description", ""),
-            depends=data.get("depends", []),
+            depends=list(data.get("depends", [])),
             hooks=hooks,
-            files=data.get("files", []),
+            files=list(data.get("files", [])),
             scripts=[ScriptEntry.from_json(s) for s in data.get("scripts", [])],
-            config=data.get("config", []),
-            skills=data.get("skills", []),
-            agents=data.get("agents", []),
-            rules=data.get("rules", []),
-            path=manifest_path.parent,
-            context_files=data.get("context_files", {}),
+            config=list(data.get("config", [])),
+            skills=list(data.get("skills", [])),
+            agents=list(data.get("agents", [])),
+            rules=list(data.get("rules", [])),
+            path=path,
+            context_files=dict(data.get("context_files", {})),
         )
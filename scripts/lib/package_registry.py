@@ -0,0 +1,255 @@
+"""コンパイル済みパッケージレジストリ。
+
+全 packages/*/manifest.json・presets.json・composition 所有関係を 1 つの JSON
+（`$AI_ORCHESTRA_DIR/.package-registry.json`）にまとめ、依存順・イベント/matcher 別の
+hook テーブル・ファイルリストを解決済みの状態で保持する。
+
+呼び出し側は load_registry() の 1 回の読み込みで済む。レジストリは manifest / presets /
+バージョンファイルの stat から計算したスタンプで検証し、install 時に再生成するほか、
+orchex のアップグレード等でスタンプが変わっていれば自動で再コンパイルする。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+from lib.hook_utils import compile_hook_filter, parse_hook_entry, parse_hook_filter
+
+REGISTRY_FILENAME = ".package-registry.json"
+
+# レジストリ形式の互換性が変わったら上げる（既存ファイルを一括無効化）
+REGISTRY_SCHEMA = 2
+
+# スタンプに含めるバージョンファイル（アップグレードで必ず変わる）
+_VERSION_FILES = ("_version.py", "ai_orchestra/_version.py")
+
+# プロセス内キャッシュ {orchestra_dir: registry}（スタンプ一致時のみ再利用）
+_memo: dict[Path, dict[str, Any]] = {}
+
+# 同期パイプラインの並行ステップから同時に呼ばれても 1 回だけコンパイルするためのロック
+_lock = threading.RLock()
+
+
+def registry_path(orchestra_dir: Path) -> Path:
+    """レジストリファイルのパスを返す。"""
+    return orchestra_dir / REGISTRY_FILENAME
+
+
+def _stat_line(path: Path, label: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{label} -"
+    return f"{label} {st.st_mtime_ns} {st.st_size}"
+
+
+def _package_dirs(orchestra_dir: Path) -> list[str]:
+    try:
+        return sorted(e.name for e in os.scandir(orchestra_dir / "packages") if e.is_dir())
+    except OSError:
+        return []
+
+
+def compute_stamp(orchestra_dir: Path) -> str:
+    """レジストリ入力（manifest / presets / バージョン）の stat からスタンプを計算する。"""
+    lines = [f"schema {REGISTRY_SCHEMA}", f"orchestra {orchestra_dir}"]
+    for rel in _VERSION_FILES:
+        lines.append(_stat_line(orchestra_dir / rel, rel))
+    lines.append(_stat_line(orchestra_dir / "presets.json", "presets.json"))
+    for name in _package_dirs(orchestra_dir):
+        manifest_path = orchestra_dir / "packages" / name / "manifest.json"
+        lines.append(_stat_line(manifest_path, f"packages/{name}/manifest.json"))
+    return hashlib.blake2b("\n".join(lines).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _dependency_order(packages: dict[str, dict[str, Any]]) -> list[str]:
+    """depends を考慮した全パッケージのインストール順（同順位は名前順）を返す。"""
+    names = sorted(packages)
+    in_degree = dict.fromkeys(names, 0)
+    dependents: dict[str, list[str]] = {name: [] for name in names}
+    for name in names:
+        for dep in packages[name].get("depends", []):
+            if dep in in_degree:
+                in_degree[name] += 1
+                dependents[dep].append(name)
+
+    ready = sorted(n for n in names if in_degree[n] == 0)
+    order: list[str] = []
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for dependent in dependents[node]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                ready.append(dependent)
+                ready.sort()
+
+    if len(order) != len(names):
+        print("[warn] package registry: 循環依存が検出されました", file=sys.stderr)
+        order.extend(n for n in names if n not in order)
+    return order
+
+
+def compile_registry(orchestra_dir: Path) -> dict[str, Any]:
+    """manifest / presets を読み込み、レジストリ（dict）を組み立てる。
+
+    packages は manifest をディレクトリ名キーでそのまま保持する（Package.from_dict の入力）。
+    読み込めない manifest は sync_engine と同様にスキップする。
+    """
+    stamp = compute_stamp(orchestra_dir)
+
+    packages: dict[str, dict[str, Any]] = {}
+    for name in _package_dirs(orchestra_dir):
+        manifest_path = orchestra_dir / "packages" / name / "manifest.json"
+        if not manifest_path.is_file():
+            continue
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            continue
+        if isinstance(manifest, dict):
+            packages[name] = manifest
+
+    compositions: dict[str, str] = {}
+    for pkg_dir in sorted(packages):
+        manifest = packages[pkg_dir]
+        pkg_name = manifest.get("name", pkg_dir)
+        for field in ("skills", "rules"):
+            for comp_name in manifest.get(field, []):
+                if isinstance(comp_name, str):
+                    if comp_name in compositions:
+                        print(
+                            f"[warn] composition '{comp_name}' claimed by both"
+                            f" '{compositions[comp_name]}' and '{pkg_name}'",
+                            file=sys.stderr,
+                        )
+                    compositions[comp_name] = pkg_name
+
+    # {event: {matcher ("" は matcher なし): [{package, file, timeout, filter}]}}
+    hooks: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    for pkg_dir in sorted(packages):
+        for event, entries in packages[pkg_dir].get("hooks", {}).items():
+            for raw_entry in entries:
+                filename, matcher = parse_hook_entry(raw_entry)
+                if not filename:
+                    continue
+                timeout = raw_entry.get("timeout", 5) if isinstance(raw_entry, dict) else 5
+                hook_filter = parse_hook_filter(raw_entry)
+                try:
+                    compile_hook_filter(hook_filter)
+                except ValueError as e:
+                    # 不正な filter は無視して常に hook を起動する（取りこぼすより安全側）
+                    print(f"[warn] {pkg_dir}/{filename}: {e}", file=sys.stderr)
+                    hook_filter = None
+                hooks.setdefault(event, {}).setdefault(matcher or "", []).append(
+                    {
+                        "package": pkg_dir,
+                        "file": filename,
+                        "timeout": timeout,
+                        "filter": hook_filter,
+                    }
+                )
+
+    files = {
+        pkg_dir: {
+            category: list(manifest.get(category, []))
+            for category in ("files", "agents", "config", "skills", "rules")
+        }
+        for pkg_dir, manifest in packages.items()
+    }
+
+    presets: dict[str, Any] = {}
+    presets_path = orchestra_dir / "presets.json"
+    if presets_path.is_file():
+        try:
+            presets = json.loads(presets_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            presets = {}
+        all_package_names = sorted(m.get("name", d) for d, m in packages.items())
+        for preset in presets.values():
+            if isinstance(preset, dict) and preset.get("packages") == "__all__":
+                preset["packages"] = all_package_names
+
+    return {
+        "schema": REGISTRY_SCHEMA,
+        "stamp": stamp,
+        "packages": packages,
+        "order": _dependency_order(packages),
+        "compositions": compositions,
+        "hooks": hooks,
+        "files": files,
+        "presets": presets,
+    }
+
+
+def write_registry(orchestra_dir: Path, registry: dict[str, Any] | None = None) -> dict[str, Any]:
+    """レジストリをコンパイルしてファイルに書き出す（install / アップグレード時）。
+
+    書き込めない場合（読み取り専用インストール等）はメモリ上のレジストリだけを返す。
+    """
+    with _lock:
+        if registry is None:
+            registry = compile_registry(orchestra_dir)
+        path = registry_path(orchestra_dir)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(registry, ensure_ascii=False) + "\n", encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        _memo[orchestra_dir] = registry
+        return registry
+
+
+def load_registry(orchestra_dir: Path) -> dict[str, Any]:
+    """レジストリを返す。スタンプが一致しなければ再コンパイルして書き直す。"""
+    stamp = compute_stamp(orchestra_dir)
+    with _lock:
+        cached = _memo.get(orchestra_dir)
+        if cached is not None and cached.get("stamp") == stamp:
+            return cached
+
+        try:
+            registry = json.loads(registry_path(orchestra_dir).read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            registry = None
+        if (
+            isinstance(registry, dict)
+            and registry.get("schema") == REGISTRY_SCHEMA
+            and registry.get("stamp") == stamp
+        ):
+            _memo[orchestra_dir] = registry
+            return registry
+
+        return write_registry(orchestra_dir)
+
+
+def expected_hooks(
+    registry: dict[str, Any], installed_packages: list[str]
+) -> list[tuple[str, str, str, str | None, dict[str, Any] | None]]:
+    """インストール済みパッケージの hook を (event, package, file, matcher, filter) で返す。"""
+    installed_set = set(installed_packages)
+    result: list[tuple[str, str, str, str | None, dict[str, Any] | None]] = []
+    for event, by_matcher in registry.get("hooks", {}).items():
+        for matcher, entries in by_matcher.items():
+            for entry in entries:
+                if entry["package"] in installed_set:
+                    result.append(
+                        (
+                            event,
+                            entry["package"],
+                            entry["file"],
+                            matcher or None,
+                            entry.get("filter"),
+                        )
+                    )
+    return result
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-import hashlib
+import contextlib
 import json
+import os
 import re
 import shutil
-import subprocess
 import sys
 from pathlib import Path
 
@@ -20,10 +20,11 @@ from lib.hook_utils import (
     find_hook_in_settings,
     get_hook_command,
     is_orchestra_hook,
-    parse_hook_entry,
     parse_pkg_from_command,
     remove_hook_from_settings,
 )
+from lib.package_registry import expected_hooks as registry_hooks
+from lib.package_registry import load_registry
 
 
 def needs_sync(src: Path, dst: Path) -> bool:
@@ -33,6 +34,68 @@ def needs_sync(src: Path, dst: Path) -> bool:
     return src.stat().st_mtime > dst.stat().st_mtime
 
 
+# orchestra.json の sync_strategy で選べるファイル配置方式（既定は copy）
+SYNC_STRATEGIES = ("copy", "hardlink", "reflink", "symlink")
+
+# linux/fs.h: FICLONE = _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+
+def resolve_sync_strategy(value: object) -> str:
+    """orchestra.json の sync_strategy を検証し、不正値なら copy を返す。"""
+    if value is None or value == "copy":
+        return "copy"
+    if value in SYNC_STRATEGIES:
+        return str(value)
+    print(f"[orchestra] unknown sync_strategy {value!r}; using copy", file=sys.stderr)
+    return "copy"
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    """FICLONE ioctl で src の CoW クローンを dst に作る（Btrfs / XFS 等）。"""
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            dst.unlink()
+            raise
+    shutil.copystat(src, dst)
+
+
+def place_file(src: Path, dst: Path, strategy: str = "copy") -> str:
+    """src を dst に配置し、実際に使った方式を返す。
+
+    hardlink / reflink / symlink は一時名で作成してから置き換え、失敗時（別デバイス・
+    非対応 FS 等）は copy にフォールバックする。copy は既存の dst がリンクなら
+    先に外し、orchestra 側のソースを書き換えないようにする。
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if strategy != "copy":
+        tmp = dst.with_name(f".{dst.name}.orchestra-tmp")
+        try:
+            if tmp.is_symlink() or tmp.exists():
+                tmp.unlink()
+            if strategy == "hardlink":
+                os.link(src, tmp)
+            elif strategy == "symlink":
+                os.symlink(src.resolve(), tmp)
+            elif strategy == "reflink":
+                _reflink(src, tmp)
+            os.replace(tmp, dst)
+            return strategy
+        except (OSError, ImportError):
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+
+    if dst.is_symlink() or (dst.exists() and os.path.samefile(src, dst)):
+        dst.unlink()
+    shutil.copy2(src, dst)
+    return "copy"
+
+
 def is_local_override(category: str, rel_path: Path) -> bool:
     """プロジェクト固有の上書きファイル（*.local.yaml / *.local.json）かどうか判定する。"""
     name = rel_path.name
@@ -60,7 +123,8 @@ def remove_stale_files(
         if len(parts) == 2 and is_local_override(parts[0], Path(parts[1])):
             continue
         target = claude_dir / file_key
-        if target.is_file():
+        # symlink 同期ではリンク切れ（ソース削除済み）も削除対象
+        if target.is_file() or target.is_symlink():
             target.unlink()
             removed += 1
             parent = target.parent
@@ -128,35 +192,12 @@ def collect_manifest_compositions(
 
     Scans every package directory (not just installed ones) so that
     package-owned compositions can be distinguished from global ones.
+    The mapping is precompiled in the package registry.
 
     Returns:
         {composition_name: package_name} mapping
     """
-    compositions: dict[str, str] = {}
-    packages_dir = orchestra_path / "packages"
-    if not packages_dir.is_dir():
-        return compositions
-    for pkg_dir in sorted(packages_dir.iterdir()):
-        manifest_path = pkg_dir / "manifest.json"
-        if not manifest_path.is_file():
-            continue
-        try:
-            with open(manifest_path, encoding="utf-8") as f:
-                manifest = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            continue
-        pkg_name = manifest.get("name", pkg_dir.name)
-        for field in ("skills", "rules"):
-            for name in manifest.get(field, []):
-                if isinstance(name, str):
-                    if name in compositions:
-                        print(
-                            f"[warn] composition '{name}' claimed by both"
-                            f" '{compositions[name]}' and '{pkg_name}'",
-                            file=sys.stderr,
-                        )
-                    compositions[name] = pkg_name
-    return compositions
+    return dict(load_registry(orchestra_path)["compositions"])
 
 
 def sync_hooks(
@@ -186,23 +227,11 @@ def sync_hooks(
     expected_hooks: set[tuple[str, str, str | None]] = set()
     installed_set = set(installed_packages)
 
-    for pkg_name in installed_packages:
-        manifest_path = orchestra_path / "packages" / pkg_name / "manifest.json"
-        if not manifest_path.exists():
-            continue
-        try:
-            with open(manifest_path, encoding="utf-8") as f:
-                manifest = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            continue
-
-        for event, entries in manifest.get("hooks", {}).items():
-            for raw_entry in entries:
-                filename, matcher = parse_hook_entry(raw_entry)
-                if not filename:
-                    continue
-                command = get_hook_command(pkg_name, filename)
-                expected_hooks.add((event, command, matcher))
+    registry = load_registry(orchestra_path)
+    for event, pkg_name, filename, matcher, hook_filter in registry_hooks(
+        registry, installed_packages
+    ):
+        expected_hooks.add((event, get_hook_command(pkg_name, filename, hook_filter), matcher))
 
     added = 0
     for event, command, matcher in expected_hooks:
@@ -247,24 +276,25 @@ def sync_packages(
     orchestra_path: Path,
     installed_packages: list[str],
     facet_managed: set[str],
+    strategy: str = "copy",
+    relink: bool = False,
 ) -> tuple[int, set[str]]:
     """パッケージ単位のファイル同期を実行する。
 
+    strategy はファイル配置方式（SYNC_STRATEGIES）。relink=True の場合は
+    needs_sync に関わらず全ファイルを配置し直す（sync_strategy 変更時の移行用）。
+    *.local.* の上書きファイルは常に copy で扱う。
+
     Returns:
         (synced_count, synced_files)
     """
     synced_count = 0
     synced_files: set[str] = set()
 
+    registered = load_registry(orchestra_path)["packages"]
     for pkg_name in installed_packages:
-        manifest_path = orchestra_path / "packages" / pkg_name / "manifest.json"
-        if not manifest_path.exists():
-            continue
-
-        try:
-            with open(manifest_path, encoding="utf-8") as f:
-                manifest = json.load(f)
-        except (json.JSONDecodeError, OSError):
+        manifest = registered.get(pkg_name)
+        if manifest is None:
             continue
 
         pkg_dir = orchestra_path / "packages" / pkg_name
@@ -286,10 +316,10 @@ def sync_packages(
                             continue
                         synced_files.add(file_rel)
                         dst = claude_dir / file_rel
-                        if not needs_sync(src_file, dst):
+                        if not relink and not needs_sync(src_file, dst):
                             continue
-                        dst.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(src_file, dst)
+                        local = is_local_override(category, dst)
+                        place_file(src_file, dst, "copy" if local else strategy)
                         synced_count += 1
                 else:
                     if category == "config":
@@ -305,11 +335,11 @@ def sync_packages(
 
                     synced_files.add(dst_key)
 
-                    if not needs_sync(src, dst):
+                    if not relink and not needs_sync(src, dst):
                         continue
 
-                    dst.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(src, dst)
+                    local = is_local_override(category, dst)
+                    place_file(src, dst, "copy" if local else strategy)
                     synced_count += 1
 
     return synced_count, synced_files
@@ -320,7 +350,11 @@ def build_facets(
     project_dir: Path,
     installed_packages: list[str] | None = None,
 ) -> int:
-    """facet composition から SKILL.md / ルール .md を自動生成する。"""
+    """facet composition から SKILL.md / ルール .md を自動生成する。
+
+    再ビルド要否は FacetBuilder が出力ごとの依存レコードで判定し、入力が変わった出力のみ
+    書き出す。戻り値は実際に書き換えた出力数。
+    """
 
     compositions_dir = orchestra_path / "facets" / "compositions"
     local_compositions_dir = project_dir / ".claude" / "facets" / "compositions"
@@ -330,100 +364,48 @@ def build_facets(
     if not has_orchestra and not has_local:
         return 0
 
-    yamls: list[Path] = []
-    if has_orchestra:
-        yamls.extend(compositions_dir.rglob("*.yaml"))
-    if has_local:
-        yamls.extend(local_compositions_dir.rglob("*.yaml"))
-
-    latest_src = max(p.stat().st_mtime for p in yamls)
-    facets_dir = orchestra_path / "facets"
-    facet_mds = list(facets_dir.glob("**/*.md"))
-    if facet_mds:
-        latest_src = max(latest_src, max(p.stat().st_mtime for p in facet_mds))
-    local_facets_dir = project_dir / ".claude" / "facets"
-    if local_facets_dir.is_dir():
-        local_facet_mds = list(local_facets_dir.glob("**/*.md"))
-        if local_facet_mds:
-            latest_src = max(latest_src, max(p.stat().st_mtime for p in local_facet_mds))
-
-    orch_json = project_dir / ".claude" / "orchestra.json"
-    if orch_json.is_file():
+    if installed_packages is None:
+        orch_json = project_dir / ".claude" / "orchestra.json"
         try:
             orch_data = json.loads(orch_json.read_text(encoding="utf-8"))
-            pkgs_str = ",".join(sorted(orch_data.get("installed_packages", [])))
+            installed_packages = orch_data.get("installed_packages", [])
         except (json.JSONDecodeError, OSError):
-            pkgs_str = ""
-        pkgs_hash = hashlib.md5(pkgs_str.encode()).hexdigest()
-        hash_file = project_dir / ".claude" / ".facet-packages-hash"
-        prev_hash = ""
-        if hash_file.is_file():
-            try:
-                prev_hash = hash_file.read_text(encoding="utf-8").strip()
-            except OSError:
-                pass
-        if pkgs_hash != prev_hash:
-            try:
-                hash_file.write_text(pkgs_hash, encoding="utf-8")
-            except OSError:
-                pass
-            import time
-
-            latest_src = time.time()
-
-    claude_skills = project_dir / ".claude" / "skills"
-    claude_rules = project_dir / ".claude" / "rules"
-    generated: list[Path] = []
-    if claude_skills.is_dir():
-        generated.extend(claude_skills.glob("*/SKILL.md"))
-    if claude_rules.is_dir():
-        generated.extend(claude_rules.glob("*.md"))
-    if generated and min(p.stat().st_mtime for p in generated) >= latest_src:
-        return 0
-
-    script = orchestra_path / "scripts" / "orchestra-manager.py"
-    if not script.is_file():
-        return 0
+            installed_packages = []
 
     targets = ["claude"]
     if installed_packages and "codex-suggestions" in installed_packages:
         targets.append("codex")
+    label = ", ".join(targets)
 
-    total_built = 0
-    for target in targets:
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    str(script),
-                    "facet",
-                    "build",
-                    "--target",
-                    target,
-                    "--project",
-                    str(project_dir),
-                ],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-        except subprocess.TimeoutExpired:
-            print(f"[orchestra] facet build ({target}) timed out", file=sys.stderr)
-            continue
-        except OSError as e:
-            print(f"[orchestra] facet build ({target}) failed: {e}", file=sys.stderr)
-            continue
+    # orchestra-manager.py をサブプロセスで起動せず、全 target を 1 パスでビルドする
+    try:
+        from lib.facet_builder import FacetBuilder
+    except ImportError as e:
+        print(f"[orchestra] facet build ({label}) failed: {e}", file=sys.stderr)
+        return 0
 
-        if result.returncode != 0:
-            print(
-                f"[orchestra] facet build ({target}) error: {result.stderr.strip()}",
-                file=sys.stderr,
-            )
-            continue
+    local_facets_dir = project_dir / ".claude" / "facets"
+    builder = FacetBuilder(
+        orchestra_dir=orchestra_path,
+        project_facets_dir=local_facets_dir if local_facets_dir.is_dir() else None,
+        manifest_compositions=collect_manifest_compositions(orchestra_path),
+        installed_packages=list(installed_packages or []),
+    )
+
+    # CLI 出力と同じ形式のメッセージを収集し、built は件数のみ、removed / cleanup は行をそのまま出力する
+    # （stdout を差し替えると並行実行中の他ステップの出力まで巻き込むため、log で受け取る）
+    messages: list[str] = []
+    try:
+        builder.build_all(targets, project_dir, log=messages.append)
+    except SystemExit:
+        print(f"[orchestra] facet build ({label}) error", file=sys.stderr)
+        return 0
+    except OSError as e:
+        print(f"[orchestra] facet build ({label}) failed: {e}", file=sys.stderr)
+        return 0
 
-        total_built += result.stdout.count("[facet] built")
-        for line in result.stdout.splitlines():
-            if "[facet] removed" in line or "[facet] cleanup" in line:
-                print(line)
+    for message in messages:
+        if "[facet] removed" in message or "[facet] cleanup" in message:
+            print(message)
 
-    return total_built
+    return sum("[facet] built" in message for message in messages)
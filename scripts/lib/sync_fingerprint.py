@@ -0,0 +1,152 @@
+"""SessionStart 同期の高速パス判定用フィンガープリント。
+
+sync-orchestra.py の全処理（manifest 読み込み・facet build・agent パッチ・hook 同期）は
+入力が変わらない限り結果も変わらない。入力を安価な stat 情報だけで要約し、前回同期時の値と
+一致すれば同期全体をスキップする。
+
+このモジュールは PyYAML / sync_engine / typing を import しない（高速パスの起動コストを抑えるため）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+FINGERPRINT_KEY = "sync_fingerprint"
+
+# 同期ロジック自体の互換性が変わったら上げる（既存フィンガープリントを一括無効化）
+FINGERPRINT_SCHEMA = 1
+
+# 走査から除外するディレクトリ名（hook 実行で随時更新されるため）
+_SKIP_DIRS = frozenset({"__pycache__", ".pytest_cache", ".ruff_cache"})
+
+# orchestra 側で同期結果に影響するツリー（packages は manifest/agents/config のみ）
+_ORCHESTRA_TREES = ("facets", "templates/project")
+_PACKAGE_SYNC_DIRS = ("agents", "config")
+_ORCHESTRA_FILES = (
+    "_version.py",
+    "ai_orchestra/_version.py",
+    "scripts/sync-orchestra.py",
+)
+
+# プロジェクト側で同期結果に影響するツリーとファイル
+_PROJECT_TREES = (".claude/config", ".claude/agents", ".claude/facets")
+_PROJECT_PATHS = (
+    ".claude/skills",
+    ".claude/rules",
+    ".claude/.facet-manifest.json",
+    ".codex/skills",
+    ".codex/rules",
+    ".codex/.facet-manifest.json",
+    ".claudeignore",
+    ".claudeignore.local",
+    ".gitignore",
+)
+
+
+def _stat_line(path: Path, label: str) -> str:
+    """パスの stat 情報を 1 行に要約する。存在しない場合は "-" を返す。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{label} -"
+    return f"{label} {st.st_mtime_ns} {st.st_size}"
+
+
+def _walk_tree(root: Path, label: str, lines: list[str]) -> None:
+    """ディレクトリ配下のディレクトリ mtime とファイル stat を lines に追記する。
+
+    エントリ追加/削除/リネームはディレクトリ mtime に、in-place 編集はファイル mtime に現れる。
+    """
+    try:
+        st = os.stat(root)
+    except OSError:
+        lines.append(f"{label} -")
+        return
+    lines.append(f"{label} {st.st_mtime_ns}")
+
+    stack = [(root, label)]
+    while stack:
+        current, current_label = stack.pop()
+        try:
+            entries = sorted(os.scandir(current), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name in _SKIP_DIRS:
+                continue
+            entry_label = f"{current_label}/{entry.name}"
+            try:
+                entry_st = entry.stat()
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                lines.append(f"{entry_label}/ {entry_st.st_mtime_ns}")
+                stack.append((Path(entry.path), entry_label))
+            else:
+                lines.append(f"{entry_label} {entry_st.st_mtime_ns} {entry_st.st_size}")
+
+
+def _orchestra_lines(orchestra_path: Path, lines: list[str]) -> None:
+    """orchestra 側の入力を lines に追記する。"""
+    lines.append(f"orchestra {orchestra_path}")
+    for rel in _ORCHESTRA_FILES:
+        lines.append(_stat_line(orchestra_path / rel, rel))
+    _walk_tree(orchestra_path / "scripts" / "lib", "scripts/lib", lines)
+    for rel in _ORCHESTRA_TREES:
+        _walk_tree(orchestra_path / rel, rel, lines)
+
+    packages_dir = orchestra_path / "packages"
+    lines.append(_stat_line(packages_dir, "packages"))
+    try:
+        pkg_names = sorted(e.name for e in os.scandir(packages_dir) if e.is_dir())
+    except OSError:
+        pkg_names = []
+    for name in pkg_names:
+        pkg_dir = packages_dir / name
+        lines.append(_stat_line(pkg_dir / "manifest.json", f"packages/{name}/manifest.json"))
+        for sub in _PACKAGE_SYNC_DIRS:
+            if (pkg_dir / sub).is_dir():
+                _walk_tree(pkg_dir / sub, f"packages/{name}/{sub}", lines)
+
+
+def _project_lines(project_dir: Path, orch: dict, lines: list[str]) -> None:
+    """プロジェクト側の入力を lines に追記する。"""
+    orch_state = {k: v for k, v in orch.items() if k != FINGERPRINT_KEY}
+    lines.append("orchestra.json " + json.dumps(orch_state, sort_keys=True, ensure_ascii=False))
+
+    # settings.local.json は permission 追記などで頻繁に書き換わるため hooks のみを見る
+    settings_path = project_dir / ".claude" / "settings.local.json"
+    try:
+        settings = json.loads(settings_path.read_text(encoding="utf-8"))
+        hooks = settings.get("hooks") if isinstance(settings, dict) else None
+        lines.append("settings.hooks " + json.dumps(hooks, sort_keys=True, ensure_ascii=False))
+    except (OSError, ValueError):
+        lines.append("settings.hooks -")
+
+    for rel in _PROJECT_TREES:
+        _walk_tree(project_dir / rel, rel, lines)
+    for rel in _PROJECT_PATHS:
+        lines.append(_stat_line(project_dir / rel, rel))
+
+
+def compute_sync_fingerprint(orchestra_path: Path, project_dir: Path, orch: dict) -> str:
+    """同期入力全体のフィンガープリントを返す。
+
+    入力: orchestra バージョン、AI_ORCHESTRA_DIR の同期対象ツリー（ディレクトリ mtime +
+    ファイル stat）、orchestra.json（フィンガープリント自身を除く）、settings.local.json の
+    hooks、ローカル上書き（.claude/config 配下の *.local.* / cli-tools.yaml、.claude/facets、
+    .claudeignore.local）および同期先の生成物ディレクトリ。
+    """
+    lines: list[str] = [f"schema {FINGERPRINT_SCHEMA}"]
+    _orchestra_lines(orchestra_path, lines)
+    _project_lines(project_dir, orch, lines)
+    return hashlib.blake2b("\n".join(lines).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def is_sync_fresh(orch: dict, fingerprint: str) -> bool:
+    """orchestra.json に記録された前回フィンガープリントと一致するか判定する。"""
+    return orch.get(FINGERPRINT_KEY) == fingerprint
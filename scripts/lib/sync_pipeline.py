@@ -0,0 +1,165 @@
+"""SessionStart 同期ステップの DAG 実行。
+
+各ステップは読み書きするリソース（.claude/agents などのパス or 論理名）を宣言する。
+宣言順で先行するステップと書き込みが衝突する場合（write/write, write/read, read/write）
+だけ依存辺を張り、それ以外はスレッドプールで並行実行する。ファイル I/O と facet build
+のように独立したステップが重なり合うため、同期の所要時間が最長経路まで短縮される。
+
+リソースは同一パスだけでなく、一方が他方の祖先（.claude と .claude/skills など）でも
+衝突とみなす。
+
+ステップ間のデータ受け渡しは results（ステップ名 → 戻り値）経由で行い、参照する
+ステップは after で明示する。
+
+ステップごとの開始オフセット・所要時間は .claude/logs/sync-timings.jsonl に 1 実行
+1 行で追記する。
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+TIMINGS_FILENAME = "sync-timings.jsonl"
+
+# タイミングログの上限サイズ。超えたら .1 にローテーションする
+TIMINGS_MAX_BYTES = 256 * 1024
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Step:
+    """同期パイプラインの 1 ステップ。"""
+
+    name: str
+    run: Callable[[dict[str, Any]], Any]
+    reads: frozenset[str] = field(default_factory=frozenset)
+    writes: frozenset[str] = field(default_factory=frozenset)
+    after: tuple[str, ...] = ()
+
+
+def step(
+    name: str,
+    run: Callable[[dict[str, Any]], Any],
+    *,
+    reads: Iterable[str] = (),
+    writes: Iterable[str] = (),
+    after: Iterable[str] = (),
+) -> Step:
+    """Step を組み立てる（reads / writes は任意の iterable を受け付ける）。"""
+    return Step(name, run, frozenset(reads), frozenset(writes), tuple(after))
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """同じリソースか、一方が他方の祖先パスなら True。"""
+    a, b = a.rstrip("/"), b.rstrip("/")
+    return a == b or b.startswith(a + "/") or a.startswith(b + "/")
+
+
+def _any_overlap(left: frozenset[str], right: frozenset[str]) -> bool:
+    return any(_overlaps(a, b) for a in left for b in right)
+
+
+def _conflicts(earlier: Step, later: Step) -> bool:
+    return _any_overlap(earlier.writes, later.reads | later.writes) or _any_overlap(
+        earlier.reads, later.writes
+    )
+
+
+def build_dependencies(steps: list[Step]) -> dict[str, set[str]]:
+    """各ステップが待つべき先行ステップ名の集合を返す。
+
+    依存は宣言順で前にあるステップにのみ張るため、循環は発生しない。
+    """
+    deps: dict[str, set[str]] = {}
+    for index, current in enumerate(steps):
+        if current.name in deps:
+            raise ValueError(f"duplicate step: {current.name}")
+        earlier_names = {s.name for s in steps[:index]}
+        for name in current.after:
+            if name not in earlier_names:
+                raise ValueError(f"step '{current.name}' must be declared after '{name}'")
+        deps[current.name] = set(current.after)
+        deps[current.name].update(s.name for s in steps[:index] if _conflicts(s, current))
+    return deps
+
+
+def run_pipeline(
+    steps: list[Step], max_workers: int = DEFAULT_MAX_WORKERS
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """ステップを依存順にスレッドプールで実行し、(results, timings) を返す。
+
+    timings は {name: {"start_ms", "ms", "thread"}}（start_ms はパイプライン開始からの
+    オフセット）。ステップが例外を送出した場合は実行中のステップの完了を待って再送出する。
+    """
+    deps = build_dependencies(steps)
+    pending = {s.name: s for s in steps}
+    results: dict[str, Any] = {}
+    timings: dict[str, dict[str, Any]] = {}
+    done: set[str] = set()
+    origin = time.perf_counter()
+
+    def timed(current: Step) -> Any:
+        started = time.perf_counter()
+        try:
+            return current.run(results)
+        finally:
+            finished = time.perf_counter()
+            timings[current.name] = {
+                "start_ms": round((started - origin) * 1000, 2),
+                "ms": round((finished - started) * 1000, 2),
+                "thread": threading.current_thread().name,
+            }
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync") as executor:
+        running: dict[Future[Any], str] = {}
+
+        def submit_ready() -> None:
+            for name in [n for n in pending if deps[n] <= done]:
+                running[executor.submit(timed, pending.pop(name))] = name
+
+        submit_ready()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                results[name] = future.result()
+                done.add(name)
+            submit_ready()
+
+    return results, timings
+
+
+def write_timings(
+    project_dir: Path,
+    timings: dict[str, dict[str, Any]],
+    total_ms: float,
+) -> None:
+    """ステップ別タイミングを .claude/logs/sync-timings.jsonl に追記する（失敗は無視）。"""
+    log_dir = project_dir / ".claude" / "logs"
+    path = log_dir / TIMINGS_FILENAME
+    entry = {
+        "ts": datetime.datetime.now(datetime.UTC).isoformat(),
+        "total_ms": round(total_ms, 2),
+        "steps": dict(sorted(timings.items(), key=lambda item: item[1]["start_ms"])),
+    }
+    try:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            if path.stat().st_size > TIMINGS_MAX_BYTES:
+                os.replace(path, path.with_name(TIMINGS_FILENAME + ".1"))
+        except FileNotFoundError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
@@ -8,8 +8,8 @@ v2: $AI_ORCHESTRA_DIR + SessionStart 自動同期方式
 
 import argparse
 import bisect
+import copy
 import datetime
-import json
 import os
 import shutil
 import subprocess
@@ -29,6 +29,7 @@ from lib.facet_builder import FacetBuilder  # noqa: E402
 from lib.orchestra_context import ContextMixin  # noqa: E402
 from lib.orchestra_hooks import HooksMixin  # noqa: E402
 from lib.orchestra_models import Package  # noqa: E402
+from lib.package_registry import load_registry, write_registry  # noqa: E402
 from lib.sync_engine import collect_manifest_compositions  # noqa: E402
 
 
@@ -98,10 +99,11 @@ class OrchestraManager(ContextMixin, HooksMixin):
         return None
 
     def load_packages(self) -> dict[str, Package]:
-        """全パッケージをロード"""
+        """全パッケージをロード（コンパイル済みパッケージレジストリから、依存順）"""
+        registry = load_registry(self.orchestra_dir)
         packages = {}
-        for manifest_path in self.packages_dir.glob("*/manifest.json"):
-            pkg = Package.load(manifest_path)
+        for dir_name in registry["order"]:
+            pkg = Package.from_dict(registry["packages"][dir_name], self.packages_dir / dir_name)
             packages[pkg.name] = pkg
         return packages
 
@@ -112,15 +114,8 @@ class OrchestraManager(ContextMixin, HooksMixin):
             print("エラー: presets.json が見つかりません", file=sys.stderr)
             sys.exit(1)
 
-        with open(presets_path, encoding="utf-8") as f:
-            presets = json.load(f)
-
-        all_package_names = sorted(self.load_packages().keys())
-        for preset in presets.values():
-            if preset.get("packages") == "__all__":
-                preset["packages"] = all_package_names
-
-        return presets
+        # __all__ はレジストリのコンパイル時に展開済み
+        return copy.deepcopy(load_registry(self.orchestra_dir)["presets"])
 
     def resolve_install_order(self, package_names: list[str]) -> list[str]:
         """依存関係を考慮したインストール順を返す（トポロジカルソート）"""
@@ -256,7 +251,7 @@ class OrchestraManager(ContextMixin, HooksMixin):
                     for event, entries in pkg.hooks.items()
                     for entry in entries
                     if not self.is_hook_registered(
-                        settings, event, entry.file, pkg.name, entry.matcher
+                        settings, event, entry.file, pkg.name, entry.matcher, entry.filter
                     )
                 ]
                 hooks_info = (
@@ -428,6 +423,9 @@ class OrchestraManager(ContextMixin, HooksMixin):
         _skip_dep_check: bool = False,
     ) -> None:
         """パッケージをインストール"""
+        if not dry_run and not _skip_dep_check:
+            # install 時にパッケージレジストリを再コンパイルする
+            write_registry(self.orchestra_dir)
         packages = self.load_packages()
         if package_name not in packages:
             print(f"エラー: パッケージ '{package_name}' が見つかりません", file=sys.stderr)
@@ -782,6 +780,8 @@ class OrchestraManager(ContextMixin, HooksMixin):
 
     def setup(self, preset_name: str, project: str | None, dry_run: bool = False) -> None:
         """プリセットを使って一括セットアップ"""
+        if not dry_run:
+            write_registry(self.orchestra_dir)
         presets = self.load_presets()
         if preset_name not in presets:
             available = ", ".join(sorted(presets.keys()))
@@ -904,6 +904,65 @@ class OrchestraManager(ContextMixin, HooksMixin):
         print(f"ポート: {proxy_cfg['host']}:{proxy_cfg['port']}")
         print(f"PIDファイル: {pid_path}")
 
+    # ------------------------------------------------------------------
+    # 遅延ジョブキュー
+    # ------------------------------------------------------------------
+
+    def _load_job_queue(self):
+        """core パッケージの job_queue をインポートして返す。"""
+        core_hooks = str(self.orchestra_dir / "packages" / "core" / "hooks")
+        if core_hooks not in sys.path:
+            sys.path.insert(0, core_hooks)
+
+        import job_queue
+
+        return job_queue
+
+    def jobs_status(self, project: str | None, recent: int = 10) -> None:
+        """遅延ジョブキューの状態を表示する"""
+        job_queue = self._load_job_queue()
+        project_dir = self.get_project_dir(project)
+        status = job_queue.queue_status(str(project_dir), recent=recent)
+
+        worker = "停止"
+        if status["worker_running"]:
+            worker = f"稼働中 (PID {status['worker_pid'] or '-'})"
+        print(f"ワーカー: {worker}")
+        print(f"スプール: {job_queue.jobs_dir(str(project_dir))}")
+
+        print()
+        print(f"{'STATE':<9} {'PRI':>3}  {'KEY / COMMAND':<44} ENQUEUED")
+        print("-" * 80)
+        rows = [("running", job) for job in status["running"]]
+        rows += [("pending", job) for job in status["pending"]]
+        for state, job in rows:
+            label = job_queue.describe_job(job)[:44]
+            enqueued = job.get("enqueued_at", "")
+            print(f"{state:<9} {job.get('priority', '-'):>3}  {label:<44} {enqueued}")
+        if not rows:
+            print("(キューは空です)")
+
+        if status["recent"]:
+            print()
+            print("最近の完了ジョブ:")
+            for result in reversed(status["recent"]):
+                rc = result.get("returncode")
+                mark = "✓" if rc == 0 else "✗"
+                detail = result.get("error") or f"rc={rc}"
+                label = result.get("label", "")
+                elapsed = f"{result.get('ms', '-')}ms"
+                print(f"  {mark} {label} ({elapsed}, {detail}) {result.get('finished_at', '')}")
+
+    def jobs_run(self, project: str | None) -> None:
+        """未実行ジョブをフォアグラウンドで実行する"""
+        job_queue = self._load_job_queue()
+        project_dir = self.get_project_dir(project)
+        if job_queue.worker_running(str(project_dir)):
+            print("ワーカーが稼働中のため、そちらで実行されます")
+            return
+        processed = job_queue.run_worker(str(project_dir))
+        print(f"✓ {processed} 件のジョブを実行しました")
+
 
 def main():
     """メインエントリポイント"""
@@ -993,6 +1052,16 @@ def main():
     proxy_status_parser = proxy_sub.add_parser("status", help="mcp-proxy の状態を表示")
     proxy_status_parser.add_argument("--project", help="プロジェクトパス")
 
+    jobs_parser = subparsers.add_parser("jobs", help="hook の遅延ジョブキューの管理")
+    jobs_sub = jobs_parser.add_subparsers(dest="jobs_command", help="jobs サブコマンド")
+    jobs_status_parser = jobs_sub.add_parser("status", help="キューとワーカーの状態を表示")
+    jobs_status_parser.add_argument("--project", help="プロジェクトパス")
+    jobs_status_parser.add_argument(
+        "--recent", type=int, default=10, help="表示する完了ジョブ数（デフォルト: 10）"
+    )
+    jobs_run_parser = jobs_sub.add_parser("run", help="未実行ジョブをフォアグラウンドで実行")
+    jobs_run_parser.add_argument("--project", help="プロジェクトパス")
+
     facet_parser = subparsers.add_parser("facet", help="facet composition から SKILL.md を生成")
     facet_sub = facet_parser.add_subparsers(dest="facet_command", help="facet サブコマンド")
     facet_build_parser = facet_sub.add_parser(
@@ -1007,6 +1076,21 @@ def main():
         help="出力先（デフォルト: claude）",
     )
     facet_build_parser.add_argument("--project", help="プロジェクトパス")
+    facet_build_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="依存ファイルが変わっていない出力も再ビルドする",
+    )
+    facet_build_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="facets/ の変更を監視し、影響を受ける出力だけを再ビルドし続ける",
+    )
+    facet_build_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="--watch で inotify を使わずポーリングで監視する",
+    )
     facet_extract_parser = facet_sub.add_parser(
         "extract",
         help="生成済みファイルから instruction を抽出してソースに書き戻す",
@@ -1084,6 +1168,14 @@ def main():
         else:
             proxy_parser.print_help()
             sys.exit(1)
+    elif args.command == "jobs":
+        if args.jobs_command == "status":
+            manager.jobs_status(args.project, args.recent)
+        elif args.jobs_command == "run":
+            manager.jobs_run(args.project)
+        else:
+            jobs_parser.print_help()
+            sys.exit(1)
     elif args.command == "facet":
         project_dir = manager.get_project_dir(args.project)
         project_facets_dir = project_dir / ".claude" / "facets"
@@ -1099,10 +1191,17 @@ def main():
             installed_packages=installed_packages,
         )
         if args.facet_command == "build":
-            if args.name:
+            if args.watch:
+                if args.name:
+                    print("エラー: --watch と --name は同時に指定できません", file=sys.stderr)
+                    sys.exit(1)
+                from lib.facet_watch import watch
+
+                watch(facet_builder, [args.target], project_dir, poll=args.poll)
+            elif args.name:
                 facet_builder.build_one(args.name, args.target, project_dir)
             else:
-                facet_builder.build_all(args.target, project_dir)
+                facet_builder.build_all(args.target, project_dir, force=args.force)
         elif args.facet_command == "extract":
             if args.name:
                 facet_builder.extract_one(args.name, args.target, project_dir)
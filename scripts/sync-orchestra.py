@@ -13,13 +13,21 @@ SessionStart hook: ai-orchestra パッケージの agents/config/hooks を自動
 
 Note: skills/rules は facet build に完全委譲（packages からは同期しない）
 
-パフォーマンス: 変更なしの場合 ~70ms（Python 起動 + mtime 比較のみ）
+2〜7 と facet build は読み書きリソースを宣言したステップの DAG（lib/sync_pipeline.py）として
+スレッドプールで実行し、衝突しないステップ（パッケージ同期と facet build、hooks /
+.claudeignore / .gitignore 同期など）を並行させる。ステップ別の所要時間は
+.claude/logs/sync-timings.jsonl に記録する。
+
+パフォーマンス: 同期入力のフィンガープリント（lib/sync_fingerprint.py）が orchestra.json の
+記録値と一致する場合は 1〜7 をすべてスキップする。高速パスでは PyYAML / sync_engine を
+import しないため、変更なしの場合は Python 起動 + stat 数百回程度で終了する。
 """
 
 import datetime
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
 # scripts/ ディレクトリをモジュール検索パスに追加（lib/ を解決するため）
@@ -27,15 +35,11 @@ _SCRIPTS_DIR = str(Path(__file__).resolve().parent)
 if _SCRIPTS_DIR not in sys.path:
     sys.path.insert(0, _SCRIPTS_DIR)
 
-from lib.agent_model_patch import patch_all_agents  # noqa: E402
-from lib.gitignore_sync import sync_gitignore as _sync_gitignore  # noqa: E402
-from lib.scaffold import ensure_claude_scaffold, sync_claudeignore  # noqa: E402
-from lib.sync_engine import (  # noqa: E402
-    build_facets,
-    collect_facet_managed_paths,
-    remove_stale_files,
-    sync_hooks,
-    sync_packages,
+from lib.scaffold import ensure_claude_scaffold  # noqa: E402
+from lib.sync_fingerprint import (  # noqa: E402
+    FINGERPRINT_KEY,
+    compute_sync_fingerprint,
+    is_sync_fresh,
 )
 
 
@@ -86,25 +90,101 @@ def main() -> None:
             print(f"[orchestra] {scaffolded_count} scaffolded")
         return
 
-    claude_dir = project_dir / ".claude"
-
-    # facet composition で管理される skill/rule パスを収集（sync スキップ対象）
-    facet_managed = collect_facet_managed_paths(orchestra_path, project_dir)
+    # 同期入力が前回から変わっていなければ何もしない（高速パス）
+    fingerprint = compute_sync_fingerprint(orchestra_path, project_dir, orch)
+    if scaffolded_count == 0 and is_sync_fresh(orch, fingerprint):
+        return
 
-    # パッケージ単位の同期
-    synced_count, synced_files = sync_packages(
-        claude_dir, orchestra_path, installed_packages, facet_managed
+    # 同期が必要な場合のみ重いモジュール（PyYAML 含む）を読み込む
+    from lib.agent_model_patch import patch_all_agents
+    from lib.gitignore_sync import sync_gitignore as _sync_gitignore
+    from lib.scaffold import sync_claudeignore
+    from lib.sync_engine import (
+        build_facets,
+        collect_facet_managed_paths,
+        remove_stale_files,
+        resolve_sync_strategy,
+        sync_hooks,
+        sync_packages,
     )
+    from lib.sync_pipeline import run_pipeline, step, write_timings
 
-    # ファセットビルド
-    facet_built_count = build_facets(orchestra_path, project_dir, installed_packages)
-
-    # 前回同期されたが今回は対象外のファイルを削除（facet 管理パスは除外）
+    claude_dir = project_dir / ".claude"
+    strategy = resolve_sync_strategy(orch.get("sync_strategy"))
+    relink = strategy != orch.get("synced_strategy", "copy")
     prev_synced = orch.get("synced_files", [])
-    removed_count = remove_stale_files(claude_dir, prev_synced, synced_files, facet_managed)
 
-    # サブエージェント model パッチ
-    patched_count = patch_all_agents(project_dir)
+    # 同期ステップを読み書きリソース付きの DAG として宣言し、衝突しないステップを並行実行する
+    # （リソースは project_dir 相対パス。"registry" は orchestra 側の読み取り専用入力）
+    steps = [
+        # facet composition で管理される skill/rule パスを収集（sync スキップ対象）
+        step(
+            "facet_managed",
+            lambda r: collect_facet_managed_paths(orchestra_path, project_dir),
+            reads={"facets", ".claude/facets"},
+        ),
+        # パッケージ単位の同期（sync_strategy 変更時は全ファイルを配置し直す）
+        step(
+            "sync_packages",
+            lambda r: sync_packages(
+                claude_dir,
+                orchestra_path,
+                installed_packages,
+                r["facet_managed"],
+                strategy,
+                relink,
+            ),
+            reads={"registry"},
+            writes={".claude/agents", ".claude/config"},
+            after=["facet_managed"],
+        ),
+        # ファセットビルド（sync_packages と並行に走る）
+        step(
+            "build_facets",
+            lambda r: build_facets(orchestra_path, project_dir, installed_packages),
+            reads={"registry", "facets", ".claude/facets"},
+            writes={".claude/skills", ".claude/rules", ".codex"},
+        ),
+        # 前回同期されたが今回は対象外のファイルを削除（facet 管理パスは除外）
+        step(
+            "remove_stale",
+            lambda r: remove_stale_files(
+                claude_dir, prev_synced, r["sync_packages"][1], r["facet_managed"]
+            ),
+            writes={".claude/agents", ".claude/config", ".claude/skills", ".claude/rules"},
+            after=["sync_packages"],
+        ),
+        # サブエージェント model パッチ
+        step(
+            "patch_agents",
+            lambda r: patch_all_agents(project_dir),
+            reads={".claude/config"},
+            writes={".claude/agents"},
+        ),
+        step(
+            "sync_hooks",
+            lambda r: sync_hooks(project_dir, orchestra_path, installed_packages),
+            reads={"registry"},
+            writes={".claude/settings.local.json"},
+        ),
+        step(
+            "sync_claudeignore",
+            lambda r: sync_claudeignore(project_dir, orchestra_path),
+            writes={".claudeignore"},
+        ),
+        step("sync_gitignore", lambda r: _sync_gitignore(project_dir), writes={".gitignore"}),
+    ]
+    started = time.perf_counter()
+    results, timings = run_pipeline(steps)
+    write_timings(project_dir, timings, (time.perf_counter() - started) * 1000)
+
+    synced_count, synced_files = results["sync_packages"]
+    facet_built_count = results["build_facets"]
+    removed_count = results["remove_stale"]
+    patched_count = results["patch_agents"]
+    hooks_changed = results["sync_hooks"]
+    claudeignore_updated = results["sync_claudeignore"]
+    gitignore_updated = results["sync_gitignore"]
 
     # orchestra.json を更新
     prev_set = set(prev_synced)
@@ -114,10 +194,20 @@ def main() -> None:
         or patched_count > 0
         or synced_files != prev_set
         or "synced_files" not in orch
+        or relink
     )
     if needs_save:
         orch["last_sync"] = datetime.datetime.now(datetime.UTC).isoformat()
         orch["synced_files"] = sorted(synced_files)
+        if strategy == "copy":
+            orch.pop("synced_strategy", None)
+        else:
+            orch["synced_strategy"] = strategy
+
+    # 同期後の状態でフィンガープリントを記録し、次回の高速パス判定に使う
+    new_fingerprint = compute_sync_fingerprint(orchestra_path, project_dir, orch)
+    if needs_save or orch.get(FINGERPRINT_KEY) != new_fingerprint:
+        orch[FINGERPRINT_KEY] = new_fingerprint
         try:
             with open(orch_path, "w", encoding="utf-8") as f:
                 json.dump(orch, f, indent=2, ensure_ascii=False)
@@ -125,15 +215,6 @@ def main() -> None:
         except OSError:
             pass
 
-    # hooks 同期
-    hooks_changed = sync_hooks(project_dir, orchestra_path, installed_packages)
-
-    # .claudeignore 同期
-    claudeignore_updated = sync_claudeignore(project_dir, orchestra_path)
-
-    # .gitignore 同期
-    gitignore_updated = _sync_gitignore(project_dir)
-
     # SessionStart hook の stdout は Claude コンテキストに注入される
     if (
         synced_count > 0
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 
 import pytest
@@ -192,6 +194,59 @@ class TestFacetBuilder:
         assert (project_dir / ".claude" / "skills" / "simplify" / "SKILL.md").is_file()
         assert (project_dir / ".claude" / "skills" / "review" / "SKILL.md").is_file()
 
+    def test_build_all_multiple_targets_in_one_pass(self, tmp_path: Path) -> None:
+        """複数 target を指定すると composition ごと・target ごとに出力される。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        _setup_second_composition(orchestra_dir)
+
+        builder = FacetBuilder(orchestra_dir)
+        output_paths = builder.build_all(["claude", "codex"], project_dir)
+
+        assert len(output_paths) == 4
+        for root in (".claude", ".codex"):
+            for name in ("simplify", "review"):
+                path = project_dir / root / "skills" / name / "SKILL.md"
+                assert path.is_file()
+            assert (project_dir / root / ".facet-manifest.json").is_file()
+        claude = project_dir / ".claude" / "skills" / "simplify" / "SKILL.md"
+        codex = project_dir / ".codex" / "skills" / "simplify" / "SKILL.md"
+        assert claude.read_text(encoding="utf-8") == codex.read_text(encoding="utf-8")
+
+    def test_build_all_output_order_is_deterministic(self, tmp_path: Path, capsys) -> None:
+        """並行書き出しでも built 行は target → composition 名の順に出力される。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        _setup_second_composition(orchestra_dir)
+
+        FacetBuilder(orchestra_dir).build_all(["claude", "codex"], project_dir)
+
+        lines = [line for line in capsys.readouterr().out.splitlines() if "[facet] built" in line]
+        assert lines == [
+            "[facet] built review -> .claude/skills/review/SKILL.md",
+            "[facet] built simplify -> .claude/skills/simplify/SKILL.md",
+            "[facet] built review -> .codex/skills/review/SKILL.md",
+            "[facet] built simplify -> .codex/skills/simplify/SKILL.md",
+        ]
+
+    def test_build_all_sends_messages_to_log(self, tmp_path: Path, capsys) -> None:
+        """log を渡すと進捗メッセージは stdout ではなく log に渡る。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        messages: list[str] = []
+
+        FacetBuilder(orchestra_dir).build_all("claude", project_dir, log=messages.append)
+
+        assert messages[0] == "[facet] built simplify -> .claude/skills/simplify/SKILL.md"
+        assert all(message.startswith("[facet] ") for message in messages)
+        assert capsys.readouterr().out == ""
+
     def test_manifest_installed_package_builds(self, tmp_path: Path) -> None:
         """manifest に含まれ、パッケージがインストール済みならビルドされる。"""
         orchestra_dir = tmp_path / "orchestra"
@@ -746,3 +801,132 @@ class TestOrphanCleanup:
         assert len(output_paths) == 2
         assert (project_dir / ".claude" / "skills" / "sub-skill" / "SKILL.md").is_file()
         assert (project_dir / ".claude" / "rules" / "sub-rule.md").is_file()
+
+
+class TestIncrementalBuild:
+    """.facet-manifest.json の依存レコードによる差分ビルドのテスト。"""
+
+    def test_manifest_records_deps_with_hashes(self, tmp_path: Path) -> None:
+        """出力ごとに composition と解決済み facet の依存レコードを記録する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+
+        FacetBuilder(orchestra_dir).build_all("claude", project_dir)
+
+        manifest = json.loads(
+            (project_dir / ".claude" / ".facet-manifest.json").read_text(encoding="utf-8")
+        )
+        record = manifest["outputs"]["simplify"]
+        kinds = [(dep["kind"], dep["name"]) for dep in record["deps"]]
+        assert kinds == [
+            ("composition", "simplify.yaml"),
+            ("policies", "code-quality.md"),
+            ("output-contracts", "tiered-review.md"),
+        ]
+        assert all(len(dep["sha256"]) == 64 for dep in record["deps"])
+        assert [f["path"] for f in record["files"]] == [".claude/skills/simplify/SKILL.md"]
+
+    def test_second_build_skips_and_force_rebuilds(self, tmp_path: Path, capsys) -> None:
+        """依存が変わらなければ書き出さず、force=True なら再ビルドする。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        builder = FacetBuilder(orchestra_dir)
+        builder.build_all("claude", project_dir)
+        capsys.readouterr()
+
+        assert builder.build_all("claude", project_dir) == []
+        assert "[facet] up-to-date: 1 output(s) skipped" in capsys.readouterr().out
+
+        assert len(builder.build_all("claude", project_dir, force=True)) == 1
+        # 描画結果が同一なので書き換えはしない
+        assert "[facet] unchanged simplify" in capsys.readouterr().out
+
+    def test_stale_reference_removed_and_kept_reference_untouched(self, tmp_path: Path) -> None:
+        """knowledge を外すとその参照だけ削除し、残る参照は書き換えない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        knowledge_dir = orchestra_dir / "facets" / "knowledge"
+        knowledge_dir.mkdir(parents=True)
+        (knowledge_dir / "alpha.md").write_text("alpha\n", encoding="utf-8")
+        (knowledge_dir / "beta.md").write_text("beta\n", encoding="utf-8")
+        composition_path = orchestra_dir / "facets" / "compositions" / "simplify.yaml"
+        base = composition_path.read_text(encoding="utf-8")
+        composition_path.write_text(base + "knowledge:\n  - alpha\n  - beta\n", encoding="utf-8")
+        builder = FacetBuilder(orchestra_dir)
+        builder.build_all("claude", project_dir)
+        refs_dir = project_dir / ".claude" / "skills" / "simplify" / "references"
+        alpha_mtime = (refs_dir / "alpha.md").stat().st_mtime_ns
+
+        composition_path.write_text(base + "knowledge:\n  - alpha\n", encoding="utf-8")
+        builder.build_all("claude", project_dir)
+
+        assert sorted(p.name for p in refs_dir.iterdir()) == ["alpha.md"]
+        assert (refs_dir / "alpha.md").stat().st_mtime_ns == alpha_mtime
+
+
+class TestResolutionCache:
+    """FacetBuilder の facet 解決キャッシュのテスト。"""
+
+    def test_shared_policy_resolved_once(self, tmp_path: Path, capsys) -> None:
+        """複数 composition が参照する policy は 1 回だけ読み込み、以降はキャッシュヒットになる。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        compositions_dir = orchestra_dir / "facets" / "compositions"
+        for name in ("alpha", "beta"):
+            (compositions_dir / f"{name}.yaml").write_text(
+                f"name: {name}\ntype: rule\npolicies:\n  - code-quality\n", encoding="utf-8"
+            )
+
+        builder = FacetBuilder(orchestra_dir)
+        builder.build_all("claude", project_dir)
+
+        # code-quality: miss 1 + hit 2、tiered-review: miss 1
+        assert builder.cache_misses == 2
+        assert builder.cache_hits == 2
+        assert "[facet] resolve cache: 2 hit(s), 2 miss(es)" in capsys.readouterr().out
+
+    def test_one_listing_per_kind(self, tmp_path: Path, monkeypatch) -> None:
+        """facet の存在確認は kind ごとのディレクトリ一覧で行い、名前ごとに probe しない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_facet_sources(orchestra_dir)
+        _setup_second_composition(orchestra_dir)
+        scanned: list[str] = []
+        real_scandir = os.scandir
+
+        def counting_scandir(path):
+            scanned.append(str(path))
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", counting_scandir)
+
+        FacetBuilder(orchestra_dir).build_all("claude", project_dir)
+
+        policies_dir = str(orchestra_dir / "facets" / "policies")
+        assert scanned.count(policies_dir) == 1
+
+    def test_clear_cache_resets_counters(self, tmp_path: Path) -> None:
+        """clear_cache でキャッシュとカウンタがリセットされ、ファイル変更が反映される。"""
+        orchestra_dir = tmp_path / "orchestra"
+        _setup_facet_sources(orchestra_dir)
+        builder = FacetBuilder(orchestra_dir)
+        assert "policy-body" in builder.resolve_facet("policies", "code-quality")
+
+        (orchestra_dir / "facets" / "policies" / "code-quality.md").write_text(
+            "updated\n", encoding="utf-8"
+        )
+        assert "policy-body" in builder.resolve_facet("policies", "code-quality")
+        assert builder.cache_hits == 1
+
+        builder.clear_cache()
+        assert (builder.cache_hits, builder.cache_misses) == (0, 0)
+        assert builder.resolve_facet("policies", "code-quality") == "updated"
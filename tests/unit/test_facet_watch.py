@@ -0,0 +1,129 @@
+"""facet_watch.py（facet build --watch）のテスト。"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import REPO_ROOT, load_module
+
+_scripts_dir = str(REPO_ROOT / "scripts")
+if _scripts_dir not in sys.path:
+    sys.path.insert(0, _scripts_dir)
+
+facet_watch = load_module("facet_watch", "scripts/lib/facet_watch.py")
+FacetBuilder = facet_watch.FacetBuilder
+
+
+def _setup_sources(orchestra_dir: Path) -> None:
+    """別々の policy に依存する 2 つの composition を作成する。"""
+    compositions_dir = orchestra_dir / "facets" / "compositions"
+    policies_dir = orchestra_dir / "facets" / "policies"
+    compositions_dir.mkdir(parents=True)
+    policies_dir.mkdir(parents=True)
+    for name in ("alpha", "beta"):
+        (policies_dir / f"{name}-policy.md").write_text(f"{name}-policy\n", encoding="utf-8")
+        (compositions_dir / f"{name}.yaml").write_text(
+            f"name: {name}\ntype: rule\npolicies:\n  - {name}-policy\n", encoding="utf-8"
+        )
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestReverseDeps:
+    def test_affected_stems_from_policy_change(self, tmp_path: Path) -> None:
+        """policy の変更はそれを参照する composition だけに影響する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_sources(orchestra_dir)
+        builder = FacetBuilder(orchestra_dir)
+        builder.build_all("claude", project_dir)
+
+        graph = facet_watch.build_reverse_deps([builder.load_output_records("claude", project_dir)])
+        roots = [orchestra_dir / "facets"]
+        changed = {orchestra_dir / "facets" / "policies" / "alpha-policy.md"}
+
+        assert facet_watch.affected_stems(changed, roots, graph) == {"alpha"}
+
+    def test_local_override_maps_to_same_key(self, tmp_path: Path) -> None:
+        """ローカル上書きのパスも orchestra 側と同じ依存キーになる。"""
+        roots = [tmp_path / "orchestra" / "facets", tmp_path / "project" / ".claude" / "facets"]
+        local = tmp_path / "project" / ".claude" / "facets" / "policies" / "alpha-policy.md"
+
+        assert facet_watch.dep_key(local, roots) == ("policies", "alpha-policy.md")
+
+    def test_new_composition_and_unrelated_files(self, tmp_path: Path) -> None:
+        """新規 composition は自身を、facet 外や未参照のファイルは何も対象にしない。"""
+        roots = [tmp_path / "facets"]
+        changed = {
+            tmp_path / "facets" / "compositions" / "skills" / "gamma.yaml",
+            tmp_path / "facets" / "compositions" / "gamma.yaml.swp",
+            tmp_path / "facets" / "policies" / "unused.md",
+            tmp_path / "elsewhere.md",
+        }
+
+        assert facet_watch.affected_stems(changed, roots, {}) == {"gamma"}
+
+
+class TestPollingWatcher:
+    def test_idle_wait_follows_poll_interval(self, tmp_path: Path, monkeypatch) -> None:
+        """変更待ちの再走査は設定したポーリング間隔ごとに行う。"""
+        sleeps: list[float] = []
+        monkeypatch.setattr(facet_watch.time, "sleep", sleeps.append)
+        watcher = facet_watch.PollingWatcher([tmp_path], interval=0.5)
+
+        assert watcher.read(watcher.idle_timeout) == set()
+        assert sleeps == [0.5]
+
+
+class TestWatchLoop:
+    @pytest.mark.parametrize("poll", [True, False])
+    def test_rebuilds_only_affected_output(self, tmp_path: Path, capsys, poll: bool) -> None:
+        """変更された policy に依存する出力だけを再ビルドし、レイテンシを出力する。"""
+        if not poll and not sys.platform.startswith("linux"):
+            pytest.skip("inotify is Linux only")
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_sources(orchestra_dir)
+        builder = FacetBuilder(orchestra_dir)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=facet_watch.watch,
+            args=(builder, ["claude"], project_dir),
+            kwargs={"poll": poll, "poll_interval": 0.05, "debounce": 0.05, "stop": stop},
+        )
+        thread.start()
+        try:
+            alpha = project_dir / ".claude" / "rules" / "alpha.md"
+            beta = project_dir / ".claude" / "rules" / "beta.md"
+            assert _wait_for(lambda: "[watch] watching" in capsys.readouterr().out)
+            beta_mtime = beta.stat().st_mtime_ns
+
+            (orchestra_dir / "facets" / "policies" / "alpha-policy.md").write_text(
+                "alpha-policy-v2\n", encoding="utf-8"
+            )
+
+            assert _wait_for(lambda: "alpha-policy-v2" in alpha.read_text(encoding="utf-8"))
+        finally:
+            stop.set()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert beta.stat().st_mtime_ns == beta_mtime
+        out = capsys.readouterr().out
+        assert "[facet] built alpha" in out
+        assert "[facet] built beta" not in out
+        assert "[watch] 1 affected (alpha) rebuilt in" in out
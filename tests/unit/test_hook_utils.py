@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import subprocess
+
 import pytest
 
-from tests.module_loader import load_module
+from tests.module_loader import REPO_ROOT, load_module
 
 hook_utils = load_module("hook_utils_test", "scripts/lib/hook_utils.py")
 
@@ -26,6 +28,96 @@ class TestIsOrchestraHook:
         assert hook_utils.is_orchestra_hook(command) is expected
 
 
+class TestGuardedHookCommand:
+    """filter 付き hook コマンド（hook-guard.sh 経由）のテスト。"""
+
+    def test_without_filter_returns_plain_command(self) -> None:
+        assert hook_utils.get_hook_command("core", "a.py") == (
+            'python3 "$AI_ORCHESTRA_DIR/packages/core/hooks/a.py"'
+        )
+
+    def test_filter_compiles_to_guard_arguments(self) -> None:
+        """extensions は大文字小文字を区別しない glob、tool_input は field/contains になる。"""
+        command = hook_utils.get_hook_command(
+            "quality-gates",
+            "lint.py",
+            {"extensions": [".py"], "tool_input": {"command": ["test"]}, "max_bytes": 1000},
+        )
+
+        assert command == (
+            'sh "$AI_ORCHESTRA_DIR/packages/core/hooks/hook-guard.sh"'
+            " --path '*.[pP][yY]' --field 'command' --contains 'test' --max-bytes 1000"
+            ' -- python3 "$AI_ORCHESTRA_DIR/packages/quality-gates/hooks/lint.py"'
+        )
+        assert hook_utils.is_orchestra_hook(command) is True
+        assert hook_utils.parse_pkg_from_command(command) == "quality-gates"
+
+    @pytest.mark.parametrize(
+        "hook_filter",
+        [
+            {"unknown": []},
+            {"paths": ["it's"]},
+            {"paths": ['a"b']},
+            {"tool_input": {"bad field": ["x"]}},
+            {"tool_input": {"command": []}},
+            {"max_bytes": 0},
+        ],
+        ids=["unknown_key", "single_quote", "double_quote", "field_name", "no_needles", "size"],
+    )
+    def test_rejects_invalid_filter(self, hook_filter: dict) -> None:
+        with pytest.raises(ValueError):
+            hook_utils.compile_hook_filter(hook_filter)
+
+
+class TestHookGuardScript:
+    """hook-guard.sh の実行テスト。"""
+
+    @staticmethod
+    def _run(hook_filter: dict, payload: str) -> subprocess.CompletedProcess[str]:
+        args = hook_utils.compile_hook_filter(hook_filter)
+        guard = REPO_ROOT / "packages" / "core" / "hooks" / "hook-guard.sh"
+        script = " ".join(["sh", f"'{guard}'", *args, "--", "sh -c 'cat; exit 3'"])
+        return subprocess.run(
+            script, shell=True, input=payload, capture_output=True, text=True, timeout=10
+        )
+
+    def test_passes_matching_input_through(self) -> None:
+        """条件を満たす入力はそのまま本体に渡し、終了コードも引き継ぐ。"""
+        payload = '{"tool_input": {"file_path": "/src/App.PY", "content": "x"}}'
+        result = self._run({"extensions": ["py", "ts"]}, payload)
+
+        assert result.returncode == 3
+        assert result.stdout == payload + "\n"
+
+    @pytest.mark.parametrize(
+        ("hook_filter", "payload"),
+        [
+            ({"extensions": ["py"]}, '{"tool_input": {"file_path": "/src/README.md"}}'),
+            ({"paths": ["*/tests/*"]}, '{"tool_input": {"file_path": "/src/app.py"}}'),
+            (
+                {"tool_input": {"command": ["test"]}},
+                '{"tool_input": {"command": "git status"}}',
+            ),
+            ({"max_bytes": 10}, '{"tool_input": {"command": "pytest -q"}}'),
+        ],
+        ids=["extension", "path_glob", "field", "max_bytes"],
+    )
+    def test_skips_non_matching_input(self, hook_filter: dict, payload: str) -> None:
+        """条件を満たさない入力では本体を起動せず exit 0。"""
+        result = self._run(hook_filter, payload)
+
+        assert result.returncode == 0
+        assert result.stdout == ""
+
+    def test_fields_are_and_and_contains_are_or(self) -> None:
+        hook_filter = {"tool_input": {"command": ["pytest", "jest"], "description": ["run"]}}
+        matching = '{"tool_input": {"command": "npx jest", "description": "run tests"}}'
+        missing_field = '{"tool_input": {"command": "npx jest", "description": "lint"}}'
+
+        assert self._run(hook_filter, matching).returncode == 3
+        assert self._run(hook_filter, missing_field).returncode == 0
+
+
 class TestParsePkgFromCommand:
     """parse_pkg_from_command のテスト。"""
 
@@ -69,3 +161,9 @@ class TestParseHookEntry:
     def test_unsupported_value_returns_empty_defaults(self) -> None:
         """未対応型は空文字と None を返す。"""
         assert hook_utils.parse_hook_entry(123) == ("", None)
+
+    def test_parse_hook_filter(self) -> None:
+        """filter は辞書指定のときだけ返す。"""
+        value = {"file": "a.py", "filter": {"extensions": ["py"]}}
+        assert hook_utils.parse_hook_filter(value) == {"extensions": ["py"]}
+        assert hook_utils.parse_hook_filter("a.py") is None
@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from tests.module_loader import load_module
+from tests.module_loader import REPO_ROOT, load_module
 
 manager_mod = load_module("orchestra_manager", "scripts/orchestra-manager.py")
 OrchestraManager = manager_mod.OrchestraManager
@@ -243,3 +243,27 @@ class TestGetPackageStatus:
 
         # Assert
         assert status == "active"
+
+
+class TestJobsStatus:
+    """`jobs_status` / `jobs_run` のテスト。"""
+
+    def test_shows_pending_then_recent(self, tmp_path: Path, capsys) -> None:
+        """未実行ジョブを表示し、run 後は完了ジョブとして表示する。"""
+        manager = OrchestraManager(REPO_ROOT)
+        job_queue = manager._load_job_queue()
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        job_queue.enqueue(str(project_dir), ["true"], key="demo-job", start_worker=False)
+
+        manager.jobs_status(str(project_dir))
+        out = capsys.readouterr().out
+        assert "ワーカー: 停止" in out
+        assert "pending" in out and "demo-job" in out
+
+        manager.jobs_run(str(project_dir))
+        manager.jobs_status(str(project_dir))
+        out = capsys.readouterr().out
+        assert "1 件のジョブを実行しました" in out
+        assert "(キューは空です)" in out
+        assert "✓ demo-job" in out
@@ -0,0 +1,157 @@
+"""package_registry.py（コンパイル済みパッケージレジストリ）のテスト。"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import REPO_ROOT, load_module
+
+_scripts_dir = str(REPO_ROOT / "scripts")
+if _scripts_dir not in sys.path:
+    sys.path.insert(0, _scripts_dir)
+
+package_registry = load_module("package_registry", "scripts/lib/package_registry.py")
+
+
+def _write_manifest(orchestra_dir: Path, name: str, **fields) -> Path:
+    pkg_dir = orchestra_dir / "packages" / name
+    pkg_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = pkg_dir / "manifest.json"
+    manifest = {"name": name, "version": "0.1.0", **fields}
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return manifest_path
+
+
+def _setup_orchestra(orchestra_dir: Path) -> None:
+    _write_manifest(
+        orchestra_dir,
+        "core",
+        hooks={
+            "SessionStart": ["start.py"],
+            "PreToolUse": [
+                {"file": "a.py", "matcher": "Bash", "filter": {"tool_input": {"command": ["git"]}}}
+            ],
+        },
+        skills=["commit"],
+    )
+    _write_manifest(
+        orchestra_dir,
+        "audit",
+        depends=["core"],
+        hooks={"PreToolUse": [{"file": "b.py", "matcher": "Bash", "timeout": 10}]},
+        rules=["audit-rule"],
+        config=["config/audit.yaml"],
+    )
+    (orchestra_dir / "presets.json").write_text(
+        json.dumps({"all": {"packages": "__all__"}, "min": {"packages": ["core"]}}),
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_memo():
+    package_registry._memo.clear()
+    yield
+    package_registry._memo.clear()
+
+
+class TestCompileRegistry:
+    def test_dependency_order(self, tmp_path: Path) -> None:
+        """depends を満たす順序（依存先が先）で並ぶ。"""
+        _setup_orchestra(tmp_path)
+        registry = package_registry.compile_registry(tmp_path)
+        assert registry["order"] == ["core", "audit"]
+
+    def test_hook_table_by_event_and_matcher(self, tmp_path: Path) -> None:
+        """hook はイベント → matcher 別にまとめられる（matcher なしは空文字キー）。"""
+        _setup_orchestra(tmp_path)
+        hooks = package_registry.compile_registry(tmp_path)["hooks"]
+
+        assert hooks["SessionStart"] == {
+            "": [{"package": "core", "file": "start.py", "timeout": 5, "filter": None}]
+        }
+        assert [e["file"] for e in hooks["PreToolUse"]["Bash"]] == ["b.py", "a.py"]
+        assert hooks["PreToolUse"]["Bash"][0]["timeout"] == 10
+
+    def test_compositions_files_and_presets(self, tmp_path: Path) -> None:
+        """composition 所有関係・ファイルリスト・__all__ 展開済みプリセットを保持する。"""
+        _setup_orchestra(tmp_path)
+        registry = package_registry.compile_registry(tmp_path)
+
+        assert registry["compositions"] == {"commit": "core", "audit-rule": "audit"}
+        assert registry["files"]["audit"]["config"] == ["config/audit.yaml"]
+        assert registry["presets"]["all"]["packages"] == ["audit", "core"]
+        assert registry["presets"]["min"]["packages"] == ["core"]
+
+    def test_expected_hooks_filters_installed(self, tmp_path: Path) -> None:
+        """expected_hooks はインストール済みパッケージの hook だけを返す。"""
+        _setup_orchestra(tmp_path)
+        registry = package_registry.compile_registry(tmp_path)
+
+        hooks = package_registry.expected_hooks(registry, ["core"])
+        assert sorted(hooks) == [
+            ("PreToolUse", "core", "a.py", "Bash", {"tool_input": {"command": ["git"]}}),
+            ("SessionStart", "core", "start.py", None, None),
+        ]
+
+    def test_invalid_filter_is_dropped(self, tmp_path: Path, capsys) -> None:
+        """不正な filter は警告して無視し、hook は常に起動する扱いにする。"""
+        _write_manifest(
+            tmp_path,
+            "core",
+            hooks={"PreToolUse": [{"file": "a.py", "filter": {"paths": ["it's"]}}]},
+        )
+        registry = package_registry.compile_registry(tmp_path)
+
+        assert registry["hooks"]["PreToolUse"][""][0]["filter"] is None
+        assert "a.py" in capsys.readouterr().err
+
+
+class TestLoadRegistry:
+    def test_writes_file_and_reuses_it(self, tmp_path: Path, monkeypatch) -> None:
+        """初回はコンパイルして書き出し、スタンプが一致する間はファイルだけを読む。"""
+        _setup_orchestra(tmp_path)
+        first = package_registry.load_registry(tmp_path)
+        assert package_registry.registry_path(tmp_path).is_file()
+
+        package_registry._memo.clear()
+
+        def fail(_orchestra_dir):
+            raise AssertionError("should not recompile")
+
+        monkeypatch.setattr(package_registry, "compile_registry", fail)
+        assert package_registry.load_registry(tmp_path) == first
+
+    def test_recompiles_when_manifest_changes(self, tmp_path: Path) -> None:
+        """manifest が更新されるとスタンプが変わり、再コンパイルされる。"""
+        _setup_orchestra(tmp_path)
+        package_registry.load_registry(tmp_path)
+
+        manifest_path = _write_manifest(tmp_path, "core", skills=["commit", "review"])
+        future = time.time() + 100
+        os.utime(manifest_path, (future, future))
+
+        registry = package_registry.load_registry(tmp_path)
+        assert registry["compositions"]["review"] == "core"
+        on_disk = json.loads(package_registry.registry_path(tmp_path).read_text(encoding="utf-8"))
+        assert on_disk["stamp"] == registry["stamp"]
+
+    def test_recompiles_on_corrupt_or_foreign_schema(self, tmp_path: Path) -> None:
+        """壊れたファイルやスキーマ不一致のファイルは無視して再コンパイルする。"""
+        _setup_orchestra(tmp_path)
+        path = package_registry.registry_path(tmp_path)
+        path.write_text("{broken", encoding="utf-8")
+        assert package_registry.load_registry(tmp_path)["order"] == ["core", "audit"]
+
+        package_registry._memo.clear()
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["schema"] = -1
+        data["order"] = []
+        path.write_text(json.dumps(data), encoding="utf-8")
+        assert package_registry.load_registry(tmp_path)["order"] == ["core", "audit"]
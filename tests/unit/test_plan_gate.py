@@ -13,6 +13,25 @@ check_gate = load_module("check_plan_gate", "packages/core/hooks/check-plan-gate
 set_gate = load_module("set_plan_gate", "packages/core/hooks/set-plan-gate.py")
 clear_gate = load_module("clear_plan_gate", "packages/core/hooks/clear-plan-gate.py")
 
+from state_store import PROJECT, close_stores, open_store  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _close_state_stores():
+    """テストごとに状態ストアの接続キャッシュを破棄する。"""
+    yield
+    close_stores()
+
+
+def _write_gate(project_dir, gate: dict) -> None:
+    """状態ストアに plan gate を書き込む。"""
+    open_store(str(project_dir)).put(PROJECT, "plan-gate", gate)
+
+
+def _read_gate(project_dir) -> dict | None:
+    """状態ストアから plan gate を読み出す。"""
+    return open_store(str(project_dir)).get(PROJECT, "plan-gate")
+
 
 def _make_stdin(data: dict, monkeypatch: pytest.MonkeyPatch) -> None:
     """stdin を JSON データでモックする。"""
@@ -24,25 +43,22 @@ def _make_stdin(data: dict, monkeypatch: pytest.MonkeyPatch) -> None:
 # ======================================================================
 
 
-class TestCheckPlanGateGetPath:
-    """_get_gate_path のテスト。"""
+class TestCheckPlanGateGetProjectDir:
+    """_get_project_dir のテスト。"""
 
     def test_cwd_provided(self):
-        """cwd がある場合、そこから gate path を組み立てる。"""
-        result = check_gate._get_gate_path({"cwd": "/project"})
-        assert result == "/project/.claude/state/plan-gate.json"
+        """cwd がある場合、cwd を返す。"""
+        assert check_gate._get_project_dir({"cwd": "/project"}) == "/project"
 
     def test_env_fallback(self, monkeypatch):
         """cwd がなく CLAUDE_PROJECT_DIR がある場合、環境変数を使う。"""
         monkeypatch.setenv("CLAUDE_PROJECT_DIR", "/env-project")
-        result = check_gate._get_gate_path({})
-        assert result == "/env-project/.claude/state/plan-gate.json"
+        assert check_gate._get_project_dir({}) == "/env-project"
 
     def test_no_cwd_no_env(self, monkeypatch):
         """cwd も環境変数もない場合、空文字を返す。"""
         monkeypatch.delenv("CLAUDE_PROJECT_DIR", raising=False)
-        result = check_gate._get_gate_path({"cwd": ""})
-        assert result == ""
+        assert check_gate._get_project_dir({"cwd": ""}) == ""
 
 
 class TestCheckPlanGateMain:
@@ -67,8 +83,8 @@ class TestCheckPlanGateMain:
         with pytest.raises(SystemExit, match="0"):
             check_gate.main()
 
-    def test_no_gate_path_exits_0(self, monkeypatch):
-        """gate path が空の場合、exit(0)。"""
+    def test_no_project_dir_exits_0(self, monkeypatch):
+        """プロジェクトディレクトリが不明な場合、exit(0)。"""
         monkeypatch.delenv("CLAUDE_PROJECT_DIR", raising=False)
         _make_stdin(
             {
@@ -82,7 +98,7 @@ class TestCheckPlanGateMain:
             check_gate.main()
 
     def test_no_gate_file_exits_0(self, monkeypatch, tmp_path):
-        """gate ファイルがない場合（pending=False と同等）、exit(0)。"""
+        """gate がない場合（pending=False と同等）、exit(0)。"""
         _make_stdin(
             {
                 "tool_name": "Agent",
@@ -96,10 +112,7 @@ class TestCheckPlanGateMain:
 
     def test_gate_not_pending_exits_0(self, monkeypatch, tmp_path):
         """gate が pending=False の場合、exit(0)。"""
-        state_dir = tmp_path / ".claude" / "state"
-        state_dir.mkdir(parents=True)
-        gate_path = state_dir / "plan-gate.json"
-        gate_path.write_text(json.dumps({"pending": False}), encoding="utf-8")
+        _write_gate(tmp_path, {"pending": False})
 
         _make_stdin(
             {
@@ -114,10 +127,7 @@ class TestCheckPlanGateMain:
 
     def test_implementation_agent_blocked(self, monkeypatch, tmp_path):
         """pending=True の gate がある場合、実装系エージェントは exit(2) でブロックされる。"""
-        state_dir = tmp_path / ".claude" / "state"
-        state_dir.mkdir(parents=True)
-        gate_path = state_dir / "plan-gate.json"
-        gate_path.write_text(json.dumps({"pending": True, "agent": "planner"}), encoding="utf-8")
+        _write_gate(tmp_path, {"pending": True, "agent": "planner"})
 
         _make_stdin(
             {
@@ -132,10 +142,7 @@ class TestCheckPlanGateMain:
 
     def test_warn_agent_outputs_warning(self, monkeypatch, tmp_path, capsys):
         """general-purpose は警告出力して exit(0)。"""
-        state_dir = tmp_path / ".claude" / "state"
-        state_dir.mkdir(parents=True)
-        gate_path = state_dir / "plan-gate.json"
-        gate_path.write_text(json.dumps({"pending": True, "agent": "planner"}), encoding="utf-8")
+        _write_gate(tmp_path, {"pending": True, "agent": "planner"})
 
         _make_stdin(
             {
@@ -154,10 +161,7 @@ class TestCheckPlanGateMain:
 
     def test_task_tool_name_also_works(self, monkeypatch, tmp_path):
         """後方互換: tool_name=Task でも動作する。"""
-        state_dir = tmp_path / ".claude" / "state"
-        state_dir.mkdir(parents=True)
-        gate_path = state_dir / "plan-gate.json"
-        gate_path.write_text(json.dumps({"pending": True}), encoding="utf-8")
+        _write_gate(tmp_path, {"pending": True})
 
         _make_stdin(
             {
@@ -247,7 +251,7 @@ class TestSetPlanGateMain:
             set_gate.main()
 
     def test_successful_plan_sets_gate(self, monkeypatch, tmp_path, capsys):
-        """正常な plan 完了後に gate ファイルを作成する。"""
+        """正常な plan 完了後に gate を設定する。"""
         _make_stdin(
             {
                 "tool_name": "Agent",
@@ -260,9 +264,8 @@ class TestSetPlanGateMain:
         with pytest.raises(SystemExit, match="0"):
             set_gate.main()
 
-        gate_path = tmp_path / ".claude" / "state" / "plan-gate.json"
-        assert gate_path.exists()
-        gate = json.loads(gate_path.read_text(encoding="utf-8"))
+        gate = _read_gate(tmp_path)
+        assert gate is not None
         assert gate["pending"] is True
         assert gate["agent"] == "planner"
         assert "set_at" in gate
@@ -296,23 +299,20 @@ class TestClearPlanGateMain:
     """clear-plan-gate main() のテスト。"""
 
     def test_no_gate_file_exits_0(self, monkeypatch, tmp_path):
-        """gate ファイルが存在しない場合、exit(0)。"""
+        """gate が存在しない場合、exit(0)。"""
         _make_stdin({"cwd": str(tmp_path)}, monkeypatch)
         with pytest.raises(SystemExit, match="0"):
             clear_gate.main()
 
     def test_removes_gate_file(self, monkeypatch, tmp_path):
-        """gate ファイルを削除する。"""
-        state_dir = tmp_path / ".claude" / "state"
-        state_dir.mkdir(parents=True)
-        gate_path = state_dir / "plan-gate.json"
-        gate_path.write_text(json.dumps({"pending": True}), encoding="utf-8")
+        """gate を削除する。"""
+        _write_gate(tmp_path, {"pending": True})
 
         _make_stdin({"cwd": str(tmp_path)}, monkeypatch)
         with pytest.raises(SystemExit, match="0"):
             clear_gate.main()
 
-        assert not gate_path.exists()
+        assert _read_gate(tmp_path) is None
 
     def test_no_cwd_exits_0(self, monkeypatch):
         """cwd がない場合、exit(0)。"""
@@ -345,8 +345,7 @@ class TestPlanGateFlow:
         with pytest.raises(SystemExit, match="0"):
             set_gate.main()
 
-        gate_path = tmp_path / ".claude" / "state" / "plan-gate.json"
-        assert gate_path.exists()
+        assert _read_gate(tmp_path) is not None
 
         # 2. 実装エージェント呼び出し: ブロックされる
         _make_stdin(
@@ -365,7 +364,7 @@ class TestPlanGateFlow:
         with pytest.raises(SystemExit, match="0"):
             clear_gate.main()
 
-        assert not gate_path.exists()
+        assert _read_gate(tmp_path) is None
 
         # 4. 実装エージェント呼び出し: 今度は通る
         _make_stdin(
@@ -30,6 +30,15 @@ test_tampering_detector = load_module(
     "test_tampering_detector_test", "packages/quality-gates/hooks/test-tampering-detector.py"
 )
 
+from state_store import close_stores, open_store, session_namespace  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _close_state_stores():
+    """テストごとに状態ストアの接続キャッシュを破棄する。"""
+    yield
+    close_stores()
+
 
 def _make_stdin(data: dict, monkeypatch: pytest.MonkeyPatch) -> None:
     """stdin を JSON 入力で置き換える。"""
@@ -39,6 +48,11 @@ def _make_stdin(data: dict, monkeypatch: pytest.MonkeyPatch) -> None:
 class TestLintOnSave:
     """lint-on-save.py のテスト。"""
 
+    @pytest.fixture(autouse=True)
+    def _sync_mode(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """パッケージ同梱の config（batch モード）を読まないようにする。"""
+        monkeypatch.delenv("AI_ORCHESTRA_DIR", raising=False)
+
     def test_run_lint_commands_uses_fallback_command(
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
     ) -> None:
@@ -71,7 +85,7 @@ class TestLintOnSave:
         monkeypatch.setattr(
             lint_on_save,
             "run_lint_commands",
-            lambda _: [
+            lambda _path, **_kwargs: [
                 {"name": "ruff format", "success": True, "output": "1 file reformatted"},
                 {"name": "ruff check", "success": False, "output": "line too long"},
             ],
@@ -90,10 +104,16 @@ class TestLintOnSave:
         assert "ruff format" in output["hookSpecificOutput"]["additionalContext"]
         assert "ruff check" in output["hookSpecificOutput"]["additionalContext"]
 
-    def test_main_ignores_non_python_file(self, monkeypatch: pytest.MonkeyPatch) -> None:
+    def test_main_ignores_non_python_file(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
         """Python 以外のファイルは処理しない。"""
         _make_stdin(
-            {"tool_name": "Write", "tool_input": {"file_path": "/tmp/example.md"}},
+            {
+                "tool_name": "Write",
+                "cwd": str(tmp_path),
+                "tool_input": {"file_path": "/tmp/example.md"},
+            },
             monkeypatch,
         )
 
@@ -113,14 +133,16 @@ class TestPostImplementationReview:
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
     ) -> None:
         """3 ファイル目の変更でレビュー提案を出す。"""
-        state_file = tmp_path / "impl-review.json"
-        monkeypatch.setattr(post_impl_review, "STATE_FILE", state_file)
-        post_impl_review.save_state(
-            {"files": ["a.py", "b.py"], "total_lines": 20, "review_suggested": False}
+        open_store(str(tmp_path)).put(
+            session_namespace("s1"),
+            post_impl_review.STATE_KEY,
+            {"files": ["a.py", "b.py"], "total_lines": 20, "review_suggested": False},
         )
         _make_stdin(
             {
                 "tool_name": "Edit",
+                "cwd": str(tmp_path),
+                "session_id": "s1",
                 "tool_input": {"file_path": "c.py", "content": "print(1)\nprint(2)\n"},
             },
             monkeypatch,
@@ -132,7 +154,7 @@ class TestPostImplementationReview:
         captured = capsys.readouterr()
         output = json.loads(captured.out)
         assert "[Review Suggestion]" in output["hookSpecificOutput"]["additionalContext"]
-        state = post_impl_review.load_state()
+        state = post_impl_review.load_state(str(tmp_path), "s1")
         assert state["review_suggested"] is True
         assert state["files"][-1] == "c.py"
 
@@ -140,17 +162,19 @@ class TestPostImplementationReview:
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
     ) -> None:
         """コード拡張子以外は state を作らない。"""
-        state_file = tmp_path / "impl-review.json"
-        monkeypatch.setattr(post_impl_review, "STATE_FILE", state_file)
         _make_stdin(
-            {"tool_name": "Write", "tool_input": {"file_path": "notes.md", "content": "memo"}},
+            {
+                "tool_name": "Write",
+                "cwd": str(tmp_path),
+                "tool_input": {"file_path": "notes.md", "content": "memo"},
+            },
             monkeypatch,
         )
 
         with pytest.raises(SystemExit, match="0"):
             post_impl_review.main()
 
-        assert not state_file.exists()
+        assert not (tmp_path / ".claude" / "state").exists()
 
 
 class TestPostTestAnalysis:
@@ -160,20 +184,20 @@ class TestPostTestAnalysis:
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
     ) -> None:
         """成功時は test gate カウンタをリセットする。"""
-        state_file = tmp_path / "test-gate.json"
-        monkeypatch.setattr(post_test_analysis, "TEST_GATE_STATE_FILE", state_file)
-        post_test_analysis.save_test_gate_state(
+        open_store(str(tmp_path)).put(
+            session_namespace("s1"),
+            post_test_analysis.TEST_GATE_STATE_KEY,
             {
                 "files_modified_since_test": ["a.py"],
                 "lines_modified_since_test": 42,
                 "last_test_result": None,
                 "warned": True,
-            }
+            },
         )
 
-        post_test_analysis.record_test_result("pytest", passed=True)
+        post_test_analysis.record_test_result(str(tmp_path), "s1", "pytest", passed=True)
 
-        state = post_test_analysis.load_test_gate_state()
+        state = post_test_analysis.load_test_gate_state(str(tmp_path), "s1")
         assert state["files_modified_since_test"] == []
         assert state["lines_modified_since_test"] == 0
         assert state["warned"] is False
@@ -203,8 +227,6 @@ class TestPostTestAnalysis:
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
     ) -> None:
         """失敗したテストコマンドでは Codex 提案を出す。"""
-        state_file = tmp_path / "test-gate.json"
-        monkeypatch.setattr(post_test_analysis, "TEST_GATE_STATE_FILE", state_file)
         monkeypatch.setattr(
             post_test_analysis,
             "load_package_config",
@@ -214,6 +236,7 @@ class TestPostTestAnalysis:
             {
                 "tool_name": "Bash",
                 "cwd": str(tmp_path),
+                "session_id": "s1",
                 "tool_input": {"command": "pytest -q"},
                 "tool_response": {"exit_code": 1, "stdout": "FAILED test_example.py::test_case"},
             },
@@ -226,7 +249,7 @@ class TestPostTestAnalysis:
         captured = capsys.readouterr()
         output = json.loads(captured.out)
         assert "[Codex Debug Suggestion]" in output["hookSpecificOutput"]["additionalContext"]
-        state = post_test_analysis.load_test_gate_state()
+        state = post_test_analysis.load_test_gate_state(str(tmp_path), "s1")
         assert state["last_test_result"]["passed"] is False
         assert state["last_test_result"]["command"] == "pytest -q"
 
@@ -271,14 +294,13 @@ class TestTestGateChecker:
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
     ) -> None:
         """閾値到達時にテスト実行を促す。"""
-        state_file = tmp_path / "test-gate.json"
-        monkeypatch.setattr(test_gate_checker, "TEST_GATE_STATE_FILE", state_file)
         monkeypatch.setattr(test_gate_checker, "is_quality_gate_enabled", lambda _: True)
         monkeypatch.setattr(test_gate_checker, "load_thresholds", lambda _: (1, 100))
         _make_stdin(
             {
                 "tool_name": "Edit",
                 "cwd": str(tmp_path),
+                "session_id": "s1",
                 "tool_input": {"file_path": "src/main.py", "content": "print(1)\nprint(2)\n"},
             },
             monkeypatch,
@@ -290,7 +312,7 @@ class TestTestGateChecker:
         captured = capsys.readouterr()
         output = json.loads(captured.out)
         assert "[Test Gate]" in output["hookSpecificOutput"]["additionalContext"]
-        state = test_gate_checker.load_test_gate_state()
+        state = test_gate_checker.load_test_gate_state(str(tmp_path), "s1")
         assert state["warned"] is True
         assert state["files_modified_since_test"] == ["src/main.py"]
 
@@ -298,8 +320,6 @@ class TestTestGateChecker:
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
     ) -> None:
         """quality gate 無効時は state を更新しない。"""
-        state_file = tmp_path / "test-gate.json"
-        monkeypatch.setattr(test_gate_checker, "TEST_GATE_STATE_FILE", state_file)
         monkeypatch.setattr(test_gate_checker, "is_quality_gate_enabled", lambda _: False)
         _make_stdin(
             {
@@ -313,7 +333,7 @@ class TestTestGateChecker:
         with pytest.raises(SystemExit, match="0"):
             test_gate_checker.main()
 
-        assert not state_file.exists()
+        assert not (tmp_path / ".claude" / "state").exists()
 
 
 class TestTestTamperingDetector:
@@ -350,18 +370,24 @@ class TestTestTamperingDetector:
         assert "[Warning]" in output["hookSpecificOutput"]["additionalContext"]
         assert "@pytest.mark.skip" in output["hookSpecificOutput"]["additionalContext"]
 
-    def test_collect_findings_for_delete_command(self, monkeypatch: pytest.MonkeyPatch) -> None:
+    def test_collect_findings_for_delete_command(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
         """削除コマンド時は deleted test file を報告する。"""
         monkeypatch.setattr(
             test_tampering_detector,
-            "get_deleted_test_files",
-            lambda _project_dir, _delete_targets: ["tests/x.py"],
+            "load_tracked_test_index",
+            lambda _project_dir: test_tampering_detector.TrackedTestIndex(
+                str(tmp_path), frozenset({"tests/x.py", "tests/y.py"})
+            ),
         )
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "y.py").write_text("", encoding="utf-8")
 
         findings = test_tampering_detector.collect_tampering_findings(
             {
                 "tool_name": "Bash",
-                "cwd": "/project",
+                "cwd": str(tmp_path),
                 "tool_input": {"command": "rm tests/x.py"},
             }
         )
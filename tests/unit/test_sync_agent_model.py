@@ -84,6 +84,23 @@ class TestPatchAgentModel:
         assert "model: opus" in content
         assert "model: sonnet" not in content
 
+    def test_linked_file_patched_without_touching_source(self, tmp_path: Path) -> None:
+        """hardlink / symlink 同期されたファイルはリンクを外して書き込み、ソースを変えない。"""
+        source = tmp_path / "source.md"
+        source.write_text(FRONTMATTER_TEMPLATE.format(model="sonnet"), encoding="utf-8")
+        hardlinked = tmp_path / "hard.md"
+        hardlinked.hardlink_to(source)
+        symlinked = tmp_path / "sym.md"
+        symlinked.symlink_to(source)
+
+        assert _patch_agent_model(hardlinked, "opus") is True
+        assert _patch_agent_model(symlinked, "haiku") is True
+
+        assert "model: sonnet" in source.read_text(encoding="utf-8")
+        assert "model: opus" in hardlinked.read_text(encoding="utf-8")
+        assert not symlinked.is_symlink()
+        assert "model: haiku" in symlinked.read_text(encoding="utf-8")
+
     def test_idempotent_same_model(self, tmp_path: Path) -> None:
         agent_file = tmp_path / "planner.md"
         agent_file.write_text(FRONTMATTER_TEMPLATE.format(model="opus"), encoding="utf-8")
@@ -418,3 +418,152 @@ class TestSyncPackages:
 
         count, files = sync_engine.sync_packages(claude_dir, orchestra_path, ["core"], set())
         assert count == 2
+
+
+def _setup_agent_package(tmp_path: Path) -> tuple[Path, Path, Path]:
+    """agent 1 件と config 1 件（*.local.yaml を含む）を持つパッケージを作成する。"""
+    orchestra_path = tmp_path / "orchestra"
+    pkg_dir = orchestra_path / "packages" / "core"
+    (pkg_dir / "agents").mkdir(parents=True)
+    agent_file = pkg_dir / "agents" / "planner.md"
+    agent_file.write_text("---\nmodel: opus\n---\n# Planner\n")
+    (pkg_dir / "base.local.yaml").write_text("local: true\n")
+    manifest = {
+        "name": "core",
+        "agents": ["agents/planner.md"],
+        "config": ["base.local.yaml"],
+    }
+    (pkg_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    claude_dir = tmp_path / "project" / ".claude"
+    claude_dir.mkdir(parents=True)
+    return orchestra_path, claude_dir, agent_file
+
+
+class TestSyncStrategy:
+    """sync_strategy（copy / hardlink / reflink / symlink）のテスト。"""
+
+    def test_resolve_sync_strategy(self, capsys):
+        """未指定は copy、不正値は警告して copy にフォールバックする。"""
+        assert sync_engine.resolve_sync_strategy(None) == "copy"
+        assert sync_engine.resolve_sync_strategy("hardlink") == "hardlink"
+        assert sync_engine.resolve_sync_strategy("zero") == "copy"
+        assert "unknown sync_strategy" in capsys.readouterr().err
+
+    def test_hardlink_shares_inode(self, tmp_path):
+        """hardlink では dst がソースと同じ inode になり、needs_sync は False のまま。"""
+        orchestra_path, claude_dir, agent_file = _setup_agent_package(tmp_path)
+
+        count, _ = sync_engine.sync_packages(
+            claude_dir, orchestra_path, ["core"], set(), strategy="hardlink"
+        )
+
+        dst = claude_dir / "agents" / "planner.md"
+        assert count == 2
+        assert dst.samefile(agent_file)
+        assert sync_engine.needs_sync(agent_file, dst) is False
+
+    def test_symlink_points_to_source(self, tmp_path):
+        """symlink では dst がソースへのリンクになる。"""
+        orchestra_path, claude_dir, agent_file = _setup_agent_package(tmp_path)
+
+        sync_engine.sync_packages(claude_dir, orchestra_path, ["core"], set(), strategy="symlink")
+
+        dst = claude_dir / "agents" / "planner.md"
+        assert dst.is_symlink()
+        assert dst.resolve() == agent_file.resolve()
+
+    def test_local_override_always_copied(self, tmp_path):
+        """*.local.yaml はリンク方式でも通常ファイルとしてコピーする。"""
+        orchestra_path, claude_dir, _ = _setup_agent_package(tmp_path)
+
+        sync_engine.sync_packages(claude_dir, orchestra_path, ["core"], set(), strategy="symlink")
+
+        local = claude_dir / "config" / "core" / "base.local.yaml"
+        assert local.is_file()
+        assert not local.is_symlink()
+
+    def test_reflink_falls_back_to_copy(self, tmp_path):
+        """reflink 非対応の FS では copy にフォールバックする。"""
+        src = tmp_path / "src.md"
+        src.write_text("content")
+        dst = tmp_path / "out" / "dst.md"
+
+        used = sync_engine.place_file(src, dst, "reflink")
+
+        assert used in ("reflink", "copy")
+        assert dst.read_text() == "content"
+        assert not dst.is_symlink()
+        assert not list(dst.parent.glob(".*.orchestra-tmp"))
+
+    def test_hardlink_failure_falls_back_to_copy(self, tmp_path, monkeypatch):
+        """os.link が失敗（別デバイス等）した場合は copy する。"""
+        src = tmp_path / "src.md"
+        src.write_text("content")
+        dst = tmp_path / "dst.md"
+
+        def fail_link(*_args):
+            raise OSError(18, "Invalid cross-device link")
+
+        monkeypatch.setattr(sync_engine.os, "link", fail_link)
+
+        assert sync_engine.place_file(src, dst, "hardlink") == "copy"
+        assert dst.read_text() == "content"
+        assert not dst.samefile(src)
+
+    def test_relink_to_copy_does_not_touch_source(self, tmp_path):
+        """hardlink から copy に戻すとき、ソースと共有した inode を書き換えずに分離する。"""
+        orchestra_path, claude_dir, agent_file = _setup_agent_package(tmp_path)
+        sync_engine.sync_packages(claude_dir, orchestra_path, ["core"], set(), strategy="hardlink")
+
+        count, _ = sync_engine.sync_packages(
+            claude_dir, orchestra_path, ["core"], set(), strategy="copy", relink=True
+        )
+
+        dst = claude_dir / "agents" / "planner.md"
+        assert count == 2
+        assert not dst.samefile(agent_file)
+        assert dst.read_text() == agent_file.read_text()
+
+    def test_dangling_symlink_removed_as_stale(self, tmp_path):
+        """ソースが消えたリンク切れ symlink も stale cleanup で削除する。"""
+        orchestra_path, claude_dir, agent_file = _setup_agent_package(tmp_path)
+        sync_engine.sync_packages(claude_dir, orchestra_path, ["core"], set(), strategy="symlink")
+        agent_file.unlink()
+
+        removed = sync_engine.remove_stale_files(claude_dir, ["agents/planner.md"], set())
+
+        assert removed == 1
+        assert not (claude_dir / "agents" / "planner.md").is_symlink()
+
+
+class TestSyncHooks:
+    """sync_hooks のテスト。"""
+
+    def test_filtered_hook_replaces_plain_command(self, tmp_path):
+        """manifest に filter を追加すると、既存の素のコマンドをガード経由に置き換える。"""
+        orchestra_path = tmp_path / "orchestra"
+        pkg_dir = orchestra_path / "packages" / "core"
+        pkg_dir.mkdir(parents=True)
+        hook = {"file": "lint.py", "matcher": "Edit", "filter": {"extensions": ["py"]}}
+        (pkg_dir / "manifest.json").write_text(
+            json.dumps({"name": "core", "hooks": {"PostToolUse": [hook]}}), encoding="utf-8"
+        )
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude").mkdir(parents=True)
+        plain = sync_engine.get_hook_command("core", "lint.py")
+        settings = {
+            "hooks": {
+                "PostToolUse": [
+                    {"matcher": "Edit", "hooks": [{"type": "command", "command": plain}]}
+                ]
+            }
+        }
+        settings_path = project_dir / ".claude" / "settings.local.json"
+        settings_path.write_text(json.dumps(settings), encoding="utf-8")
+
+        assert sync_engine.sync_hooks(project_dir, orchestra_path, ["core"]) == 2
+
+        entries = json.loads(settings_path.read_text())["hooks"]["PostToolUse"]
+        commands = [h["command"] for e in entries for h in e["hooks"]]
+        assert commands == [sync_engine.get_hook_command("core", "lint.py", hook["filter"])]
+        assert commands[0].startswith('sh "$AI_ORCHESTRA_DIR/packages/core/hooks/hook-guard.sh"')
@@ -1,21 +1,29 @@
-"""sync-orchestra.py の build_facets mtime スキップのテスト。
+"""sync-orchestra.py の build_facets 差分ビルドのテスト。
 
 テスト観点:
-- 生成物がソースより新しい場合はビルドをスキップする
-- 生成物が存在しない場合はビルドする
-- ソースが更新された場合はビルドする
+- 依存ファイルが変わらなければビルドをスキップする（touch のみも含む）
+- 生成物が存在しない / 依存レコードがない場合はビルドする
+- ソースが更新された場合は、その出力だけをビルドする
+- 描画結果が同一なら生成物を書き換えない
 """
 
 from __future__ import annotations
 
 import os
+import sys
 import time
 from pathlib import Path
 
 from tests.module_loader import REPO_ROOT, load_module
 
-sync_mod = load_module("sync_orchestra", "scripts/sync-orchestra.py")
-build_facets = sync_mod.build_facets
+# sync_engine は scripts/ からの相対 import を使うため sys.path にスクリプトルートを追加
+_scripts_dir = str(REPO_ROOT / "scripts")
+if _scripts_dir not in sys.path:
+    sys.path.insert(0, _scripts_dir)
+
+# sync-orchestra.py は sync_engine を遅延 import するため、build_facets は sync_engine から取得する
+sync_engine = load_module("sync_engine", "scripts/lib/sync_engine.py")
+build_facets = sync_engine.build_facets
 
 
 def _setup_minimal_facets(orchestra_dir: Path, project_dir: Path) -> None:
@@ -47,38 +55,9 @@ instruction: |
         encoding="utf-8",
     )
 
-    # orchestra-manager.py と依存モジュールが必要（build_facets がサブプロセスで呼ぶ）
-    scripts_dir = orchestra_dir / "scripts"
-    scripts_dir.mkdir(parents=True, exist_ok=True)
-    import shutil
-
-    shutil.copy2(
-        REPO_ROOT / "scripts" / "orchestra-manager.py", scripts_dir / "orchestra-manager.py"
-    )
-
-    lib_dst = scripts_dir / "lib"
-    lib_dst.mkdir(exist_ok=True)
-    for lib_name in [
-        "__init__.py",
-        "orchestra_models.py",
-        "orchestra_context.py",
-        "orchestra_hooks.py",
-        "facet_builder.py",
-        "gitignore_sync.py",
-        "scaffold.py",
-        "agent_model_patch.py",
-        "hook_utils.py",
-        "sync_engine.py",
-        "settings_io.py",
-    ]:
-        src_script = REPO_ROOT / "scripts" / "lib" / lib_name
-        dst_script = lib_dst / lib_name
-        if src_script.exists() and not dst_script.exists():
-            shutil.copy2(src_script, dst_script)
-
 
 def _create_stale_generated(project_dir: Path) -> None:
-    """生成物をソースより新しいタイムスタンプで作成する。"""
+    """依存レコードのない生成物をソースより新しいタイムスタンプで作成する。"""
     skills_dir = project_dir / ".claude" / "skills" / "test-skill"
     skills_dir.mkdir(parents=True, exist_ok=True)
     skill_path = skills_dir / "SKILL.md"
@@ -88,38 +67,89 @@ def _create_stale_generated(project_dir: Path) -> None:
     os.utime(skill_path, (future_time, future_time))
 
 
-class TestBuildFacetsMtime:
-    def test_skip_when_generated_newer(self, tmp_path: Path) -> None:
-        """生成物がソースより新しい場合はスキップ（return 0）。"""
+def _add_second_skill(orchestra_dir: Path) -> None:
+    """別 policy に依存する 2 つ目の composition を追加する。"""
+    (orchestra_dir / "facets" / "compositions" / "other-skill.yaml").write_text(
+        """\
+name: other-skill
+description: other
+frontmatter:
+  name: other-skill
+  description: other
+policies:
+  - other-policy
+instruction: |
+  # Other
+  other-body
+""",
+        encoding="utf-8",
+    )
+    (orchestra_dir / "facets" / "policies" / "other-policy.md").write_text(
+        "# Other Policy\n", encoding="utf-8"
+    )
+
+
+def _bump_mtime(path: Path) -> None:
+    future = time.time() + 7200
+    os.utime(path, (future, future))
+
+
+class TestBuildFacetsIncremental:
+    def test_skip_when_deps_unchanged(self, tmp_path: Path) -> None:
+        """依存ファイルが変わらなければ 2 回目はスキップ（return 0）。"""
         orchestra_dir = tmp_path / "orchestra"
         project_dir = tmp_path / "project"
         project_dir.mkdir(parents=True)
         _setup_minimal_facets(orchestra_dir, project_dir)
-        _create_stale_generated(project_dir)
 
-        result = build_facets(orchestra_dir, project_dir)
-        assert result == 0
+        assert build_facets(orchestra_dir, project_dir) == 1
+        assert build_facets(orchestra_dir, project_dir) == 0
 
-    def test_build_when_source_newer(self, tmp_path: Path) -> None:
-        """ソースが生成物より新しい場合はビルドする。"""
+    def test_skip_when_only_touched(self, tmp_path: Path) -> None:
+        """mtime だけ変わり内容が同じ場合は再ビルドしない。"""
         orchestra_dir = tmp_path / "orchestra"
         project_dir = tmp_path / "project"
         project_dir.mkdir(parents=True)
         _setup_minimal_facets(orchestra_dir, project_dir)
-        _create_stale_generated(project_dir)
-
-        # ソースのタイムスタンプを生成物より新しくする
+        build_facets(orchestra_dir, project_dir)
         skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
-        composition_path = orchestra_dir / "facets" / "compositions" / "test-skill.yaml"
-        far_future = time.time() + 7200
-        os.utime(composition_path, (far_future, far_future))
+        mtime_before = skill_path.stat().st_mtime_ns
 
-        result = build_facets(orchestra_dir, project_dir)
-        assert result > 0
+        _bump_mtime(orchestra_dir / "facets" / "policies" / "test-policy.md")
+        _bump_mtime(orchestra_dir / "facets" / "compositions" / "test-skill.yaml")
+
+        assert build_facets(orchestra_dir, project_dir) == 0
+        assert skill_path.stat().st_mtime_ns == mtime_before
 
+    def test_build_when_source_changed(self, tmp_path: Path) -> None:
+        """ソースの内容が変わった場合はビルドする。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        build_facets(orchestra_dir, project_dir)
+
+        (orchestra_dir / "facets" / "policies" / "test-policy.md").write_text(
+            "# Test Policy\n\nupdated-policy-body\n", encoding="utf-8"
+        )
+
+        assert build_facets(orchestra_dir, project_dir) == 1
+        skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
         content = skill_path.read_text(encoding="utf-8")
         assert "original-body" in content
-        assert "policy-body" in content
+        assert "updated-policy-body" in content
+
+    def test_build_when_generated_has_no_record(self, tmp_path: Path) -> None:
+        """依存レコードのない既存生成物は、タイムスタンプに関わらずビルドする。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        _create_stale_generated(project_dir)
+
+        assert build_facets(orchestra_dir, project_dir) == 1
+        skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
+        assert "policy-body" in skill_path.read_text(encoding="utf-8")
 
     def test_build_when_no_generated_exists(self, tmp_path: Path) -> None:
         """生成物が存在しない場合はビルドする。"""
@@ -130,3 +160,118 @@ class TestBuildFacetsMtime:
 
         result = build_facets(orchestra_dir, project_dir)
         assert result > 0
+
+    def test_rebuild_when_generated_deleted(self, tmp_path: Path) -> None:
+        """生成物が削除された場合は依存が変わらなくても再生成する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        build_facets(orchestra_dir, project_dir)
+        skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
+        skill_path.unlink()
+
+        assert build_facets(orchestra_dir, project_dir) == 1
+        assert skill_path.is_file()
+
+    def test_hand_edited_output_kept_when_deps_unchanged(self, tmp_path: Path) -> None:
+        """依存が変わらなければ、直接編集された生成物（extract 前のチューニング）を上書きしない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        build_facets(orchestra_dir, project_dir)
+        skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
+        skill_path.write_text("tuned-content", encoding="utf-8")
+
+        assert build_facets(orchestra_dir, project_dir) == 0
+        assert skill_path.read_text(encoding="utf-8") == "tuned-content"
+
+    def test_only_dependents_rebuilt(self, tmp_path: Path) -> None:
+        """policy を 1 つ変更すると、それに依存する出力だけを再ビルドする。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        _add_second_skill(orchestra_dir)
+        assert build_facets(orchestra_dir, project_dir) == 2
+        other_path = project_dir / ".claude" / "skills" / "other-skill" / "SKILL.md"
+        other_mtime = other_path.stat().st_mtime_ns
+
+        (orchestra_dir / "facets" / "policies" / "test-policy.md").write_text(
+            "# Test Policy\n\nchanged\n", encoding="utf-8"
+        )
+
+        assert build_facets(orchestra_dir, project_dir) == 1
+        assert other_path.stat().st_mtime_ns == other_mtime
+
+    def test_local_override_triggers_rebuild(self, tmp_path: Path) -> None:
+        """プロジェクトローカルの facet 追加で解決先が変わった出力を再ビルドする。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        build_facets(orchestra_dir, project_dir)
+
+        local_policies = project_dir / ".claude" / "facets" / "policies"
+        local_policies.mkdir(parents=True)
+        (local_policies / "test-policy.md").write_text("# Local\n\nlocal-body\n", encoding="utf-8")
+
+        assert build_facets(orchestra_dir, project_dir) == 1
+        skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
+        assert "local-body" in skill_path.read_text(encoding="utf-8")
+
+    def test_identical_render_not_rewritten(self, tmp_path: Path) -> None:
+        """依存が変わっても描画結果が同一なら生成物を書き換えない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        build_facets(orchestra_dir, project_dir)
+        skill_path = project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md"
+        mtime_before = skill_path.stat().st_mtime_ns
+
+        composition_path = orchestra_dir / "facets" / "compositions" / "test-skill.yaml"
+        composition_path.write_text(
+            "# comment only\n" + composition_path.read_text(encoding="utf-8"), encoding="utf-8"
+        )
+
+        assert build_facets(orchestra_dir, project_dir) == 0
+        assert skill_path.stat().st_mtime_ns == mtime_before
+
+
+class TestBuildFacetsInProcess:
+    def test_codex_target_built_in_same_pass(self, tmp_path: Path) -> None:
+        """codex-suggestions インストール時は claude / codex を 1 回のビルドで生成する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+
+        result = build_facets(orchestra_dir, project_dir, ["core", "codex-suggestions"])
+
+        assert result == 2
+        assert (project_dir / ".claude" / "skills" / "test-skill" / "SKILL.md").is_file()
+        assert (project_dir / ".codex" / "skills" / "test-skill" / "SKILL.md").is_file()
+
+    def test_built_lines_not_printed(self, tmp_path: Path, capsys) -> None:
+        """built 行は件数のみ返し、SessionStart の stdout には出さない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+
+        build_facets(orchestra_dir, project_dir)
+
+        assert "[facet] built" not in capsys.readouterr().out
+
+    def test_build_error_returns_zero(self, tmp_path: Path, capsys) -> None:
+        """facet 解決エラー時は例外を伝播させず 0 を返す。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir(parents=True)
+        _setup_minimal_facets(orchestra_dir, project_dir)
+        (orchestra_dir / "facets" / "policies" / "test-policy.md").unlink()
+
+        assert build_facets(orchestra_dir, project_dir) == 0
+        assert "facet build (claude) error" in capsys.readouterr().err
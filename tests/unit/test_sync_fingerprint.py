@@ -0,0 +1,235 @@
+"""sync_fingerprint.py と sync-orchestra.py 高速パスのユニットテスト。"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import load_module
+
+sync_fingerprint = load_module("sync_fingerprint", "scripts/lib/sync_fingerprint.py")
+compute_sync_fingerprint = sync_fingerprint.compute_sync_fingerprint
+FINGERPRINT_KEY = sync_fingerprint.FINGERPRINT_KEY
+
+sync_mod = load_module("sync_orchestra", "scripts/sync-orchestra.py")
+
+
+def _setup_orchestra(orchestra_dir: Path) -> None:
+    """同期入力となる最小の orchestra ツリーを作成する。"""
+    pkg_dir = orchestra_dir / "packages" / "demo"
+    (pkg_dir / "config").mkdir(parents=True)
+    (pkg_dir / "config" / "demo.yaml").write_text("key: value\n", encoding="utf-8")
+    (pkg_dir / "hooks").mkdir()
+    (pkg_dir / "manifest.json").write_text(
+        json.dumps({"name": "demo", "version": "0.1.0", "config": ["config/demo.yaml"]}),
+        encoding="utf-8",
+    )
+    policies = orchestra_dir / "facets" / "policies"
+    policies.mkdir(parents=True)
+    (policies / "p.md").write_text("# P\n", encoding="utf-8")
+
+
+def _bump_mtime(path: Path) -> None:
+    future = time.time() + 100
+    os.utime(path, (future, future))
+
+
+class TestComputeSyncFingerprint:
+    """compute_sync_fingerprint のテスト。"""
+
+    def test_stable_when_unchanged(self, tmp_path):
+        """入力が変わらなければ同じ値を返す。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_orchestra(orchestra_dir)
+        orch = {"installed_packages": ["demo"]}
+
+        first = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        second = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        assert first == second
+
+    def test_ignores_own_key(self, tmp_path):
+        """orchestra.json に記録したフィンガープリント自身は入力に含めない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_orchestra(orchestra_dir)
+        orch = {"installed_packages": ["demo"]}
+
+        fp = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        orch[FINGERPRINT_KEY] = fp
+        assert compute_sync_fingerprint(orchestra_dir, project_dir, orch) == fp
+
+    def test_changes_on_in_place_edit(self, tmp_path):
+        """ディレクトリ mtime が変わらない in-place 編集も検出する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_orchestra(orchestra_dir)
+        orch = {"installed_packages": ["demo"]}
+
+        before = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        _bump_mtime(orchestra_dir / "facets" / "policies" / "p.md")
+        assert compute_sync_fingerprint(orchestra_dir, project_dir, orch) != before
+
+    def test_changes_on_installed_packages(self, tmp_path):
+        """orchestra.json の内容変更を検出する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_orchestra(orchestra_dir)
+
+        before = compute_sync_fingerprint(orchestra_dir, project_dir, {"installed_packages": []})
+        after = compute_sync_fingerprint(
+            orchestra_dir, project_dir, {"installed_packages": ["demo"]}
+        )
+        assert before != after
+
+    def test_changes_on_local_override(self, tmp_path):
+        """*.local.yaml の追加を検出する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        config_dir = project_dir / ".claude" / "config" / "agent-routing"
+        config_dir.mkdir(parents=True)
+        _setup_orchestra(orchestra_dir)
+        orch = {"installed_packages": ["demo"]}
+
+        before = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        (config_dir / "cli-tools.local.yaml").write_text("x: 1\n", encoding="utf-8")
+        assert compute_sync_fingerprint(orchestra_dir, project_dir, orch) != before
+
+    def test_ignores_hook_code_and_pycache(self, tmp_path):
+        """hooks/ や __pycache__ の更新は同期結果に影響しないため無視する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        _setup_orchestra(orchestra_dir)
+        orch = {"installed_packages": ["demo"]}
+
+        before = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        hooks_dir = orchestra_dir / "packages" / "demo" / "hooks"
+        (hooks_dir / "__pycache__").mkdir()
+        (hooks_dir / "hook.py").write_text("print()\n", encoding="utf-8")
+        assert compute_sync_fingerprint(orchestra_dir, project_dir, orch) == before
+
+    def test_settings_only_hooks_considered(self, tmp_path):
+        """settings.local.json は hooks 以外の変更を無視する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude").mkdir(parents=True)
+        _setup_orchestra(orchestra_dir)
+        settings_path = project_dir / ".claude" / "settings.local.json"
+        settings_path.write_text(json.dumps({"hooks": {}}), encoding="utf-8")
+        orch = {"installed_packages": ["demo"]}
+
+        before = compute_sync_fingerprint(orchestra_dir, project_dir, orch)
+        settings_path.write_text(
+            json.dumps({"hooks": {}, "permissions": {"allow": ["Bash(ls)"]}}), encoding="utf-8"
+        )
+        assert compute_sync_fingerprint(orchestra_dir, project_dir, orch) == before
+
+        settings_path.write_text(json.dumps({"hooks": {"Stop": []}}), encoding="utf-8")
+        assert compute_sync_fingerprint(orchestra_dir, project_dir, orch) != before
+
+
+class TestSyncOrchestraFastPath:
+    """sync-orchestra.main の高速パスのテスト。"""
+
+    def _run_main(self, project_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps({"cwd": str(project_dir)})))
+        sync_mod.main()
+
+    def test_second_run_skips_and_records_fingerprint(self, tmp_path, monkeypatch, capsys):
+        """2 回目以降は何も出力せず、orchestra.json も書き換えない。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude").mkdir(parents=True)
+        _setup_orchestra(orchestra_dir)
+        orch_path = project_dir / ".claude" / "orchestra.json"
+        orch_path.write_text(json.dumps({"installed_packages": ["demo"]}), encoding="utf-8")
+        monkeypatch.setenv("AI_ORCHESTRA_DIR", str(orchestra_dir))
+
+        self._run_main(project_dir, monkeypatch)
+        first_out = capsys.readouterr().out
+        assert "synced" in first_out
+        recorded = json.loads(orch_path.read_text(encoding="utf-8"))
+        assert recorded.get(FINGERPRINT_KEY)
+
+        mtime_before = orch_path.stat().st_mtime_ns
+        self._run_main(project_dir, monkeypatch)
+        assert capsys.readouterr().out == ""
+        assert orch_path.stat().st_mtime_ns == mtime_before
+
+    def test_slow_path_logs_step_timings(self, tmp_path, monkeypatch, capsys):
+        """同期を実行した場合のみステップ別タイミングを .claude/logs に記録する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude").mkdir(parents=True)
+        _setup_orchestra(orchestra_dir)
+        orch_path = project_dir / ".claude" / "orchestra.json"
+        orch_path.write_text(json.dumps({"installed_packages": ["demo"]}), encoding="utf-8")
+        monkeypatch.setenv("AI_ORCHESTRA_DIR", str(orchestra_dir))
+
+        self._run_main(project_dir, monkeypatch)
+        self._run_main(project_dir, monkeypatch)
+        capsys.readouterr()
+
+        log_path = project_dir / ".claude" / "logs" / "sync-timings.jsonl"
+        entries = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+        assert len(entries) == 1
+        assert set(entries[0]["steps"]) == {
+            "facet_managed",
+            "sync_packages",
+            "build_facets",
+            "remove_stale",
+            "patch_agents",
+            "sync_hooks",
+            "sync_claudeignore",
+            "sync_gitignore",
+        }
+
+    def test_source_change_triggers_sync(self, tmp_path, monkeypatch, capsys):
+        """orchestra 側のファイル更新で再同期される。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude").mkdir(parents=True)
+        _setup_orchestra(orchestra_dir)
+        orch_path = project_dir / ".claude" / "orchestra.json"
+        orch_path.write_text(json.dumps({"installed_packages": ["demo"]}), encoding="utf-8")
+        monkeypatch.setenv("AI_ORCHESTRA_DIR", str(orchestra_dir))
+
+        self._run_main(project_dir, monkeypatch)
+        capsys.readouterr()
+
+        _bump_mtime(orchestra_dir / "packages" / "demo" / "config" / "demo.yaml")
+        self._run_main(project_dir, monkeypatch)
+        assert "1 synced" in capsys.readouterr().out
+
+    def test_strategy_change_relinks_existing_files(self, tmp_path, monkeypatch, capsys):
+        """sync_strategy を変えると既存ファイルも配置し直し、適用方式を記録する。"""
+        orchestra_dir = tmp_path / "orchestra"
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude").mkdir(parents=True)
+        _setup_orchestra(orchestra_dir)
+        orch_path = project_dir / ".claude" / "orchestra.json"
+        orch_path.write_text(json.dumps({"installed_packages": ["demo"]}), encoding="utf-8")
+        monkeypatch.setenv("AI_ORCHESTRA_DIR", str(orchestra_dir))
+        self._run_main(project_dir, monkeypatch)
+        capsys.readouterr()
+
+        orch = json.loads(orch_path.read_text(encoding="utf-8"))
+        orch["sync_strategy"] = "hardlink"
+        orch_path.write_text(json.dumps(orch), encoding="utf-8")
+        self._run_main(project_dir, monkeypatch)
+
+        src = orchestra_dir / "packages" / "demo" / "config" / "demo.yaml"
+        dst = project_dir / ".claude" / "config" / "demo" / "demo.yaml"
+        assert dst.samefile(src)
+        recorded = json.loads(orch_path.read_text(encoding="utf-8"))
+        assert recorded["synced_strategy"] == "hardlink"
@@ -0,0 +1,147 @@
+"""sync_pipeline.py（SessionStart 同期ステップの DAG 実行）のテスト。"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from tests.module_loader import load_module
+
+sync_pipeline = load_module("sync_pipeline", "scripts/lib/sync_pipeline.py")
+step = sync_pipeline.step
+
+
+def _noop(_results):
+    return None
+
+
+class TestBuildDependencies:
+    def test_conflicting_resources_are_ordered(self) -> None:
+        """書き込みが衝突するステップだけが先行ステップを待つ。"""
+        steps = [
+            step("a", _noop, writes={".claude/agents"}),
+            step("b", _noop, writes={".claude/skills"}),
+            step("c", _noop, reads={".claude/agents"}),
+            step("d", _noop, reads={".claude/skills"}, writes={".gitignore"}),
+            step("e", _noop, reads={"registry"}),
+        ]
+        deps = sync_pipeline.build_dependencies(steps)
+
+        assert deps == {"a": set(), "b": set(), "c": {"a"}, "d": {"b"}, "e": set()}
+
+    def test_read_then_write_is_ordered(self) -> None:
+        """先行ステップが読むリソースを後続が書く場合も順序を保つ。"""
+        steps = [step("reader", _noop, reads={"x"}), step("writer", _noop, writes={"x"})]
+        assert sync_pipeline.build_dependencies(steps)["writer"] == {"reader"}
+
+    def test_ancestor_path_conflicts_with_descendant(self) -> None:
+        """親ディレクトリと配下のパスは衝突とみなす（名前の前方一致だけでは衝突しない）。"""
+        steps = [
+            step("codex", _noop, writes={".codex"}),
+            step("codex_skills", _noop, reads={".codex/skills"}),
+            step("claude_skills", _noop, writes={".claude/skills/"}),
+            step("claude", _noop, reads={".claude"}),
+            step("claudeignore", _noop, writes={".claudeignore"}),
+        ]
+        deps = sync_pipeline.build_dependencies(steps)
+
+        assert deps["codex_skills"] == {"codex"}
+        assert deps["claude"] == {"claude_skills"}
+        assert deps["claudeignore"] == set()
+
+    def test_after_must_reference_earlier_step(self) -> None:
+        """after は宣言順で前にあるステップのみ参照できる。"""
+        with pytest.raises(ValueError):
+            sync_pipeline.build_dependencies([step("a", _noop, after=["b"]), step("b", _noop)])
+        with pytest.raises(ValueError):
+            sync_pipeline.build_dependencies([step("a", _noop), step("a", _noop)])
+
+
+class TestRunPipeline:
+    def test_independent_steps_overlap(self) -> None:
+        """独立したステップは並行に実行される（互いの開始を待ち合わせられる）。"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(name):
+            def run(_results):
+                barrier.wait()
+                return name
+
+            return run
+
+        steps = [
+            step("packages", meet("packages"), writes={".claude/agents"}),
+            step("facets", meet("facets"), writes={".claude/skills"}),
+        ]
+        results, timings = sync_pipeline.run_pipeline(steps)
+
+        assert results == {"packages": "packages", "facets": "facets"}
+        assert timings["packages"]["thread"] != timings["facets"]["thread"]
+
+    def test_dependent_step_sees_results(self) -> None:
+        """依存先の結果は results 経由で受け取り、依存先の完了後に開始する。"""
+        order: list[str] = []
+
+        def first(_results):
+            order.append("first")
+            return 41
+
+        def second(results):
+            order.append("second")
+            return results["first"] + 1
+
+        steps = [
+            step("first", first, writes={"x"}),
+            step("second", second, writes={"x"}, after=["first"]),
+        ]
+        results, timings = sync_pipeline.run_pipeline(steps)
+
+        assert results["second"] == 42
+        assert order == ["first", "second"]
+        assert timings["second"]["start_ms"] >= timings["first"]["start_ms"]
+
+    def test_step_error_propagates(self) -> None:
+        """ステップの例外は呼び出し元に再送出され、依存ステップは実行されない。"""
+        ran: list[str] = []
+
+        def boom(_results):
+            raise RuntimeError("boom")
+
+        steps = [
+            step("boom", boom, writes={"x"}),
+            step("after", lambda r: ran.append("after"), reads={"x"}),
+        ]
+        with pytest.raises(RuntimeError):
+            sync_pipeline.run_pipeline(steps)
+        assert ran == []
+
+
+class TestWriteTimings:
+    def test_appends_jsonl_sorted_by_start(self, tmp_path: Path) -> None:
+        """1 実行 1 行で追記し、ステップは開始順に並ぶ。"""
+        timings = {
+            "late": {"start_ms": 5.0, "ms": 1.0, "thread": "sync_1"},
+            "early": {"start_ms": 0.1, "ms": 4.0, "thread": "sync_0"},
+        }
+        sync_pipeline.write_timings(tmp_path, timings, 6.0)
+        sync_pipeline.write_timings(tmp_path, timings, 7.0)
+
+        path = tmp_path / ".claude" / "logs" / "sync-timings.jsonl"
+        entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert [e["total_ms"] for e in entries] == [6.0, 7.0]
+        assert list(entries[0]["steps"]) == ["early", "late"]
+
+    def test_rotates_when_too_large(self, tmp_path: Path, monkeypatch) -> None:
+        """上限サイズを超えたログは .1 に退避してから書き始める。"""
+        monkeypatch.setattr(sync_pipeline, "TIMINGS_MAX_BYTES", 10)
+        log_dir = tmp_path / ".claude" / "logs"
+        log_dir.mkdir(parents=True)
+        (log_dir / "sync-timings.jsonl").write_text("x" * 100 + "\n", encoding="utf-8")
+
+        sync_pipeline.write_timings(tmp_path, {}, 1.0)
+
+        assert (log_dir / "sync-timings.jsonl.1").read_text(encoding="utf-8").startswith("xxx")
+        assert len((log_dir / "sync-timings.jsonl").read_text(encoding="utf-8").splitlines()) == 1
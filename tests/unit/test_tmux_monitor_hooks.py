@@ -16,6 +16,7 @@ core_hooks_dir = str(REPO_ROOT / "packages" / "core" / "hooks")
 if core_hooks_dir not in sys.path:
     sys.path.insert(0, core_hooks_dir)
 
+tmux_common = load_module("tmux_common", "packages/tmux-monitor/hooks/tmux_common.py")
 tmux_format = load_module(
     "tmux_format_output_test", "packages/tmux-monitor/hooks/tmux-format-output.py"
 )
@@ -44,7 +45,7 @@ class TestTmuxFormatOutput:
         assert tmux_format.format_tool_input({"file_path": "src/app.py"}) == "src/app.py"
 
     def test_main_formats_supported_record_types(
-        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str], tmp_path: Path
     ) -> None:
         """assistant / user / progress を順に整形表示する。"""
         lines = "\n".join(
@@ -75,9 +76,12 @@ class TestTmuxFormatOutput:
                 ),
             ]
         )
-        monkeypatch.setattr("sys.stdin", io.StringIO(lines))
+        transcript = tmp_path / "agent.jsonl"
+        transcript.write_text(lines, encoding="utf-8")
 
-        tmux_format.main()
+        with transcript.open() as stdin:
+            monkeypatch.setattr("sys.stdin", stdin)
+            tmux_format.main()
 
         captured = capsys.readouterr()
         assert "hello" in captured.out
@@ -94,7 +98,7 @@ class TestTmuxPreTask:
     ) -> None:
         """有効時は description をキューに追記する。"""
         queue_dir = tmp_path / "session-info"
-        monkeypatch.setattr(tmux_pre_task, "SESSION_INFO_DIR", str(queue_dir))
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(queue_dir))
         monkeypatch.setattr(tmux_pre_task, "is_tmux_monitoring_enabled", lambda _: True)
         monkeypatch.setattr(
             "sys.stdin",
@@ -112,9 +116,8 @@ class TestTmuxPreTask:
         with pytest.raises(SystemExit, match="0"):
             tmux_pre_task.main()
 
-        queue_file = queue_dir / "sess-1.task-queue"
-        lines = queue_file.read_text(encoding="utf-8").splitlines()
-        assert json.loads(lines[0]) == {"description": "Fix flaky tests"}
+        item = queue_dir / "sess-1.task-queue" / "00000000.json"
+        assert json.loads(item.read_text(encoding="utf-8")) == {"description": "Fix flaky tests"}
 
 
 class TestTmuxSessionEnd:
@@ -142,14 +145,19 @@ class TestTmuxSessionEnd:
         write("sess-1.lock-path", str(lock_a))
         write("sess-1.shared-dir", str(shared_a))
         write("sess-1.tmux-session", "tmux-a")
-        write("sess-1.task-queue", '{"description": "x"}\n')
+        (info_dir / "sess-1.task-queue").mkdir()
+        write("sess-1.task-queue/00000000.json", '{"description": "x"}')
         write("sess-2.pid", "123")
         write("sess-2.lock-path", str(lock_b))
         write("sess-2.shared-dir", str(shared_b))
         write("sess-2.tmux-session", "tmux-b")
         write("sess-2.task-queue", '{"description": "y"}\n')
+        (info_dir / "sess-1.stream").mkdir()
+        write("sess-1.stream/agent-1.json", "{}")
+        write("sess-2.streamer.lock", "")
 
         monkeypatch.setattr(tmux_session_end, "SESSION_INFO_DIR", str(info_dir))
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(info_dir))
         monkeypatch.setattr(tmux_session_end, "is_tmux_monitoring_enabled", lambda _: True)
         monkeypatch.setattr(
             tmux_session_end,
@@ -166,6 +174,8 @@ class TestTmuxSessionEnd:
         assert not lock_b.exists()
         assert not shared_a.exists()
         assert not shared_b.exists()
+        assert not (info_dir / "sess-1.stream").exists()
+        assert not (info_dir / "sess-2.streamer.lock").exists()
 
 
 class TestTmuxSessionStart:
@@ -184,6 +194,7 @@ class TestTmuxSessionStart:
             return SimpleNamespace(returncode=0, stdout="", stderr="")
 
         monkeypatch.setattr(tmux_session_start, "SESSION_INFO_DIR", str(info_dir))
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(info_dir))
         monkeypatch.setattr(tmux_session_start, "SHARED_STORE_PREFIX", shared_prefix)
         monkeypatch.setattr(tmux_session_start, "is_tmux_monitoring_enabled", lambda _: True)
         monkeypatch.setattr(
@@ -191,10 +202,11 @@ class TestTmuxSessionStart:
             "read_hook_input",
             lambda: {"cwd": str(tmp_path / "proj"), "session_id": "abcdef123456"},
         )
-        monkeypatch.setattr(tmux_session_start, "find_claude_pid", lambda: 4321)
+        monkeypatch.setattr(tmux_common, "find_claude_pid", lambda: 4321)
         monkeypatch.setattr(tmux_session_start, "cleanup_orphaned_sessions", lambda _: None)
         monkeypatch.setattr(tmux_session_start, "tmux_has_session", lambda _: False)
         monkeypatch.setattr(tmux_session_start, "run_tmux", fake_run_tmux)
+        monkeypatch.setattr(tmux_common, "run_tmux", fake_run_tmux)
 
         tmux_session_start.main()
 
@@ -206,7 +218,10 @@ class TestTmuxSessionStart:
         meta = json.loads((shared_dir / "meta.json").read_text(encoding="utf-8"))
         assert meta["session_key"] == "4321"
         assert meta["project"] == "proj"
-        assert any(call[:3] == ("new-session", "-d", "-s") for call in calls)
+        # セッション作成とボーダー設定は 1 回の tmux 起動にまとめる
+        assert len(calls) == 1
+        assert calls[0][:3] == ("new-session", "-d", "-s")
+        assert calls[0].count(";") == 2
 
 
 class TestTmuxSubagentStart:
@@ -217,25 +232,13 @@ class TestTmuxSubagentStart:
     ) -> None:
         """キューの先頭 description を返し、残りを保持する。"""
         info_dir = tmp_path / "session-info"
-        info_dir.mkdir()
-        queue_file = info_dir / "sess-1.task-queue"
-        queue_file.write_text(
-            "\n".join(
-                [
-                    json.dumps({"description": "first"}),
-                    json.dumps({"description": "second"}),
-                    "",
-                ]
-            ),
-            encoding="utf-8",
-        )
-        monkeypatch.setattr(tmux_subagent_start, "SESSION_INFO_DIR", str(info_dir))
-
-        description = tmux_subagent_start.pop_task_description("sess-1")
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(info_dir))
+        tmux_common.push_task_description("sess-1", "first")
+        tmux_common.push_task_description("sess-1", "second")
 
-        assert description == "first"
-        remaining = queue_file.read_text(encoding="utf-8").splitlines()
-        assert json.loads(remaining[0]) == {"description": "second"}
+        assert tmux_subagent_start.pop_task_description("sess-1") == "first"
+        assert tmux_subagent_start.pop_task_description("sess-1") == "second"
+        assert tmux_subagent_start.pop_task_description("sess-1") == ""
 
     def test_main_fallback_creates_pane_info(
         self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
@@ -247,11 +250,14 @@ class TestTmuxSubagentStart:
 
         def fake_run_tmux(*args: str) -> SimpleNamespace:
             calls.append(args)
-            if args[:4] == ("display-message", "-t", "claude-proj-sess123", "-p"):
-                return SimpleNamespace(returncode=0, stdout="%1\n", stderr="")
+            if args[0] == "list-panes":
+                return SimpleNamespace(returncode=1, stdout="", stderr="no session")
+            if args[0] == "new-session":
+                return SimpleNamespace(returncode=0, stdout="%1\t/dev/pts/1\tvm\n", stderr="")
             return SimpleNamespace(returncode=0, stdout="", stderr="")
 
         monkeypatch.setattr(tmux_subagent_start, "SESSION_INFO_DIR", str(info_dir))
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(info_dir))
         monkeypatch.setattr(tmux_subagent_start, "is_tmux_monitoring_enabled", lambda _: True)
         monkeypatch.setattr(
             tmux_subagent_start,
@@ -264,8 +270,8 @@ class TestTmuxSubagentStart:
                 "transcript_path": str(tmp_path / "transcript.jsonl"),
             },
         )
-        monkeypatch.setattr(tmux_subagent_start, "find_claude_pid", lambda: None)
-        monkeypatch.setattr(tmux_subagent_start, "tmux_has_session", lambda _: False)
+        monkeypatch.setattr(tmux_common, "find_claude_pid", lambda: None)
+        monkeypatch.setattr(tmux_common, "run_tmux", fake_run_tmux)
         monkeypatch.setattr(tmux_subagent_start, "run_tmux", fake_run_tmux)
         monkeypatch.setattr(tmux_subagent_start, "pop_task_description", lambda _: "Run tests")
         monkeypatch.setattr(tmux_subagent_start.os.path, "isfile", lambda _: False)
@@ -275,7 +281,67 @@ class TestTmuxSubagentStart:
 
         pane_info = (info_dir / "sess123456.pane-agent1234567").read_text(encoding="utf-8")
         assert pane_info.splitlines() == ["claude-proj-sess123", "%1"]
-        assert any(call[:3] == ("new-session", "-d", "-s") for call in calls)
+        new_session = next(call for call in calls if call[0] == "new-session")
+        assert new_session[:4] == ("new-session", "-d", "-s", "claude-proj-sess123")
+        assert ("select-pane", "-t", "claude-proj-sess123", "-T") == new_session[-5:-1]
+        # 組み立てたセッション情報は次の hook のために保存される
+        assert (info_dir / "sess123456.tmux-session").read_text(
+            encoding="utf-8"
+        ) == "claude-proj-sess123"
+        assert (info_dir / "sess123456.pid").read_text(encoding="utf-8") == "sess123"
+
+    def test_main_registers_pane_tty_with_streamer(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """ストリーマー方式ではペインは待機するだけにし、tty をストリーマーに登録する。"""
+        info_dir = tmp_path / "session-info"
+        info_dir.mkdir()
+        (info_dir / "sess-1.tmux-session").write_text("claude-proj-42", encoding="utf-8")
+        (info_dir / "sess-1.lock-path").write_text(str(tmp_path / "first"), encoding="utf-8")
+        calls: list[tuple[str, ...]] = []
+        started: list[str] = []
+
+        def fake_run_tmux(*args: str) -> SimpleNamespace:
+            calls.append(args)
+            if args[0] == "list-panes":
+                return SimpleNamespace(returncode=0, stdout="%1\t/dev/pts/7\twaiting\n", stderr="")
+            if args[0] == "respawn-pane":
+                return SimpleNamespace(returncode=0, stdout="%1\t/dev/pts/7\tt\n", stderr="")
+            return SimpleNamespace(returncode=0, stdout="", stderr="")
+
+        monkeypatch.setattr(tmux_subagent_start, "SESSION_INFO_DIR", str(info_dir))
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(info_dir))
+        monkeypatch.setattr(tmux_subagent_start, "is_tmux_monitoring_enabled", lambda _: True)
+        monkeypatch.setattr(
+            tmux_subagent_start,
+            "read_hook_input",
+            lambda: {
+                "cwd": str(tmp_path / "proj"),
+                "agent_id": "agent1234567",
+                "agent_type": "tester",
+                "session_id": "sess-1",
+                "transcript_path": str(tmp_path / "transcript.jsonl"),
+            },
+        )
+        monkeypatch.setattr(tmux_common, "run_tmux", fake_run_tmux)
+        monkeypatch.setattr(tmux_subagent_start, "run_tmux", fake_run_tmux)
+        monkeypatch.setattr(tmux_subagent_start, "pop_task_description", lambda _: "")
+        monkeypatch.setattr(tmux_subagent_start, "ensure_streamer", started.append)
+
+        tmux_subagent_start.main()
+
+        # 待機ペインの respawn・タイトル設定・tty 取得を 1 回の tmux 起動で行う
+        assert len(calls) == 2
+        respawn = calls[1]
+        assert respawn[:4] == ("respawn-pane", "-k", "-t", "%1")
+        assert respawn[4].endswith("&& exec cat")
+        assert respawn[5:11] == (";", "select-pane", "-t", "%1", "-T", "tester:agent12")
+        route = json.loads((info_dir / "sess-1.stream" / "agent1234567.json").read_text())
+        assert route == {
+            "path": str(tmp_path / "transcript" / "subagents" / "agent-agent1234567.jsonl"),
+            "tty": "/dev/pts/7",
+        }
+        assert started == ["sess-1"]
 
 
 class TestTmuxSubagentStop:
@@ -299,17 +365,18 @@ class TestTmuxSubagentStop:
         info_dir.mkdir()
         pane_info_file = info_dir / "sess-1.pane-agent1234567"
         pane_info_file.write_text("tmux-sess\n%3\n", encoding="utf-8")
+        (info_dir / "sess-1.stream").mkdir()
+        (info_dir / "sess-1.stream" / "agent1234567.json").write_text("{}", encoding="utf-8")
         calls: list[tuple[str, ...]] = []
 
         def fake_run_tmux(*args: str) -> SimpleNamespace:
             calls.append(args)
             if args[:4] == ("list-panes", "-t", "tmux-sess", "-F"):
-                return SimpleNamespace(returncode=0, stdout="%3\n", stderr="")
-            if args[:4] == ("display-message", "-t", "%3", "-p"):
-                return SimpleNamespace(returncode=0, stdout="tester:agent12\n", stderr="")
+                return SimpleNamespace(returncode=0, stdout="%3\ttester:agent12\n", stderr="")
             return SimpleNamespace(returncode=0, stdout="", stderr="")
 
         monkeypatch.setattr(tmux_subagent_stop, "SESSION_INFO_DIR", str(info_dir))
+        monkeypatch.setattr(tmux_common, "SESSION_INFO_DIR", str(info_dir))
         monkeypatch.setattr(tmux_subagent_stop, "is_tmux_monitoring_enabled", lambda _: True)
         monkeypatch.setattr(
             tmux_subagent_stop,
@@ -318,9 +385,29 @@ class TestTmuxSubagentStop:
         )
         monkeypatch.setattr(tmux_subagent_stop, "tmux_has_session", lambda _: True)
         monkeypatch.setattr(tmux_subagent_stop, "run_tmux", fake_run_tmux)
+        monkeypatch.setattr(tmux_common, "run_tmux", fake_run_tmux)
 
         tmux_subagent_stop.main()
 
         assert not pane_info_file.exists()
-        assert ("select-pane", "-t", "%3", "-T", "DONE: tester:agent12") in calls
-        assert ("set-option", "-t", "%3", "pane-border-style", "fg=green") in calls
+        assert (info_dir / "sess-1.stream" / "agent1234567.done").exists()
+        # DONE 表示とボーダー変更は 1 回の tmux 起動にまとめる
+        assert calls[-1] == (
+            "select-pane",
+            "-t",
+            "%3",
+            "-T",
+            "DONE: tester:agent12",
+            ";",
+            "set-option",
+            "-t",
+            "%3",
+            "pane-border-style",
+            "fg=green",
+            ";",
+            "set-option",
+            "-t",
+            "%3",
+            "pane-active-border-style",
+            "fg=green",
+        )